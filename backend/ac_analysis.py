@@ -0,0 +1,390 @@
+"""
+AC Frequency Response
+Builds the modified nodal analysis matrices G and C of a circuit once and
+solves (G + sC)x = b at every point of a log-spaced sweep in one batched
+NumPy solve, giving gain, phase, the measured -3 dB point and the stopband
+roll-off of the netlist as generated
+"""
+
+import hashlib
+import json
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+import si_units
+from connectivity import GROUND_NETS
+
+DEFAULT_POINTS = 200
+MAX_POINTS = 5000
+
+# Sweep around the design cutoff when the circuit states one, else a fixed range
+SPAN_DECADES = 2
+DEFAULT_RANGE = (1.0, 1e7)
+
+# Net names taken as the output, in order of preference (compared upper-case)
+OUTPUT_NETS = ('OUT', 'VOUT', 'OUTPUT')
+INPUT_NET = 'IN'
+
+# Complex matrix entries per batched solve; longer sweeps are solved in chunks
+MAX_BATCH_ENTRIES = 1 << 22
+
+CACHE_SIZE = 128
+
+# -3 dB is half power
+HALF_POWER_DB = 10 * math.log10(2)
+
+
+@dataclass
+class ACResponse:
+    """
+    Small-signal response of a circuit from its input net to its output net
+
+    Attributes:
+        freqs: Sweep frequencies in Hz
+        gain: Complex Vout/Vin per frequency
+        input_net, output_net: Nets the gain is measured between
+        cutoff_freq: Measured -3 dB frequency below the passband peak; None
+            if the sweep never crosses it
+        rolloff_db_per_decade: Slope over the last decade of the stopband
+            end of the sweep
+    """
+    freqs: np.ndarray
+    gain: np.ndarray
+    input_net: str
+    output_net: str
+    cutoff_freq: Optional[float]
+    rolloff_db_per_decade: Optional[float]
+
+    @property
+    def magnitude(self) -> np.ndarray:
+        return np.abs(self.gain)
+
+    @property
+    def magnitude_db(self) -> np.ndarray:
+        with np.errstate(divide='ignore'):
+            return 20 * np.log10(self.magnitude)
+
+    @property
+    def phase_deg(self) -> np.ndarray:
+        return np.degrees(np.unwrap(np.angle(self.gain)))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready summary and curves"""
+        return {
+            'input_net': self.input_net,
+            'output_net': self.output_net,
+            'cutoff_freq': self.cutoff_freq,
+            'rolloff_db_per_decade': self.rolloff_db_per_decade,
+            'freqs': self.freqs.tolist(),
+            'magnitude_db': [round(v, 4) if math.isfinite(v) else None for v in self.magnitude_db.tolist()],
+            'phase_deg': [round(v, 3) for v in self.phase_deg.tolist()],
+        }
+
+
+def circuit_hash(circuit_json: Dict[str, Any], **options: Any) -> str:
+    """Stable hash of the electrical content of a circuit plus analysis options"""
+    components = [
+        (str(comp.get('id')), comp.get('type'), str(comp.get('value')), comp.get('nets'))
+        for comp in circuit_json.get('components', []) if isinstance(comp, dict)
+    ]
+    payload = json.dumps({'components': components, 'constraints': circuit_json.get('constraints'),
+                          'options': options}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cutoff_hint(circuit_json: Dict[str, Any]) -> Optional[float]:
+    constraints = circuit_json.get('constraints')
+    if not isinstance(constraints, dict):
+        return None
+    cutoff = si_units.try_parse(constraints.get('cutoff_freq'))
+    return cutoff if cutoff and cutoff > 0 else None
+
+
+def _sweep(circuit_json: Dict[str, Any], f_start: Optional[float], f_stop: Optional[float], points: int) -> np.ndarray:
+    if not 2 <= points <= MAX_POINTS:
+        raise ValueError(f"Sweep needs between 2 and {MAX_POINTS} points, got {points}")
+    cutoff = _cutoff_hint(circuit_json)
+    if cutoff:
+        low, high = cutoff / 10 ** SPAN_DECADES, cutoff * 10 ** SPAN_DECADES
+    else:
+        low, high = DEFAULT_RANGE
+    low = f_start if f_start is not None else low
+    high = f_stop if f_stop is not None else high
+    if not 0 < low < high:
+        raise ValueError(f"Sweep needs 0 < f_start < f_stop, got {low} and {high}")
+    return np.logspace(math.log10(low), math.log10(high), points)
+
+
+def pick_nets(components: List[Dict[str, Any]], input_net: Optional[str],
+               output_net: Optional[str]) -> Tuple[str, str]:
+    nets = []
+    for comp in components:
+        for net in comp.get('nets') or []:
+            if net and net not in nets:
+                nets.append(net)
+    by_upper = {net.upper(): net for net in nets}
+    if input_net is None:
+        sources = [comp['nets'][0] for comp in components
+                   if comp.get('type') == 'voltage_source' and len(comp.get('nets') or []) == 2
+                   and str(comp['nets'][1]).upper() in GROUND_NETS]
+        input_net = by_upper.get(INPUT_NET) or (sources[0] if sources else None)
+    if input_net not in nets:
+        raise ValueError(f"Input net {input_net!r} not found; name the driven net 'IN'")
+    if output_net is None:
+        output_net = next((by_upper[name] for name in OUTPUT_NETS if name in by_upper), None)
+        if output_net is None:
+            # A two-part filter or divider has a single net between input and ground
+            others = [net for net in nets if net != input_net and net.upper() not in GROUND_NETS
+                      and not any(comp.get('type') == 'opamp' and net in comp['nets'][3:] for comp in components)]
+            if len(others) != 1:
+                raise ValueError("Cannot tell the output net; name it 'OUT' or pass output_net")
+            output_net = others[0]
+    if output_net not in nets:
+        raise ValueError(f"Output net {output_net!r} not found")
+    return input_net, output_net
+
+
+@dataclass
+class MNASystem:
+    """
+    Modified nodal analysis of a netlist: G x + C dx/dt = drive*u(t) + bias
+
+    Attributes:
+        G, C: Conductance and capacitance/inductance matrices
+        drive: Right-hand side of a unit signal on the input net
+        bias: Right-hand side of the other sources at their DC values
+        drive_level: Value of the source on the input net (1 V if none)
+        rows: Unknown index of every net with a path to ground
+    """
+    G: np.ndarray
+    C: np.ndarray
+    drive: np.ndarray
+    bias: np.ndarray
+    drive_level: float
+    rows: Dict[str, int]
+
+    def row(self, net: str) -> int:
+        if net not in self.rows:
+            raise ValueError(f"Net {net!r} has no path to ground")
+        return self.rows[net]
+
+
+def build_mna(components: List[Dict[str, Any]], input_net: str) -> MNASystem:
+    """MNA matrices of the R, L, C, source and op-amp parts, driven at input_net"""
+    ids: Dict[str, int] = {}
+    parent: List[int] = [0]
+
+    def node(net: str) -> int:
+        if net.upper() in GROUND_NETS:
+            return 0
+        if net not in ids:
+            ids[net] = len(parent)
+            parent.append(len(parent))
+        return ids[net]
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    # (kind, pins, value): R, C and L admittances, sources and op-amps as branches
+    elements = []
+    drive_level = None
+    for comp in components:
+        kind, nets = comp.get('type'), comp.get('nets') or []
+        if kind == 'opamp':
+            if len(nets) >= 3 and all(nets[:3]):
+                elements.append((kind, tuple(node(net) for net in nets[:3]), 0.0))
+            continue
+        if kind not in ('resistor', 'capacitor', 'inductor', 'voltage_source', 'current_source') \
+                or len(nets) != 2 or not all(nets):
+            continue
+        value = si_units.try_parse(comp.get('value'))
+        if value is None or (kind in ('resistor', 'capacitor', 'inductor') and value <= 0):
+            continue
+        pins = (node(nets[0]), node(nets[1]))
+        if kind == 'voltage_source' and drive_level is None and nets[0] == input_net and pins[1] == 0:
+            # The source on the input carries the test signal; value None marks it
+            drive_level = value
+            value = None
+        elements.append((kind, pins, value))
+    if drive_level is None:
+        elements.append(('voltage_source', (node(input_net), 0), None))
+
+    # Nets with no path to ground through any element have no defined voltage
+    for kind, pins, _ in elements:
+        if kind == 'current_source':
+            continue
+        # An op-amp output is driven against ground
+        a, b = find(pins[0]), 0 if kind == 'opamp' else find(pins[1])
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+    count = len(parent)
+    rows = np.full(count, -1)
+    size = 0
+    for i in range(1, count):
+        if find(i) == 0:
+            rows[i] = size
+            size += 1
+
+    branches = sum(1 for kind, _, _ in elements if kind in ('voltage_source', 'inductor', 'opamp'))
+    n = size + branches
+    G = np.zeros((n, n))
+    C = np.zeros((n, n))
+    drive = np.zeros(n)
+    bias = np.zeros(n)
+    k = size
+    for kind, pins, value in elements:
+        p, q = rows[pins[0]], rows[pins[1]]
+        if kind in ('resistor', 'capacitor'):
+            target, y = (G, 1.0 / value) if kind == 'resistor' else (C, value)
+            for i, j, v in ((p, p, y), (q, q, y), (p, q, -y), (q, p, -y)):
+                if i >= 0 and j >= 0:
+                    target[i, j] += v
+            continue
+        if kind == 'current_source':
+            # Current flows from the first pin through the source to the second
+            for i, sign in ((p, -1.0), (q, 1.0)):
+                if i >= 0:
+                    bias[i] += sign * value
+            continue
+        if kind == 'opamp':
+            # Ideal op-amp: output current whatever keeps the inputs equal
+            if p >= 0:
+                G[p, k] += 1.0
+            if rows[pins[2]] >= 0:
+                G[k, rows[pins[2]]] += 1.0
+            if q >= 0:
+                G[k, q] -= 1.0
+        else:
+            # V(p) - V(q) - L·di/dt = value, with the branch current i leaving p
+            for i, sign in ((p, 1.0), (q, -1.0)):
+                if i >= 0:
+                    G[i, k] += sign
+                    G[k, i] += sign
+            if kind == 'inductor':
+                C[k, k] = -value
+            elif value is None:
+                drive[k] = 1.0
+            else:
+                bias[k] = value
+        k += 1
+    net_rows = {net: int(rows[i]) for net, i in ids.items() if rows[i] >= 0}
+    return MNASystem(G, C, drive, bias, 1.0 if drive_level is None else drive_level, net_rows)
+
+
+def _solve_sweep(G: np.ndarray, C: np.ndarray, b: np.ndarray, out_row: int, freqs: np.ndarray) -> np.ndarray:
+    """Output voltage at every frequency, solving as many frequencies per call as fit"""
+    n = len(b)
+    s = 2j * np.pi * freqs
+    out = np.empty(len(freqs), dtype=complex)
+    chunk = max(1, MAX_BATCH_ENTRIES // max(n * n, 1))
+    rhs = b.astype(complex)[:, None]
+    for start in range(0, len(freqs), chunk):
+        s_chunk = s[start:start + chunk]
+        systems = G[None, :, :] + s_chunk[:, None, None] * C[None, :, :]
+        try:
+            x = np.linalg.solve(systems, np.broadcast_to(rhs, (len(s_chunk), n, 1)))
+        except np.linalg.LinAlgError:
+            raise ValueError("Circuit has no unique AC solution (check for loops of sources or op-amp feedback)")
+        out[start:start + chunk] = x[:, out_row, 0]
+    return out
+
+
+def _cutoff(freqs: np.ndarray, db: np.ndarray) -> Tuple[Optional[float], bool]:
+    """Measured -3 dB frequency, and whether the passband is at the low end"""
+    finite = np.where(np.isfinite(db), db, -np.inf)
+    peak = int(np.argmax(finite))
+    level = finite[peak] - HALF_POWER_DB
+    low_pass = finite[0] >= finite[-1]
+    log_f = np.log10(freqs)
+    if low_pass:
+        below = np.flatnonzero(finite[peak:] < level)
+        if not len(below):
+            return None, low_pass
+        i = peak + int(below[0])
+        j = i - 1
+    else:
+        below = np.flatnonzero(finite[:peak + 1] < level)
+        if not len(below):
+            return None, low_pass
+        j = int(below[-1])
+        i = j + 1
+    # Linear in dB against log frequency between the two bracketing points
+    t = (level - finite[j]) / (finite[i] - finite[j]) if np.isfinite(finite[i] - finite[j]) else 0.0
+    return float(10 ** (log_f[j] + t * (log_f[i] - log_f[j]))), low_pass
+
+
+def _rolloff(freqs: np.ndarray, db: np.ndarray, low_pass: bool) -> Optional[float]:
+    log_f = np.log10(freqs)
+    end = log_f[-1] - 1 if low_pass else log_f[0] + 1
+    decade = (log_f >= end) if low_pass else (log_f <= end)
+    decade &= np.isfinite(db)
+    if decade.sum() < 2:
+        return None
+    return float(np.polyfit(log_f[decade], db[decade], 1)[0])
+
+
+_cache: "OrderedDict[str, ACResponse]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def analyze_ac(circuit_json: Dict[str, Any], f_start: Optional[float] = None, f_stop: Optional[float] = None,
+               points: int = DEFAULT_POINTS, input_net: Optional[str] = None,
+               output_net: Optional[str] = None) -> ACResponse:
+    """
+    Frequency response of a circuit's netlist
+
+    Capacitors and inductors take their impedance at each frequency,
+    op-amps are ideal, the input is driven with a unit source and other
+    voltage sources are AC ground.
+
+    Args:
+        circuit_json: Circuit JSON with components
+        f_start, f_stop: Sweep limits in Hz; by default two decades either
+            side of constraints.cutoff_freq, else 1 Hz to 10 MHz
+        points: Log-spaced sweep points
+        input_net: Driven net; 'IN' (or a grounded source's net) by default
+        output_net: Measured net; 'OUT'/'VOUT'/'OUTPUT' or the only other net
+
+    Returns:
+        ACResponse, shared through a per-circuit cache; its arrays are read-only
+
+    Raises:
+        ValueError: If the nets cannot be found, the sweep is invalid or the
+            circuit has no unique solution
+    """
+    key = circuit_hash(circuit_json, f_start=f_start, f_stop=f_stop, points=points,
+                       input_net=input_net, output_net=output_net)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+
+    components = [comp for comp in circuit_json.get('components', []) if isinstance(comp, dict)]
+    freqs = _sweep(circuit_json, f_start, f_stop, points)
+    input_net, output_net = pick_nets(components, input_net, output_net)
+    system = build_mna(components, input_net)
+    gain = _solve_sweep(system.G, system.C, system.drive, system.row(output_net), freqs)
+    with np.errstate(divide='ignore'):
+        db = 20 * np.log10(np.abs(gain))
+    cutoff, low_pass = _cutoff(freqs, db)
+    freqs.setflags(write=False)
+    gain.setflags(write=False)
+    response = ACResponse(freqs, gain, input_net, output_net, cutoff, _rolloff(freqs, db, low_pass))
+
+    with _cache_lock:
+        _cache[key] = response
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return response
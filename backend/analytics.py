@@ -3,11 +3,15 @@ Analytics module to track and showcase project metrics for bonus submissions.
 """
 
 import time
+from collections import deque
 from functools import wraps
 from typing import Callable, Any
 import json
 from pathlib import Path
 
+# Per-net routing records kept for statistics; older ones only live on in the totals
+NET_ROUTE_HISTORY = 10000
+
 class PerformanceMetrics:
     """Track performance metrics for technical complexity bonus."""
     
@@ -16,7 +20,11 @@ class PerformanceMetrics:
             "generation_times": [],
             "pipeline_stages": {},
             "cache_hits": 0,
-            "total_requests": 0
+            "total_requests": 0,
+            "cancellations": {},
+            "net_routes": deque(maxlen=NET_ROUTE_HISTORY),
+            "net_routes_total": 0,
+            "label_fallbacks_total": 0
         }
     
     def timing_decorator(self, stage_name: str):
@@ -49,6 +57,24 @@ class PerformanceMetrics:
         """Record cache hit for performance optimization."""
         self.metrics["cache_hits"] += 1
     
+    def record_cancellation(self, stage: str, reason: str):
+        """Count a request abandoned at a pipeline stage (deadline or disconnect)."""
+        key = f"{stage}:{reason}"
+        self.metrics["cancellations"][key] = self.metrics["cancellations"].get(key, 0) + 1
+    
+    def record_net_route(self, net: str, pins: int, duration: float, routed: bool):
+        """Record schematic routing time for one net (routed=False means label fallback)."""
+        self.metrics["net_routes"].append({
+            "net": net,
+            "pins": pins,
+            "duration_ms": round(duration * 1000, 3),
+            "routed": routed,
+            "timestamp": time.time()
+        })
+        self.metrics["net_routes_total"] += 1
+        if not routed:
+            self.metrics["label_fallbacks_total"] += 1
+    
     def get_statistics(self) -> dict:
         """Calculate performance statistics."""
         if not self.metrics["generation_times"]:
@@ -68,7 +94,23 @@ class PerformanceMetrics:
                     "count": len(timings)
                 }
                 for stage, timings in self.metrics["pipeline_stages"].items()
-            }
+            },
+            "cancellations": dict(self.metrics["cancellations"]),
+            "routing": self._routing_statistics()
+        }
+    
+    def _routing_statistics(self) -> dict:
+        """Summarize per-net routing times (timings over the last NET_ROUTE_HISTORY nets)."""
+        routes = self.metrics["net_routes"]
+        if not routes:
+            return {"nets": 0}
+        durations = sorted(r["duration_ms"] for r in routes)
+        return {
+            "nets": self.metrics["net_routes_total"],
+            "avg_ms": round(sum(durations) / len(durations), 3),
+            "p95_ms": durations[int(len(durations) * 0.95)] if len(durations) > 1 else durations[0],
+            "max_ms": durations[-1],
+            "label_fallbacks": self.metrics["label_fallbacks_total"]
         }
     
     def save_metrics(self, filepath: str = "performance_metrics.json"):
@@ -76,7 +118,7 @@ class PerformanceMetrics:
         Path(filepath).parent.mkdir(parents=True, exist_ok=True)
         with open(filepath, 'w') as f:
             json.dump({
-                "raw_metrics": self.metrics,
+                "raw_metrics": {**self.metrics, "net_routes": list(self.metrics["net_routes"])},
                 "statistics": self.get_statistics()
             }, f, indent=2)
 
@@ -20,12 +20,21 @@ load_dotenv(dotenv_path=env_path, override=True)
 
 from intent_extractor import IntentExtractor
 from dsl_generator import generate_dsl_from_json
-from circuit_validator import validate_circuit
+from circuit_validator import CircuitValidator, validate_circuit
+import validation_rules
+import si_units
+from ac_analysis import analyze_ac
+from transient_analysis import MAX_STEPS, simulate_transient
+from component_calculator import apply_cutoff_constraint
+from filter_synthesis import synthesize_from_intent
 from skidl_generator import SKiDLGenerator
 from file_manager import FileManager
 from explainer import generate_circuit_explanation
+from tolerance_analysis import analyze_tolerance
 from input_validator import validate_user_input
-from error_handler import InputValidationError, NLPError, GenerationError, ValidationError, CircuitError
+from error_handler import InputValidationError, NLPError, GenerationError, ValidationError, CircuitError, RequestCancelledError
+from deadline import Deadline, client_disconnect_probe
+from analytics import metrics
 
 app = Flask(__name__)
 CORS(app)
@@ -38,7 +47,10 @@ def home():
         'endpoints': {
             'health': '/health',
             'generate': '/generate (POST)',
-            'download': '/download/<folder>/<filename>'
+            'analyze': '/analyze (POST)',
+            'simulate': '/simulate (POST)',
+            'download': '/download/<folder>/<filename>',
+            'preview': '/preview/<id>.svg'
         }
     })
 
@@ -73,6 +85,11 @@ def generate_circuit():
                 'error': str(e)
             }), 400
         
+        # Budget for the whole pipeline; every stage gets only what is left
+        deadline = Deadline.from_headers(
+            request.headers, client_disconnect_probe(request.environ)
+        )
+        
         # Generate unique ID for this request
         request_id = str(uuid.uuid4())[:8]
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -80,28 +97,37 @@ def generate_circuit():
         
         # Step 1: Extract circuit intent using NLP
         try:
-            circuit_json = intent_extractor.extract_circuit_intent(user_input)
+            circuit_json = intent_extractor.extract_circuit_intent(user_input, deadline)
             if not circuit_json:
                 raise NLPError("Failed to extract circuit intent")
             
             # Normalize circuit_json structure for explainer
-            # Convert "circuit_type" to "type" and add "_filter" suffix if needed
+            # Convert "circuit_type" to the registered "type" (rc_lowpass -> rc_lowpass_filter)
             if "circuit_type" in circuit_json:
-                circuit_type = circuit_json["circuit_type"]
-                # Map short names to full names
-                type_mapping = {
-                    "rc_lowpass": "rc_lowpass_filter",
-                    "rc_highpass": "rc_highpass_filter",
-                    "voltage_divider": "voltage_divider"
-                }
-                circuit_json["type"] = type_mapping.get(circuit_type, circuit_type)
+                circuit_json["type"] = validation_rules.json_type(circuit_json["circuit_type"])
                 
+        except RequestCancelledError:
+            raise
         except Exception as e:
             return jsonify({
                 'success': False,
                 'error': 'Could not understand circuit description. Please be more specific about the circuit type and parameters.'
             }), 400
         
+        # Step 1b: Filters above first order are synthesized from Sallen-Key
+        # stages; otherwise pick the standard R/C pair closest to the cutoff
+        try:
+            synthesized = synthesize_from_intent(circuit_json)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Cannot synthesize filter: {str(e)}'
+            }), 400
+        if synthesized:
+            circuit_json, alternatives = synthesized, None
+        else:
+            alternatives = apply_cutoff_constraint(circuit_json)
+        
         # Step 2: Generate DSL
         try:
             dsl_string = generate_dsl_from_json(circuit_json)
@@ -138,9 +164,11 @@ def generate_circuit():
         
         # Step 5: Execute SKiDL and create netlist
         try:
-            success, netlist_path, error = file_manager.execute_skidl(skidl_code, output_prefix)
+            success, netlist_path, error = file_manager.execute_skidl(skidl_code, output_prefix, deadline)
             if not success:
                 raise GenerationError(error)
+        except RequestCancelledError:
+            raise
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -149,9 +177,11 @@ def generate_circuit():
         
         # Step 6: Convert to KiCad schematic
         try:
-            success, kicad_path, error = file_manager.convert_to_kicad(netlist_path)
+            success, kicad_path, error = file_manager.convert_to_kicad(netlist_path, deadline)
             if not success:
                 raise GenerationError(error)
+        except RequestCancelledError:
+            raise
         except Exception as e:
             return jsonify({
                 'success': False,
@@ -165,6 +195,13 @@ def generate_circuit():
             # Non-critical failure - provide basic explanation
             explanation = f"Generated circuit with {len(circuit_json.get('components', []))} components."
         
+        # Step 8: Spread of the key quantity over part tolerances (non-critical)
+        try:
+            tolerance = analyze_tolerance(circuit_json)
+        except Exception as e:
+            print(f"Warning: tolerance analysis failed: {e}")
+            tolerance = None
+        
         # Get the directory containing the files
         file_dir = os.path.dirname(kicad_path)
         folder_name = os.path.basename(file_dir)
@@ -173,27 +210,47 @@ def generate_circuit():
         zip_filename = f"circuit_{request_id}.zip"
         zip_path = os.path.join(file_dir, zip_filename)
         
+        deadline.check("packaging")
         try:
             with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add all relevant files to the ZIP
-                for filename in ['circuit.net', 'circuit.kicad_pro', 'circuit.kicad_sch', 'circuit.py']:
-                    file_path = os.path.join(file_dir, filename)
-                    if os.path.exists(file_path):
-                        zipf.write(file_path, filename)
+                # Add all relevant files to the ZIP (sub-sheets included)
+                for filename in sorted(os.listdir(file_dir)):
+                    if filename == 'circuit.py' or filename.endswith(('.net', '.kicad_pro', '.kicad_sch')):
+                        zipf.write(os.path.join(file_dir, filename), filename)
         except Exception as e:
             print(f"Warning: Failed to create ZIP file: {e}")
             # Fall back to single file download
             zip_filename = 'circuit.net'
         
         # Success response
-        return jsonify({
+        response = {
             'success': True,
             'explanation': explanation,
             'download_url': f'/download/{folder_name}/{zip_filename}',
             'filename': zip_filename,
             'request_id': request_id
-        }), 200
+        }
+        if alternatives:
+            response['alternatives'] = alternatives
+        if tolerance:
+            response['tolerance'] = tolerance
+        preview_id = file_manager.preview_id(kicad_path)
+        if preview_id:
+            response['preview_url'] = f'/preview/{preview_id}.svg'
+        return jsonify(response), 200
     
+    except RequestCancelledError as e:
+        metrics.record_cancellation(e.stage, e.reason)
+        if e.reason == 'deadline':
+            return jsonify({
+                'success': False,
+                'error': 'Request deadline exceeded. Please try again.'
+            }), 504
+        # 499 mirrors nginx's "client closed request"
+        return jsonify({
+            'success': False,
+            'error': 'Request cancelled by the client.'
+        }), 499
     except CircuitError as e:
         return jsonify({
             'success': False,
@@ -208,6 +265,119 @@ def generate_circuit():
         }), 500
 
 
+@app.route('/analyze', methods=['POST'])
+def analyze_circuit():
+    """
+    Frequency response of a circuit JSON netlist
+
+    Body: {"circuit": {...}, "f_start": "10", "f_stop": "100k", "points": 200,
+           "input_net": "IN", "output_net": "OUT"}; everything but circuit is optional
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('circuit'), dict):
+        return jsonify({
+            'success': False,
+            'error': 'Missing circuit'
+        }), 400
+    
+    validator = CircuitValidator()
+    try:
+        is_valid, messages = validator.validate(data['circuit'])
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Malformed circuit: {str(e)}'
+        }), 400
+    if not is_valid:
+        error_msgs = [msg.message for msg in messages if msg.level.value == "ERROR"]
+        return jsonify({
+            'success': False,
+            'error': 'Circuit validation failed:\n• ' + '\n• '.join(error_msgs)
+        }), 400
+    
+    # Analyze the circuit as validated, e.g. with numeric nets read as names
+    circuit_json = validator.circuit_json
+    try:
+        options = {}
+        for name in ('f_start', 'f_stop'):
+            if data.get(name) is not None:
+                options[name] = si_units.parse(data[name])
+        if data.get('points') is not None:
+            options['points'] = int(data['points'])
+        analysis = analyze_ac(circuit_json, input_net=data.get('input_net'),
+                              output_net=data.get('output_net'), **options)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Cannot analyze circuit: {str(e)}'
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'analysis': analysis.to_dict()
+    }), 200
+
+
+@app.route('/simulate', methods=['POST'])
+def simulate_circuit():
+    """
+    Step response of a circuit JSON netlist
+
+    Body: {"circuit": {...}, "t_stop": "5m", "steps": 1000, "adaptive": false,
+           "input_net": "IN", "output_net": "OUT"}; everything but circuit is optional
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('circuit'), dict):
+        return jsonify({
+            'success': False,
+            'error': 'Missing circuit'
+        }), 400
+    
+    if not isinstance(data.get('adaptive', False), bool):
+        return jsonify({
+            'success': False,
+            'error': 'adaptive must be true or false'
+        }), 400
+    
+    validator = CircuitValidator()
+    try:
+        is_valid, messages = validator.validate(data['circuit'])
+    except (AttributeError, KeyError, TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Malformed circuit: {str(e)}'
+        }), 400
+    if not is_valid:
+        error_msgs = [msg.message for msg in messages if msg.level.value == "ERROR"]
+        return jsonify({
+            'success': False,
+            'error': 'Circuit validation failed:\n• ' + '\n• '.join(error_msgs)
+        }), 400
+    
+    # Simulate the circuit as validated, e.g. with numeric nets read as names
+    circuit_json = validator.circuit_json
+    try:
+        # The whole waveform is held in memory before it is decimated, so
+        # adaptive runs stop at the same number of steps as fixed ones
+        options = {'adaptive': data.get('adaptive', False), 'max_steps': MAX_STEPS // 100}
+        if data.get('t_stop') is not None:
+            options['t_stop'] = si_units.parse(data['t_stop'])
+        if data.get('steps') is not None:
+            options['steps'] = int(data['steps'])
+        simulation = simulate_transient(circuit_json, input_net=data.get('input_net'),
+                                        output_net=data.get('output_net'), **options)
+    except (TypeError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f'Cannot simulate circuit: {str(e)}'
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'simulation': simulation.to_dict()
+    }), 200
+
+
 @app.route('/download/<folder>/<filename>', methods=['GET'])
 def download_file(folder, filename):
     try:
@@ -230,6 +400,21 @@ def download_file(folder, filename):
         }), 500
 
 
+@app.route('/preview/<preview_id>.svg', methods=['GET'])
+def preview_file(preview_id):
+    # Ids are content hashes, so a given URL never changes and can be cached forever
+    file_path = file_manager.preview_path(preview_id)
+    if file_path is None:
+        return jsonify({
+            'success': False,
+            'error': 'Preview not found'
+        }), 404
+    
+    response = send_file(file_path, mimetype='image/svg+xml', etag=preview_id, max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -4,35 +4,75 @@ Bonus feature: Real-world practicality and technical sophistication.
 """
 
 import math
-from typing import Tuple, Dict
+import os
+import sys
+from typing import Tuple, Dict, List, Optional
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+import e_series
+import si_units
+from parts_catalog import PartsCatalog
+
+# Rows returned by the batch searches, one per target; NaN where nothing fits
+RC_DTYPE = np.dtype([('resistance', 'f8'), ('capacitance', 'f8'), ('frequency', 'f8'), ('error_percent', 'f8')])
+DIVIDER_DTYPE = np.dtype([('r1', 'f8'), ('r2', 'f8'), ('output_voltage', 'f8'), ('error_percent', 'f8')])
+
+
+def _pick_best(error: np.ndarray, feasible: np.ndarray, tie_break: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per target (first axis), the flat index of the smallest error, preferring
+    the smallest tie_break among errors equal up to rounding noise
+
+    Returns:
+        (index, found) arrays of length targets
+    """
+    targets = error.shape[0]
+    rounded = np.where(feasible, np.round(error, 9), np.inf).reshape(targets, -1)
+    tied = rounded == rounded.min(axis=1, keepdims=True)
+    tie_break = np.broadcast_to(tie_break, error.shape).reshape(targets, -1)
+    best = np.where(tied, tie_break, np.inf).argmin(axis=1)
+    return best, np.isfinite(rounded[np.arange(targets), best])
+
+
+def _gather(best: np.ndarray, found: np.ndarray, dtype: np.dtype, shape: tuple, **fields) -> np.ndarray:
+    """Structured array of the chosen entries of each field, NaN where not found"""
+    result = np.empty(len(best), dtype=dtype)
+    rows = np.arange(len(best))
+    for name, values in fields.items():
+        chosen = np.broadcast_to(values, shape).reshape(len(best), -1)[rows, best]
+        result[name] = np.where(found, chosen, np.nan)
+    return result
+
 
 class ComponentOptimizer:
     """Optimize component values to standard E12/E24 series."""
     
     # E12 series (10% tolerance)
-    E12_SERIES = [1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2]
+    E12_SERIES = list(e_series.SERIES['E12'])
     
     # E24 series (5% tolerance)
-    E24_SERIES = [
-        1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
-        3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1
-    ]
+    E24_SERIES = list(e_series.SERIES['E24'])
     
-    def __init__(self, use_e24: bool = False):
-        self.series = self.E24_SERIES if use_e24 else self.E12_SERIES
+    def __init__(self, use_e24: bool = False, catalog: Optional[PartsCatalog] = None):
+        self.series_name = 'E24' if use_e24 else 'E12'
+        self.series = list(e_series.SERIES[self.series_name])
+        # With a catalog, every search and lookup is limited to stocked values
+        self.catalog = catalog
     
     def find_nearest_standard_value(self, target: float, component_type: str = "resistor") -> Tuple[float, str]:
         """Find nearest standard component value."""
         if target <= 0:
             return target, "Invalid value"
         
-        # Determine magnitude
-        magnitude = 10 ** math.floor(math.log10(target))
-        normalized = target / magnitude
-        
-        # Find closest standard value
-        closest = min(self.series, key=lambda x: abs(x - normalized))
-        standard_value = closest * magnitude
+        if self.catalog is not None:
+            part = self.catalog.nearest(component_type, target)
+            if part is None:
+                return target, "Not stocked"
+            standard_value = part.value
+        else:
+            standard_value = e_series.nearest(target, self.series_name)
         
         # Format with appropriate suffix
         formatted = self._format_value(standard_value, component_type)
@@ -41,75 +81,273 @@ class ComponentOptimizer:
     
     def _format_value(self, value: float, component_type: str) -> str:
         """Format value with appropriate suffix (k, M, µ, n, p)."""
-        if component_type == "resistor":
-            if value >= 1e6:
-                return f"{value/1e6:.1f}M"
-            elif value >= 1e3:
-                return f"{value/1e3:.1f}k"
-            else:
-                return f"{value:.1f}Ω"
-        
-        elif component_type == "capacitor":
-            if value >= 1e-6:
-                return f"{value*1e6:.1f}µF"
-            elif value >= 1e-9:
-                return f"{value*1e9:.1f}nF"
-            elif value >= 1e-12:
-                return f"{value*1e12:.1f}pF"
-            else:
-                return f"{value:.2e}F"
-        
-        return f"{value:.2e}"
+        unit = {"resistor": "Ω", "capacitor": "F"}.get(component_type)
+        if unit is None:
+            return f"{value:.2e}"
+        return si_units.format_value(value, unit, decimals=1)
+    
+    def search_rc_pairs(self, target_freq: float, impedance_range: Tuple[float, float] = (1e3, 100e3),
+                        capacitance_range: Tuple[float, float] = (100e-12, 10e-6), top_k: int = 5,
+                        r_series: Optional[str] = None, c_series: Optional[str] = None) -> List[Dict]:
+        """
+        Rank every standard R x C combination by cutoff frequency error
+        
+        R is the filter's impedance at cutoff (|Z_C| = R there), so
+        impedance_range bounds what the source must drive and what the load sees.
+        
+        Args:
+            target_freq: Cutoff frequency in Hz
+            impedance_range: Allowed resistor values in ohms, inclusive
+            capacitance_range: Allowed capacitor values in farads, inclusive
+            top_k: Number of pairs to return
+            r_series: Resistor series, defaults to the optimizer's series; ignored with a catalog
+            c_series: Capacitor series, defaults to the optimizer's series; ignored with a catalog
+            
+        Returns:
+            Up to top_k dicts with resistance, capacitance, frequency and
+            error_percent, best first; pairs with equal error prefer
+            impedances near the middle of impedance_range
+            
+        Raises:
+            ValueError: If the frequency is not positive or a range holds no standard value
+        """
+        if target_freq <= 0:
+            raise ValueError("Cutoff frequency must be positive")
+        r_values = self._values_in("resistor", r_series or self.series_name, impedance_range)
+        c_values = self._values_in("capacitor", c_series or self.series_name, capacitance_range)
+        if not len(r_values) or not len(c_values):
+            raise ValueError("No standard values inside the allowed ranges")
+        
+        frequency = 1 / (2 * math.pi * np.multiply.outer(r_values, c_values))
+        error = np.abs(frequency - target_freq) / target_freq
+        
+        # Decade-shifted pairs (1.5k/100n vs 15k/10n) tie up to rounding noise,
+        # so compare rounded errors and break ties towards mid-range impedance
+        rounded = np.round(error, 9).ravel()
+        center = math.sqrt(impedance_range[0] * impedance_range[1])
+        spread = np.repeat(np.abs(np.log(r_values / center)), len(c_values))
+        k = min(top_k, rounded.size)
+        kth = np.partition(rounded, k - 1)[k - 1]
+        candidates = np.flatnonzero(rounded <= kth)
+        order = candidates[np.lexsort((spread[candidates], rounded[candidates]))][:k]
+        
+        rows, columns = np.unravel_index(order, error.shape)
+        return [{
+            "resistance": float(r_values[i]),
+            "capacitance": float(c_values[j]),
+            "frequency": float(frequency[i, j]),
+            "error_percent": float(error[i, j] * 100),
+        } for i, j in zip(rows, columns)]
+    
+    def available_values(self, component_type: str, bounds: Tuple[float, float],
+                         series: Optional[str] = None) -> np.ndarray:
+        """
+        Values the searches may pick for one part type, ascending
+        
+        Args:
+            component_type: "resistor" or "capacitor"
+            bounds: Smallest and largest allowed value, inclusive
+            series: E-series name, defaults to the optimizer's series; ignored with a catalog
+        """
+        return self._values_in(component_type, series or self.series_name, bounds)
     
-    def optimize_rc_pair(self, target_freq: float, preferred_r_range: Tuple[float, float] = (1e3, 100e3)) -> Dict:
+    def _values_in(self, component_type: str, series: str, bounds: Tuple[float, float]) -> np.ndarray:
+        """Candidate values within bounds: stocked ones with a catalog, else the whole series"""
+        values = self.catalog.values(component_type) if self.catalog is not None else e_series.table(series)
+        low, high = bounds
+        # Tolerate float noise at the bounds so 1e3 admits the table's 1000.0
+        return values[(values >= low * (1 - 1e-9)) & (values <= high * (1 + 1e-9))]
+    
+    def _divider_candidates(self, vin: np.ndarray, vout: np.ndarray, series: str,
+                            resistance_range: Tuple[float, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        For every target and every standard R2, the two standard R1 values
+        bracketing the ideal one; the best R1 for a given R2 is always one of them
+        
+        Returns:
+            (r1, r2) broadcastable to shape (targets, len(R2), 2)
+        """
+        values = self._values_in("resistor", series, resistance_range)
+        if not len(values):
+            raise ValueError("No standard values inside the allowed range")
+        if not np.all((vout > 0) & (vout < vin)):
+            raise ValueError("Output voltage must be positive and less than input voltage")
+        ideal = np.multiply.outer((vin - vout) / vout, values)
+        upper = np.searchsorted(values, ideal).clip(0, len(values) - 1)
+        lower = (upper - 1).clip(0)
+        r1 = np.stack((values[lower], values[upper]), axis=-1)
+        return r1, values[None, :, None]
+    
+    @staticmethod
+    def _divider_metrics(vin, vout, r1, r2, max_current, max_power, max_output_impedance):
+        """Output error, current, worst resistor power and output impedance, with a feasibility mask"""
+        total = r1 + r2
+        actual = vin * r2 / total
+        error = np.abs(actual - vout) / vout
+        current = vin / total
+        power = current ** 2 * np.maximum(r1, r2)
+        impedance = r1 * r2 / total
+        feasible = np.ones(np.broadcast(error, current).shape, dtype=bool)
+        if max_current is not None:
+            feasible &= current <= max_current
+        if max_power is not None:
+            feasible &= power <= max_power
+        if max_output_impedance is not None:
+            feasible &= impedance <= max_output_impedance
+        return actual, error, current, power, impedance, feasible
+    
+    def search_divider_pairs(self, input_voltage: float, output_voltage: float,
+                             max_current: Optional[float] = None, max_power: Optional[float] = None,
+                             max_output_impedance: Optional[float] = None,
+                             resistance_range: Tuple[float, float] = (1e3, 1e6),
+                             series: Optional[str] = None) -> List[Dict]:
+        """
+        Pareto front of standard R1/R2 pairs for a voltage divider
+        
+        Lower quiescent current needs larger resistors, which limits how
+        finely the ratio can be set; every returned pair is the most accurate
+        one at or below its current.
+        
+        Args:
+            input_voltage: Vin in volts
+            output_voltage: Target Vout in volts, below Vin
+            max_current: Largest allowed quiescent current in amps
+            max_power: Largest allowed dissipation in either resistor in watts
+            max_output_impedance: Largest allowed R1 || R2 in ohms
+            resistance_range: Allowed resistor values in ohms, inclusive
+            series: E-series name, defaults to the optimizer's series; ignored with a catalog
+            
+        Returns:
+            Dicts with r1, r2, output_voltage, error_percent, current, power and
+            output_impedance, most accurate first; empty if nothing meets the limits
+            
+        Raises:
+            ValueError: If the voltages are impossible or the range holds no standard value
+        """
+        vin, vout = np.array([input_voltage], dtype=float), np.array([output_voltage], dtype=float)
+        r1, r2 = self._divider_candidates(vin, vout, series or self.series_name, resistance_range)
+        r1, r2 = r1[0], np.broadcast_to(r2[0], r1[0].shape)
+        actual, error, current, power, impedance, feasible = self._divider_metrics(
+            input_voltage, output_voltage, r1, r2, max_current, max_power, max_output_impedance
+        )
+        
+        index = np.flatnonzero(feasible)
+        # Most accurate first, then cheapest in current; a pair is on the front
+        # if it draws less than every more accurate pair
+        index = index[np.lexsort((current.ravel()[index], np.round(error.ravel()[index], 9)))]
+        drawn = current.ravel()[index]
+        previous_best = np.concatenate(([np.inf], np.minimum.accumulate(drawn)[:-1]))
+        front = index[drawn < previous_best]
+        
+        return [{
+            "r1": float(r1.flat[i]),
+            "r2": float(r2.flat[i]),
+            "output_voltage": float(actual.flat[i]),
+            "error_percent": float(error.flat[i] * 100),
+            "current": float(current.flat[i]),
+            "power": float(power.flat[i]),
+            "output_impedance": float(impedance.flat[i]),
+        } for i in front]
+    
+    def search_divider_batch(self, input_voltages, output_voltages,
+                             max_current: Optional[float] = None, max_power: Optional[float] = None,
+                             max_output_impedance: Optional[float] = None,
+                             resistance_range: Tuple[float, float] = (1e3, 1e6),
+                             series: Optional[str] = None) -> np.ndarray:
+        """
+        Most accurate standard R1/R2 pair for each of many (Vin, Vout) targets
+        
+        Args:
+            input_voltages: Array of Vin in volts
+            output_voltages: Array of target Vout in volts, same length
+            max_current, max_power, max_output_impedance, resistance_range, series:
+                As for search_divider_pairs, applied to every target
+            
+        Returns:
+            DIVIDER_DTYPE structured array (r1, r2, output_voltage,
+            error_percent), one row per target; NaN where no pair meets the
+            limits. Equally accurate pairs prefer less current.
+            
+        Raises:
+            ValueError: If any target is impossible or the range holds no standard value
+        """
+        vin = np.asarray(input_voltages, dtype=float).ravel()
+        vout = np.asarray(output_voltages, dtype=float).ravel()
+        r1, r2 = self._divider_candidates(vin, vout, series or self.series_name, resistance_range)
+        actual, error, current, _, _, feasible = self._divider_metrics(
+            vin[:, None, None], vout[:, None, None], r1, r2, max_current, max_power, max_output_impedance
+        )
+        best, found = _pick_best(error, feasible, current)
+        return _gather(best, found, DIVIDER_DTYPE, error.shape,
+                       r1=r1, r2=r2, output_voltage=actual, error_percent=error * 100)
+    
+    def search_rc_batch(self, target_freqs, impedance_range: Tuple[float, float] = (1e3, 100e3),
+                        capacitance_range: Tuple[float, float] = (100e-12, 10e-6),
+                        r_series: Optional[str] = None, c_series: Optional[str] = None) -> np.ndarray:
+        """
+        Best standard R x C pair for each of many cutoff frequencies
+        
+        Same result as the first entry of search_rc_pairs for every target,
+        but only the two capacitors bracketing the ideal value are scored
+        per resistor, so sweeps of many thousands of targets stay fast.
+        
+        Args:
+            target_freqs: Array of cutoff frequencies in Hz
+            impedance_range, capacitance_range, r_series, c_series: As for search_rc_pairs
+            
+        Returns:
+            RC_DTYPE structured array, one row per target
+            
+        Raises:
+            ValueError: If any frequency is not positive or a range holds no standard value
+        """
+        freqs = np.asarray(target_freqs, dtype=float).ravel()
+        if not np.all(freqs > 0):
+            raise ValueError("Cutoff frequencies must be positive")
+        r_values = self._values_in("resistor", r_series or self.series_name, impedance_range)
+        c_values = self._values_in("capacitor", c_series or self.series_name, capacitance_range)
+        if not len(r_values) or not len(c_values):
+            raise ValueError("No standard values inside the allowed ranges")
+        
+        ideal = 1 / (2 * math.pi * np.multiply.outer(freqs, r_values))
+        upper = np.searchsorted(c_values, ideal).clip(0, len(c_values) - 1)
+        lower = (upper - 1).clip(0)
+        c = np.stack((c_values[lower], c_values[upper]), axis=-1)
+        r = r_values[None, :, None]
+        frequency = 1 / (2 * math.pi * r * c)
+        error = np.abs(frequency - freqs[:, None, None]) / freqs[:, None, None]
+        
+        center = math.sqrt(impedance_range[0] * impedance_range[1])
+        best, found = _pick_best(error, np.ones(error.shape, dtype=bool), np.abs(np.log(r / center)))
+        return _gather(best, found, RC_DTYPE, error.shape,
+                       resistance=r, capacitance=c, frequency=frequency, error_percent=error * 100)
+    
+    def optimize_rc_pair(self, target_freq: float, preferred_r_range: Tuple[float, float] = (1e3, 100e3),
+                         top_k: int = 5) -> Dict:
         """Optimize R and C values for target frequency."""
         # Target: f = 1/(2π*R*C)
         # Prefer resistor in reasonable range (1k - 100k)
-        
-        best_error = float('inf')
-        best_r = None
-        best_c = None
-        
-        # Try different resistor values in preferred range
-        for r_base in self.series:
-            for r_mult in [1e3, 10e3, 100e3]:  # 1k, 10k, 100k
-                r = r_base * r_mult
-                if preferred_r_range[0] <= r <= preferred_r_range[1]:
-                    # Calculate required C
-                    c_calc = 1 / (2 * math.pi * r * target_freq)
-                    
-                    # Find standard C value
-                    c_standard, c_formatted = self.find_nearest_standard_value(c_calc, "capacitor")
-                    
-                    # Calculate actual frequency
-                    f_actual = 1 / (2 * math.pi * r * c_standard)
-                    error = abs(f_actual - target_freq) / target_freq
-                    
-                    if error < best_error:
-                        best_error = error
-                        best_r = r
-                        best_c = c_standard
-        
-        r_standard, r_formatted = self.find_nearest_standard_value(best_r, "resistor")
-        c_standard, c_formatted = self.find_nearest_standard_value(best_c, "capacitor")
-        
-        actual_freq = 1 / (2 * math.pi * r_standard * c_standard)
+        ranked = self.search_rc_pairs(target_freq, preferred_r_range, top_k=top_k)
+        best = ranked[0]
+        r_standard, c_standard = best["resistance"], best["capacitance"]
+        actual_freq = best["frequency"]
         
         return {
             "resistor": {
                 "value": r_standard,
-                "formatted": r_formatted,
-                "calculated_value": best_r
+                "formatted": self._format_value(r_standard, "resistor"),
+                "calculated_value": 1 / (2 * math.pi * c_standard * target_freq)
             },
             "capacitor": {
                 "value": c_standard,
-                "formatted": c_formatted,
-                "calculated_value": best_c
+                "formatted": self._format_value(c_standard, "capacitor"),
+                "calculated_value": 1 / (2 * math.pi * r_standard * target_freq)
             },
             "actual_frequency": actual_freq,
             "target_frequency": target_freq,
-            "error_percent": abs(actual_freq - target_freq) / target_freq * 100,
-            "reasoning": f"Selected standard E12 values. Actual frequency: {actual_freq:.1f} Hz (error: {abs(actual_freq - target_freq) / target_freq * 100:.2f}%)"
+            "error_percent": best["error_percent"],
+            "alternatives": ranked[1:],
+            "reasoning": f"Selected {'stocked' if self.catalog is not None else 'standard ' + self.series_name} values. Actual frequency: {actual_freq:.1f} Hz (error: {best['error_percent']:.2f}%)"
         }
 
 # Global optimizer instance
@@ -1,15 +1,40 @@
 import math
-from typing import Tuple
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+import e_series
+import si_units
+from circuit_optimizer import ComponentOptimizer
+from parts_catalog import default_catalog
 
 
 class ComponentCalculator:
     """Calculate component values based on circuit constraints."""
     
-    # Standard E12 resistor values (10% tolerance)
-    E12_SERIES = [1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2]
+    # Resistors come from E12 (10% tolerance), capacitors from the sparser E6
+    RESISTOR_SERIES = 'E12'
+    CAPACITOR_SERIES = 'E6'
+    
+    # Filter impedance (R, which equals |Z_C| at cutoff) kept easy to drive and load
+    FILTER_IMPEDANCE = (1e3, 100e3)
+    CAPACITANCE_RANGE = (100e-12, 10e-6)
+    # Largest cutoff error worth applying; every cutoff the ranges above can
+    # reach has a pair within it, so only out-of-range targets miss
+    CUTOFF_TOLERANCE_PERCENT = 10.0
+    
+    # Divider resistors: as little quiescent current as the output impedance
+    # limit allows, so a light load barely shifts Vout
+    DIVIDER_RESISTANCE = (1e3, 100e3)
+    DIVIDER_OUTPUT_IMPEDANCE = 10e3
     
-    # Common capacitor values (simplified)
-    CAP_VALUES = [1, 1.5, 2.2, 3.3, 4.7, 6.8, 10, 15, 22, 33, 47, 68, 100, 150, 220, 330, 470, 680]
+    @staticmethod
+    def _optimizer() -> ComponentOptimizer:
+        """Optimizer limited to the configured parts catalog, if there is one"""
+        return ComponentOptimizer(catalog=default_catalog())
     
     @staticmethod
     def calculate_rc_filter(cutoff_freq: float, filter_type: str = "lowpass") -> Tuple[str, str]:
@@ -24,33 +49,7 @@ class ComponentCalculator:
         Returns:
             Tuple of (resistor_value, capacitor_value) as strings with units
         """
-        # Choose a standard capacitor value first, then calculate R
-        # Start with a reasonable capacitor value based on frequency range
-        if cutoff_freq < 100:
-            # Low frequency: use larger cap (microfarads)
-            C_target = 1e-6  # 1uF
-        elif cutoff_freq < 1000:
-            # Mid frequency: use sub-microfarad
-            C_target = 100e-9  # 100nF
-        elif cutoff_freq < 10000:
-            # Higher frequency: use tens of nanofarads
-            C_target = 10e-9  # 10nF
-        else:
-            # Very high frequency: use picofarads
-            C_target = 1e-9  # 1nF
-        
-        # Calculate required resistance
-        # R = 1 / (2 * π * fc * C)
-        R_calculated = 1 / (2 * math.pi * cutoff_freq * C_target)
-        
-        # Round to nearest E12 value
-        R_standard = ComponentCalculator._nearest_e12(R_calculated)
-        
-        # Recalculate C with standard R for better accuracy
-        C_final = 1 / (2 * math.pi * cutoff_freq * R_standard)
-        
-        # Round capacitor to standard value
-        C_standard = ComponentCalculator._nearest_capacitor(C_final)
+        R_standard, C_standard = ComponentCalculator.search_rc_filter(cutoff_freq, top_k=1)[0]
         
         # Format values with appropriate units
         R_str = ComponentCalculator._format_resistance(R_standard)
@@ -58,6 +57,25 @@ class ComponentCalculator:
         
         return (R_str, C_str)
     
+    @staticmethod
+    def search_rc_filter(cutoff_freq: float, top_k: int = 5) -> List[Tuple[float, float]]:
+        """
+        Best standard (R, C) pairs for an RC filter, searching every combination
+        
+        Args:
+            cutoff_freq: Cutoff frequency in Hz
+            top_k: Number of pairs to return
+        
+        Returns:
+            (resistance, capacitance) pairs, smallest cutoff error first
+        """
+        ranked = ComponentCalculator._optimizer().search_rc_pairs(
+            cutoff_freq, ComponentCalculator.FILTER_IMPEDANCE, ComponentCalculator.CAPACITANCE_RANGE,
+            top_k=top_k, r_series=ComponentCalculator.RESISTOR_SERIES,
+            c_series=ComponentCalculator.CAPACITOR_SERIES
+        )
+        return [(pair["resistance"], pair["capacitance"]) for pair in ranked]
+    
     @staticmethod
     def calculate_voltage_divider(input_voltage: float, output_voltage: float) -> Tuple[str, str]:
         """
@@ -74,17 +92,15 @@ class ComponentCalculator:
         if output_voltage >= input_voltage:
             raise ValueError("Output voltage must be less than input voltage")
         
-        # Choose R2 as a reasonable value (e.g., 1k to 10k range)
-        # This affects current draw: lower R = more current
-        R2_target = 10000  # 10k ohms (good balance)
-        
-        # Calculate R1: R1 = R2 * (Vin - Vout) / Vout
-        ratio = (input_voltage - output_voltage) / output_voltage
-        R1_calculated = R2_target * ratio
-        
-        # Round to nearest E12 values
-        R1_standard = ComponentCalculator._nearest_e12(R1_calculated)
-        R2_standard = ComponentCalculator._nearest_e12(R2_target)
+        # Joint search over both resistors; among equally accurate pairs the
+        # front starts with the one drawing the least current
+        best = ComponentCalculator._optimizer().search_divider_pairs(
+            input_voltage, output_voltage,
+            max_output_impedance=ComponentCalculator.DIVIDER_OUTPUT_IMPEDANCE,
+            resistance_range=ComponentCalculator.DIVIDER_RESISTANCE,
+            series=ComponentCalculator.RESISTOR_SERIES
+        )[0]
+        R1_standard, R2_standard = best["r1"], best["r2"]
         
         # Format values
         R1_str = ComponentCalculator._format_resistance(R1_standard)
@@ -92,57 +108,137 @@ class ComponentCalculator:
         
         return (R1_str, R2_str)
     
+    @staticmethod
+    def calculate_rc_filter_batch(cutoff_freqs) -> np.ndarray:
+        """
+        Array form of calculate_rc_filter for design sweeps
+        
+        Args:
+            cutoff_freqs: Array of cutoff frequencies in Hz
+        
+        Returns:
+            Structured array with resistance, capacitance, frequency and
+            error_percent per target; see format_batch for value strings
+        """
+        return ComponentCalculator._optimizer().search_rc_batch(
+            cutoff_freqs, ComponentCalculator.FILTER_IMPEDANCE, ComponentCalculator.CAPACITANCE_RANGE,
+            r_series=ComponentCalculator.RESISTOR_SERIES, c_series=ComponentCalculator.CAPACITOR_SERIES
+        )
+    
+    @staticmethod
+    def calculate_voltage_divider_batch(input_voltages, output_voltages) -> np.ndarray:
+        """
+        Array form of calculate_voltage_divider for design sweeps
+        
+        Args:
+            input_voltages: Array of Vin in V
+            output_voltages: Array of desired Vout in V, same length
+        
+        Returns:
+            Structured array with r1, r2, output_voltage and error_percent per
+            target; see format_batch for value strings
+        """
+        return ComponentCalculator._optimizer().search_divider_batch(
+            input_voltages, output_voltages,
+            max_output_impedance=ComponentCalculator.DIVIDER_OUTPUT_IMPEDANCE,
+            resistance_range=ComponentCalculator.DIVIDER_RESISTANCE,
+            series=ComponentCalculator.RESISTOR_SERIES
+        )
+    
+    @staticmethod
+    def format_batch(result: np.ndarray) -> List[Tuple[str, ...]]:
+        """
+        Format the component values of a batch result like the scalar calculators do
+        
+        Returns:
+            One tuple per row: (R, C) for RC filter results, (R1, R2) for dividers
+        """
+        if 'capacitance' in result.dtype.names:
+            fields = (('resistance', ComponentCalculator._format_resistance),
+                      ('capacitance', ComponentCalculator._format_capacitance))
+        else:
+            fields = (('r1', ComponentCalculator._format_resistance),
+                      ('r2', ComponentCalculator._format_resistance))
+        columns = [[fmt(value) for value in result[name].tolist()] for name, fmt in fields]
+        return list(zip(*columns))
+    
     @staticmethod
     def _nearest_e12(value: float) -> float:
-        """Find nearest E12 series value to the given resistance."""
+        """Find nearest stocked (or else E12 series) value to the given resistance."""
         if value <= 0:
             raise ValueError("Resistance must be positive")
         
-        # Find the appropriate decade
-        decade = 10 ** math.floor(math.log10(value))
-        normalized = value / decade
-        
-        # Find closest E12 value
-        closest = min(ComponentCalculator.E12_SERIES, key=lambda x: abs(x - normalized))
-        
-        return closest * decade
+        catalog = default_catalog()
+        if catalog is not None and (part := catalog.nearest('resistor', value)) is not None:
+            return part.value
+        return e_series.nearest(value, ComponentCalculator.RESISTOR_SERIES)
     
     @staticmethod
     def _nearest_capacitor(value: float) -> float:
-        """Find nearest standard capacitor value."""
+        """Find nearest stocked (or else standard) capacitor value."""
         if value <= 0:
             raise ValueError("Capacitance must be positive")
         
-        # Find the appropriate decade
-        decade = 10 ** math.floor(math.log10(value))
-        normalized = value / decade
-        
-        # Find closest standard value
-        closest_normalized = min(ComponentCalculator.CAP_VALUES, key=lambda x: abs(x - normalized))
-        
-        return closest_normalized * decade
+        catalog = default_catalog()
+        if catalog is not None and (part := catalog.nearest('capacitor', value)) is not None:
+            return part.value
+        return e_series.nearest(value, ComponentCalculator.CAPACITOR_SERIES)
     
     @staticmethod
     def _format_resistance(ohms: float) -> str:
         """Format resistance value with appropriate unit."""
-        if ohms >= 1e6:
-            return f"{ohms/1e6:.1f}M"
-        elif ohms >= 1e3:
-            return f"{ohms/1e3:.1f}k"
-        else:
-            return f"{ohms:.1f}"
+        return si_units.format_value(ohms, decimals=1)
     
     @staticmethod
     def _format_capacitance(farads: float) -> str:
         """Format capacitance value with appropriate unit."""
-        if farads >= 1e-6:
-            return f"{farads*1e6:.1f}u"
-        elif farads >= 1e-9:
-            return f"{farads*1e9:.1f}n"
-        elif farads >= 1e-12:
-            return f"{farads*1e12:.1f}p"
-        else:
-            return f"{farads:.2e}"
+        return si_units.format_value(farads, decimals=1)
+
+def apply_cutoff_constraint(circuit_json: Dict[str, Any], top_k: int = 5) -> Optional[List[Dict[str, str]]]:
+    """
+    Replace an RC filter's R and C values with the best standard pair for its cutoff constraint
+    
+    Args:
+        circuit_json: Extracted circuit; updated in place
+        top_k: Number of pairs considered, the best one applied
+    
+    Returns:
+        The runner-up pairs as formatted values, or None if the circuit is not
+        a well-formed single-R single-C filter with a usable cutoff_freq
+        constraint, or no pair comes within CUTOFF_TOLERANCE_PERCENT of it
+        (the extracted values are then kept)
+    """
+    # Runs on raw model output ahead of validation, so anything malformed is left to the validator
+    constraints = circuit_json.get('constraints')
+    components = circuit_json.get('components')
+    if not isinstance(constraints, dict) or not isinstance(components, list):
+        return None
+    cutoff = constraints.get('cutoff_freq')
+    parts = [comp for comp in components if isinstance(comp, dict)]
+    resistors = [comp for comp in parts if comp.get('type') == 'resistor']
+    capacitors = [comp for comp in parts if comp.get('type') == 'capacitor']
+    if cutoff is None or len(resistors) != 1 or len(capacitors) != 1:
+        return None
+    try:
+        frequency = si_units.parse(cutoff)
+        pairs = ComponentCalculator.search_rc_filter(frequency, top_k)
+    except ValueError:
+        return None
+    r, c = pairs[0]
+    error = abs(1 / (2 * math.pi * r * c) - frequency) / frequency * 100
+    if error > ComponentCalculator.CUTOFF_TOLERANCE_PERCENT:
+        print(f"Warning: no standard R/C pair within {ComponentCalculator.CUTOFF_TOLERANCE_PERCENT:g}% "
+              f"of {cutoff}, keeping the extracted values")
+        return None
+    
+    formatted = [{
+        'resistor': ComponentCalculator._format_resistance(r),
+        'capacitor': ComponentCalculator._format_capacitance(c),
+        'cutoff_freq': f"{1 / (2 * math.pi * r * c):.1f}Hz",
+    } for r, c in pairs]
+    resistors[0]['value'] = formatted[0]['resistor']
+    capacitors[0]['value'] = formatted[0]['capacitor']
+    return formatted[1:]
 
 
 def test_calculator():
@@ -193,22 +289,7 @@ def test_calculator():
 
 def parse_value(value_str: str) -> float:
     """Parse component value string to float (e.g., '1k' -> 1000)."""
-    multipliers = {
-        'M': 1e6,
-        'k': 1e3,
-        'u': 1e-6,
-        'n': 1e-9,
-        'p': 1e-12
-    }
-    
-    value_str = value_str.strip()
-    
-    for suffix, mult in multipliers.items():
-        if value_str.endswith(suffix):
-            return float(value_str[:-1]) * mult
-    
-    return float(value_str)
-
+    return si_units.parse(value_str)
 
 if __name__ == "__main__":
     test_calculator()
@@ -18,6 +18,23 @@ class Config:
     OUTPUT_DIR = os.getenv('OUTPUT_DIR', './output_api')
     TEMP_DIR = os.getenv('TEMP_DIR', './temp')
     
+    # KiCad symbol libraries embedded into generated schematics
+    SYMBOL_DIR = os.getenv('SYMBOL_DIR') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'kicad_libs', 'symbols'
+    )
+    
+    # Stocked parts (CSV or SQLite); when set, calculators only pick values on hand
+    PARTS_CATALOG = os.getenv('PARTS_CATALOG', '')
+    PARTS_MIN_STOCK = int(os.getenv('PARTS_MIN_STOCK', 1))
+    
+    # Netlists larger than this are split into hierarchical sub-sheets, drawn in parallel
+    MAX_PARTS_PER_SHEET = int(os.getenv('MAX_PARTS_PER_SHEET', 60))
+    SHEET_WORKERS = int(os.getenv('SHEET_WORKERS', os.cpu_count() or 1))
+    
+    # Scratch workspaces for SKiDL jobs (defaults to /dev/shm when available)
+    SCRATCH_DIR = os.getenv('SCRATCH_DIR', '')
+    SCRATCH_POOL_SIZE = int(os.getenv('SCRATCH_POOL_SIZE', 8))
+    
     # Rate limiting
     MAX_REQUESTS_PER_HOUR = int(os.getenv('MAX_REQUESTS_PER_HOUR', 100))
     
@@ -25,6 +42,10 @@ class Config:
     API_TIMEOUT = int(os.getenv('API_TIMEOUT', 30))
     SKIDL_EXECUTION_TIMEOUT = int(os.getenv('SKIDL_EXECUTION_TIMEOUT', 10))
     
+    # Per-request deadline in seconds (clients may lower it via X-Request-Deadline)
+    REQUEST_DEADLINE = float(os.getenv('REQUEST_DEADLINE', 45))
+    MAX_REQUEST_DEADLINE = float(os.getenv('MAX_REQUEST_DEADLINE', 120))
+    
     # Security
     MAX_INPUT_LENGTH = int(os.getenv('MAX_INPUT_LENGTH', 500))
     ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', '*').split(',')
@@ -37,6 +58,9 @@ class Config:
     ENABLE_CACHING = os.getenv('ENABLE_CACHING', 'true').lower() == 'true'
     ENABLE_TELEMETRY = os.getenv('ENABLE_TELEMETRY', 'false').lower() == 'true'
     
+    # Derive schematic UUIDs from element paths so identical circuits give identical files
+    DETERMINISTIC_UUIDS = os.getenv('DETERMINISTIC_UUIDS', 'true').lower() == 'true'
+    
     @staticmethod
     def validate():
         """Validate required configuration"""
@@ -0,0 +1,125 @@
+"""
+Netlist connectivity engine
+Interns net names to integer IDs and unions every component's pins in one
+pass, giving connected parts, ground reachability, single-pin nets and
+shorted parts for circuits of any size
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Net names treated as the ground reference (compared upper-case); the
+# validator, the analyses and the schematic all use this one set
+GROUND_NETS = frozenset({'GND', 'GROUND', '0', 'VSS', 'AGND', 'DGND'})
+
+
+class Connectivity:
+    """
+    Connectivity of a circuit's components over its nets
+
+    Args:
+        components: Circuit JSON components, each with 'id', 'type' and a
+            'nets' list indexed by pin; empty net names mark unused pins
+    """
+
+    def __init__(self, components: Iterable[Dict[str, Any]]):
+        self.net_ids: Dict[str, int] = {}
+        self.net_names: List[str] = []
+        self.pin_counts: List[int] = []
+        self.first_ref: List[str] = []
+        self._parent: List[int] = []
+        self.refs: List[str] = []
+        self._component_net: List[int] = []
+        # (ref, type, net) of parts whose connected pins all land on one net
+        self.shorted: List[Tuple[str, str, str]] = []
+        # (first ref, second ref, net pair) of voltage sources across the same two nets
+        self.parallel_sources: List[Tuple[str, str, Tuple[str, str]]] = []
+
+        net_ids, names, counts, first, parent = (
+            self.net_ids, self.net_names, self.pin_counts, self.first_ref, self._parent)
+        find = self._find
+        sources: Dict[Tuple[int, int], str] = {}
+        for comp in components:
+            ref = str(comp.get('id', 'UNKNOWN'))
+            nets = comp.get('nets')
+            if not isinstance(nets, list):
+                continue
+            root = -1
+            pins = []
+            for net in nets:
+                if not net:
+                    continue  # unused pin
+                net_id = net_ids.get(net)
+                if net_id is None:
+                    net_id = net_ids[net] = len(names)
+                    names.append(net)
+                    counts.append(0)
+                    first.append(ref)
+                    parent.append(net_id)
+                counts[net_id] += 1
+                pins.append(net_id)
+                # Union by attaching this net's root under the component's root
+                net_root = find(net_id)
+                if root < 0:
+                    root = net_root
+                elif net_root != root:
+                    parent[net_root] = root
+            if not pins:
+                continue
+            self.refs.append(ref)
+            self._component_net.append(pins[0])
+
+            comp_type = comp.get('type', '')
+            if len(pins) > 1 and min(pins) == max(pins):
+                self.shorted.append((ref, comp_type, names[pins[0]]))
+            elif comp_type == 'voltage_source' and len(pins) == 2:
+                key = (min(pins), max(pins))
+                if key in sources:
+                    self.parallel_sources.append((sources[key], ref, (names[key[0]], names[key[1]])))
+                else:
+                    sources[key] = ref
+
+    def _find(self, net_id: int) -> int:
+        parent = self._parent
+        while parent[net_id] != net_id:
+            # Path halving keeps the trees flat without recursion
+            parent[net_id] = parent[parent[net_id]]
+            net_id = parent[net_id]
+        return net_id
+
+    def ground_ids(self) -> List[int]:
+        """IDs of the ground nets present"""
+        return [net_id for name, net_id in self.net_ids.items() if name.upper() in GROUND_NETS]
+
+    @property
+    def has_ground(self) -> bool:
+        return bool(self.ground_ids())
+
+    def floating_nets(self) -> List[Tuple[str, str]]:
+        """(net, ref) for every net reached by a single pin"""
+        return [(self.net_names[i], self.first_ref[i]) for i, count in enumerate(self.pin_counts) if count == 1]
+
+    def islands(self) -> List[List[str]]:
+        """Component refs of each connected part, largest first"""
+        parts: Dict[int, List[str]] = {}
+        find = self._find
+        for ref, net_id in zip(self.refs, self._component_net):
+            parts.setdefault(find(net_id), []).append(ref)
+        return sorted(parts.values(), key=len, reverse=True)
+
+    def ungrounded(self) -> List[List[str]]:
+        """Component refs of each connected part with no path to a ground net"""
+        find = self._find
+        grounded = {find(net_id) for net_id in self.ground_ids()}
+        parts: Dict[int, List[str]] = {}
+        for ref, net_id in zip(self.refs, self._component_net):
+            root = find(net_id)
+            if root not in grounded:
+                parts.setdefault(root, []).append(ref)
+        return sorted(parts.values(), key=len, reverse=True)
+
+    def connected(self, net_a: str, net_b: str) -> Optional[bool]:
+        """Whether two nets are joined through components; None if either is absent"""
+        a, b = self.net_ids.get(net_a), self.net_ids.get(net_b)
+        if a is None or b is None:
+            return None
+        return self._find(a) == self._find(b)
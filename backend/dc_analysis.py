@@ -0,0 +1,308 @@
+"""
+DC Operating Point
+Modified nodal analysis of circuit JSON: node voltages, branch currents and
+dissipation with capacitors open, inductors shorted and op-amps ideal.
+Large systems are factorized as SciPy sparse matrices when SciPy is
+installed; small ones use NumPy's dense solver
+"""
+
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+import si_units
+from connectivity import GROUND_NETS
+
+try:
+    from scipy.sparse import csc_matrix
+    from scipy.sparse.linalg import splu
+except ImportError:  # listed in requirements.txt; without it every solve is dense
+    csc_matrix = splu = None
+
+# Unknowns above which the sparse solver is used (when available)
+SPARSE_THRESHOLD = 200
+
+# Rating assumed for resistors without a 'power_rating' (1/4 W through-hole / 1206)
+DEFAULT_RESISTOR_RATING_W = 0.25
+
+# Two-pin parts solved as MNA branches (resistors are stamped separately)
+TWO_PIN_BRANCHES = frozenset({'inductor', 'voltage_source', 'current_source'})
+
+# Parts whose DC behaviour is not modelled; their pins are left open
+UNMODELED_TYPES = frozenset({'diode', 'led', 'transistor'})
+
+
+@dataclass
+class DCSolution:
+    """
+    Operating point of a circuit
+
+    Attributes:
+        node_voltages: Volts per net, ground at 0; nets without a DC path to
+            ground are absent
+        currents: Amps per part, flowing into its first pin (out of a
+            source's positive terminal for voltage sources)
+        power: Watts dissipated per resistor; watts delivered per source
+        floating_nets: Nets with no DC path to ground
+        source_loops: Voltage sources and inductors that close a loop of
+            zero resistance; left out of the solve
+        unmodeled: Parts treated as open circuits (diodes, transistors)
+        singular: The remaining system still had no unique solution
+    """
+    node_voltages: Dict[str, float] = field(default_factory=dict)
+    currents: Dict[str, float] = field(default_factory=dict)
+    power: Dict[str, float] = field(default_factory=dict)
+    floating_nets: List[str] = field(default_factory=list)
+    source_loops: List[str] = field(default_factory=list)
+    unmodeled: List[str] = field(default_factory=list)
+    singular: bool = False
+
+
+class _Nodes:
+    """Union-find over net indices, with ground as index 0"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.names: List[str] = ['0']
+        self.parent: List[int] = [0]
+        self.has_ground = False
+
+    def id(self, net: str) -> int:
+        net_id = self.ids.get(net)
+        if net_id is None:
+            if net.upper() in GROUND_NETS:
+                self.names[0] = net
+                self.has_ground = True
+                net_id = self.ids[net] = 0
+            else:
+                net_id = self.ids[net] = len(self.names)
+                self.names.append(net)
+                self.parent.append(net_id)
+        return net_id
+
+    def find(self, net_id: int) -> int:
+        parent = self.parent
+        while parent[net_id] != net_id:
+            parent[net_id] = parent[parent[net_id]]
+            net_id = parent[net_id]
+        return net_id
+
+    def union(self, a: int, b: int) -> bool:
+        """Join two nets; False if they were already joined"""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        # Keep ground as the root of its set
+        if a < b:
+            a, b = b, a
+        self.parent[a] = b
+        return True
+
+
+def resistor_rating(comp: Dict[str, Any]) -> float:
+    """Power rating in watts from the part's 'power_rating', else the default"""
+    rating = si_units.try_parse(comp.get('power_rating'))
+    return rating if rating and rating > 0 else DEFAULT_RESISTOR_RATING_W
+
+
+def solve_dc(components: List[Dict[str, Any]]) -> Optional[DCSolution]:
+    """
+    Solve the DC operating point
+
+    Args:
+        components: Circuit JSON components
+
+    Returns:
+        DCSolution, or None if the circuit has no ground net or no source
+    """
+    nodes = _Nodes()
+    node_id = nodes.id
+    solution = DCSolution()
+    # Resistors are stamped as arrays; everything else is a handful of branches
+    r_refs: List[str] = []
+    r_pins: List[Tuple[int, int]] = []
+    r_values: List[Any] = []
+    # (ref, type, pin node ids, value text) of sources, inductors and op-amps
+    branches: List[Tuple[str, str, Tuple[int, ...], Any]] = []
+    for comp in components:
+        nets = comp.get('nets')
+        comp_type = comp.get('type')
+        if not isinstance(nets, list):
+            continue
+        if comp_type == 'resistor' or comp_type in TWO_PIN_BRANCHES:
+            if len(nets) != 2 or not nets[0] or not nets[1]:
+                continue
+            pins = (node_id(nets[0]), node_id(nets[1]))
+            if comp_type == 'resistor':
+                r_refs.append(str(comp.get('id', '')))
+                r_pins.append(pins)
+                r_values.append(comp.get('value'))
+            else:
+                branches.append((str(comp.get('id', '')), comp_type, pins, comp.get('value')))
+        elif comp_type == 'opamp':
+            # Output, inverting and non-inverting input of section A
+            if len(nets) >= 3 and all(nets[:3]):
+                branches.append((str(comp.get('id', '')), comp_type, tuple(node_id(net) for net in nets[:3]), 0))
+        elif comp_type in UNMODELED_TYPES:
+            solution.unmodeled.append(str(comp.get('id', '')))
+        elif comp_type == 'capacitor':
+            # Open at DC, but its nets still exist (and may float)
+            if len(nets) == 2 and nets[0] and nets[1]:
+                node_id(nets[0])
+                node_id(nets[1])
+
+    values = si_units.parse_array([value for *_, value in branches]) if branches else np.zeros(0)
+    branches = [(ref, kind, pins, float(value))
+                for (ref, kind, pins, _), value in zip(branches, values) if np.isfinite(value)]
+    if not nodes.has_ground or not any(kind in ('voltage_source', 'current_source') for _, kind, _, _ in branches):
+        return None
+    count = len(nodes.names)
+    r_pins_array = np.array(r_pins, dtype=np.intp).reshape(-1, 2)
+    conductance = 1.0 / si_units.parse_array(r_values) if r_values else np.zeros(0)
+    resistors = np.isfinite(conductance) & (conductance > 0)
+
+    # Zero-resistance branches (sources, inductors) may not close a loop
+    stamped = []
+    for branch in branches:
+        ref, kind, pins, _ = branch
+        if kind in ('voltage_source', 'inductor') and not nodes.union(pins[0], pins[1]):
+            solution.source_loops.append(ref)
+            continue
+        stamped.append(branch)
+
+    # Nets reach ground through resistors, those branches and op-amp outputs
+    reach = list(range(count))
+
+    def find(i: int) -> int:
+        while reach[i] != i:
+            reach[i] = reach[reach[i]]
+            i = reach[i]
+        return i
+
+    def union(a: int, b: int):
+        a, b = find(a), find(b)
+        if a != b:
+            # Ground (0) stays the root of its set
+            reach[max(a, b)] = min(a, b)
+
+    for a, b in r_pins_array[resistors].tolist():
+        union(a, b)
+    for _, kind, pins, _ in stamped:
+        if kind == 'opamp':
+            union(pins[0], 0)
+        elif kind != 'current_source':
+            union(pins[0], pins[1])
+    grounded = np.array([find(i) == 0 for i in range(count)])
+    solution.floating_nets = [nodes.names[i] for i in np.flatnonzero(~grounded).tolist()]
+
+    # Unknowns: grounded nets other than ground itself, then one current per branch
+    row_of = np.full(count, -1, dtype=np.intp)
+    solved = np.flatnonzero(grounded[1:]) + 1
+    row_of[solved] = np.arange(len(solved))
+    size = len(solved)
+
+    # Resistor stamps: +g on both diagonals, -g off them; ground rows drop out
+    live = resistors & grounded[r_pins_array[:, 0]] if len(r_pins) else resistors
+    a, b = row_of[r_pins_array[live, 0]], row_of[r_pins_array[live, 1]]
+    g = conductance[live]
+    rows = [np.concatenate([a, b, a, b])]
+    cols = [np.concatenate([a, b, b, a])]
+    vals = [np.concatenate([g, g, -g, -g])]
+    extra_rows: List[int] = []
+    extra_cols: List[int] = []
+    extra_vals: List[float] = []
+    branch_of: Dict[str, int] = {}
+    rhs_entries: List[Tuple[int, float]] = []
+
+    def stamp(r: int, c: int, v: float):
+        extra_rows.append(r)
+        extra_cols.append(c)
+        extra_vals.append(v)
+
+    for ref, kind, pins, value in stamped:
+        if not grounded[pins[0]]:
+            continue  # part of a floating section; nothing flows
+        p, n = row_of[pins[0]], row_of[pins[1]]
+        if kind == 'current_source':
+            # Current flows from the first pin through the source to the second
+            rhs_entries += [(p, -value), (n, value)]
+            continue
+        k = size
+        size += 1
+        branch_of[ref] = k
+        if kind == 'opamp':
+            # Ideal op-amp: output current whatever keeps the inputs equal
+            stamp(p, k, 1.0)
+            stamp(k, row_of[pins[2]], 1.0)
+            stamp(k, n, -1.0)
+            continue
+        stamp(p, k, 1.0)
+        stamp(n, k, -1.0)
+        stamp(k, p, 1.0)
+        stamp(k, n, -1.0)
+        if kind == 'voltage_source':
+            rhs_entries.append((k, value))
+
+    rows.append(np.array(extra_rows, dtype=np.intp))
+    cols.append(np.array(extra_cols, dtype=np.intp))
+    vals.append(np.array(extra_vals, dtype=float))
+    rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+    keep = (rows >= 0) & (cols >= 0)
+    rhs = np.zeros(size)
+    for r, value in rhs_entries:
+        if r >= 0:
+            rhs[r] += value
+
+    x = _solve(size, rows[keep], cols[keep], vals[keep], rhs)
+    if x is None:
+        solution.singular = True
+        return solution
+
+    voltage = np.zeros(count)
+    voltage[solved] = x[:len(solved)]
+    names = nodes.names
+    solution.node_voltages = {names[i]: float(voltage[i]) for i in np.flatnonzero(grounded).tolist()}
+    drop = voltage[r_pins_array[live, 0]] - voltage[r_pins_array[live, 1]]
+    current = drop * g
+    live_refs = [ref for ref, keep_ref in zip(r_refs, live.tolist()) if keep_ref]
+    solution.currents = dict(zip(live_refs, current.tolist()))
+    solution.power = dict(zip(live_refs, (current * drop).tolist()))
+    for ref, kind, pins, value in stamped:
+        if kind == 'current_source':
+            if grounded[pins[0]]:
+                solution.currents[ref] = value
+                solution.power[ref] = float(-value * (voltage[pins[0]] - voltage[pins[1]]))
+        elif ref in branch_of:
+            current = float(x[branch_of[ref]])
+            if kind == 'voltage_source':
+                # Branch current enters the positive terminal; report what the source drives out
+                solution.currents[ref] = -current
+                solution.power[ref] = -current * value
+            else:
+                solution.currents[ref] = current
+    return solution
+
+
+def _solve(size: int, rows: np.ndarray, cols: np.ndarray, vals: np.ndarray,
+           rhs: np.ndarray) -> Optional[np.ndarray]:
+    """Solve the assembled system; None if it is singular"""
+    if size == 0:
+        return rhs
+    if splu is not None and size > SPARSE_THRESHOLD:
+        matrix = csc_matrix((vals, (rows, cols)), shape=(size, size))
+        try:
+            x = splu(matrix).solve(rhs)
+        except RuntimeError:  # "Factor is exactly singular"
+            return None
+    else:
+        matrix = np.zeros((size, size))
+        np.add.at(matrix, (rows, cols), vals)
+        try:
+            x = np.linalg.solve(matrix, rhs)
+        except np.linalg.LinAlgError:
+            return None
+    return x if np.all(np.isfinite(x)) else None
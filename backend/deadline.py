@@ -0,0 +1,118 @@
+"""
+Request deadlines and cooperative cancellation
+Each pipeline stage asks the deadline for its remaining budget and checks it
+between units of work so abandoned requests stop consuming resources
+"""
+
+import math
+import socket
+import time
+from typing import Callable, Optional
+
+from config import Config
+from error_handler import RequestCancelledError
+
+DEADLINE_HEADER = 'X-Request-Deadline'
+
+
+class Deadline:
+    """Absolute per-request deadline with an optional external cancel signal"""
+
+    def __init__(self, budget_seconds: float, cancel_check: Optional[Callable[[], bool]] = None):
+        self.expires_at = time.monotonic() + max(budget_seconds, 0.0)
+        self._cancel_check = cancel_check
+        self.reason = None
+
+    @classmethod
+    def from_headers(cls, headers, cancel_check: Optional[Callable[[], bool]] = None) -> 'Deadline':
+        """
+        Build a deadline from the request header, falling back to config
+
+        Args:
+            headers: Mapping of request headers
+            cancel_check: Callable returning True once the client has gone away
+
+        Returns:
+            Deadline capped at Config.MAX_REQUEST_DEADLINE seconds
+        """
+        budget = Config.REQUEST_DEADLINE
+        raw = headers.get(DEADLINE_HEADER)
+        if raw:
+            try:
+                requested = float(raw)
+            except ValueError:
+                requested = None
+            # NaN would slip past the cap below and never expire
+            if requested is not None and math.isfinite(requested) and requested > 0:
+                budget = requested
+        return cls(min(budget, Config.MAX_REQUEST_DEADLINE), cancel_check)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def budget(self, cap: float) -> float:
+        """Time a stage may spend: its own limit or what is left, whichever is smaller"""
+        return min(cap, self.remaining())
+
+    @property
+    def cancelled(self) -> bool:
+        """True once the deadline has passed or the client disconnected"""
+        if self.reason is None:
+            if self.remaining() <= 0:
+                self.reason = 'deadline'
+            elif self._cancel_check is not None and self._cancel_check():
+                self.reason = 'disconnect'
+        return self.reason is not None
+
+    def check(self, stage: str):
+        """
+        Raise if the request should stop
+
+        Args:
+            stage: Pipeline stage name, reported in the error and metrics
+
+        Raises:
+            RequestCancelledError: If the deadline expired or the client left
+        """
+        if self.cancelled:
+            raise RequestCancelledError(stage, self.reason)
+
+
+def client_disconnect_probe(environ, interval: float = 0.25) -> Optional[Callable[[], bool]]:
+    """
+    Build a cheap check for whether the HTTP client closed its connection
+
+    Works with gunicorn and the werkzeug dev server, which both expose the
+    client socket in the WSGI environ. A zero-byte non-blocking peek means
+    the peer sent FIN. Results are cached for `interval` seconds. Platforms
+    without MSG_DONTWAIT (Windows) get no probe.
+
+    Args:
+        environ: WSGI environ of the current request
+        interval: Minimum seconds between socket probes
+
+    Returns:
+        Callable returning True once disconnected, or None if unsupported
+    """
+    sock = environ.get('gunicorn.socket') or environ.get('werkzeug.socket')
+    dontwait = getattr(socket, 'MSG_DONTWAIT', None)
+    if sock is None or dontwait is None:
+        return None
+
+    state = {'checked_at': 0.0, 'gone': False}
+
+    def probe() -> bool:
+        now = time.monotonic()
+        if state['gone'] or now - state['checked_at'] < interval:
+            return state['gone']
+        state['checked_at'] = now
+        try:
+            state['gone'] = sock.recv(1, socket.MSG_PEEK | dontwait) == b''
+        except BlockingIOError:
+            state['gone'] = False
+        except OSError:
+            state['gone'] = True
+        return state['gone']
+
+    return probe
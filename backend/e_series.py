@@ -0,0 +1,112 @@
+"""
+IEC 60063 preferred number series (E6 to E192)
+Precomputed tables over every decade from femto to tera, with nearest-value
+lookup for scalars and NumPy arrays
+"""
+
+from bisect import bisect_left
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+# E6-E24 are historical roundings and cannot be computed from 10^(i/n)
+_HISTORICAL = {
+    'E6': (1.0, 1.5, 2.2, 3.3, 4.7, 6.8),
+    'E12': (1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2),
+    'E24': (1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+            3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1),
+}
+
+
+def _e192() -> tuple:
+    values = [round(10 ** (i / 192), 2) for i in range(192)]
+    values[185] = 9.20  # the one value the standard does not round from 10^(i/192)
+    return tuple(values)
+
+
+# Mantissas in [1, 10) per series; E48 and E96 are every 4th and 2nd E192 value
+SERIES: Dict[str, tuple] = dict(_HISTORICAL, E48=_e192()[::4], E96=_e192()[::2], E192=_e192())
+
+# Nominal tolerance of parts sold in each series
+TOLERANCE: Dict[str, float] = {'E6': 0.2, 'E12': 0.1, 'E24': 0.05, 'E48': 0.02, 'E96': 0.01, 'E192': 0.005}
+
+# Decades covered by the lookup tables: 1e-15 (1 fF) up to 9.xx e12 (TΩ)
+MIN_DECADE = -15
+MAX_DECADE = 12
+
+_tables: Dict[str, tuple] = {}
+
+
+def _lookup(series: str) -> tuple:
+    """(values, boundaries) as arrays and as lists, built on first use"""
+    if series in _tables:
+        return _tables[series]
+    mantissas = SERIES[series]
+    # Built from decimal strings so 4.7e-9 is exactly the float Python parses for "4.7n"
+    values = [float(f"{m:g}e{d}") for d in range(MIN_DECADE, MAX_DECADE + 1) for m in mantissas]
+    values.append(float(f"1e{MAX_DECADE + 1}"))
+    table = np.array(values)
+    # Rounding is relative, so the boundary between neighbours is their geometric mean
+    boundaries = np.sqrt(table[:-1] * table[1:])
+    # Scalar lookups bisect plain lists, which beats NumPy's per-call overhead
+    _tables[series] = table, boundaries, values, boundaries.tolist()
+    return _tables[series]
+
+
+def table(series: str = 'E12') -> np.ndarray:
+    """
+    All values of a series across the supported decades, ascending
+
+    Raises:
+        KeyError: If the series is unknown
+    """
+    return _lookup(series)[0]
+
+
+def nearest(value: Union[float, np.ndarray], series: str = 'E12') -> Union[float, np.ndarray]:
+    """
+    Round to the nearest value of a preferred number series
+
+    Values between two series values go to whichever is closer by ratio, so
+    9.6k rounds up to 10k in E12 rather than down to 8.2k. Values outside the
+    table range clip to its ends.
+
+    Args:
+        value: Positive number or array of positive numbers
+        series: Series name, 'E6' to 'E192'
+
+    Returns:
+        A float for scalar input, otherwise an array of the same shape
+
+    Raises:
+        ValueError: If any value is not positive
+        KeyError: If the series is unknown
+    """
+    values, boundaries, value_list, boundary_list = _lookup(series)
+    if np.isscalar(value):
+        if not value > 0:
+            raise ValueError(f"Value must be positive, got {value}")
+        return value_list[bisect_left(boundary_list, value)]
+
+    array = np.asarray(value, dtype=float)
+    if not np.all(array > 0):
+        raise ValueError("Values must be positive")
+    return values[np.searchsorted(boundaries, array)]
+
+
+
+def series_of(value: float, candidates=tuple(SERIES)) -> Optional[str]:
+    """
+    First of the candidate series that contains value
+
+    Args:
+        value: Positive component value
+        candidates: Series names to try, in order
+
+    Returns:
+        Series name, or None if value is not a standard value of any of them
+    """
+    for series in candidates:
+        if abs(nearest(value, series) - value) <= value * 1e-6:
+            return series
+    return None
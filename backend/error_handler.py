@@ -34,6 +34,15 @@ class ValidationError(CircuitError):
     pass
 
 
+class RequestCancelledError(CircuitError):
+    """Raised when a request passes its deadline or the client disconnects"""
+    
+    def __init__(self, stage: str, reason: str):
+        self.stage = stage
+        self.reason = reason
+        super().__init__(f"Request cancelled during {stage} ({reason})")
+
+
 def handle_errors(func):
     """Decorator for consistent error handling"""
     @wraps(func)
@@ -52,6 +61,9 @@ def handle_errors(func):
         except ValidationError as e:
             logger.warning(f"Circuit validation error: {str(e)}")
             raise
+        except RequestCancelledError as e:
+            logger.info(f"Request cancelled: {str(e)}")
+            raise
         except Exception as e:
             logger.exception(f"Unexpected error in {func.__name__}: {str(e)}")
             raise CircuitError(f"An unexpected error occurred: {str(e)}")
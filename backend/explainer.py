@@ -5,6 +5,12 @@ Generates human-readable explanations of circuit designs
 
 from typing import Dict, Any, List
 import math
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import si_units
+from ac_analysis import analyze_ac
 
 
 class ExplanationGenerator:
@@ -44,6 +50,9 @@ class ExplanationGenerator:
         # Calculation explanation
         self._explain_calculations(circuit_type, circuit_json)
         
+        # Response measured from the netlist itself
+        self._add_measured_response(circuit_type, circuit_json)
+        
         # Verification statement
         self._add_verification(circuit_type, circuit_json)
         
@@ -194,43 +203,23 @@ class ExplanationGenerator:
     
     def _parse_value(self, value_str: str) -> float:
         """Parse component value string to numeric value"""
-        if not value_str:
-            return None
-        
-        # Remove spaces and convert to lowercase
-        value_str = value_str.strip().lower()
-        
-        # Handle different units
-        multipliers = {
-            'g': 1e9,
-            'm': 1e6,
-            'k': 1e3,
-            'h': 1e2,
-            'da': 1e1,
-            'd': 1e-1,
-            'c': 1e-2,
-            'µ': 1e-6,
-            'u': 1e-6,
-            'n': 1e-9,
-            'p': 1e-12,
-            'f': 1e-15,
-        }
-        
-        # Try to extract number and unit
-        import re
-        match = re.match(r'([0-9.]+)\s*([a-zµ]*)', value_str)
-        if match:
-            number = float(match.group(1))
-            unit = match.group(2)
-            
-            # Check for multiplier prefix
-            for prefix, multiplier in multipliers.items():
-                if unit.startswith(prefix):
-                    return number * multiplier
-            
-            return number
-        
-        return None
+        return si_units.try_parse(value_str)
+    
+    def _add_measured_response(self, circuit_type: str, circuit_json: Dict[str, Any]):
+        """State the -3 dB point and roll-off simulated from the generated components"""
+        if 'lowpass' not in circuit_type and 'highpass' not in circuit_type:
+            return
+        try:
+            response = analyze_ac(circuit_json)
+        except ValueError:
+            return
+        if response.cutoff_freq is None:
+            return
+        text = (f"Simulated response of the generated netlist: the -3 dB point is at "
+                f"{si_units.format_value(response.cutoff_freq, 'Hz')}")
+        if response.rolloff_db_per_decade is not None:
+            text += f", rolling off at {response.rolloff_db_per_decade:.0f} dB/decade"
+        self.explanation_parts.append(text + ".")
     
     def _add_verification(self, circuit_type: str, circuit_json: Dict[str, Any]):
         """Add verification statement"""
@@ -1,89 +1,197 @@
+import hashlib
 import os
+import re
 import sys
+import signal
 import subprocess
+import time
 import uuid
 import shutil
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Tuple
 
+sys.path.append(os.path.dirname(__file__))
+
+from config import Config
+from analytics import metrics
+from scratch_workspace import ScratchWorkspacePool
+from deadline import Deadline
+from error_handler import RequestCancelledError
+from netlist_parser import parse_netlist
+from schematic_writer import SchematicWriter
+from sheet_builder import draw_netlist, write_hierarchical_schematic
+from svg_preview import SchematicPreview
+from value_patcher import topology_signature, netlist_value_spans, schematic_value_spans, patch_values
+
 
 class FileManager:
     """Manages SKiDL execution and KiCad file generation"""
     
-    def __init__(self, output_dir: str = "output"):
+    # Files promoted from the scratch workspace to persistent storage
+    SKIDL_ARTIFACTS = ('circuit.py',)
+    
+    # Hard limit for one SKiDL run, and how often a run checks its deadline
+    SKIDL_TIMEOUT = 30
+    SKIDL_POLL_INTERVAL = 0.1
+    
+    # Topologies whose netlist and schematic are kept for value-only patching
+    TEMPLATE_CACHE_SIZE = 32
+    
+    # SVG previews live in one shared directory, named by schematic hash
+    PREVIEW_DIR = 'previews'
+    PREVIEW_ID = re.compile(r'^[0-9a-f]{64}$')
+    PREVIEW_INDEX_SIZE = 256
+    
+    def __init__(self, output_dir: str = "output", scratch_pool: Optional[ScratchWorkspacePool] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.scratch_pool = scratch_pool or ScratchWorkspacePool()
+        self._templates = OrderedDict()          # signature -> cached outputs and value offsets
+        self._pending_templates = OrderedDict()  # netlist path -> (signature, refs) awaiting conversion
+        self._prepatched = set()                 # netlist paths whose schematic is already written
+        self._template_lock = threading.Lock()
+        self._preview_ids = OrderedDict()        # project path -> preview id
     
-    def execute_skidl(self, skidl_code: str, circuit_name: str = None) -> Tuple[bool, str, str]:
+    def execute_skidl(self, skidl_code: str, circuit_name: str = None,
+                      deadline: Optional[Deadline] = None) -> Tuple[bool, str, str]:
         """
         Execute SKiDL code and generate netlist
         
         Args:
             skidl_code: SKiDL Python code as string
             circuit_name: Optional name for the circuit
+            deadline: Optional request deadline; the SKiDL process is killed
+                when it expires or the client disconnects
             
         Returns:
             Tuple of (success: bool, netlist_path: str, error_message: str)
+            
+        Raises:
+            RequestCancelledError: If the deadline cancelled the run
         """
+        if deadline:
+            deadline.check("skidl_execution")
+        
         # Generate unique ID for this generation
         generation_id = str(uuid.uuid4())[:8]
         if circuit_name:
             generation_id = f"{circuit_name}_{generation_id}"
         
-        # Create generation directory
         gen_dir = self.output_dir / generation_id
-        gen_dir.mkdir(exist_ok=True)
         
-        # Write SKiDL script to file
-        script_path = gen_dir / "circuit.py"
-        with open(script_path, 'w') as f:
-            f.write(skidl_code)
+        # Same topology as a cached circuit: patch values instead of running SKiDL
+        signature, values = topology_signature(skidl_code)
+        if Config.ENABLE_CACHING:
+            patched_path = self._patch_from_template(signature, values, skidl_code, gen_dir)
+            if patched_path:
+                metrics.record_cache_hit()
+                return True, patched_path, ""
+        
+        # Run the job on scratch storage; only artifacts reach output_dir
+        with self.scratch_pool.workspace() as work_dir:
+            # Write SKiDL script to file
+            script_path = work_dir / "circuit.py"
+            with open(script_path, 'w') as f:
+                f.write(skidl_code)
+            
+            try:
+                # Get the python executable from venv if available
+                python_exe = sys.executable if 'venv' in sys.executable else 'python'
+                
+                # Execute SKiDL script
+                returncode, stderr = self._run_skidl_process(python_exe, work_dir, deadline)
+                
+                if returncode != 0:
+                    error_msg = f"SKiDL execution failed:\n{stderr}"
+                    return False, "", error_msg
+                
+                # Find generated netlist file
+                netlist_path = work_dir / "circuit.net"
+                if not netlist_path.exists():
+                    # SKiDL might generate with different name
+                    netlist_files = list(work_dir.glob("*.net"))
+                    if netlist_files:
+                        netlist_path = netlist_files[0]
+                    else:
+                        return False, "", "No netlist file generated"
+                
+                self.scratch_pool.promote(
+                    work_dir, gen_dir, self.SKIDL_ARTIFACTS + (netlist_path.name,)
+                )
+                if Config.ENABLE_CACHING and values:
+                    with self._template_lock:
+                        self._pending_templates[str(gen_dir / netlist_path.name)] = (signature, set(values))
+                        while len(self._pending_templates) > self.TEMPLATE_CACHE_SIZE:
+                            self._pending_templates.popitem(last=False)
+                return True, str(gen_dir / netlist_path.name), ""
+                
+            except subprocess.TimeoutExpired:
+                return False, "", f"SKiDL execution timed out (>{self.SKIDL_TIMEOUT}s)"
+            except RequestCancelledError:
+                raise
+            except Exception as e:
+                return False, "", f"Execution error: {str(e)}"
+    
+    def _run_skidl_process(self, python_exe: str, work_dir: Path,
+                           deadline: Optional[Deadline]) -> Tuple[int, str]:
+        """
+        Run circuit.py in its own process group, polling the deadline
         
+        Returns:
+            Tuple of (returncode, stderr)
+        """
+        proc = subprocess.Popen(
+            [python_exe, 'circuit.py'],
+            cwd=str(work_dir),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True
+        )
+        started = time.monotonic()
         try:
-            # Get the python executable from venv if available
-            python_exe = sys.executable if 'venv' in sys.executable else 'python'
-            
-            # Execute SKiDL script
-            result = subprocess.run(
-                [python_exe, 'circuit.py'],
-                cwd=str(gen_dir),
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                error_msg = f"SKiDL execution failed:\n{result.stderr}"
-                return False, "", error_msg
-            
-            # Find generated netlist file
-            netlist_path = gen_dir / "circuit.net"
-            if not netlist_path.exists():
-                # SKiDL might generate with different name
-                netlist_files = list(gen_dir.glob("*.net"))
-                if netlist_files:
-                    netlist_path = netlist_files[0]
-                else:
-                    return False, "", "No netlist file generated"
-            
-            return True, str(netlist_path), ""
-            
-        except subprocess.TimeoutExpired:
-            return False, "", "SKiDL execution timed out (>30s)"
-        except Exception as e:
-            return False, "", f"Execution error: {str(e)}"
+            while True:
+                try:
+                    _, stderr = proc.communicate(timeout=self.SKIDL_POLL_INTERVAL)
+                    return proc.returncode, stderr
+                except subprocess.TimeoutExpired:
+                    if time.monotonic() - started > self.SKIDL_TIMEOUT:
+                        raise
+                    if deadline:
+                        deadline.check("skidl_execution")
+        except BaseException:
+            self._kill_process_group(proc)
+            raise
+    
+    @staticmethod
+    def _kill_process_group(proc: subprocess.Popen):
+        """Kill a SKiDL run together with anything it spawned"""
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            proc.kill()
+        proc.communicate()
     
-    def convert_to_kicad(self, netlist_path: str) -> Tuple[bool, str, str]:
+    def convert_to_kicad(self, netlist_path: str, deadline: Optional[Deadline] = None) -> Tuple[bool, str, str]:
         """
         Convert netlist to KiCad project
         
         Args:
             netlist_path: Path to the netlist file
+            deadline: Optional request deadline checked between output files
             
         Returns:
             Tuple of (success: bool, kicad_project_path: str, error_message: str)
+            
+        Raises:
+            RequestCancelledError: If the deadline cancelled the conversion
         """
+        if deadline:
+            deadline.check("kicad_conversion")
+        
         netlist_path = Path(netlist_path)
         
         if not netlist_path.exists():
@@ -93,6 +201,13 @@ class FileManager:
         project_dir = netlist_path.parent
         project_name = netlist_path.stem
         
+        with self._template_lock:
+            prepatched = str(netlist_path) in self._prepatched
+            self._prepatched.discard(str(netlist_path))
+            pending = self._pending_templates.pop(str(netlist_path), None)
+        if prepatched:
+            return True, str(project_dir / f"{project_name}.kicad_pro"), ""
+        
         # Create KiCad project file (.kicad_pro)
         kicad_pro_path = project_dir / f"{project_name}.kicad_pro"
         kicad_pro_content = self._generate_kicad_project_file()
@@ -100,15 +215,150 @@ class FileManager:
         with open(kicad_pro_path, 'w') as f:
             f.write(kicad_pro_content)
         
+        if deadline:
+            deadline.check("kicad_conversion")
+        
         # Create KiCad schematic file (.kicad_sch)
         kicad_sch_path = project_dir / f"{project_name}.kicad_sch"
-        kicad_sch_content = self._generate_kicad_schematic_file(netlist_path)
-        
+        preview = SchematicPreview()
         with open(kicad_sch_path, 'w') as f:
-            f.write(kicad_sch_content)
+            sub_sheets = self._write_kicad_schematic_file(netlist_path, f, project_dir, preview)
+        self._store_preview(kicad_pro_path, kicad_sch_path.read_bytes(), preview)
+        
+        # Value patching only rewrites the root file, so hierarchical designs are not cached
+        if pending and not sub_sheets:
+            self._remember_template(pending[0], pending[1], netlist_path, kicad_sch_path,
+                                    kicad_pro_content, preview)
         
         return True, str(kicad_pro_path), ""
     
+    def _remember_template(self, signature: str, refs: set, netlist_path: Path,
+                           kicad_sch_path: Path, kicad_pro_content: str, preview: SchematicPreview):
+        """Cache a freshly generated circuit's outputs with the offsets of every Value field"""
+        try:
+            netlist_text = netlist_path.read_text(encoding='utf-8')
+            schematic_text = kicad_sch_path.read_text(encoding='utf-8')
+            netlist_spans = netlist_value_spans(netlist_text)
+            schematic_spans = schematic_value_spans(schematic_text)
+        except Exception as e:
+            print(f"Warning: could not index generated files for patching: {e}")
+            return
+        
+        # Only topologies where every value can be found in both files are reusable
+        if not refs <= netlist_spans.keys() or not refs <= schematic_spans.keys():
+            return
+        
+        with self._template_lock:
+            self._templates[signature] = {
+                'netlist_name': netlist_path.name,
+                'netlist': netlist_text,
+                'netlist_spans': netlist_spans,
+                'schematic': schematic_text,
+                'schematic_spans': schematic_spans,
+                'project': kicad_pro_content,
+                'preview': preview,
+            }
+            self._templates.move_to_end(signature)
+            while len(self._templates) > self.TEMPLATE_CACHE_SIZE:
+                self._templates.popitem(last=False)
+    
+    def _patch_from_template(self, signature: str, values: dict, skidl_code: str,
+                             gen_dir: Path) -> Optional[str]:
+        """
+        Write a new generation by patching the Value fields of a cached one
+        
+        Returns:
+            Path of the patched netlist, or None if no usable template exists
+        """
+        with self._template_lock:
+            template = self._templates.get(signature)
+            if template is not None:
+                self._templates.move_to_end(signature)
+        if template is None:
+            return None
+        
+        netlist_text = patch_values(template['netlist'], template['netlist_spans'], values)
+        schematic_text = patch_values(template['schematic'], template['schematic_spans'], values)
+        if netlist_text is None or schematic_text is None:
+            return None
+        
+        netlist_name = template['netlist_name']
+        stem = Path(netlist_name).stem
+        files = {
+            'circuit.py': skidl_code,
+            netlist_name: netlist_text,
+            f"{stem}.kicad_pro": template['project'],
+            f"{stem}.kicad_sch": schematic_text,
+        }
+        with self.scratch_pool.workspace() as work_dir:
+            for name, text in files.items():
+                (work_dir / name).write_text(text, encoding='utf-8')
+            self.scratch_pool.promote(work_dir, gen_dir, tuple(files))
+        
+        self._store_preview(gen_dir / f"{stem}.kicad_pro", schematic_text.encode('utf-8'),
+                            template['preview'].with_values(values))
+        
+        netlist_path = str(gen_dir / netlist_name)
+        with self._template_lock:
+            self._prepatched.add(netlist_path)
+        return netlist_path
+    
+    def _store_preview(self, project_path: Path, schematic: bytes, preview: SchematicPreview):
+        """
+        Render the preview unless one for an identical schematic already exists
+        
+        Failures are logged and leave the project without a preview.
+        """
+        preview_id = hashlib.sha256(schematic).hexdigest()
+        try:
+            preview_dir = self.output_dir / self.PREVIEW_DIR
+            preview_dir.mkdir(exist_ok=True)
+            path = preview_dir / f"{preview_id}.svg"
+            if path.exists():
+                # Keep shared previews alive for cleanup_old_files
+                os.utime(path)
+            else:
+                tmp_path = preview_dir / f".{preview_id}.{uuid.uuid4().hex[:8]}.tmp"
+                tmp_path.write_text(preview.render(), encoding='utf-8')
+                os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Warning: could not write schematic preview: {e}")
+            return
+        
+        with self._template_lock:
+            self._preview_ids[str(project_path)] = preview_id
+            self._preview_ids.move_to_end(str(project_path))
+            while len(self._preview_ids) > self.PREVIEW_INDEX_SIZE:
+                self._preview_ids.popitem(last=False)
+    
+    def preview_id(self, project_path: str) -> Optional[str]:
+        """
+        Get the SVG preview id of a converted project
+        
+        Args:
+            project_path: Path to the .kicad_pro file returned by convert_to_kicad
+            
+        Returns:
+            Content hash naming the preview, or None if none was written
+        """
+        with self._template_lock:
+            return self._preview_ids.get(str(project_path))
+    
+    def preview_path(self, preview_id: str) -> Optional[Path]:
+        """
+        Get the file of an SVG preview
+        
+        Args:
+            preview_id: Id from preview_id()
+            
+        Returns:
+            Path of the SVG, or None if the id is malformed or unknown
+        """
+        if not self.PREVIEW_ID.match(preview_id):
+            return None
+        path = self.output_dir / self.PREVIEW_DIR / f"{preview_id}.svg"
+        return path if path.is_file() else None
+    
     def _generate_kicad_project_file(self) -> str:
         """Generate basic KiCad project file content"""
         return '''{
@@ -132,213 +382,119 @@ class FileManager:
   }
 }'''
     
-    def _generate_kicad_schematic_file(self, netlist_path: Path) -> str:
-        """Generate complete simulation-ready KiCad schematic for ANY circuit type"""
-        import re
+    def _write_kicad_schematic_file(self, netlist_path: Path, fp, sheet_dir: Optional[Path] = None,
+                                    preview: Optional[SchematicPreview] = None) -> list:
+        """
+        Write complete simulation-ready KiCad schematic for ANY circuit type
+        
+        Everything drawn on the root sheet is also recorded in preview, if given.
         
+        Returns:
+            Paths of sub-sheet files written next to the root schematic
+        """
         try:
-            with open(netlist_path, 'r') as f:
-                netlist_content = f.read()
-            
-            # Extract components
-            comp_pattern = r'\(comp\s+\(ref\s+"([^"]+)"\)\s+\(value\s+"([^"]+)"\)'
-            components = re.findall(comp_pattern, netlist_content)
-            
-            # Extract nets (connections)
-            net_pattern = r'\(net\s+\(code\s+\d+\)\s+\(name\s+"([^"]+)"\).*?\(node\s+\(ref\s+"([^"]+)"\)\s+\(pin\s+"([^"]+)"\)'
-            nets = {}
-            for match in re.finditer(net_pattern, netlist_content, re.DOTALL):
-                net_name = match.group(1)
-                if net_name not in nets:
-                    nets[net_name] = []
-                node_pattern = r'\(node\s+\(ref\s+"([^"]+)"\)\s+\(pin\s+"([^"]+)"\)'
-                for node_match in re.finditer(node_pattern, match.group(0)):
-                    nets[net_name].append((node_match.group(1), node_match.group(2)))
+            netlist = parse_netlist(netlist_path)
+            components = netlist.component_values()
+            nets = netlist.net_map()
             
             # Categorize components
             resistors = [(ref, val) for ref, val in components if ref.startswith('R')]
             capacitors = [(ref, val) for ref, val in components if ref.startswith('C')]
-            inductors = [(ref, val) for ref, val in components if ref.startswith('L')]
-            
+        except Exception as e:
+            print(f"Error reading netlist: {e}")
+            self._generate_empty_schematic(SchematicWriter(fp))
+            return []
+        
+        try:
+            writer = SchematicWriter(fp, observer=preview)
             # Determine circuit type
             if len(resistors) == 1 and len(capacitors) == 1:
                 # RC Filter (low-pass or high-pass)
-                return self._generate_rc_filter_schematic(resistors, capacitors, nets)
+                self._generate_rc_filter_schematic(writer, resistors, capacitors, nets)
             elif len(resistors) == 2 and len(capacitors) == 0:
                 # Voltage Divider
-                return self._generate_voltage_divider_schematic(resistors, nets)
-            elif len(resistors) == 1 and len(inductors) == 1:
-                # RL Filter
-                return self._generate_rl_filter_schematic(resistors, inductors, nets)
+                self._generate_voltage_divider_schematic(writer, resistors, nets)
             else:
-                # Generic layout for other circuits
-                return self._generate_generic_schematic(components, nets)
+                # Automatic placement for everything else (RL filters included)
+                return self._generate_generic_schematic(writer, netlist, sheet_dir, netlist_path.stem)
         except Exception as e:
             print(f"Error generating schematic: {e}")
-            return self._generate_empty_schematic()
+            fp.seek(0)
+            fp.truncate()
+            if preview:
+                preview.reset()
+            self._generate_empty_schematic(SchematicWriter(fp))
+        return []
     
-    def _generate_rc_filter_schematic(self, resistors, capacitors, nets):
+    def _generate_rc_filter_schematic(self, writer: SchematicWriter, resistors, capacitors, nets):
         """Generate complete RC filter with voltage source"""
-        symbols = []
-        wires = []
-        labels = []
-        power_symbols = []
         comp_positions = {}
         
         r_comp = resistors[0] if resistors else None
         c_comp = capacitors[0] if capacitors else None
         
-        # Add voltage source at (80, 100)
-        v_uuid = str(uuid.uuid4())
-        symbols.append(f'''  (symbol (lib_id "Simulation_SPICE:VDC") (at 80 110 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {v_uuid})
-    (property "Reference" "V1" (at 75 105 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Value" "5V" (at 75 115 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Footprint" "" (at 80 110 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "~" (at 80 110 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (pin "2" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "V1") (unit 1))
-      )
-    )
-  )''')
+        writer.begin(lib_ids=("Device:C", "Device:R", "power:GND", "Simulation_SPICE:VDC"))
+        
+        # Add voltage source at (80, 110)
+        writer.emit_symbol("Simulation_SPICE:VDC", "V1", "5V", (80, 110),
+                           reference_at=(75, 105), value_at=(75, 115))
         
         # Position R1 horizontally at (120, 100)
         if r_comp:
-                ref, value = r_comp
-                comp_uuid = str(uuid.uuid4())
-                x, y = 120, 100
-                comp_positions[ref] = {
-                    'x': x, 'y': y, 'rotation': 0,
-                    'pin1': (x - 5.08, y),  # Left pin
-                    'pin2': (x + 5.08, y)   # Right pin
-                }
-                symbols.append(f'''  (symbol (lib_id "Device:R") (at {x} {y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {comp_uuid})
-    (property "Reference" "{ref}" (at {x} {y - 5} 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Value" "{value}" (at {x} {y + 5} 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Footprint" "" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "~" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (pin "2" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "{ref}") (unit 1))
-      )
-    )
-  )''')
+            ref, value = r_comp
+            x, y = 120, 100
+            comp_positions[ref] = {
+                'x': x, 'y': y, 'rotation': 0,
+                'pin1': (x - 5.08, y),  # Left pin
+                'pin2': (x + 5.08, y)   # Right pin
+            }
+            writer.emit_symbol("Device:R", ref, value, (x, y),
+                               reference_at=(x, y - 5), value_at=(x, y + 5))
         
         # Position C1 vertically at (140, 115) - below R1's right pin
         if c_comp:
-                ref, value = c_comp
-                comp_uuid = str(uuid.uuid4())
-                x, y = 140, 115
-                comp_positions[ref] = {
-                    'x': x, 'y': y, 'rotation': 0,
-                    'pin1': (x, y - 3.81),  # Top pin
-                    'pin2': (x, y + 3.81)   # Bottom pin
-                }
-                symbols.append(f'''  (symbol (lib_id "Device:C") (at {x} {y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {comp_uuid})
-    (property "Reference" "{ref}" (at {x + 3} {y} 0)
-      (effects (font (size 1.27 1.27)) (justify left))
-    )
-    (property "Value" "{value}" (at {x + 3} {y + 3} 0)
-      (effects (font (size 1.27 1.27)) (justify left))
-    )
-    (property "Footprint" "" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "~" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (pin "2" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "{ref}") (unit 1))
-      )
-    )
-  )''')
+            ref, value = c_comp
+            x, y = 140, 115
+            comp_positions[ref] = {
+                'x': x, 'y': y, 'rotation': 0,
+                'pin1': (x, y - 3.81),  # Top pin
+                'pin2': (x, y + 3.81)   # Bottom pin
+            }
+            writer.emit_symbol("Device:C", ref, value, (x, y),
+                               reference_at=(x + 3, y), value_at=(x + 3, y + 3), justify="left")
         
         # Now add wires to connect everything
         # Wire from IN label to R1 pin 1
         if r_comp:
-            r_ref = r_comp[0]
-            r1_pin1 = comp_positions[r_ref]['pin1']
+            r1_pin1 = comp_positions[r_comp[0]]['pin1']
             in_x = r1_pin1[0] - 15
-            labels.append(f'  (label "IN" (at {in_x} {r1_pin1[1]} 0) (fields_autoplaced) (effects (font (size 1.27 1.27)) (justify left bottom)) (uuid {uuid.uuid4()}))')
-            wires.append(f'  (wire (pts (xy {in_x} {r1_pin1[1]}) (xy {r1_pin1[0]} {r1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
+            writer.emit_label("IN", (in_x, r1_pin1[1]))
+            writer.emit_wire((in_x, r1_pin1[1]), r1_pin1)
         
         # Wire from R1 pin 2 to C1 pin 1 (vertical then horizontal)
         if r_comp and c_comp:
-            r_ref = r_comp[0]
-            c_ref = c_comp[0]
-            r1_pin2 = comp_positions[r_ref]['pin2']
-            c1_pin1 = comp_positions[c_ref]['pin1']
+            r1_pin2 = comp_positions[r_comp[0]]['pin2']
+            c1_pin1 = comp_positions[c_comp[0]]['pin1']
+            corner = (r1_pin2[0], c1_pin1[1])
             
             # Vertical wire from R1 pin2 down to C1 level
-            wires.append(f'  (wire (pts (xy {r1_pin2[0]} {r1_pin2[1]}) (xy {r1_pin2[0]} {c1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
+            writer.emit_wire(r1_pin2, corner)
             # Horizontal wire from that point to C1 pin1
-            wires.append(f'  (wire (pts (xy {r1_pin2[0]} {c1_pin1[1]}) (xy {c1_pin1[0]} {c1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
+            writer.emit_wire(corner, c1_pin1)
             # Add junction at the corner
-            wires.append(f'  (junction (at {r1_pin2[0]} {c1_pin1[1]}) (diameter 0) (color 0 0 0 0) (uuid {uuid.uuid4()}))')
+            writer.emit_junction(corner)
             # Add OUT label
             out_x = r1_pin2[0] + 5
-            labels.append(f'  (label "OUT" (at {out_x} {c1_pin1[1]} 0) (fields_autoplaced) (effects (font (size 1.27 1.27)) (justify left bottom)) (uuid {uuid.uuid4()}))')
-            wires.append(f'  (wire (pts (xy {r1_pin2[0]} {c1_pin1[1]}) (xy {out_x} {c1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            
+            writer.emit_label("OUT", (out_x, c1_pin1[1]))
+            writer.emit_wire(corner, (out_x, c1_pin1[1]))
+        
         # Add ground symbol for C1 pin 2
         if c_comp:
-                c_ref = c_comp[0]
-                c1_pin2 = comp_positions[c_ref]['pin2']
-                gnd_y = c1_pin2[1] + 5
-                gnd_uuid = str(uuid.uuid4())
-                power_symbols.append(f'''  (symbol (lib_id "power:GND") (at {c1_pin2[0]} {gnd_y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {gnd_uuid})
-    (property "Reference" "#PWR001" (at {c1_pin2[0]} {gnd_y + 6.35} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Value" "GND" (at {c1_pin2[0]} {gnd_y + 3.81} 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Footprint" "" (at {c1_pin2[0]} {gnd_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "" (at {c1_pin2[0]} {gnd_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "#PWR001") (unit 1))
-      )
-    )
-  )''')
-                # Wire from C1 pin2 to ground
-                wires.append(f'  (wire (pts (xy {c1_pin2[0]} {c1_pin2[1]}) (xy {c1_pin2[0]} {gnd_y})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
+            c1_pin2 = comp_positions[c_comp[0]]['pin2']
+            gnd_y = c1_pin2[1] + 5
+            writer.emit_power((c1_pin2[0], gnd_y))
+            # Wire from C1 pin2 to ground
+            writer.emit_wire(c1_pin2, (c1_pin2[0], gnd_y))
         
         # Connect voltage source
         # V1 pin 1 (positive, top) at (80, 106.19) connects to IN
@@ -350,259 +506,49 @@ class FileManager:
             r1_pin1 = comp_positions[r_comp[0]]['pin1']
             in_label_x = r1_pin1[0] - 15
             # Wire from V1+ vertically to R1 level
-            wires.append(f'  (wire (pts (xy {v1_pos[0]} {v1_pos[1]}) (xy {v1_pos[0]} {r1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            # Wire horizontally from V1 to IN label
-            wires.append(f'  (wire (pts (xy {v1_pos[0]} {r1_pin1[1]}) (xy {in_label_x} {r1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            # Wire from IN label to R1 pin1 (this connects to the existing IN-to-R1 wire)
-            # No need for additional wire here as it's already added in the "Wire from IN label to R1 pin 1" section
+            writer.emit_wire(v1_pos, (v1_pos[0], r1_pin1[1]))
+            # Wire horizontally from V1 to IN label (which already connects to R1 pin1)
+            writer.emit_wire((v1_pos[0], r1_pin1[1]), (in_label_x, r1_pin1[1]))
         
         # Ground for V1 negative
         gnd2_y = v1_neg[1] + 5
-        gnd2_uuid = str(uuid.uuid4())
-        power_symbols.append(f'''  (symbol (lib_id "power:GND") (at {v1_neg[0]} {gnd2_y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {gnd2_uuid})
-    (property "Reference" "#PWR002" (at {v1_neg[0]} {gnd2_y + 6.35} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Value" "GND" (at {v1_neg[0]} {gnd2_y + 3.81} 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Footprint" "" (at {v1_neg[0]} {gnd2_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "" (at {v1_neg[0]} {gnd2_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "#PWR002") (unit 1))
-      )
-    )
-  )''')
-        wires.append(f'  (wire (pts (xy {v1_neg[0]} {v1_neg[1]}) (xy {v1_neg[0]} {gnd2_y})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
+        writer.emit_power((v1_neg[0], gnd2_y))
+        writer.emit_wire(v1_neg, (v1_neg[0], gnd2_y))
         
         # Connect both grounds together
         if c_comp:
             c1_pin2 = comp_positions[c_comp[0]]['pin2']
             gnd1_y = c1_pin2[1] + 5
             # Horizontal wire connecting both ground points
-            wires.append(f'  (wire (pts (xy {v1_neg[0]} {gnd2_y}) (xy {c1_pin2[0]} {gnd1_y})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            
-        return self._build_schematic_output(symbols, power_symbols, wires, labels)
-    
-    def _old_fallback_return(self):
-        """Old code - keeping for reference"""
-        return f'''(kicad_sch (version 20230121) (generator eeschema)
-
-  (uuid {uuid.uuid4()})
-
-  (paper "A4")
-
-  (title_block
-    (title "AutoCDA Generated Circuit")
-    (date "{datetime.now().strftime('%Y-%m-%d')}")
-    (comment 1 "Generated by AutoCDA")
-    (comment 2 "Import the netlist to see connections")
-  )
-
-  (lib_symbols
-    (symbol "Device:R" (pin_numbers hide) (pin_names (offset 0)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "R" (at 2.032 0 90) (effects (font (size 1.27 1.27))))
-      (property "Value" "R" (at 0 0 90) (effects (font (size 1.27 1.27))))
-      (property "Footprint" "" (at -1.778 0 90) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "R_0_1"
-        (rectangle (start -1.016 -2.54) (end 1.016 2.54)
-          (stroke (width 0.254) (type default)) (fill (type none))
-        )
-      )
-      (symbol "R_1_1"
-        (pin passive line (at 0 3.81 270) (length 1.27) (name "~" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-        (pin passive line (at 0 -3.81 90) (length 1.27) (name "~" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
-      )
-    )
-    (symbol "Device:C" (pin_numbers hide) (pin_names (offset 0.254)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "C" (at 0.635 2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Value" "C" (at 0.635 -2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Footprint" "" (at 0.9652 -3.81 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "C_0_1"
-        (polyline (pts (xy -2.032 -0.762) (xy 2.032 -0.762)) (stroke (width 0.508) (type default)) (fill (type none)))
-        (polyline (pts (xy -2.032 0.762) (xy 2.032 0.762)) (stroke (width 0.508) (type default)) (fill (type none)))
-      )
-      (symbol "C_1_1"
-        (pin passive line (at 0 3.81 270) (length 2.794) (name "~" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-        (pin passive line (at 0 -3.81 90) (length 2.794) (name "~" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
-      )
-    )
-    (symbol "power:GND" (power) (pin_names (offset 0)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "#PWR" (at 0 -6.35 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Value" "GND" (at 0 -3.81 0) (effects (font (size 1.27 1.27))))
-      (property "Footprint" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "GND_0_1"
-        (polyline (pts (xy 0 0) (xy 0 -1.27) (xy 1.27 -1.27) (xy 0 -2.54) (xy -1.27 -1.27) (xy 0 -1.27)) (stroke (width 0) (type default)) (fill (type none)))
-      )
-      (symbol "GND_1_1"
-        (pin power_in line (at 0 0 270) (length 0) hide (name "GND" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-      )
-    )
-    (symbol "Simulation_SPICE:VDC" (pin_numbers hide) (pin_names (offset 0.0254)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "V" (at 2.54 2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Value" "VDC" (at 2.54 0 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Footprint" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "VDC_0_1"
-        (circle (center 0 0) (radius 3.81) (stroke (width 0.254) (type default)) (fill (type background)))
-        (polyline (pts (xy -1.27 0.635) (xy 1.27 0.635)) (stroke (width 0) (type default)) (fill (type none)))
-        (polyline (pts (xy 0 -0.635) (xy 0 -1.905)) (stroke (width 0) (type default)) (fill (type none)))
-        (polyline (pts (xy 0 1.905) (xy 0 0.635)) (stroke (width 0) (type default)) (fill (type none)))
-      )
-      (symbol "VDC_1_1"
-        (pin passive line (at 0 6.35 270) (length 2.54) (name "+" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-        (pin passive line (at 0 -6.35 90) (length 2.54) (name "-" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
-      )
-    )
-  )
-
-{symbols_str}
-
-{wires_str}
-
-{labels_str}
-
-  (sheet_instances
-    (path "/" (page "1"))
-  )
-)'''
-    
-    def _old_fallback_code(self):
-        """Old code - removed"""
-        return f'''(kicad_sch (version 20230121) (generator eeschema)
-
-  (uuid {uuid.uuid4()})
-
-  (paper "A4")
-
-  (title_block
-    (title "AutoCDA Generated Circuit")
-    (date "{datetime.now().strftime('%Y-%m-%d')}")
-    (comment 1 "Generated by AutoCDA")
-  )
-
-  (lib_symbols)
-
-  (sheet_instances
-    (path "/" (page "1"))
-  )
-)'''
+            writer.emit_wire((v1_neg[0], gnd2_y), (c1_pin2[0], gnd1_y))
+        
+        writer.end()
     
-    def _generate_voltage_divider_schematic(self, resistors, nets):
+    def _generate_voltage_divider_schematic(self, writer: SchematicWriter, resistors, nets):
         """Generate complete voltage divider with voltage source"""
-        symbols = []
-        wires = []
-        labels = []
-        power_symbols = []
         comp_positions = {}
         
         r1_comp = resistors[0] if len(resistors) > 0 else None
         r2_comp = resistors[1] if len(resistors) > 1 else None
         
-        # Add voltage source at (100, 80)
-        v_uuid = str(uuid.uuid4())
-        symbols.append(f'''  (symbol (lib_id "Simulation_SPICE:VDC") (at 100 90 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {v_uuid})
-    (property "Reference" "V1" (at 95 85 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Value" "9V" (at 95 95 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Footprint" "" (at 100 90 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "~" (at 100 90 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (pin "2" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "V1") (unit 1))
-      )
-    )
-  )''')
-        
-        # R1 vertical at (140, 100)
-        if r1_comp:
-            ref, value = r1_comp
-            comp_uuid = str(uuid.uuid4())
-            x, y = 140, 100
-            comp_positions[ref] = {
-                'x': x, 'y': y, 'rotation': 0,
-                'pin1': (x, y - 3.81),
-                'pin2': (x, y + 3.81)
-            }
-            symbols.append(f'''  (symbol (lib_id "Device:R") (at {x} {y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {comp_uuid})
-    (property "Reference" "{ref}" (at {x + 3} {y} 0)
-      (effects (font (size 1.27 1.27)) (justify left))
-    )
-    (property "Value" "{value}" (at {x + 3} {y + 3} 0)
-      (effects (font (size 1.27 1.27)) (justify left))
-    )
-    (property "Footprint" "" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "~" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (pin "2" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "{ref}") (unit 1))
-      )
-    )
-  )''')
-        
-        # R2 vertical at (140, 130)
-        if r2_comp:
-            ref, value = r2_comp
-            comp_uuid = str(uuid.uuid4())
-            x, y = 140, 130
+        writer.begin(lib_ids=("Device:R", "power:GND", "Simulation_SPICE:VDC"))
+        
+        # Add voltage source at (100, 90)
+        writer.emit_symbol("Simulation_SPICE:VDC", "V1", "9V", (100, 90),
+                           reference_at=(95, 85), value_at=(95, 95))
+        
+        # R1 vertical at (140, 100), R2 vertical at (140, 130)
+        for comp, (x, y) in ((r1_comp, (140, 100)), (r2_comp, (140, 130))):
+            if not comp:
+                continue
+            ref, value = comp
             comp_positions[ref] = {
                 'x': x, 'y': y, 'rotation': 0,
                 'pin1': (x, y - 3.81),
                 'pin2': (x, y + 3.81)
             }
-            symbols.append(f'''  (symbol (lib_id "Device:R") (at {x} {y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {comp_uuid})
-    (property "Reference" "{ref}" (at {x + 3} {y} 0)
-      (effects (font (size 1.27 1.27)) (justify left))
-    )
-    (property "Value" "{value}" (at {x + 3} {y + 3} 0)
-      (effects (font (size 1.27 1.27)) (justify left))
-    )
-    (property "Footprint" "" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "~" (at {x} {y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (pin "2" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "{ref}") (unit 1))
-      )
-    )
-  )''')
+            writer.emit_symbol("Device:R", ref, value, (x, y),
+                               reference_at=(x + 3, y), value_at=(x + 3, y + 3), justify="left")
         
         # Connect everything
         v1_pos = (100, 83.65)
@@ -615,184 +561,49 @@ class FileManager:
             r2_pin2 = comp_positions[r2_comp[0]]['pin2']
             
             # V1+ to R1 pin1
-            wires.append(f'  (wire (pts (xy {v1_pos[0]} {v1_pos[1]}) (xy {v1_pos[0]} {r1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            wires.append(f'  (wire (pts (xy {v1_pos[0]} {r1_pin1[1]}) (xy {r1_pin1[0]} {r1_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            labels.append(f'  (label "VIN" (at {v1_pos[0] + 5} {r1_pin1[1]} 0) (fields_autoplaced) (effects (font (size 1.27 1.27)) (justify left bottom)) (uuid {uuid.uuid4()}))')
+            writer.emit_wire(v1_pos, (v1_pos[0], r1_pin1[1]))
+            writer.emit_wire((v1_pos[0], r1_pin1[1]), r1_pin1)
+            writer.emit_label("VIN", (v1_pos[0] + 5, r1_pin1[1]))
             
             # R1 pin2 to R2 pin1 (VOUT)
-            wires.append(f'  (wire (pts (xy {r1_pin2[0]} {r1_pin2[1]}) (xy {r2_pin1[0]} {r2_pin1[1]})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            labels.append(f'  (label "VOUT" (at {r1_pin2[0] + 5} {r1_pin2[1] + 5} 0) (fields_autoplaced) (effects (font (size 1.27 1.27)) (justify left bottom)) (uuid {uuid.uuid4()}))')
+            writer.emit_wire(r1_pin2, r2_pin1)
+            writer.emit_label("VOUT", (r1_pin2[0] + 5, r1_pin2[1] + 5))
             
             # R2 pin2 to GND
             gnd_y = r2_pin2[1] + 5
-            gnd_uuid = str(uuid.uuid4())
-            power_symbols.append(f'''  (symbol (lib_id "power:GND") (at {r2_pin2[0]} {gnd_y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {gnd_uuid})
-    (property "Reference" "#PWR001" (at {r2_pin2[0]} {gnd_y + 6.35} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Value" "GND" (at {r2_pin2[0]} {gnd_y + 3.81} 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Footprint" "" (at {r2_pin2[0]} {gnd_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "" (at {r2_pin2[0]} {gnd_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "#PWR001") (unit 1))
-      )
-    )
-  )''')
-            wires.append(f'  (wire (pts (xy {r2_pin2[0]} {r2_pin2[1]}) (xy {r2_pin2[0]} {gnd_y})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
+            writer.emit_power((r2_pin2[0], gnd_y))
+            writer.emit_wire(r2_pin2, (r2_pin2[0], gnd_y))
             
             # V1- to GND
             gnd2_y = v1_neg[1] + 5
-            gnd2_uuid = str(uuid.uuid4())
-            power_symbols.append(f'''  (symbol (lib_id "power:GND") (at {v1_neg[0]} {gnd2_y} 0) (unit 1)
-    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)
-    (uuid {gnd2_uuid})
-    (property "Reference" "#PWR002" (at {v1_neg[0]} {gnd2_y + 6.35} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Value" "GND" (at {v1_neg[0]} {gnd2_y + 3.81} 0)
-      (effects (font (size 1.27 1.27)))
-    )
-    (property "Footprint" "" (at {v1_neg[0]} {gnd2_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (property "Datasheet" "" (at {v1_neg[0]} {gnd2_y} 0)
-      (effects (font (size 1.27 1.27)) hide)
-    )
-    (pin "1" (uuid {uuid.uuid4()}))
-    (instances
-      (project "circuit"
-        (path "/" (reference "#PWR002") (unit 1))
-      )
-    )
-  )''')
-            wires.append(f'  (wire (pts (xy {v1_neg[0]} {v1_neg[1]}) (xy {v1_neg[0]} {gnd2_y})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-            wires.append(f'  (wire (pts (xy {v1_neg[0]} {gnd2_y}) (xy {r2_pin2[0]} {gnd_y})) (stroke (width 0) (type default)) (uuid {uuid.uuid4()}))')
-        
-        return self._build_schematic_output(symbols, power_symbols, wires, labels)
-    
-    def _generate_rl_filter_schematic(self, resistors, inductors, nets):
-        """Generate RL filter - similar to RC but with inductor"""
-        # Similar to RC filter but replace C with L
-        return self._generate_empty_schematic()
+            writer.emit_power((v1_neg[0], gnd2_y))
+            writer.emit_wire(v1_neg, (v1_neg[0], gnd2_y))
+            writer.emit_wire((v1_neg[0], gnd2_y), (r2_pin2[0], gnd_y))
+        
+        writer.end()
     
-    def _generate_generic_schematic(self, components, nets):
-        """Generate generic circuit layout"""
-        return self._generate_empty_schematic()
+    def _generate_generic_schematic(self, writer: SchematicWriter, netlist, sheet_dir: Optional[Path] = None,
+                                    stem: str = "circuit") -> list:
+        """
+        Generate an auto-placed, auto-routed layout for any netlist
+        
+        Netlists with more than Config.MAX_PARTS_PER_SHEET parts become a root
+        sheet plus sub-sheet files in sheet_dir.
+        
+        Returns:
+            Paths of any sub-sheet files written
+        """
+        if sheet_dir is not None and len(netlist.components) > Config.MAX_PARTS_PER_SHEET:
+            return write_hierarchical_schematic(
+                writer, netlist, sheet_dir, stem, Config.MAX_PARTS_PER_SHEET, Config.SHEET_WORKERS
+            )
+        draw_netlist(writer, netlist)
+        return []
     
-    def _generate_empty_schematic(self):
+    def _generate_empty_schematic(self, writer: SchematicWriter):
         """Generate empty schematic as fallback"""
-        return f'''(kicad_sch (version 20230121) (generator eeschema)
-  (uuid {uuid.uuid4()})
-  (paper "A4")
-  (title_block
-    (title "AutoCDA Generated Circuit")
-    (date "{datetime.now().strftime('%Y-%m-%d')}")
-    (comment 1 "Generated by AutoCDA")
-  )
-  (lib_symbols)
-  (sheet_instances
-    (path "/" (page "1"))
-  )
-)'''
-    
-    def _build_schematic_output(self, symbols, power_symbols, wires, labels):
-        """Build final schematic output"""
-        symbols_str = '\n\n'.join(symbols + power_symbols)
-        wires_str = '\n\n'.join(wires)
-        labels_str = '\n\n'.join(labels)
-        
-        return f'''(kicad_sch (version 20230121) (generator eeschema)
-
-  (uuid {uuid.uuid4()})
-
-  (paper "A4")
-
-  (title_block
-    (title "AutoCDA Generated Circuit")
-    (date "{datetime.now().strftime('%Y-%m-%d')}")
-    (comment 1 "Generated by AutoCDA - Simulation Ready")
-  )
-
-  (lib_symbols
-    (symbol "Device:R" (pin_numbers hide) (pin_names (offset 0)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "R" (at 2.032 0 90) (effects (font (size 1.27 1.27))))
-      (property "Value" "R" (at 0 0 90) (effects (font (size 1.27 1.27))))
-      (property "Footprint" "" (at -1.778 0 90) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "R_0_1"
-        (rectangle (start -1.016 -2.54) (end 1.016 2.54)
-          (stroke (width 0.254) (type default)) (fill (type none))
-        )
-      )
-      (symbol "R_1_1"
-        (pin passive line (at 0 3.81 270) (length 1.27) (name "~" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-        (pin passive line (at 0 -3.81 90) (length 1.27) (name "~" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
-      )
-    )
-    (symbol "Device:C" (pin_numbers hide) (pin_names (offset 0.254)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "C" (at 0.635 2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Value" "C" (at 0.635 -2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Footprint" "" (at 0.9652 -3.81 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "C_0_1"
-        (polyline (pts (xy -2.032 -0.762) (xy 2.032 -0.762)) (stroke (width 0.508) (type default)) (fill (type none)))
-        (polyline (pts (xy -2.032 0.762) (xy 2.032 0.762)) (stroke (width 0.508) (type default)) (fill (type none)))
-      )
-      (symbol "C_1_1"
-        (pin passive line (at 0 3.81 270) (length 2.794) (name "~" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-        (pin passive line (at 0 -3.81 90) (length 2.794) (name "~" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
-      )
-    )
-    (symbol "power:GND" (power) (pin_names (offset 0)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "#PWR" (at 0 -6.35 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Value" "GND" (at 0 -3.81 0) (effects (font (size 1.27 1.27))))
-      (property "Footprint" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "GND_0_1"
-        (polyline (pts (xy 0 0) (xy 0 -1.27) (xy 1.27 -1.27) (xy 0 -2.54) (xy -1.27 -1.27) (xy 0 -1.27)) (stroke (width 0) (type default)) (fill (type none)))
-      )
-      (symbol "GND_1_1"
-        (pin power_in line (at 0 0 270) (length 0) hide (name "GND" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-      )
-    )
-    (symbol "Simulation_SPICE:VDC" (pin_numbers hide) (pin_names (offset 0.0254)) (exclude_from_sim no) (in_bom yes) (on_board yes)
-      (property "Reference" "V" (at 2.54 2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Value" "VDC" (at 2.54 0 0) (effects (font (size 1.27 1.27)) (justify left)))
-      (property "Footprint" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
-      (symbol "VDC_0_1"
-        (circle (center 0 0) (radius 3.81) (stroke (width 0.254) (type default)) (fill (type background)))
-        (polyline (pts (xy -1.27 0.635) (xy 1.27 0.635)) (stroke (width 0) (type default)) (fill (type none)))
-        (polyline (pts (xy 0 -0.635) (xy 0 -1.905)) (stroke (width 0) (type default)) (fill (type none)))
-        (polyline (pts (xy 0 1.905) (xy 0 0.635)) (stroke (width 0) (type default)) (fill (type none)))
-      )
-      (symbol "VDC_1_1"
-        (pin passive line (at 0 6.35 270) (length 2.54) (name "+" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
-        (pin passive line (at 0 -6.35 90) (length 2.54) (name "-" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
-      )
-    )
-  )
-
-{symbols_str}
-
-{wires_str}
-
-{labels_str}
-
-  (sheet_instances
-    (path "/" (page "1"))
-  )
-)'''
+        writer.begin(lib_ids=(), comment="Generated by AutoCDA")
+        writer.end()
     
     def cleanup_old_files(self, max_age_hours: int = 24):
         """
@@ -804,7 +615,12 @@ class FileManager:
         cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
         
         for item in self.output_dir.iterdir():
-            if item.is_dir():
+            if item.name == self.PREVIEW_DIR:
+                # Previews are shared between generations, so expire them one by one
+                for preview in item.iterdir():
+                    if datetime.fromtimestamp(preview.stat().st_mtime) < cutoff_time:
+                        preview.unlink()
+            elif item.is_dir():
                 # Check directory modification time
                 dir_mtime = datetime.fromtimestamp(item.stat().st_mtime)
                 if dir_mtime < cutoff_time:
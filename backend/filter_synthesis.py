@@ -0,0 +1,429 @@
+"""
+Higher-order filter synthesis
+Builds Nth-order Butterworth, Bessel and Chebyshev filters from unity-gain
+Sallen-Key stages, or passive RC ladders, with standard component values,
+as circuit JSON for the DSL / SKiDL / KiCad pipeline
+"""
+
+import math
+import os
+import sys
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+import si_units
+from circuit_optimizer import ComponentOptimizer
+from component_calculator import ComponentCalculator
+from parts_catalog import default_catalog
+
+RESPONSES = ('butterworth', 'bessel', 'chebyshev')
+FILTER_TYPES = ('lowpass', 'highpass')
+TOPOLOGIES = ('sallen_key', 'rc_ladder')
+MAX_ORDER = 8
+
+# Passband ripple of Chebyshev designs unless given; the cutoff is the ripple band edge
+DEFAULT_RIPPLE_DB = 1.0
+
+# Stage Q and f0 both depend on value ratios, so synthesis snaps to finer
+# series than the single-pole calculators
+RESISTOR_SERIES = 'E24'
+CAPACITOR_SERIES = 'E12'
+
+# Active stages are driven by op-amps and tolerate a wider resistor span,
+# which high-Q highpass stages need (R2/R1 >= 4 Q^2)
+SALLEN_KEY_IMPEDANCE = (100.0, 1e6)
+
+# Each active stage uses section A of a dual op-amp (pins 1-3, supply on 4 and 8)
+OPAMP_PART = 'TL072'
+
+# Log-spaced points per decade when locating the realized cutoff
+_RESPONSE_POINTS = 2000
+
+
+@lru_cache(maxsize=None)
+def prototype_poles(response: str, order: int, ripple_db: float = DEFAULT_RIPPLE_DB) -> Tuple[complex, ...]:
+    """
+    Poles of the normalized lowpass prototype, cutoff at 1 rad/s
+
+    Butterworth and Bessel are normalized to -3 dB at the cutoff, Chebyshev
+    (type I) to the edge of its ripple band.
+
+    Returns:
+        Poles in the left half plane, one per order
+    """
+    if response == 'butterworth':
+        angles = math.pi * (2 * np.arange(1, order + 1) + order - 1) / (2 * order)
+        poles = np.exp(1j * angles)
+    elif response == 'chebyshev':
+        epsilon = math.sqrt(10 ** (ripple_db / 10) - 1)
+        a = math.asinh(1 / epsilon) / order
+        theta = math.pi * (2 * np.arange(1, order + 1) - 1) / (2 * order)
+        poles = -math.sinh(a) * np.sin(theta) + 1j * math.cosh(a) * np.cos(theta)
+    elif response == 'bessel':
+        # Reverse Bessel polynomial, then rescaled so the -3 dB point is 1 rad/s
+        coefficients = [math.factorial(2 * order - k) / (2 ** (order - k) * math.factorial(k) * math.factorial(order - k))
+                        for k in range(order, -1, -1)]
+        poles = np.roots(coefficients)
+        low, high = 1e-3, 10.0 * order
+        for _ in range(100):
+            mid = math.sqrt(low * high)
+            low, high = (mid, high) if _gain(poles, mid) > 1 / math.sqrt(2) else (low, mid)
+        poles = poles / math.sqrt(low * high)
+    else:
+        raise ValueError(f"Unknown response: {response}")
+    return tuple(complex(p) for p in poles)
+
+
+def _gain(poles, omega) -> np.ndarray:
+    """|H(j omega)| of the unity-DC-gain all-pole lowpass with these poles"""
+    s = 1j * np.asarray(omega, dtype=float)[..., None]
+    poles = np.asarray(poles)
+    return np.abs(np.prod(-poles / (s - poles), axis=-1))
+
+
+def stage_targets(response: str, order: int, ripple_db: float = DEFAULT_RIPPLE_DB) -> List[Tuple[float, Optional[float]]]:
+    """
+    Normalized (omega0, Q) of each stage, lowest Q first
+
+    A real pole becomes a first-order stage with Q None; every complex
+    pair becomes a second-order stage.
+    """
+    stages = []
+    for pole in prototype_poles(response, order, ripple_db):
+        if abs(pole.imag) < 1e-12:
+            stages.append((abs(pole), None))
+        elif pole.imag > 0:
+            stages.append((abs(pole), abs(pole) / (-2 * pole.real)))
+    return sorted(stages, key=lambda stage: stage[1] or 0.0)
+
+
+def _bracket(values: np.ndarray, ideal: np.ndarray) -> np.ndarray:
+    """The two available values around each ideal one, stacked on a new last axis"""
+    upper = np.searchsorted(values, ideal).clip(0, len(values) - 1)
+    lower = (upper - 1).clip(0)
+    return np.stack((values[lower], values[upper]), axis=-1)
+
+
+def _sallen_key_q(filter_type: str, r1, r2, c1, c2):
+    """Q of a unity-gain Sallen-Key stage (R1/C1 are the feedback parts for highpass/lowpass)"""
+    if filter_type == 'lowpass':
+        return np.sqrt(r1 * r2 * c1 * c2) / (c2 * (r1 + r2))
+    return np.sqrt(r1 * r2 * c1 * c2) / (r1 * (c1 + c2))
+
+
+def search_sallen_key(f0: float, q: float, filter_type: str, r_values: np.ndarray,
+                      c_values: np.ndarray) -> Dict[str, float]:
+    """
+    Best standard R1, R2, C1, C2 for one unity-gain Sallen-Key stage
+
+    Every (C1, C2) pair is tried at once. For each, R1 follows from Q and is
+    bracketed by its two nearest available values, then R2 follows from f0
+    given the snapped R1 and is bracketed likewise, so the search covers
+    len(C)^2 x 4 coupled combinations in a single array pass.
+
+    Lowpass: IN-R1-A-R2-B, C1 from A to OUT, C2 from B to GND.
+    Highpass: IN-C1-A-C2-B, R1 from A to OUT, R2 from B to GND.
+
+    Returns:
+        Dict with r1, r2, c1, c2, the realized f0 and q, and error_percent
+        (sum of the f0 and Q errors)
+
+    Raises:
+        ValueError: If no combination realizes the stage
+    """
+    w0 = 2 * math.pi * f0
+    c1 = c_values[:, None]
+    c2 = c_values[None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if filter_type == 'lowpass':
+            # R1 + R2 = 1/(w0 Q C2) and R1 R2 = 1/(w0^2 C1 C2): real only if C1 >= 4 Q^2 C2
+            total = 1 / (w0 * q * c2)
+            discriminant = total ** 2 - 4 / (w0 ** 2 * c1 * c2)
+            r1_ideal = (total + np.sqrt(np.maximum(discriminant, 0))) / 2
+            feasible = np.broadcast_to(discriminant >= 0, r1_ideal.shape)
+        else:
+            r1_ideal = 1 / (w0 * q * (c1 + c2))
+            feasible = np.ones(r1_ideal.shape, dtype=bool)
+        r1 = _bracket(r_values, r1_ideal)[..., :, None]
+        r2 = _bracket(r_values, 1 / (w0 ** 2 * r1[..., 0] * c1[..., None] * c2[..., None]))
+        c1, c2 = c1[..., None, None], c2[..., None, None]
+
+        f_actual = 1 / (2 * math.pi * np.sqrt(r1 * r2 * c1 * c2))
+        q_actual = _sallen_key_q(filter_type, r1, r2, c1, c2)
+        error = np.abs(f_actual / f0 - 1) + np.abs(q_actual / q - 1)
+    error = np.where(feasible[..., None, None], error, np.inf)
+    best = np.unravel_index(np.argmin(error), error.shape)
+    if not np.isfinite(error[best]):
+        raise ValueError(f"No standard values realize f0={f0:g}Hz Q={q:g}")
+
+    shape = error.shape
+    pick = lambda array: float(np.broadcast_to(array, shape)[best])
+    return {
+        'r1': pick(r1), 'r2': pick(r2), 'c1': pick(c1), 'c2': pick(c2),
+        'f0': pick(f_actual), 'q': pick(q_actual), 'error_percent': float(error[best] * 100),
+    }
+
+
+def _stage_response(stage: Dict[str, Any], filter_type: str, s: np.ndarray) -> np.ndarray:
+    """Complex transfer function of one stage at s (rad/s)"""
+    values = stage['values']
+    if stage['topology'] == 'sallen_key':
+        r1, r2, c1, c2 = values['R1'], values['R2'], values['C1'], values['C2']
+        product = r1 * r2 * c1 * c2
+        if filter_type == 'lowpass':
+            return 1 / (s ** 2 * product + s * c2 * (r1 + r2) + 1)
+        return s ** 2 * product / (s ** 2 * product + s * r1 * (c1 + c2) + 1)
+    if stage['topology'] == 'first_order':
+        tau = values['R1'] * values['C1']
+        return 1 / (1 + s * tau) if filter_type == 'lowpass' else s * tau / (1 + s * tau)
+
+    # Passive ladder: chain the ABCD matrices of its sections, output unloaded
+    a, b = np.ones_like(s), np.zeros_like(s)
+    c, d = np.zeros_like(s), np.ones_like(s)
+    for r, cap in stage['sections']:
+        series, shunt = (r, s * cap) if filter_type == 'lowpass' else (1 / (s * cap), 1 / r)
+        b, d = a * series + b, c * series + d
+        a, c = a + b * shunt, c + d * shunt
+    return 1 / a
+
+
+def frequency_response(circuit_json: Dict[str, Any], freqs) -> np.ndarray:
+    """
+    Gain magnitude of a synthesized filter, from its realized component values
+
+    Args:
+        circuit_json: Output of synthesize_filter
+        freqs: Frequencies in Hz
+
+    Returns:
+        |H(j 2 pi f)| for each frequency
+    """
+    synthesis = circuit_json['synthesis']
+    s = 2j * math.pi * np.asarray(freqs, dtype=float)
+    response = np.ones_like(s)
+    for stage in synthesis['stages']:
+        response = response * _stage_response(stage, synthesis['filter_type'], s)
+    return np.abs(response)
+
+
+def _find_cutoff(circuit_json: Dict[str, Any], cutoff_freq: float, level: float) -> Optional[float]:
+    """Frequency where the realized gain crosses level at the passband edge"""
+    freqs = cutoff_freq * np.logspace(-1, 1, 2 * _RESPONSE_POINTS + 1)
+    gain = frequency_response(circuit_json, freqs)
+    passing = np.flatnonzero(gain >= level * (1 - 1e-9))
+    if not len(passing):
+        return None
+    # Lowpass: the last frequency still in the passband; highpass: the first
+    if circuit_json['synthesis']['filter_type'] == 'lowpass':
+        i, j = passing[-1], passing[-1] + 1
+    else:
+        i, j = passing[0] - 1, passing[0]
+    if i < 0 or j >= len(freqs):
+        return None
+    # Interpolate in log-frequency / dB between the bracketing points
+    fraction = (math.log(level) - math.log(gain[i])) / (math.log(gain[j]) - math.log(gain[i]))
+    return float(math.exp(math.log(freqs[i]) + fraction * (math.log(freqs[j]) - math.log(freqs[i]))))
+
+
+class _Netlist:
+    """Components with sequential reference designators and internal net names"""
+
+    def __init__(self):
+        self.components: List[Dict[str, Any]] = []
+        self._counts: Dict[str, int] = {}
+        self._nets = 0
+
+    def net(self) -> str:
+        self._nets += 1
+        return f"N{self._nets}"
+
+    def add(self, prefix: str, comp_type: str, value: str, nets: List[str]) -> str:
+        self._counts[prefix] = self._counts.get(prefix, 0) + 1
+        ref = f"{prefix}{self._counts[prefix]}"
+        self.components.append({'id': ref, 'type': comp_type, 'value': value, 'nets': nets})
+        return ref
+
+    def follower(self, non_inverting: str, output: str) -> str:
+        """Section A of a dual op-amp as a voltage follower; section B left unconnected"""
+        return self.add('U', 'opamp', OPAMP_PART, [output, output, non_inverting, 'VEE', '', '', '', 'VCC'])
+
+
+def synthesize_filter(cutoff_freq: float, order: int = 2, response: str = 'butterworth',
+                      filter_type: str = 'lowpass', topology: str = 'sallen_key',
+                      ripple_db: float = DEFAULT_RIPPLE_DB,
+                      impedance_range: Optional[Tuple[float, float]] = None,
+                      capacitance_range: Tuple[float, float] = ComponentCalculator.CAPACITANCE_RANGE,
+                      r_series: str = RESISTOR_SERIES, c_series: str = CAPACITOR_SERIES,
+                      optimizer: Optional[ComponentOptimizer] = None) -> Dict[str, Any]:
+    """
+    Design an Nth-order filter with standard component values
+
+    Sallen-Key designs cascade unity-gain second-order stages, lowest Q
+    first, plus a buffered RC stage for odd orders. RC ladders chain
+    identical passive RC sections and ignore response and ripple_db.
+
+    Args:
+        cutoff_freq: Cutoff in Hz (-3 dB, or the ripple band edge for Chebyshev)
+        order: Filter order, 1 to MAX_ORDER
+        response: 'butterworth', 'bessel' or 'chebyshev'
+        filter_type: 'lowpass' or 'highpass'
+        topology: 'sallen_key' or 'rc_ladder'
+        ripple_db: Chebyshev passband ripple
+        impedance_range: Allowed resistor values in ohms; defaults to
+            SALLEN_KEY_IMPEDANCE, or the calculator's filter impedance for ladders
+        capacitance_range: Allowed capacitor values in farads
+        r_series: Resistor series when no parts catalog is configured
+        c_series: Capacitor series when no parts catalog is configured
+        optimizer: Value source, defaults to one over the configured parts catalog
+
+    Returns:
+        Circuit JSON (type, constraints, components with nets) plus a
+        'synthesis' entry with per-stage targets, realized values and the
+        realized cutoff
+
+    Raises:
+        ValueError: For unsupported parameters or when no standard values fit
+    """
+    if cutoff_freq <= 0:
+        raise ValueError("Cutoff frequency must be positive")
+    if not 1 <= order <= MAX_ORDER:
+        raise ValueError(f"Order must be between 1 and {MAX_ORDER}")
+    if response not in RESPONSES:
+        raise ValueError(f"Unknown response: {response}")
+    if filter_type not in FILTER_TYPES:
+        raise ValueError(f"Unknown filter type: {filter_type}")
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology: {topology}")
+    optimizer = optimizer or ComponentOptimizer(catalog=default_catalog())
+    if impedance_range is None:
+        impedance_range = SALLEN_KEY_IMPEDANCE if topology == 'sallen_key' else ComponentCalculator.FILTER_IMPEDANCE
+    lowpass = filter_type == 'lowpass'
+    netlist = _Netlist()
+    stages = []
+    node = 'IN'
+
+    if topology == 'rc_ladder':
+        # -3 dB point of N identical sections with RC = 1, then one section's frequency to hit it
+        unit = {'topology': 'rc_ladder', 'values': {}, 'sections': [(1.0, 1.0)] * order}
+        low, high = 1e-3, 1e3
+        for _ in range(100):
+            mid = math.sqrt(low * high)
+            gain = abs(_stage_response(unit, 'lowpass', np.array([1j * mid]))[0])
+            low, high = (mid, high) if gain > 1 / math.sqrt(2) else (low, mid)
+        omega = math.sqrt(low * high)
+        section_freq = cutoff_freq / omega if lowpass else cutoff_freq * omega
+        pair = optimizer.search_rc_pairs(section_freq, impedance_range, capacitance_range, top_k=1,
+                                         r_series=r_series, c_series=c_series)[0]
+        r, c = pair['resistance'], pair['capacitance']
+        for index in range(order):
+            out = 'OUT' if index == order - 1 else netlist.net()
+            if lowpass:
+                netlist.add('R', 'resistor', si_units.format_value(r), [node, out])
+                netlist.add('C', 'capacitor', si_units.format_value(c), [out, 'GND'])
+            else:
+                netlist.add('C', 'capacitor', si_units.format_value(c), [node, out])
+                netlist.add('R', 'resistor', si_units.format_value(r), [out, 'GND'])
+            node = out
+        stages.append({'topology': 'rc_ladder', 'values': {'R': r, 'C': c}, 'sections': [(r, c)] * order})
+        circuit_type, level = f"rc_ladder_{filter_type}", 1 / math.sqrt(2)
+    else:
+        r_values = optimizer.available_values('resistor', impedance_range, r_series)
+        c_values = optimizer.available_values('capacitor', capacitance_range, c_series)
+        if not len(r_values) or not len(c_values):
+            raise ValueError("No standard values inside the allowed ranges")
+        targets = stage_targets(response, order, ripple_db)
+        for index, (omega, q) in enumerate(targets):
+            f0 = cutoff_freq * omega if lowpass else cutoff_freq / omega
+            a = netlist.net()
+            if q is None:
+                pair = optimizer.search_rc_pairs(f0, impedance_range, capacitance_range, top_k=1,
+                                                 r_series=r_series, c_series=c_series)[0]
+                values = {'R1': pair['resistance'], 'C1': pair['capacitance']}
+                out = 'OUT' if index == len(targets) - 1 else netlist.net()
+                series_part, shunt_part = (('R', 'resistor', 'R1'), ('C', 'capacitor', 'C1')) if lowpass \
+                    else (('C', 'capacitor', 'C1'), ('R', 'resistor', 'R1'))
+                refs = {role: netlist.add(prefix, comp_type, si_units.format_value(values[role]), nets)
+                        for (prefix, comp_type, role), nets in ((series_part, [node, a]), (shunt_part, [a, 'GND']))}
+                stage = {'topology': 'first_order', 'target_f0': f0, 'target_q': None,
+                         'f0': pair['frequency'], 'q': None, 'error_percent': pair['error_percent']}
+            else:
+                best = search_sallen_key(f0, q, filter_type, r_values, c_values)
+                values = {'R1': best['r1'], 'R2': best['r2'], 'C1': best['c1'], 'C2': best['c2']}
+                b = netlist.net()
+                out = 'OUT' if index == len(targets) - 1 else netlist.net()
+                if lowpass:
+                    placed = (('R1', 'R', 'resistor', [node, a]), ('R2', 'R', 'resistor', [a, b]),
+                              ('C1', 'C', 'capacitor', [a, out]), ('C2', 'C', 'capacitor', [b, 'GND']))
+                else:
+                    placed = (('C1', 'C', 'capacitor', [node, a]), ('C2', 'C', 'capacitor', [a, b]),
+                              ('R1', 'R', 'resistor', [a, out]), ('R2', 'R', 'resistor', [b, 'GND']))
+                refs = {role: netlist.add(prefix, comp_type, si_units.format_value(values[role]), nets)
+                        for role, prefix, comp_type, nets in placed}
+                a = b
+                stage = {'topology': 'sallen_key', 'target_f0': f0, 'target_q': q,
+                         'f0': best['f0'], 'q': best['q'], 'error_percent': best['error_percent']}
+            refs['U'] = netlist.follower(a, out)
+            stage.update(values=values, refs=refs)
+            stages.append(stage)
+            node = out
+        circuit_type = f"{response}_{filter_type}"
+        level = float(_gain(prototype_poles(response, order, ripple_db), 1.0))
+
+    constraints = {'cutoff_freq': f"{cutoff_freq:g}", 'order': order, 'filter_type': filter_type}
+    if topology == 'sallen_key':
+        constraints['response'] = response
+        if response == 'chebyshev':
+            constraints['ripple_db'] = ripple_db
+    circuit_json = {
+        'circuit_type': circuit_type,
+        'type': f"{circuit_type}_filter",
+        'components': netlist.components,
+        'constraints': constraints,
+        'synthesis': {'topology': topology, 'filter_type': filter_type, 'stages': stages},
+    }
+    actual = _find_cutoff(circuit_json, cutoff_freq, level)
+    circuit_json['synthesis'].update(
+        cutoff_freq=actual,
+        cutoff_error_percent=None if actual is None else abs(actual / cutoff_freq - 1) * 100,
+    )
+    return circuit_json
+
+
+def synthesize_from_intent(circuit_json: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Replace an extracted RC filter by a synthesized one when it asks for order > 1
+
+    Args:
+        circuit_json: Extracted circuit with cutoff_freq and optional order,
+            response and topology constraints
+
+    Returns:
+        The synthesized circuit JSON, or None to keep the extracted circuit
+
+    Raises:
+        ValueError: If the circuit or its constraints are not a mapping, or as
+            synthesize_filter (an order above MAX_ORDER included)
+    """
+    if not isinstance(circuit_json, dict):
+        raise ValueError(f"Circuit must be an object, got {type(circuit_json).__name__}")
+    constraints = circuit_json.get('constraints') or {}
+    if not isinstance(constraints, dict):
+        raise ValueError(f"Constraints must be an object, got {type(constraints).__name__}")
+    kind = str(circuit_json.get('circuit_type') or circuit_json.get('type') or '')
+    filter_type = next((t for t in FILTER_TYPES if t in kind), None)
+    try:
+        order = int(constraints.get('order') or 1)
+        cutoff = si_units.parse(constraints.get('cutoff_freq'))
+    except (TypeError, ValueError):
+        return None
+    if order < 2 or filter_type is None:
+        return None
+    return synthesize_filter(
+        cutoff, order,
+        response=str(constraints.get('response') or 'butterworth').lower(),
+        filter_type=filter_type,
+        topology=str(constraints.get('topology') or 'sallen_key').lower(),
+    )
@@ -1,9 +1,14 @@
 import json
 import os
 import time
+import sys
 import requests
 from typing import Dict, Optional
 
+sys.path.append(os.path.dirname(__file__))
+
+from deadline import Deadline
+
 
 class IntentExtractor:
     def __init__(self):
@@ -14,16 +19,24 @@ class IntentExtractor:
             print(f"API Key loaded: {self.api_key[:20]}...")
         self.max_retries = 3
         self.retry_delay = 2  # seconds
+        self.request_timeout = 30  # seconds per API call
         self.api_url = "https://api.openai.com/v1/chat/completions"
         
-    def extract_circuit_intent(self, user_input: str) -> Optional[Dict]:
+    def extract_circuit_intent(self, user_input: str, deadline: Optional[Deadline] = None) -> Optional[Dict]:
         """
         Extract circuit intent from user's natural language description.
         Returns JSON with components, values, and constraints.
+        
+        When a deadline is given, each API call only gets the remaining
+        budget and retries stop (raising RequestCancelledError) once the
+        deadline passes or the client disconnects.
         """
         prompt = self._build_extraction_prompt(user_input)
         
         for attempt in range(self.max_retries):
+            if deadline:
+                deadline.check("intent_extraction")
+            timeout = deadline.budget(self.request_timeout) if deadline else self.request_timeout
             try:
                 response = requests.post(
                     url=self.api_url,
@@ -37,13 +50,14 @@ class IntentExtractor:
                             {"role": "user", "content": prompt}
                         ],
                         "max_tokens": 500
-                    }
+                    },
+                    timeout=timeout
                 )
                 
                 if response.status_code != 200:
                     print(f"API Error: Status {response.status_code}, Response: {response.text}")
                     if attempt < self.max_retries - 1:
-                        time.sleep(self.retry_delay)
+                        self._wait_before_retry(deadline)
                     continue
                 
                 # Extract JSON from response
@@ -59,14 +73,19 @@ class IntentExtractor:
             except requests.RequestException as e:
                 print(f"Attempt {attempt + 1}: Request Error - {str(e)}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    self._wait_before_retry(deadline)
             except Exception as e:
                 print(f"Attempt {attempt + 1}: Unexpected error - {str(e)}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
+                    self._wait_before_retry(deadline)
         
         return None
     
+    def _wait_before_retry(self, deadline: Optional[Deadline]):
+        """Sleep between attempts without overshooting the request deadline"""
+        delay = deadline.budget(self.retry_delay) if deadline else self.retry_delay
+        time.sleep(delay)
+    
     def _build_extraction_prompt(self, user_input: str) -> str:
         return f"""You are a circuit design assistant. Extract circuit information from the user's description and return ONLY valid JSON with no additional text, no markdown backticks, no preamble.
 
@@ -92,12 +111,15 @@ Return JSON with this exact structure:
   "constraints": {{
     "cutoff_freq": "1000" (for filters, in Hz),
     "input_voltage": "9" (for dividers, in V),
-    "output_voltage": "5" (for dividers, in V)
+    "output_voltage": "5" (for dividers, in V),
+    "order": "4" (optional, filters steeper than first order),
+    "response": "butterworth" | "bessel" | "chebyshev" (optional, with order)
   }}
 }}
 
 Rules:
 - Only support these circuit types: rc_lowpass, rc_highpass, voltage_divider
+- For steeper filters (2nd to 8th order) set "order" and keep the single R1/C1 filter; it is expanded automatically
 - Component IDs must be unique (R1, R2, C1, etc.)
 - Nets must include "IN" for input, "GND" for ground
 - Values should be numeric with units (k, n, u, m)
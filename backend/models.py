@@ -1,125 +1,206 @@
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, field_validator, model_validator
+from typing import Any, Dict, List, Optional, Tuple
 from enum import Enum
 
-
-class CircuitType(str, Enum):
-    RC_LOWPASS = "rc_lowpass"
-    RC_HIGHPASS = "rc_highpass"
-    VOLTAGE_DIVIDER = "voltage_divider"
+import si_units
+from connectivity import Connectivity
+from validation_rules import CircuitIndex, ValidationLevel, run_rules
 
 
 class ComponentType(str, Enum):
     RESISTOR = "resistor"
     CAPACITOR = "capacitor"
+    INDUCTOR = "inductor"
+    DIODE = "diode"
+    LED = "led"
+    TRANSISTOR = "transistor"
+    VOLTAGE_SOURCE = "voltage_source"
+    CURRENT_SOURCE = "current_source"
+    OPAMP = "opamp"
+    GROUND = "ground"
+
+
+# Values of these are quantities (4k7, 100n); the rest carry part numbers (TL072).
+# Sets hold the plain strings, since Component.type is not restricted to the enum
+QUANTITY_TYPES = frozenset(t.value for t in (
+    ComponentType.RESISTOR, ComponentType.CAPACITOR, ComponentType.INDUCTOR,
+    ComponentType.VOLTAGE_SOURCE, ComponentType.CURRENT_SOURCE,
+))
+
+# Parts with exactly two pins, both connected
+TWO_TERMINAL_TYPES = QUANTITY_TYPES | {ComponentType.DIODE.value, ComponentType.LED.value}
+
+# Parts with a single pin (power symbols); every other part needs at least two
+SINGLE_PIN_TYPES = frozenset({ComponentType.GROUND.value})
 
 
 class Component(BaseModel):
+    # Generated circuits carry extra keys (footprints, notes) through untouched;
+    # JSON numbers (1000) are accepted as values
+    model_config = ConfigDict(extra='allow', coerce_numbers_to_str=True)
+
     id: str = Field(..., description="Unique component identifier (e.g., R1, C1)")
-    type: ComponentType = Field(..., description="Component type")
-    value: str = Field(..., description="Component value with unit (e.g., 1k, 100n)")
-    nets: List[str] = Field(..., min_items=2, max_items=2, description="Two nets this component connects")
-    
-    @validator('id')
+    # Types outside ComponentType are kept and reported as warnings, see component_warnings
+    type: str = Field(..., description="Component type (a ComponentType value)")
+    value: str = Field('', description="Component value with unit (e.g., 1k, 100n) or part number")
+    nets: List[str] = Field(..., min_length=1, description="Net of each pin in pin order; empty for unused pins")
+
+    @field_validator('id')
+    @classmethod
     def validate_id(cls, v):
         if not v:
-            raise ValueError("Component ID cannot be empty")
+            raise ValueError("ID cannot be empty")
         if not v[0].isalpha():
-            raise ValueError("Component ID must start with a letter")
-        return v
-    
-    @validator('value')
-    def validate_value(cls, v):
-        if not v:
-            raise ValueError("Component value cannot be empty")
-        # Check if value contains at least one digit
-        if not any(char.isdigit() for char in v):
-            raise ValueError("Component value must contain numeric digits")
-        return v
-    
-    @validator('nets')
-    def validate_nets(cls, v):
-        if len(v) != 2:
-            raise ValueError("Component must have exactly 2 nets")
-        if v[0] == v[1]:
-            raise ValueError("Component cannot connect to the same net twice")
+            raise ValueError("ID must start with a letter")
         return v
 
+    @model_validator(mode='after')
+    def validate_value_and_pins(self):
+        # Missing or unparseable values are only warnings; a parsed value must be positive
+        if self.type in QUANTITY_TYPES:
+            number = si_units.try_parse(self.value)
+            if number is not None and number <= 0:
+                raise ValueError("value must be positive")
+        if self.type not in SINGLE_PIN_TYPES and len(self.nets) < 2:
+            raise ValueError("must connect to at least 2 nets")
+        # Both terminals on one net is a short, reported by the connectivity checks
+        if self.type in TWO_TERMINAL_TYPES and (len(self.nets) != 2 or not all(self.nets)):
+            raise ValueError("must connect to exactly 2 nets")
+        return self
+
 
 class Constraints(BaseModel):
+    # Synthesized filters add order, response and other design targets
+    model_config = ConfigDict(extra='allow', coerce_numbers_to_str=True)
+
     cutoff_freq: Optional[str] = Field(None, description="Cutoff frequency in Hz (for filters)")
     input_voltage: Optional[str] = Field(None, description="Input voltage in V (for dividers)")
     output_voltage: Optional[str] = Field(None, description="Output voltage in V (for dividers)")
-    
-    @validator('cutoff_freq', 'input_voltage', 'output_voltage')
+
+    @field_validator('cutoff_freq', 'input_voltage', 'output_voltage')
+    @classmethod
     def validate_numeric_fields(cls, v):
-        if v is not None:
-            try:
-                float(v)
-            except ValueError:
-                raise ValueError(f"Value must be numeric, got: {v}")
+        if v is not None and si_units.try_parse(v) is None:
+            raise ValueError(f"Value must be numeric, got: {v}")
         return v
 
 
 class Circuit(BaseModel):
-    circuit_type: CircuitType = Field(..., description="Type of circuit to generate")
-    components: List[Component] = Field(..., min_items=1, description="List of circuit components")
-    constraints: Constraints = Field(..., description="Circuit design constraints")
-    
-    @validator('components')
-    def validate_components(cls, v, values):
-        if not v:
-            raise ValueError("Circuit must have at least one component")
-        
-        # Check for duplicate IDs
-        ids = [comp.id for comp in v]
-        if len(ids) != len(set(ids)):
-            raise ValueError("Component IDs must be unique")
-        
-        # Check that circuit type matches component requirements
-        circuit_type = values.get('circuit_type')
-        if circuit_type:
-            if circuit_type in [CircuitType.RC_LOWPASS, CircuitType.RC_HIGHPASS]:
-                # Filter circuits must have at least 1 resistor and 1 capacitor
-                types = [comp.type for comp in v]
-                if ComponentType.RESISTOR not in types or ComponentType.CAPACITOR not in types:
-                    raise ValueError("RC filter must have at least one resistor and one capacitor")
-            elif circuit_type == CircuitType.VOLTAGE_DIVIDER:
-                # Voltage divider must have at least 2 resistors
-                resistor_count = sum(1 for comp in v if comp.type == ComponentType.RESISTOR)
-                if resistor_count < 2:
-                    raise ValueError("Voltage divider must have at least two resistors")
-        
-        return v
-    
-    @validator('constraints')
-    def validate_constraints_match_circuit_type(cls, v, values):
-        circuit_type = values.get('circuit_type')
-        
-        if circuit_type in [CircuitType.RC_LOWPASS, CircuitType.RC_HIGHPASS]:
-            if not v.cutoff_freq:
-                raise ValueError(f"{circuit_type.value} requires cutoff_freq in constraints")
-        elif circuit_type == CircuitType.VOLTAGE_DIVIDER:
-            if not v.input_voltage or not v.output_voltage:
-                raise ValueError("voltage_divider requires input_voltage and output_voltage in constraints")
-        
+    model_config = ConfigDict(extra='allow')
+
+    # Per-type requirements live in the validation_rules registry
+    circuit_type: str = Field(..., description="Type of circuit (rc_lowpass, voltage_divider, ...)")
+    components: List[Component] = Field(..., min_length=1, description="List of circuit components")
+    constraints: Optional[Constraints] = Field(None, description="Circuit design constraints")
+
+    @model_validator(mode='before')
+    @classmethod
+    def take_type_as_circuit_type(cls, data):
+        # Generated circuits name their type in 'type' (rc_lowpass_filter)
+        if isinstance(data, dict) and 'circuit_type' not in data and 'type' in data:
+            data = {**data, 'circuit_type': data['type']}
+        return data
+
+    @field_validator('components')
+    @classmethod
+    def validate_unique_ids(cls, v):
+        seen = set()
+        duplicates = [comp.id for comp in v if comp.id in seen or seen.add(comp.id)]
+        if duplicates:
+            raise ValueError(f"Component IDs must be unique: {', '.join(dict.fromkeys(duplicates))}")
         return v
-    
+
+    def component_dicts(self) -> List[Dict[str, Any]]:
+        """Components as validated (ids, values and nets as strings), extra keys kept"""
+        return [{**(comp.model_extra or {}), 'id': comp.id, 'type': comp.type, 'value': comp.value,
+                 'nets': comp.nets} for comp in self.components]
+
+    def connectivity(self) -> Connectivity:
+        """Net connectivity of the components"""
+        return Connectivity({'id': comp.id, 'type': comp.type, 'nets': comp.nets}
+                            for comp in self.components)
+
     def has_ground(self) -> bool:
         """Check if circuit has a GND net."""
-        all_nets = []
-        for comp in self.components:
-            all_nets.extend(comp.nets)
-        return "GND" in all_nets
-    
+        return self.connectivity().has_ground
+
     def get_floating_nets(self) -> List[str]:
         """Return list of nets that only connect to one component."""
-        net_counts = {}
-        for comp in self.components:
-            for net in comp.nets:
-                net_counts[net] = net_counts.get(net, 0) + 1
-        
-        return [net for net, count in net_counts.items() if count < 2]
+        return [net for net, _ in self.connectivity().floating_nets()]
+
+
+# Building an adapter compiles the schema, so do it once per process
+CIRCUIT_ADAPTER = TypeAdapter(Circuit)
+
+
+def describe_errors(errors: List[Dict[str, Any]], circuit_json: Any) -> List[Tuple[Optional[str], str]]:
+    """
+    (component id, message) for each pydantic error of one circuit
+
+    The id is None for errors outside the components list.
+    """
+    components = circuit_json.get('components') if isinstance(circuit_json, dict) else None
+    described = []
+    for err in errors:
+        loc = err['loc']
+        ctx_error = err.get('ctx', {}).get('error')
+        message = str(ctx_error) if ctx_error is not None else err['msg']
+        if (len(loc) >= 2 and loc[0] == 'components' and isinstance(loc[1], int)
+                and isinstance(components, list) and loc[1] < len(components)
+                and isinstance(components[loc[1]], dict)):
+            comp_id = components[loc[1]].get('id')
+            field = '.'.join(str(part) for part in loc[2:])
+            # Rules spanning several fields (value, pins) have none in their loc
+            where = f" {field}" if field and field != 'id' else ''
+            name = comp_id if comp_id is not None else f"at index {loc[1]}"
+            described.append((comp_id, f"Component {name}{where}: {message}"))
+        elif loc:
+            described.append((None, f"{'.'.join(str(part) for part in loc)}: {message}"))
+        else:
+            described.append((None, message))
+    return described
+
+
+def component_warnings(circuit: Circuit) -> List[Tuple[str, str]]:
+    """
+    (component id, message) for parts the schema accepts but later steps may
+    not handle: unrecognized types, and quantities that are missing or
+    cannot be parsed
+    """
+    known = {member.value for member in ComponentType}
+    warnings = []
+    for comp in circuit.components:
+        if comp.type not in known:
+            warnings.append((comp.id, f"Component {comp.id} has unrecognized type: {comp.type}"))
+        elif comp.type in QUANTITY_TYPES:
+            if not comp.value:
+                warnings.append((comp.id, f"Component {comp.id} has empty value"))
+            elif si_units.try_parse(comp.value) is None:
+                warnings.append((comp.id, f"Component {comp.id} value '{comp.value}' cannot be parsed"))
+    return warnings
+
+
+def check_schema(circuit_json: Any) -> Tuple[Optional[Circuit], List[Tuple[Optional[str], str]]]:
+    """Validate one circuit; returns the model (None on failure) and described errors"""
+    try:
+        return CIRCUIT_ADAPTER.validate_python(circuit_json), []
+    except ValidationError as e:
+        return None, describe_errors(e.errors(), circuit_json)
+
+
+def validate_circuits(circuit_jsons: List[Any]) -> List[Tuple[Optional[Circuit], List[Tuple[Optional[str], str]]]]:
+    """
+    Validate a batch of circuits, each one once
+
+    Returns:
+        (model or None, described errors) per circuit, in input order
+
+    Raises:
+        TypeError: If circuit_jsons is not a list
+    """
+    if not isinstance(circuit_jsons, list):
+        raise TypeError(f"Expected a list of circuits, got {type(circuit_jsons).__name__}")
+    return [check_schema(circuit_json) for circuit_json in circuit_jsons]
 
 
 # Validation function
@@ -128,21 +209,28 @@ def validate_circuit_json(circuit_json: Dict) -> tuple:
     Validate circuit JSON against schema.
     Returns (Circuit object, list of errors)
     """
-    errors = []
-    
-    try:
-        circuit = Circuit(**circuit_json)
-        
-        # Additional checks
-        if not circuit.has_ground():
-            errors.append("WARNING: Circuit does not have a GND net")
-        
-        floating_nets = circuit.get_floating_nets()
-        if floating_nets:
-            errors.append(f"WARNING: Floating nets detected: {', '.join(floating_nets)}")
-        
-        return circuit, errors
-        
-    except Exception as e:
-        errors.append(f"Validation error: {str(e)}")
-        return None, errors
+    circuit, errors = check_schema(circuit_json)
+    if circuit is None:
+        return None, [f"Validation error: {message}" for _, message in errors]
+
+    # Circuit-type rules (required parts, constraints, ground) from the registry
+    index = CircuitIndex({**circuit_json, 'components': circuit.component_dicts()})
+    type_errors = [m.message for m in run_rules(index) if m.level == ValidationLevel.ERROR]
+    if type_errors:
+        return None, [f"Validation error: {message}" for message in type_errors]
+
+    connectivity = index.connectivity
+    if connectivity.shorted:
+        shorted = ', '.join(f"{ref} on '{net}'" for ref, _, net in connectivity.shorted)
+        return None, [f"Validation error: Component connects to the same net twice: {shorted}"]
+
+    # Additional checks
+    warnings = [f"WARNING: {message}" for _, message in component_warnings(circuit)]
+    if not connectivity.has_ground:
+        warnings.append("WARNING: Circuit does not have a GND net")
+
+    floating_nets = [net for net, _ in connectivity.floating_nets()]
+    if floating_nets:
+        warnings.append(f"WARNING: Floating nets detected: {', '.join(floating_nets)}")
+
+    return circuit, warnings
@@ -0,0 +1,266 @@
+"""
+Streaming S-expression parser for KiCad netlists
+Reads .net files in fixed-size chunks and produces typed component and net
+tables in a single linear pass
+"""
+
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Tuple, Union
+
+# Token kinds
+LPAREN = '('
+RPAREN = ')'
+ATOM = 'atom'
+STRING = 'string'
+
+CHUNK_SIZE = 64 * 1024
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))')
+_WHITESPACE_RE = re.compile(r'\s*')
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+
+class NetlistParseError(ValueError):
+    """Raised when a netlist is not well-formed"""
+    pass
+
+
+@dataclass
+class NetlistComponent:
+    ref: str
+    value: str = ''
+    lib: str = ''
+    part: str = ''
+    footprint: str = ''
+
+    @property
+    def lib_id(self) -> str:
+        """KiCad library identifier, e.g. 'Device:R'"""
+        return f"{self.lib}:{self.part}" if self.lib else self.part
+
+
+@dataclass
+class NetlistNode:
+    ref: str
+    pin: str
+    pintype: str = ''
+
+
+@dataclass
+class NetlistNet:
+    code: int
+    name: str
+    nodes: List[NetlistNode] = field(default_factory=list)
+
+
+@dataclass
+class Netlist:
+    components: List[NetlistComponent] = field(default_factory=list)
+    nets: List[NetlistNet] = field(default_factory=list)
+
+    def component_values(self) -> List[Tuple[str, str]]:
+        """List of (ref, value) pairs in netlist order"""
+        return [(comp.ref, comp.value) for comp in self.components]
+
+    def net_map(self) -> Dict[str, List[Tuple[str, str]]]:
+        """Mapping of net name to its (ref, pin) nodes"""
+        return {net.name: [(node.ref, node.pin) for node in net.nodes] for net in self.nets}
+
+
+Source = Union[str, io.IOBase]
+
+
+def tokenize(stream, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, str, int, int]]:
+    """
+    Tokenize an S-expression text stream incrementally
+
+    Only one chunk plus a partial token is held in memory at a time.
+
+    Args:
+        stream: Text file-like object
+        chunk_size: Characters read per refill
+
+    Yields:
+        Tuples of (kind, value, start, end) with absolute character offsets;
+        for strings, value is unescaped and the span includes the quotes
+    """
+    buf = ''
+    base = 0  # absolute offset of buf[0]
+    pos = 0
+    eof = False
+
+    while True:
+        m = _TOKEN_RE.match(buf, pos)
+        # A string or atom touching the end of the buffer may be cut off
+        truncated = m is None or (
+            m.end() == len(buf) and (m.group(3) is not None or m.group(4) is not None)
+        )
+        if truncated and not eof:
+            chunk = stream.read(chunk_size)
+            if chunk:
+                base += pos
+                buf = buf[pos:] + chunk
+                pos = 0
+            else:
+                eof = True
+            continue
+
+        if m is None:
+            rest = _WHITESPACE_RE.match(buf, pos).end()
+            if rest == len(buf):
+                return
+            raise NetlistParseError(f"Unexpected input at offset {base + rest}")
+
+        if m.group(1):
+            yield LPAREN, LPAREN, base + m.start(1), base + m.end(1)
+        elif m.group(2):
+            yield RPAREN, RPAREN, base + m.start(2), base + m.end(2)
+        elif m.group(3) is not None:
+            raw = m.group(3)
+            value = _ESCAPE_RE.sub(r'\1', raw) if '\\' in raw else raw
+            yield STRING, value, base + m.start(3) - 1, base + m.end(3) + 1
+        else:
+            yield ATOM, m.group(4), base + m.start(4), base + m.end(4)
+        pos = m.end()
+
+
+def _open(source: Source):
+    """Return (stream, should_close) for a path or an already open stream"""
+    if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+        return open(source, 'r', encoding='utf-8'), True
+    return source, False
+
+
+def _find(children: list, name: str):
+    """First child list whose head is name"""
+    for child in children:
+        if isinstance(child, list) and child and child[0] == name:
+            return child
+    return None
+
+
+def _scalar(children: list, name: str, default: str = '') -> str:
+    node = _find(children, name)
+    if node is None or len(node) < 2 or isinstance(node[1], list):
+        return default
+    return node[1]
+
+
+def _build_component(tree: list) -> NetlistComponent:
+    libsource = _find(tree, 'libsource') or []
+    return NetlistComponent(
+        ref=_scalar(tree, 'ref'),
+        value=_scalar(tree, 'value'),
+        lib=_scalar(libsource, 'lib'),
+        part=_scalar(libsource, 'part'),
+        footprint=_scalar(tree, 'footprint'),
+    )
+
+
+def _build_net(tree: list) -> NetlistNet:
+    code = _scalar(tree, 'code', '0')
+    nodes = [
+        NetlistNode(_scalar(child, 'ref'), _scalar(child, 'pin'), _scalar(child, 'pintype'))
+        for child in tree
+        if isinstance(child, list) and child and child[0] == 'node'
+    ]
+    return NetlistNet(int(code) if code.isdigit() else 0, _scalar(tree, 'name'), nodes)
+
+
+_BUILDERS = {
+    ('export', 'components', 'comp'): _build_component,
+    ('export', 'nets', 'net'): _build_net,
+}
+
+
+def iter_netlist(source: Source, chunk_size: int = CHUNK_SIZE) -> Iterator[Union[NetlistComponent, NetlistNet]]:
+    """
+    Stream components and nets out of a KiCad netlist
+
+    Only the element currently being read is materialized; everything outside
+    (export (components (comp ...)) (nets (net ...))) is skipped.
+
+    Args:
+        source: Path to a .net file or a text stream
+        chunk_size: Characters read per refill
+
+    Yields:
+        NetlistComponent and NetlistNet objects in file order
+    """
+    stream, should_close = _open(source)
+    try:
+        path = []          # element names from the root to the current position
+        capture = None     # stack of lists for the element being materialized
+        capture_depth = 0  # len(path) at which the captured element started
+        expect_head = False
+
+        for kind, value, _, _ in tokenize(stream, chunk_size):
+            if kind == LPAREN:
+                if expect_head:
+                    # List whose head is itself a list: give it an anonymous name
+                    path.append('')
+                expect_head = True
+                if capture is not None:
+                    new = []
+                    capture[-1].append(new)
+                    capture.append(new)
+                continue
+
+            if kind == RPAREN:
+                if expect_head:
+                    # Empty list "()"
+                    expect_head = False
+                    if capture is not None:
+                        capture.pop()
+                    continue
+                if not path:
+                    raise NetlistParseError("Unbalanced ')' in netlist")
+                if capture is not None:
+                    done = capture.pop()
+                    if len(path) == capture_depth:
+                        capture = None
+                        yield _BUILDERS[tuple(path)](done)
+                path.pop()
+                expect_head = False
+                continue
+
+            if expect_head:
+                path.append(value)
+                expect_head = False
+                if capture is not None:
+                    capture[-1].append(value)
+                elif tuple(path) in _BUILDERS:
+                    capture = [[value]]
+                    capture_depth = len(path)
+                continue
+
+            if capture is not None:
+                capture[-1].append(value)
+
+        if path:
+            raise NetlistParseError("Unexpected end of netlist")
+    finally:
+        if should_close:
+            stream.close()
+
+
+def parse_netlist(source: Source, chunk_size: int = CHUNK_SIZE) -> Netlist:
+    """
+    Parse a KiCad netlist into component and net tables
+
+    Args:
+        source: Path to a .net file or a text stream
+        chunk_size: Characters read per refill
+
+    Returns:
+        Netlist with components and nets in file order
+    """
+    netlist = Netlist()
+    for element in iter_netlist(source, chunk_size):
+        if isinstance(element, NetlistComponent):
+            netlist.components.append(element)
+        else:
+            netlist.nets.append(element)
+    return netlist
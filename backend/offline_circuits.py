@@ -7,20 +7,20 @@ CACHED_CIRCUITS = {
         "explanation": """I designed a voltage divider using two resistors to convert 9V to 5V.
 
 Component Selection:
-- R1: 3.9kΩ (E12 series)
-- R2: 5.6kΩ (E12 series)
+- R1: 12kΩ (E12 series)
+- R2: 15kΩ (E12 series)
 
 Calculation:
 Using the voltage divider formula: Vout = Vin × R2/(R1+R2)
-Vout = 9V × 5.6kΩ/(3.9kΩ + 5.6kΩ) = 5.31V
+Vout = 9V × 15kΩ/(12kΩ + 15kΩ) = 5.00V
 
-This gives us 5.31V output, which is within 6% of the target 5V - acceptable tolerance for most applications.
+The 12k:15k ratio is exactly 4:5, so the output is exactly 5V, while the divider draws only 0.33mA from the 9V supply.
 
 The resistor values were selected from the standard E12 series to ensure availability and standard sizing.""",
         "schematic_path": "/output/voltage_divider_9v_5v.kicad_sch",
         "components": [
-            {"ref": "R1", "value": "3.9k", "type": "resistor"},
-            {"ref": "R2", "value": "5.6k", "type": "resistor"}
+            {"ref": "R1", "value": "12k", "type": "resistor"},
+            {"ref": "R2", "value": "15k", "type": "resistor"}
         ]
     },
     
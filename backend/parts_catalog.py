@@ -0,0 +1,182 @@
+"""
+Local parts catalog
+Loads stocked resistors and capacitors from CSV or SQLite into sorted,
+value-indexed arrays, so nearest-available lookups are a binary search
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+import si_units
+from config import Config
+
+# Columns expected in CSV files and in the SQLite table
+COLUMNS = ('sku', 'type', 'value', 'tolerance', 'package', 'stock')
+
+
+@dataclass(frozen=True)
+class CatalogPart:
+    """One stocked part number"""
+    sku: str
+    type: str           # "resistor" or "capacitor"
+    value: float        # ohms or farads
+    tolerance: float    # fraction, e.g. 0.01
+    package: str
+    stock: int
+
+
+def _parse_tolerance(value) -> float:
+    text = str(value).strip().lstrip('±')
+    return float(text[:-1]) / 100 if text.endswith('%') else float(text)
+
+
+def _part_from_row(row: Dict) -> CatalogPart:
+    return CatalogPart(
+        sku=str(row['sku']),
+        type=str(row['type']).strip().lower(),
+        value=si_units.parse(row['value']),
+        tolerance=_parse_tolerance(row['tolerance']),
+        package=str(row.get('package') or ''),
+        stock=int(row.get('stock') or 0),
+    )
+
+
+def _parts_from_rows(rows: Iterable[Dict], source: str) -> List[CatalogPart]:
+    """Parts from catalog rows, skipping (and reporting) rows that do not parse"""
+    parts, skipped = [], []
+    for number, row in enumerate(rows, 1):
+        try:
+            parts.append(_part_from_row(row))
+        except (KeyError, TypeError, ValueError) as e:
+            skipped.append(f"row {number}: {e!r}")
+    if skipped:
+        print(f"Warning: skipped {len(skipped)} malformed row(s) in parts catalog {source}: "
+              + '; '.join(skipped[:5]) + ('; ...' if len(skipped) > 5 else ''))
+    return parts
+
+
+class _Index:
+    """Distinct values of one part type, with the preferred part for each"""
+
+    def __init__(self, parts: List[CatalogPart]):
+        best: Dict[float, CatalogPart] = {}
+        for part in parts:
+            current = best.get(part.value)
+            # Several SKUs share a value: prefer the tightest tolerance, then the deepest stock
+            if current is None or (part.tolerance, -part.stock) < (current.tolerance, -current.stock):
+                best[part.value] = part
+        self.values = np.array(sorted(best), dtype=float)
+        self.parts = [best[value] for value in self.values.tolist()]
+        # Nearest by ratio: the boundary between neighbours is their geometric mean
+        self.boundaries = np.sqrt(self.values[:-1] * self.values[1:]).tolist()
+
+
+class PartsCatalog:
+    """
+    Stocked parts, indexed by type (and optionally package) on first use
+
+    Parts with less than min_stock units on hand are ignored.
+    """
+
+    def __init__(self, parts: Iterable[CatalogPart], min_stock: int = 1):
+        self.parts = [part for part in parts if part.stock >= min_stock]
+        self._indexes: Dict[Tuple[str, Optional[str]], _Index] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, path: str, min_stock: int = 1) -> 'PartsCatalog':
+        """Load a CSV file with a header row naming the COLUMNS"""
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls(_parts_from_rows(csv.DictReader(f), path), min_stock)
+
+    @classmethod
+    def from_sqlite(cls, path: str, table: str = 'parts', min_stock: int = 1) -> 'PartsCatalog':
+        """Load the COLUMNS of a table in a SQLite database"""
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute(
+                f'SELECT {", ".join(COLUMNS)} FROM "{table}" WHERE stock >= ?', (min_stock,)
+            ).fetchall()
+        finally:
+            connection.close()
+        return cls(_parts_from_rows((dict(row) for row in rows), path), min_stock)
+
+    @classmethod
+    def from_file(cls, path: str, min_stock: int = 1) -> 'PartsCatalog':
+        """Load a catalog, choosing SQLite for .db/.sqlite/.sqlite3 files and CSV otherwise"""
+        if path.lower().endswith(('.db', '.sqlite', '.sqlite3')):
+            return cls.from_sqlite(path, min_stock=min_stock)
+        return cls.from_csv(path, min_stock=min_stock)
+
+    def _index(self, kind: str, package: Optional[str] = None) -> _Index:
+        key = (kind, package)
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = _Index([part for part in self.parts if part.type == kind
+                                    and (package is None or part.package == package)])
+                    self._indexes[key] = index
+        return index
+
+    def values(self, kind: str, package: Optional[str] = None) -> np.ndarray:
+        """Distinct stocked values of a part type, ascending"""
+        return self._index(kind, package).values
+
+    def nearest(self, kind: str, value: float, package: Optional[str] = None) -> Optional[CatalogPart]:
+        """
+        Stocked part whose value is closest by ratio
+
+        Args:
+            kind: "resistor" or "capacitor"
+            value: Wanted value in ohms or farads
+            package: Only consider this package, e.g. "0805"
+
+        Returns:
+            The part, or None if nothing of that type is stocked
+        """
+        index = self._index(kind, package)
+        if not index.parts:
+            return None
+        return index.parts[bisect_left(index.boundaries, value)]
+
+    def __len__(self) -> int:
+        return len(self.parts)
+
+
+_default_catalog: Optional[PartsCatalog] = None
+_default_loaded = False
+
+
+def default_catalog() -> Optional[PartsCatalog]:
+    """
+    Catalog named by Config.PARTS_CATALOG, loaded once; None when unset or
+    unreadable (the failure is reported once, not retried per request)
+    """
+    global _default_catalog, _default_loaded
+    if not _default_loaded:
+        if Config.PARTS_CATALOG:
+            try:
+                _default_catalog = PartsCatalog.from_file(Config.PARTS_CATALOG, Config.PARTS_MIN_STOCK)
+            except (OSError, sqlite3.Error, csv.Error, UnicodeDecodeError) as e:
+                print(f"Warning: parts catalog {Config.PARTS_CATALOG} could not be loaded, "
+                      f"using standard series values: {e}")
+        _default_loaded = True
+    return _default_catalog
+
+
+def set_default_catalog(catalog: Optional[PartsCatalog]):
+    """Replace the configured catalog, e.g. from tooling or tests; None restores free E-series choice"""
+    global _default_catalog, _default_loaded
+    _default_catalog, _default_loaded = catalog, True
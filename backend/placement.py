@@ -0,0 +1,222 @@
+"""
+Automatic schematic placement
+Layered placement seeded by signal flow (IN -> OUT, ground parts at the
+bottom of each column), linear in the number of pins
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from connectivity import GROUND_NETS
+from netlist_parser import Netlist
+from symbol_library import default_library
+
+GRID = 2.54            # KiCad default grid (100 mil)
+COLUMN_PITCH = 10 * GRID
+ROW_PITCH = 6 * GRID
+ORIGIN = (10 * GRID, 10 * GRID)
+MIN_ROWS = 8
+BODY = 2 * GRID        # minimum half-extent of a symbol body
+TEXT_WIDTH = 6 * GRID  # room for reference and value text right of a symbol
+ASPECT = math.sqrt(2)  # ISO paper width / height
+
+SOURCE_NETS = {'IN', 'VIN', 'INPUT', 'VCC', 'VDD'}
+SINK_NETS = {'OUT', 'VOUT', 'OUTPUT'}
+
+_TWO_PIN_VERTICAL = {'1': (0.0, -3.81), '2': (0.0, 3.81)}
+
+
+def snap(value: float, grid: float = GRID) -> float:
+    """Snap a coordinate to the grid"""
+    return round(round(value / grid) * grid, 4)
+
+
+def snap_up(value: float, grid: float = GRID) -> float:
+    """Round a length up to a whole number of grid steps"""
+    return round(math.ceil(value / grid - 1e-9) * grid, 4)
+
+
+def pin_offsets(lib_id: str, pins: List[str]) -> Dict[str, Tuple[float, float]]:
+    """
+    Pin positions relative to the symbol origin, in schematic coordinates (y down)
+
+    Geometry comes from the symbol library; unknown symbols get their pins
+    stacked vertically on the grid.
+    """
+    known = default_library().pins(lib_id)
+    if known and all(pin in known for pin in pins):
+        return {pin: (x, -y) for pin, (x, y) in known.items()}
+    if len(pins) <= 2:
+        return {pin: offset for pin, offset in zip(sorted(pins) or ['1', '2'], _TWO_PIN_VERTICAL.values())}
+    span = (len(pins) - 1) * GRID
+    return {pin: (-GRID * 2, -span / 2 + i * GRID) for i, pin in enumerate(sorted(pins, key=_pin_key))}
+
+
+def _pin_key(pin: str):
+    return (0, int(pin), '') if pin.isdigit() else (1, 0, pin)
+
+
+@dataclass
+class PlacedSymbol:
+    ref: str
+    lib_id: str
+    value: str
+    x: float
+    y: float
+    pins: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    def pin_position(self, pin: str) -> Tuple[float, float]:
+        """Absolute position of a pin"""
+        dx, dy = self.pins.get(pin, (0.0, 0.0))
+        return (round(self.x + dx, 4), round(self.y + dy, 4))
+
+
+@dataclass
+class Placement:
+    symbols: Dict[str, PlacedSymbol] = field(default_factory=dict)
+    width: float = 0.0
+    height: float = 0.0
+
+
+def _classify(name: str, names: set) -> bool:
+    return name.upper() in names
+
+
+def place(netlist: Netlist) -> Placement:
+    """
+    Place every netlist component on a non-overlapping, grid-snapped layout
+
+    Components are layered by breadth-first distance from the input nets over
+    the component/net bipartite graph (ground nets excluded, so they do not
+    collapse the layering). Components on output nets are pushed to the last
+    layer, and within a column parts are ordered by the barycenter of their
+    already-placed neighbours with ground-connected parts at the bottom.
+    Tall columns wrap and long chains fold into bands so the sheet keeps
+    roughly the proportions of an ISO page.
+
+    Args:
+        netlist: Parsed netlist
+
+    Returns:
+        Placement with absolute symbol and pin positions
+    """
+    comps = {comp.ref: comp for comp in netlist.components}
+    comp_nets: Dict[str, List[str]] = {ref: [] for ref in comps}
+    comp_pins: Dict[str, List[str]] = {ref: [] for ref in comps}
+    net_comps: Dict[str, List[str]] = {}
+    for net in netlist.nets:
+        members = net_comps.setdefault(net.name, [])
+        for node in net.nodes:
+            if node.ref not in comps:
+                continue
+            members.append(node.ref)
+            comp_nets[node.ref].append(net.name)
+            comp_pins[node.ref].append(node.pin)
+
+    grounded = {ref for ref, names in comp_nets.items() if any(_classify(n, GROUND_NETS) for n in names)}
+    sinks = {ref for ref, names in comp_nets.items() if any(_classify(n, SINK_NETS) for n in names)}
+
+    # Breadth-first layering from the input nets; each net is expanded once
+    layer: Dict[str, int] = {}
+    seen_nets = set()
+    queue = deque()
+    order = list(comps)
+    seeds = [ref for ref in order if any(_classify(n, SOURCE_NETS) for n in comp_nets[ref])]
+    seeds = seeds or order[:1]
+    next_seed = 0
+    while len(layer) < len(comps):
+        if not queue:
+            # Start (or restart for disconnected islands) after the deepest layer
+            base = max(layer.values()) + 1 if layer else 0
+            pending = [ref for ref in seeds if ref not in layer]
+            if not pending:
+                while order[next_seed] in layer:
+                    next_seed += 1
+                pending = [order[next_seed]]
+            for ref in pending:
+                layer[ref] = base
+                queue.append(ref)
+        ref = queue.popleft()
+        for name in comp_nets[ref]:
+            if name in seen_nets or _classify(name, GROUND_NETS):
+                continue
+            seen_nets.add(name)
+            for other in net_comps[name]:
+                if other not in layer:
+                    layer[other] = layer[ref] + 1
+                    queue.append(other)
+
+    if sinks and layer:
+        last = max(layer.values())
+        for ref in sinks:
+            if layer[ref] < last and not any(_classify(n, SOURCE_NETS) for n in comp_nets[ref]):
+                layer[ref] = last
+
+    columns: Dict[int, List[str]] = {}
+    for ref in order:
+        columns.setdefault(layer[ref], []).append(ref)
+
+    max_rows = max(MIN_ROWS, int(math.ceil(math.sqrt(len(comps)) * 1.5)))
+    net_row_sum: Dict[str, float] = {}
+    net_row_count: Dict[str, int] = {}
+
+    # Order each column by barycenter and wrap tall columns
+    stacks: List[List[str]] = []
+    for key in sorted(columns):
+        members = columns[key]
+
+        def barycenter(ref):
+            rows = [net_row_sum[n] / net_row_count[n] for n in comp_nets[ref] if n in net_row_count]
+            return sum(rows) / len(rows) if rows else float('inf')
+
+        members.sort(key=lambda ref: (ref in grounded, barycenter(ref)))
+
+        for start in range(0, len(members), max_rows):
+            stack = members[start:start + max_rows]
+            stacks.append(stack)
+            for row, ref in enumerate(stack):
+                for name in comp_nets[ref]:
+                    net_row_sum[name] = net_row_sum.get(name, 0.0) + row
+                    net_row_count[name] = net_row_count.get(name, 0) + 1
+
+    # Size each stack from its symbols' pin extents
+    offsets = {ref: pin_offsets(comps[ref].lib_id, comp_pins[ref]) for ref in comps}
+    extents = {}
+    for ref, pins in offsets.items():
+        xs = [dx for dx, _ in pins.values()] + [-BODY, BODY]
+        ys = [dy for _, dy in pins.values()] + [-BODY, BODY]
+        above = snap_up(GRID - min(ys))
+        below = max(snap_up(GRID + max(ys)), ROW_PITCH - above)
+        extents[ref] = (snap_up(-min(xs)) - BODY, snap_up(max(xs)), above, below)
+
+    lefts = [max(extents[ref][0] for ref in stack) for stack in stacks]
+    widths = [max(COLUMN_PITCH, left + max(extents[ref][1] for ref in stack) + TEXT_WIDTH)
+              for left, stack in zip(lefts, stacks)]
+    heights = [sum(extents[ref][2] + extents[ref][3] for ref in stack) for stack in stacks]
+
+    # Fold long chains into bands so the sheet keeps a landscape aspect ratio
+    band_height = max(heights, default=0) + ROW_PITCH
+    bands = max(1, round(math.sqrt(sum(widths) / (ASPECT * band_height)))) if stacks else 1
+    per_band = math.ceil(len(stacks) / bands) if stacks else 0
+
+    placement = Placement()
+    x_cursor = ORIGIN[0]
+    for index, stack in enumerate(stacks):
+        band, column = divmod(index, per_band)
+        if column == 0:
+            x_cursor = ORIGIN[0]
+        y_cursor = ORIGIN[1] - 3 * GRID + band * band_height
+        for ref in stack:
+            comp = comps[ref]
+            y_cursor += extents[ref][2]
+            placement.symbols[ref] = PlacedSymbol(
+                ref, comp.lib_id, comp.value, snap(x_cursor + lefts[index]), snap(y_cursor), offsets[ref]
+            )
+            y_cursor += extents[ref][3]
+        placement.width = max(placement.width, x_cursor + widths[index] + ORIGIN[0] - COLUMN_PITCH)
+        placement.height = max(placement.height, y_cursor + ORIGIN[1] - 3 * GRID)
+        x_cursor += widths[index]
+
+    return placement
@@ -0,0 +1,295 @@
+"""
+Streaming KiCad schematic writer
+Emits .kicad_sch elements straight to a file-like object so memory stays
+flat regardless of circuit size
+"""
+
+import uuid
+from datetime import datetime
+from typing import Iterable, Optional, Sequence, Tuple
+
+from config import Config
+from symbol_library import BUILTIN_SYMBOLS, SymbolLibrary, default_library
+
+Point = Tuple[float, float]
+
+_ALL_BUILTIN_BLOCK = '  (lib_symbols\n' + '\n'.join(BUILTIN_SYMBOLS.values()) + '\n  )\n\n'
+
+_FONT = '(font (size 1.27 1.27))'
+
+# KiCad 9 schematic format: symbols copied from the bundled KiCad 9 libraries
+# (library version 20241209) use its syntax, e.g. (hide yes) and
+# (embedded_fonts no), which older eeschema versions cannot read
+KICAD_SCH_VERSION = 20250114
+KICAD_GENERATOR_VERSION = "9.0"
+
+# Namespace for content-derived element UUIDs
+UUID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://github.com/lochandwiraj/AutoCDA/kicad_sch")
+
+# ISO landscape sheet sizes in mm, smallest first
+PAPER_SIZES = (
+    ("A4", 297, 210),
+    ("A3", 420, 297),
+    ("A2", 594, 420),
+    ("A1", 841, 594),
+    ("A0", 1189, 841),
+)
+
+
+def _num(value: float) -> str:
+    """Format a coordinate without float noise (106.19 not 106.19000000000001)"""
+    text = f"{value:.4f}".rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+
+def paper_for(width: float, height: float) -> str:
+    """Smallest standard sheet that fits a drawing, or a user-sized sheet"""
+    for name, paper_width, paper_height in PAPER_SIZES:
+        if width <= paper_width and height <= paper_height:
+            return f'"{name}"'
+    return f'"User" {_num(width)} {_num(height)}'
+
+
+class SchematicWriter:
+    """Writes one .kicad_sch document element by element"""
+
+    def __init__(self, fp, project: str = "circuit", library: Optional[SymbolLibrary] = None,
+                 deterministic: Optional[bool] = None, instance_path: str = "/", first_power: int = 1,
+                 observer=None):
+        """
+        Args:
+            fp: Text file-like object to write to
+            project: KiCad project name used in symbol instances
+            library: Symbol library for lib_symbols (defaults to the shared one)
+            deterministic: Derive UUIDs from element paths and omit the date so
+                identical circuits give identical files (defaults to
+                Config.DETERMINISTIC_UUIDS)
+            instance_path: Sheet path of this document in the hierarchy,
+                "/<root uuid>/<sheet uuid>" for sub-sheets
+            first_power: First #PWR number, so sub-sheets do not reuse references
+            observer: Optional recorder (e.g. svg_preview.SchematicPreview) told
+                about every symbol, wire, junction, label and sheet drawn
+        """
+        self.fp = fp
+        self.project = project
+        self.library = library or default_library()
+        self.deterministic = Config.DETERMINISTIC_UUIDS if deterministic is None else deterministic
+        self.instance_path = instance_path
+        self.document_uuid = None
+        self.observer = observer
+        self._power_count = first_power - 1
+        self._issued = {}
+
+    def _uuid(self, *path) -> str:
+        """UUID for an element, e.g. _uuid("pin", "R1", "2")"""
+        if not self.deterministic:
+            return str(uuid.uuid4())
+        scope = (self.project,) if self.instance_path == "/" else (self.project, self.instance_path)
+        key = '/'.join(str(part) for part in scope + path)
+        # Repeated paths (say, two identical wires) get an occurrence suffix
+        count = self._issued.get(key, 0)
+        self._issued[key] = count + 1
+        if count:
+            key = f"{key}#{count}"
+        return str(uuid.uuid5(UUID_NAMESPACE, key))
+
+    def begin(self, lib_ids: Optional[Iterable[str]] = None,
+              title: str = "AutoCDA Generated Circuit",
+              comment: str = "Generated by AutoCDA - Simulation Ready",
+              paper: str = '"A4"'):
+        """
+        Write the document header and library symbol table
+
+        Args:
+            lib_ids: Library symbols to embed; None embeds the built-in set
+            title: Title block title
+            comment: Title block comment 1
+            paper: Paper expression, see paper_for
+        """
+        self.document_uuid = self._uuid("sheet")
+        date = '' if self.deterministic else f'    (date "{datetime.now().strftime("%Y-%m-%d")}")\n'
+        self.fp.write(
+            f'(kicad_sch (version {KICAD_SCH_VERSION}) (generator "eeschema") '
+            f'(generator_version "{KICAD_GENERATOR_VERSION}")\n\n'
+            f'  (uuid {self.document_uuid})\n\n'
+            f'  (paper {paper})\n\n'
+            f'  (title_block\n'
+            f'    (title "{title}")\n'
+            f'{date}'
+            f'    (comment 1 "{comment}")\n'
+            f'  )\n\n'
+        )
+        if lib_ids is None:
+            self.fp.write(_ALL_BUILTIN_BLOCK)
+            return
+
+        blocks = [block for block in map(self.library.definition, dict.fromkeys(lib_ids)) if block]
+        if blocks:
+            self.fp.write('  (lib_symbols\n' + '\n'.join(blocks) + '\n  )\n\n')
+        else:
+            self.fp.write('  (lib_symbols)\n\n')
+
+    def emit_symbol(self, lib_id: str, reference: str, value: str, at: Point,
+                    pins: Sequence[str] = ("1", "2"), rotation: int = 0,
+                    reference_at: Optional[Point] = None, value_at: Optional[Point] = None,
+                    justify: Optional[str] = None, hide_reference: bool = False,
+                    datasheet: str = "~"):
+        """
+        Write a placed symbol instance
+
+        Args:
+            lib_id: Library symbol, e.g. "Device:R"
+            reference: Reference designator
+            value: Value property text
+            at: Symbol origin in mm
+            pins: Pin numbers of the symbol
+            rotation: Rotation in degrees
+            reference_at: Reference text position (defaults to at)
+            value_at: Value text position (defaults to at)
+            justify: Optional text justification for both properties
+            hide_reference: Hide the reference text (power symbols)
+            datasheet: Datasheet property text
+        """
+        if self.observer:
+            self.observer.symbol(lib_id, reference, value, at, rotation, reference_at, value_at, hide_reference)
+        x, y = _num(at[0]), _num(at[1])
+        rx, ry = reference_at or at
+        vx, vy = value_at or at
+        effects = f'(effects {_FONT}'
+        ref_effects = effects + (' hide)' if hide_reference else (f' (justify {justify}))' if justify else ')'))
+        value_effects = effects + (f' (justify {justify}))' if justify else ')')
+        pin_lines = ''.join(f'    (pin "{pin}" (uuid {self._uuid("pin", reference, pin)}))\n' for pin in pins)
+
+        self.fp.write(
+            f'  (symbol (lib_id "{lib_id}") (at {x} {y} {rotation}) (unit 1)\n'
+            f'    (exclude_from_sim no) (in_bom yes) (on_board yes) (dnp no)\n'
+            f'    (uuid {self._uuid("symbol", reference)})\n'
+            f'    (property "Reference" "{reference}" (at {_num(rx)} {_num(ry)} 0)\n'
+            f'      {ref_effects}\n'
+            f'    )\n'
+            f'    (property "Value" "{value}" (at {_num(vx)} {_num(vy)} 0)\n'
+            f'      {value_effects}\n'
+            f'    )\n'
+            f'    (property "Footprint" "" (at {x} {y} 0)\n'
+            f'      (effects {_FONT} hide)\n'
+            f'    )\n'
+            f'    (property "Datasheet" "{datasheet}" (at {x} {y} 0)\n'
+            f'      (effects {_FONT} hide)\n'
+            f'    )\n'
+            f'{pin_lines}'
+            f'    (instances\n'
+            f'      (project "{self.project}"\n'
+            f'        (path "{self.instance_path}" (reference "{reference}") (unit 1))\n'
+            f'      )\n'
+            f'    )\n'
+            f'  )\n\n'
+        )
+
+    def emit_power(self, at: Point, value: str = "GND"):
+        """Write a ground symbol with the next #PWR reference"""
+        self._power_count += 1
+        x, y = at
+        self.emit_symbol(
+            f"power:{value}", f"#PWR{self._power_count:03d}", value, at,
+            pins=("1",), reference_at=(x, y + 6.35), value_at=(x, y + 3.81),
+            hide_reference=True, datasheet=""
+        )
+
+    def emit_wire(self, start: Point, end: Point):
+        """Write a straight wire segment"""
+        if self.observer:
+            self.observer.wire(start, end)
+        pts = f'(xy {_num(start[0])} {_num(start[1])}) (xy {_num(end[0])} {_num(end[1])})'
+        self.fp.write(
+            f'  (wire (pts {pts})'
+            f' (stroke (width 0) (type default)) (uuid {self._uuid("wire", pts)}))\n\n'
+        )
+
+    def emit_junction(self, at: Point):
+        """Write a junction dot"""
+        if self.observer:
+            self.observer.junction(at)
+        x, y = _num(at[0]), _num(at[1])
+        self.fp.write(
+            f'  (junction (at {x} {y}) (diameter 0) (color 0 0 0 0)'
+            f' (uuid {self._uuid("junction", x, y)}))\n\n'
+        )
+
+    def emit_label(self, name: str, at: Point, rotation: int = 0):
+        """Write a local net label"""
+        if self.observer:
+            self.observer.label(name, at)
+        x, y = _num(at[0]), _num(at[1])
+        self.fp.write(
+            f'  (label "{name}" (at {x} {y} {rotation}) (fields_autoplaced)'
+            f' (effects {_FONT} (justify left bottom)) (uuid {self._uuid("label", name, x, y)}))\n\n'
+        )
+
+    def emit_hierarchical_label(self, name: str, at: Point, rotation: int = 180):
+        """Write a hierarchical label connecting a sub-sheet net to its parent sheet pin"""
+        if self.observer:
+            self.observer.label(name, at)
+        x, y = _num(at[0]), _num(at[1])
+        justify = 'right' if rotation == 180 else 'left'
+        self.fp.write(
+            f'  (hierarchical_label "{name}" (shape bidirectional) (at {x} {y} {rotation}) (fields_autoplaced)'
+            f' (effects {_FONT} (justify {justify})) (uuid {self._uuid("hierarchical_label", name, x, y)}))\n\n'
+        )
+
+    def emit_sheet(self, name: str, filename: str, at: Point, size: Tuple[float, float],
+                   pins: Sequence[Tuple[str, Point]], page: str) -> str:
+        """
+        Write a sheet symbol referencing a sub-sheet file
+
+        Args:
+            name: Sheet name
+            filename: Sub-sheet file name, relative to this document
+            at: Top-left corner in mm
+            size: (width, height) in mm
+            pins: (net name, position) of each sheet pin, on the sheet border
+            page: Page number shown for the sub-sheet
+
+        Returns:
+            The sheet's UUID; its symbols use "<instance path><uuid>" as their path
+        """
+        if self.observer:
+            self.observer.sheet(name, at, size, pins)
+        x, y = at
+        width, height = size
+        sheet_uuid = self._uuid("sheet", name)
+        pin_lines = ''.join(
+            f'    (pin "{net}" bidirectional (at {_num(px)} {_num(py)} {0 if px >= x + width else 180})\n'
+            f'      (effects {_FONT} (justify {"right" if px >= x + width else "left"}))\n'
+            f'      (uuid {self._uuid("sheet_pin", name, net)})\n'
+            f'    )\n'
+            for net, (px, py) in pins
+        )
+        self.fp.write(
+            f'  (sheet (at {_num(x)} {_num(y)}) (size {_num(width)} {_num(height)}) (fields_autoplaced)\n'
+            f'    (stroke (width 0.1524) (type solid))\n'
+            f'    (fill (color 0 0 0 0.0000))\n'
+            f'    (uuid {sheet_uuid})\n'
+            f'    (property "Sheetname" "{name}" (at {_num(x)} {_num(y - 0.7116)} 0)\n'
+            f'      (effects {_FONT} (justify left bottom))\n'
+            f'    )\n'
+            f'    (property "Sheetfile" "{filename}" (at {_num(x)} {_num(y + height + 0.5846)} 0)\n'
+            f'      (effects {_FONT} (justify left top))\n'
+            f'    )\n'
+            f'{pin_lines}'
+            f'    (instances\n'
+            f'      (project "{self.project}"\n'
+            f'        (path "/{self.document_uuid}" (page "{page}"))\n'
+            f'      )\n'
+            f'    )\n'
+            f'  )\n\n'
+        )
+        return sheet_uuid
+
+    def end(self):
+        """Close the document"""
+        self.fp.write(
+            '  (sheet_instances\n'
+            '    (path "/" (page "1"))\n'
+            '  )\n'
+            ')'
+        )
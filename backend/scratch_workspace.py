@@ -0,0 +1,142 @@
+"""
+Scratch workspace pool for SKiDL jobs
+Allocates job directories on tmpfs and recycles them between runs
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from config import Config
+
+
+def _default_scratch_root() -> Path:
+    """Pick the scratch root: configured path, then /dev/shm, then the system temp dir"""
+    if Config.SCRATCH_DIR:
+        return Path(Config.SCRATCH_DIR)
+    shm = Path('/dev/shm')
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return shm / 'autocda'
+    return Path(tempfile.gettempdir()) / 'autocda_scratch'
+
+
+class ScratchWorkspacePool:
+    """Pool of reusable job directories on fast (ideally tmpfs) storage"""
+
+    def __init__(self, root: Optional[str] = None, max_idle: Optional[int] = None):
+        self.root = Path(root) if root else _default_scratch_root()
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            # Configured root unusable (read-only, missing mount) - stay functional
+            self.root = Path(tempfile.gettempdir()) / 'autocda_scratch'
+            self.root.mkdir(parents=True, exist_ok=True)
+
+        self.max_idle = Config.SCRATCH_POOL_SIZE if max_idle is None else max_idle
+        self._idle = deque()
+        self._lock = threading.Lock()
+        # Slots are namespaced per process so gunicorn workers never share one
+        self._prefix = f"slot-{os.getpid()}-"
+
+    def acquire(self) -> Path:
+        """
+        Get an empty job directory, reusing an idle one when available
+
+        Returns:
+            Path to an empty directory owned by the caller until release()
+        """
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        slot = self.root / f"{self._prefix}{uuid.uuid4().hex[:8]}"
+        slot.mkdir()
+        return slot
+
+    def release(self, slot: Path):
+        """
+        Wipe a job directory and return it to the pool
+
+        Args:
+            slot: Directory previously returned by acquire()
+        """
+        try:
+            self._clear(slot)
+        except OSError:
+            shutil.rmtree(slot, ignore_errors=True)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(slot)
+                return
+        shutil.rmtree(slot, ignore_errors=True)
+
+    @contextmanager
+    def workspace(self):
+        """Context manager yielding a scratch directory that is recycled on exit"""
+        slot = self.acquire()
+        try:
+            yield slot
+        finally:
+            self.release(slot)
+
+    def promote(self, slot: Path, dest_dir: Path, artifacts: Iterable[str]) -> List[Path]:
+        """
+        Publish selected artifacts from a scratch directory to persistent storage
+
+        Artifacts are copied into a hidden staging directory next to dest_dir,
+        which is then renamed into place, so readers only ever see a complete
+        job directory and debris (.erc, .log, *_sklib.py) never leaves tmpfs.
+
+        Args:
+            slot: Scratch directory holding the job output
+            dest_dir: Final persistent directory (must not exist yet)
+            artifacts: File names inside slot to publish
+
+        Returns:
+            List of published file paths inside dest_dir
+        """
+        dest_dir = Path(dest_dir)
+        staging = dest_dir.parent / f".{dest_dir.name}.partial"
+        staging.mkdir(parents=True)
+
+        published = []
+        try:
+            for name in artifacts:
+                shutil.copyfile(slot / name, staging / name)
+                published.append(dest_dir / name)
+            os.rename(staging, dest_dir)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        return published
+
+    def idle_count(self) -> int:
+        """Number of recycled directories waiting for reuse"""
+        with self._lock:
+            return len(self._idle)
+
+    def close(self):
+        """Remove all idle directories owned by this pool"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for slot in idle:
+            shutil.rmtree(slot, ignore_errors=True)
+
+    @staticmethod
+    def _clear(slot: Path):
+        """Delete everything inside slot without removing slot itself"""
+        with os.scandir(slot) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
@@ -0,0 +1,363 @@
+"""
+Schematic sheet builder
+Draws auto-placed, auto-routed sheets from a netlist, and splits large
+netlists into a root sheet plus sub-sheets cut along as few nets as possible
+"""
+
+import heapq
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from connectivity import GROUND_NETS
+from netlist_parser import Netlist, NetlistNet
+from placement import place, snap, GRID
+from schematic_writer import SchematicWriter, paper_for
+from wire_router import WireRouter
+from analytics import metrics
+
+# Fiduccia-Mattheyses refinement: passes per bisection, balance tolerance,
+# and the net size above which neighbour gains are not updated incrementally
+FM_PASSES = 4
+FM_BALANCE = 0.1
+FM_NET_LIMIT = 64
+
+SHEET_WIDTH = 20 * GRID
+SHEET_GAP = 10 * GRID
+
+
+def is_ground(name: str) -> bool:
+    return name.upper() in GROUND_NETS
+
+
+def draw_netlist(writer: SchematicWriter, netlist: Netlist, hierarchical: Sequence[str] = (),
+                 record_route: Optional[Callable[[str, int, float, bool], None]] = None):
+    """
+    Write a complete auto-placed, auto-routed sheet
+
+    Args:
+        writer: Writer for the sheet's document
+        netlist: Components and nets on this sheet
+        hierarchical: Nets that continue on other sheets; each gets a
+            hierarchical label on one of its pins
+        record_route: Per-net routing callback, see WireRouter
+    """
+    placement = place(netlist)
+    symbols = placement.symbols
+    nets = netlist.net_map()
+    ground_nets = {name for name in nets if is_ground(name)}
+
+    lib_ids = {symbol.lib_id for symbol in symbols.values()}
+    if ground_nets:
+        lib_ids.add("power:GND")
+    writer.begin(lib_ids=sorted(lib_ids), paper=paper_for(placement.width, placement.height))
+
+    for symbol in symbols.values():
+        writer.emit_symbol(
+            symbol.lib_id, symbol.ref, symbol.value, (symbol.x, symbol.y),
+            pins=sorted(symbol.pins),
+            reference_at=(symbol.x + 2.54, symbol.y - 1.27),
+            value_at=(symbol.x + 2.54, symbol.y + 1.27),
+            justify="left"
+        )
+
+    # Ground pins get their own power symbol instead of a sheet-wide bus
+    for name in sorted(ground_nets):
+        for ref, pin in nets[name]:
+            if ref in symbols:
+                writer.emit_power(symbols[ref].pin_position(pin))
+
+    router = WireRouter(placement, nets, record_route)
+    signal_nets = {name: nodes for name, nodes in nets.items() if name not in ground_nets}
+    for routed in router.route(signal_nets):
+        for start, end in routed.wires:
+            writer.emit_wire(start, end)
+        for point in routed.junctions:
+            writer.emit_junction(point)
+        for point in routed.labels:
+            writer.emit_label(routed.name, point)
+
+    for name in hierarchical:
+        ref, pin = next((ref, pin) for ref, pin in nets[name] if ref in symbols)
+        writer.emit_hierarchical_label(name, symbols[ref].pin_position(pin))
+
+    writer.end()
+
+
+def _connectivity(netlist: Netlist) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """Component -> signal nets and signal net -> components, ground excluded"""
+    comp_nets: Dict[str, List[str]] = {comp.ref: [] for comp in netlist.components}
+    net_members: Dict[str, List[str]] = {}
+    for net in netlist.nets:
+        if is_ground(net.name):
+            continue
+        members = list(dict.fromkeys(node.ref for node in net.nodes if node.ref in comp_nets))
+        net_members[net.name] = members
+        for ref in members:
+            comp_nets[ref].append(net.name)
+    return comp_nets, net_members
+
+
+def _bfs_order(group: List[str], comp_nets, net_members) -> List[str]:
+    """Group members in breadth-first order, so connected parts start on the same side"""
+    members = set(group)
+    seen, seen_nets, order = set(), set(), []
+    for root in group:
+        if root in seen:
+            continue
+        seen.add(root)
+        queue = [root]
+        for ref in queue:
+            order.append(ref)
+            for name in comp_nets[ref]:
+                if name in seen_nets:
+                    continue
+                seen_nets.add(name)
+                for other in net_members[name]:
+                    if other in members and other not in seen:
+                        seen.add(other)
+                        queue.append(other)
+    return order
+
+
+def _fm_pass(order: List[str], side: Dict[str, int], comp_nets, net_members, lo: int, hi: int) -> bool:
+    """
+    One Fiduccia-Mattheyses pass: move every part at most once, highest gain
+    first, then keep the best prefix of moves
+
+    Returns:
+        True if the cut shrank
+    """
+    members = set(order)
+    counts: Dict[str, List[int]] = {}
+    for ref in order:
+        for name in comp_nets[ref]:
+            counts.setdefault(name, [0, 0])[side[ref]] += 1
+
+    def gain(ref):
+        here = side[ref]
+        total = 0
+        for name in comp_nets[ref]:
+            count = counts[name]
+            total += (count[here] == 1) - (count[1 - here] == 0)
+        return total
+
+    index = {ref: i for i, ref in enumerate(order)}
+    gains = {ref: gain(ref) for ref in order}
+    heap = [(-g, index[ref], ref) for ref, g in gains.items()]
+    heapq.heapify(heap)
+    size0 = sum(1 for ref in order if side[ref] == 0)
+    locked, moves = set(), []
+    total = best = best_len = 0
+
+    while heap:
+        negative, _, ref = heapq.heappop(heap)
+        if ref in locked or -negative != gains[ref]:
+            continue
+        actual = gain(ref)
+        if actual != gains[ref]:
+            # Stale after a move on a large net; requeue with the real gain
+            gains[ref] = actual
+            heapq.heappush(heap, (-actual, index[ref], ref))
+            continue
+        target = 1 - side[ref]
+        new_size0 = size0 + (1 if target == 0 else -1)
+        if not lo <= new_size0 <= hi:
+            continue
+
+        for name in comp_nets[ref]:
+            counts[name][side[ref]] -= 1
+            counts[name][target] += 1
+        side[ref] = target
+        size0 = new_size0
+        locked.add(ref)
+        moves.append(ref)
+        total += actual
+        if total > best:
+            best, best_len = total, len(moves)
+
+        for name in comp_nets[ref]:
+            if len(net_members[name]) > FM_NET_LIMIT:
+                continue
+            for other in net_members[name]:
+                if other in members and other not in locked:
+                    updated = gain(other)
+                    if updated != gains[other]:
+                        gains[other] = updated
+                        heapq.heappush(heap, (-updated, index[other], other))
+
+    for ref in moves[best_len:]:
+        side[ref] = 1 - side[ref]
+    return best > 0
+
+
+def _bisect(group: List[str], max_parts: int, comp_nets, net_members) -> Tuple[List[str], List[str]]:
+    """
+    Split a group in two, sized so each side fills whole sheets: with k sheets
+    needed overall, the first side gets ceil(k/2) of them
+    """
+    order = _bfs_order(group, comp_nets, net_members)
+    total = len(order)
+    sheets = math.ceil(total / max_parts)
+    first_sheets = math.ceil(sheets / 2)
+    target = round(total * first_sheets / sheets)
+    slack = int(total * FM_BALANCE)
+    lo = max(1, target - slack, total - (sheets - first_sheets) * max_parts)
+    hi = min(total - 1, target + slack, first_sheets * max_parts)
+
+    side = {ref: 0 if i < target else 1 for i, ref in enumerate(order)}
+    for _ in range(FM_PASSES):
+        if not _fm_pass(order, side, comp_nets, net_members, lo, hi):
+            break
+    return [ref for ref in order if side[ref] == 0], [ref for ref in order if side[ref] == 1]
+
+
+def partition_netlist(netlist: Netlist, max_parts: int) -> List[List[str]]:
+    """
+    Split components into groups of at most max_parts, cutting few nets
+
+    Recursive bisection with Fiduccia-Mattheyses refinement over the
+    component/net hypergraph. Ground nets are ignored since power symbols
+    connect them on every sheet anyway.
+
+    Args:
+        netlist: Parsed netlist
+        max_parts: Largest allowed group
+
+    Returns:
+        Component references per group
+    """
+    comp_nets, net_members = _connectivity(netlist)
+    groups, stack = [], [[comp.ref for comp in netlist.components]]
+    while stack:
+        group = stack.pop()
+        if len(group) <= max_parts:
+            groups.append(group)
+            continue
+        first, second = _bisect(group, max_parts, comp_nets, net_members)
+        stack += [second, first]
+    return groups
+
+
+def _write_sheet(job: tuple) -> Tuple[str, List[tuple]]:
+    """Worker: draw one sub-sheet file, returning its routing records for the parent to keep"""
+    path, netlist, hierarchical, project, instance_path, deterministic, first_power = job
+    routes: List[tuple] = []
+    with open(path, 'w') as f:
+        writer = SchematicWriter(f, project, deterministic=deterministic,
+                                 instance_path=instance_path, first_power=first_power)
+        draw_netlist(writer, netlist, hierarchical, record_route=lambda *route: routes.append(route))
+    return path, routes
+
+
+# Worker pools by size, shared across requests
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def _discard_pool(workers: int):
+    with _pools_lock:
+        pool = _pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run_jobs(jobs: List[tuple], workers: int):
+    results = None
+    if workers > 1 and len(jobs) > 1:
+        try:
+            results = list(_pool(workers).map(_write_sheet, jobs))
+        except (OSError, BrokenProcessPool) as e:
+            _discard_pool(workers)
+            print(f"Warning: parallel sheet generation unavailable, continuing serially: {e}")
+    if results is None:
+        results = [_write_sheet(job) for job in jobs]
+    # Workers have their own copy of the metrics, so their routes are recorded here
+    for _, routes in results:
+        for route in routes:
+            metrics.record_net_route(*route)
+
+
+def write_hierarchical_schematic(writer: SchematicWriter, netlist: Netlist, sheet_dir: Path,
+                                 stem: str, max_parts: int, workers: int = 1) -> List[Path]:
+    """
+    Write a root sheet of sheet symbols plus one sub-sheet file per partition
+
+    Nets cut by the partition become hierarchical labels in the sub-sheets
+    and sheet pins joined by net labels on the root sheet.
+
+    Args:
+        writer: Writer for the root document
+        netlist: Full netlist
+        sheet_dir: Directory for sub-sheet files
+        stem: Root schematic name; sub-sheets are <stem>_sheet<n>.kicad_sch
+        max_parts: Largest number of parts on one sub-sheet
+        workers: Processes used to draw sub-sheets
+
+    Returns:
+        Paths of the sub-sheet files
+    """
+    groups = partition_netlist(netlist, max_parts)
+    sheet_of = {ref: i for i, group in enumerate(groups) for ref in group}
+    components = {comp.ref: comp for comp in netlist.components}
+
+    sub_netlists = [Netlist(components=[components[ref] for ref in group]) for group in groups]
+    crossing: List[List[str]] = [[] for _ in groups]
+    ground_pins = [0] * len(groups)
+    for net in netlist.nets:
+        by_sheet: Dict[int, list] = {}
+        for node in net.nodes:
+            if node.ref in sheet_of:
+                by_sheet.setdefault(sheet_of[node.ref], []).append(node)
+        for i, nodes in by_sheet.items():
+            sub_netlists[i].nets.append(NetlistNet(net.code, net.name, nodes))
+            if is_ground(net.name):
+                ground_pins[i] += len(nodes)
+            elif len(by_sheet) > 1:
+                crossing[i].append(net.name)
+
+    columns = max(1, math.ceil(math.sqrt(len(groups))))
+    heights = [max(10 * GRID, (len(pins) + 1) * GRID) for pins in crossing]
+    row_height = max(heights) + SHEET_GAP
+    width = 2 * SHEET_GAP + columns * (SHEET_WIDTH + 2 * SHEET_GAP)
+    height = 2 * SHEET_GAP + math.ceil(len(groups) / columns) * row_height
+    writer.begin(lib_ids=(), paper=paper_for(width, height))
+
+    jobs, paths, first_power = [], [], 1
+    for i, group in enumerate(groups):
+        row, column = divmod(i, columns)
+        x = snap(2 * SHEET_GAP + column * (SHEET_WIDTH + 2 * SHEET_GAP))
+        y = snap(2 * SHEET_GAP + row * row_height)
+        pins = [(name, (x + SHEET_WIDTH, y + (k + 1) * GRID)) for k, name in enumerate(crossing[i])]
+        filename = f"{stem}_sheet{i + 1}.kicad_sch"
+        sheet_uuid = writer.emit_sheet(f"Sheet{i + 1}", filename, (x, y), (SHEET_WIDTH, heights[i]),
+                                       pins, page=str(i + 2))
+        for name, at in pins:
+            writer.emit_label(name, at)
+
+        path = Path(sheet_dir) / filename
+        paths.append(path)
+        jobs.append((str(path), sub_netlists[i], crossing[i], writer.project,
+                     f"/{writer.document_uuid}/{sheet_uuid}", writer.deterministic, first_power))
+        first_power += ground_pins[i]
+
+    try:
+        _run_jobs(jobs, workers)
+    except BaseException:
+        # Sheets written before the failure would otherwise be zipped with the empty root
+        for path in paths:
+            path.unlink(missing_ok=True)
+        raise
+    writer.end()
+    return paths
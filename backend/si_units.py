@@ -0,0 +1,125 @@
+"""
+SI value parsing and formatting
+One shared, cached implementation for strings like 4.7k, 100nF, 2.2µF,
+1kHz, 5mA and R-notation such as 4k7 or 4R7
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+# Decimal exponents of SI prefixes; "R" marks the decimal point in R-notation
+PREFIXES = {
+    'f': -15, 'p': -12, 'n': -9, 'u': -6, 'µ': -6, 'μ': -6, 'm': -3,
+    'R': 0, 'k': 3, 'K': 3, 'M': 6, 'meg': 6, 'G': 9, 'T': 12,
+}
+
+# Units accepted (and ignored) after the prefix, compared lower-case
+UNITS = {'', 'ω', 'ohm', 'ohms', 'f', 'h', 'hz', 'v', 'a', 'w', 's'}
+
+# SPICE spells mega "meg" in any case, which must win over m (milli)
+_VALUE = re.compile(
+    r'^(?P<sign>[+-]?)(?P<int>\d*)(?:\.(?P<frac>\d*))?(?:[eE](?P<exp>[+-]?\d+))?'
+    r'(?P<prefix>(?i:meg)|[' + ''.join(p for p in PREFIXES if len(p) == 1) + r']?)'
+    r'(?P<rfrac>\d*)(?P<unit>[A-Za-zΩ]*)$'
+)
+
+# Prefixes used when formatting, by exponent
+_FORMAT_PREFIXES = {-15: 'f', -12: 'p', -9: 'n', -6: 'u', -3: 'm', 0: '', 3: 'k', 6: 'M', 9: 'G', 12: 'T'}
+
+PARSE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_text(text: str) -> float:
+    match = _VALUE.match(text.replace(' ', ''))
+    if match:
+        sign, integer, frac, exp, prefix, rfrac, unit = match.group(
+            'sign', 'int', 'frac', 'exp', 'prefix', 'rfrac', 'unit')
+        # Digits after the prefix are R-notation (4k7) and exclude a decimal point or exponent
+        r_notation_ok = not rfrac or (frac is None and not exp and prefix)
+        if r_notation_ok and unit.lower() in UNITS and (integer or frac or rfrac):
+            digits = f"{integer or '0'}.{(frac or '') + rfrac or '0'}"
+            # Shift the exponent instead of multiplying, so "4.7n" is exactly 4.7e-9
+            exponent = int(exp or 0) + PREFIXES.get(prefix if len(prefix) < 2 else prefix.lower(), 0)
+            return float(f"{sign}{digits}e{exponent}")
+    raise ValueError(f"Cannot parse value: {text!r}")
+
+
+def parse(value: Union[str, float, int]) -> float:
+    """
+    Number from an SI value string
+
+    Prefixes are case sensitive where SI is (m is milli, M is mega); k/K and
+    u/µ are both accepted, as is SPICE's meg. A trailing unit (Ω/ohm(s), F,
+    H, Hz, V, A, W, s) in any case is ignored.
+
+    Args:
+        value: String such as "4.7k", "100nF", "4k7", "1 kHz", or a number
+
+    Returns:
+        The value as a float
+
+    Raises:
+        ValueError: If the string is not a number with an optional prefix and unit
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    return _parse_text(str(value).strip())
+
+
+def try_parse(value: Union[str, float, int, None]) -> Optional[float]:
+    """parse(), but None instead of an exception for missing or malformed values"""
+    if value is None or value == '':
+        return None
+    try:
+        return parse(value)
+    except ValueError:
+        return None
+
+
+def parse_array(values: Iterable) -> np.ndarray:
+    """
+    parse() over many values, each distinct string parsed once
+
+    Returns:
+        Float array with the shape of values; NaN where a value cannot be parsed
+    """
+    array = np.asarray(values, dtype=object)
+    unique, inverse = np.unique(array.astype(str), return_inverse=True)
+    parsed = np.array([np.nan if (v := try_parse(text)) is None else v for text in unique.tolist()])
+    return parsed[inverse].reshape(array.shape)
+
+
+def format_value(value: float, unit: str = '', decimals: Optional[int] = None) -> str:
+    """
+    SI string for a number, e.g. 4700 -> "4.7k", 3.3e-8 -> "33n"
+
+    Args:
+        value: Number to format
+        unit: Appended after the prefix ("Ω", "F", ...)
+        decimals: Fixed digits after the point; by default up to three
+            significant digits with trailing zeros dropped
+
+    Returns:
+        Formatted string; zero, NaN and infinities use the plain number
+    """
+    if value == 0 or not math.isfinite(value):
+        return f"{value:g}{unit}"
+    exponent = min(max(3 * math.floor(math.log10(abs(value)) / 3), -15), 12)
+    mantissa = value / 10 ** exponent
+    if decimals is None:
+        text = f"{mantissa:.3g}"
+        if 'e' in text:
+            # 999.6 rounds to 1e+03: move up a prefix instead
+            exponent = min(exponent + 3, 12)
+            text = f"{value / 10 ** exponent:.3g}"
+    else:
+        text = f"{mantissa:.{decimals}f}"
+        if abs(float(text)) >= 1000 and exponent < 12:
+            exponent += 3
+            text = f"{value / 10 ** exponent:.{decimals}f}"
+    return f"{text}{_FORMAT_PREFIXES[exponent]}{unit}"
@@ -10,6 +10,7 @@ class SKiDLGenerator:
             'resistor': 'R',
             'capacitor': 'C',
             'voltage_source': 'V',
+            'opamp': 'U',
             'ground': 'GND'
         }
     
@@ -102,6 +103,8 @@ reset()
                 code += f"{comp_id} = Part('Device', 'R', value='{value}', footprint='Resistor_SMD:R_0805_2012Metric')\n"
             elif comp_type == 'capacitor':
                 code += f"{comp_id} = Part('Device', 'C', value='{value}', footprint='Capacitor_SMD:C_0805_2012Metric')\n"
+            elif comp_type == 'opamp':
+                code += f"{comp_id} = Part('Device', 'Opamp_Dual', value='{value}', footprint='Package_SO:SOIC-8_3.9x4.9mm_P1.27mm')\n"
             elif comp_type == 'voltage_source':
                 code += f"{comp_id} = Part('pspice', 'VSRC', value='{value}')\n"
             elif comp_type == 'ground':
@@ -0,0 +1,196 @@
+"""
+SVG preview of generated schematics
+Records what a SchematicWriter draws and renders it as a small standalone
+SVG, using the symbol graphics from the symbol library (no KiCad needed)
+"""
+
+import copy
+import io
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from netlist_parser import tokenize, LPAREN, RPAREN
+from symbol_library import SymbolLibrary, default_library
+
+Point = Tuple[float, float]
+
+MARGIN = 10.0
+STROKE = 0.254
+FONT_SIZE = 1.27
+COLORS = {
+    'wire': '#008400',
+    'body': '#840000',
+    'text': '#006464',
+    'label': '#000000',
+    'sheet': '#840084',
+}
+
+
+def _n(value: float) -> str:
+    text = f"{value:.3f}".rstrip('0').rstrip('.')
+    return '0' if text in ('-0', '') else text
+
+
+def _parse(text: str) -> list:
+    """S-expression text to nested lists of strings"""
+    stack = [[]]
+    for kind, value, _, _ in tokenize(io.StringIO(text)):
+        if kind == LPAREN:
+            stack.append([])
+        elif kind == RPAREN:
+            done = stack.pop()
+            stack[-1].append(done)
+        else:
+            stack[-1].append(value)
+    return stack[0]
+
+
+def _children(node: list, head: str) -> List[list]:
+    return [child for child in node if isinstance(child, list) and child and child[0] == head]
+
+
+def _xy(node: list) -> Point:
+    # Library coordinates are y-up; SVG, like the schematic, is y-down
+    return float(node[1]), -float(node[2])
+
+
+def _symbol_graphics(definition: str) -> str:
+    """SVG fragment for one library symbol, in symbol coordinates"""
+    root = _parse(definition)[0]
+    parts = []
+    for unit in _children(root, 'symbol'):
+        # Unit 0 is shared by all units; only unit 1 is ever placed
+        if unit[1].split('_')[-2] not in ('0', '1'):
+            continue
+        for rect in _children(unit, 'rectangle'):
+            (x1, y1), (x2, y2) = _xy(_children(rect, 'start')[0]), _xy(_children(rect, 'end')[0])
+            parts.append(f'<rect x="{_n(min(x1, x2))}" y="{_n(min(y1, y2))}" '
+                         f'width="{_n(abs(x2 - x1))}" height="{_n(abs(y2 - y1))}"/>')
+        for line in _children(unit, 'polyline'):
+            points = ' '.join(f'{_n(x)},{_n(y)}' for x, y in map(_xy, _children(_children(line, 'pts')[0], 'xy')))
+            parts.append(f'<polyline points="{points}"/>')
+        for circle in _children(unit, 'circle'):
+            x, y = _xy(_children(circle, 'center')[0])
+            radius = float(_children(circle, 'radius')[0][1])
+            parts.append(f'<circle cx="{_n(x)}" cy="{_n(y)}" r="{_n(radius)}"/>')
+        for arc in _children(unit, 'arc'):
+            points = ' '.join(f'{_n(x)},{_n(y)}' for x, y in
+                              (_xy(_children(arc, key)[0]) for key in ('start', 'mid', 'end')))
+            parts.append(f'<polyline points="{points}"/>')
+        for pin in _children(unit, 'pin'):
+            at = _children(pin, 'at')[0]
+            x, y = _xy(at)
+            length = float(_children(pin, 'length')[0][1]) if _children(pin, 'length') else 0.0
+            angle = int(float(at[3])) if len(at) > 3 else 0
+            dx, dy = {0: (1, 0), 90: (0, -1), 180: (-1, 0), 270: (0, 1)}.get(angle % 360, (1, 0))
+            parts.append(f'<line x1="{_n(x)}" y1="{_n(y)}" x2="{_n(x + dx * length)}" y2="{_n(y + dy * length)}"/>')
+    return ''.join(parts)
+
+
+class SchematicPreview:
+    """
+    Observer for SchematicWriter that renders the drawn sheet as SVG
+
+    Symbol bodies are emitted once per lib_id in <defs> and instanced with
+    <use>, so the preview stays small however many parts are placed.
+    """
+
+    def __init__(self, library: Optional[SymbolLibrary] = None):
+        self.library = library or default_library()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.symbols: List[dict] = []
+        self.wires: List[Tuple[Point, Point]] = []
+        self.junctions: List[Point] = []
+        self.labels: List[Tuple[str, Point]] = []
+        self.sheets: List[Tuple[str, Point, Tuple[float, float], list]] = []
+
+    def symbol(self, lib_id: str, reference: str, value: str, at: Point, rotation: int,
+               reference_at: Optional[Point], value_at: Optional[Point], hide_reference: bool):
+        self.symbols.append({
+            'lib_id': lib_id, 'reference': reference, 'value': value, 'at': at, 'rotation': rotation,
+            'reference_at': None if hide_reference else (reference_at or at), 'value_at': value_at or at,
+        })
+
+    def wire(self, start: Point, end: Point):
+        self.wires.append((start, end))
+
+    def junction(self, at: Point):
+        self.junctions.append(at)
+
+    def label(self, name: str, at: Point):
+        self.labels.append((name, at))
+
+    def sheet(self, name: str, at: Point, size: Tuple[float, float], pins: list):
+        self.sheets.append((name, at, size, list(pins)))
+
+    def with_values(self, values: Dict[str, str]) -> 'SchematicPreview':
+        """Copy with component values replaced, for value-only regenerations"""
+        patched = copy.copy(self)
+        patched.symbols = [dict(s, value=values.get(s['reference'], s['value'])) for s in self.symbols]
+        return patched
+
+    def _bounds(self) -> Tuple[float, float, float, float]:
+        points = [s['at'] for s in self.symbols] + [p for wire in self.wires for p in wire]
+        points += [at for _, at in self.labels] + self.junctions
+        for _, (x, y), (w, h), _ in self.sheets:
+            points += [(x, y), (x + w, y + h)]
+        if not points:
+            return 0.0, 0.0, 2 * MARGIN, 2 * MARGIN
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        return min(xs) - MARGIN, min(ys) - MARGIN, max(xs) - min(xs) + 2 * MARGIN, max(ys) - min(ys) + 2 * MARGIN
+
+    def render(self) -> str:
+        """Standalone SVG document, sized in millimetres"""
+        x0, y0, width, height = self._bounds()
+        out = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{_n(width)}mm" height="{_n(height)}mm" viewBox="{_n(x0)} {_n(y0)} {_n(width)} {_n(height)}">',
+            f'<rect x="{_n(x0)}" y="{_n(y0)}" width="{_n(width)}" height="{_n(height)}" fill="#ffffff"/>',
+        ]
+
+        ids: Dict[str, str] = {}
+        defs = []
+        for lib_id in dict.fromkeys(s['lib_id'] for s in self.symbols):
+            ids[lib_id] = f"s{len(ids)}"
+            definition = self.library.definition(lib_id)
+            body = _symbol_graphics(definition) if definition else \
+                '<rect x="-2.54" y="-2.54" width="5.08" height="5.08"/>'
+            defs.append(f'<g id="{ids[lib_id]}">{body}</g>')
+        if defs:
+            out.append(f'<defs>{"".join(defs)}</defs>')
+
+        out.append(f'<g fill="none" stroke="{COLORS["body"]}" stroke-width="{STROKE}" '
+                   f'stroke-linecap="round" stroke-linejoin="round">')
+        for s in self.symbols:
+            x, y = s['at']
+            rotate = f' rotate({-s["rotation"]})' if s['rotation'] else ''
+            out.append(f'<use xlink:href="#{ids[s["lib_id"]]}" transform="translate({_n(x)} {_n(y)}){rotate}"/>')
+        for name, (x, y), (w, h), _ in self.sheets:
+            out.append(f'<rect x="{_n(x)}" y="{_n(y)}" width="{_n(w)}" height="{_n(h)}" '
+                       f'stroke="{COLORS["sheet"]}"/>')
+        out.append('</g>')
+
+        if self.wires:
+            path = ''.join(f'M{_n(a[0])} {_n(a[1])}L{_n(b[0])} {_n(b[1])}' for a, b in self.wires)
+            out.append(f'<path d="{path}" fill="none" stroke="{COLORS["wire"]}" stroke-width="{STROKE}"/>')
+        for x, y in self.junctions:
+            out.append(f'<circle cx="{_n(x)}" cy="{_n(y)}" r="0.5" fill="{COLORS["wire"]}"/>')
+
+        out.append(f'<g font-family="sans-serif" font-size="{_n(FONT_SIZE)}" fill="{COLORS["text"]}">')
+        for s in self.symbols:
+            for key, text in (('reference_at', s['reference']), ('value_at', s['value'])):
+                if s[key] is not None:
+                    out.append(f'<text x="{_n(s[key][0])}" y="{_n(s[key][1])}">{escape(text)}</text>')
+        for name, (x, y) in self.labels:
+            out.append(f'<text x="{_n(x)}" y="{_n(y - 0.3)}" fill="{COLORS["label"]}">{escape(name)}</text>')
+        for name, (x, y), _, pins in self.sheets:
+            out.append(f'<text x="{_n(x)}" y="{_n(y - 0.7)}" fill="{COLORS["sheet"]}">{escape(name)}</text>')
+            for net, (px, py) in pins:
+                out.append(f'<text x="{_n(px - 0.5)}" y="{_n(py + 0.4)}" text-anchor="end" '
+                           f'fill="{COLORS["sheet"]}">{escape(net)}</text>')
+        out.append('</g></svg>')
+        return '\n'.join(out)
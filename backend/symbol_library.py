@@ -0,0 +1,219 @@
+"""
+Indexed KiCad symbol library
+Looks up symbol definitions in the .kicad_sym files under kicad_libs by byte
+offset and serializes each one once, ready to embed in a schematic's
+lib_symbols section
+"""
+
+import os
+import re
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(__file__))
+
+from config import Config
+
+# Definitions that are not in the bundled libraries (power and simulation)
+BUILTIN_SYMBOLS = {
+    "Device:R": '''    (symbol "Device:R" (pin_numbers hide) (pin_names (offset 0)) (exclude_from_sim no) (in_bom yes) (on_board yes)
+      (property "Reference" "R" (at 2.032 0 90) (effects (font (size 1.27 1.27))))
+      (property "Value" "R" (at 0 0 90) (effects (font (size 1.27 1.27))))
+      (property "Footprint" "" (at -1.778 0 90) (effects (font (size 1.27 1.27)) hide))
+      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+      (symbol "R_0_1"
+        (rectangle (start -1.016 -2.54) (end 1.016 2.54)
+          (stroke (width 0.254) (type default)) (fill (type none))
+        )
+      )
+      (symbol "R_1_1"
+        (pin passive line (at 0 3.81 270) (length 1.27) (name "~" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
+        (pin passive line (at 0 -3.81 90) (length 1.27) (name "~" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
+      )
+    )''',
+    "Device:C": '''    (symbol "Device:C" (pin_numbers hide) (pin_names (offset 0.254)) (exclude_from_sim no) (in_bom yes) (on_board yes)
+      (property "Reference" "C" (at 0.635 2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
+      (property "Value" "C" (at 0.635 -2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
+      (property "Footprint" "" (at 0.9652 -3.81 0) (effects (font (size 1.27 1.27)) hide))
+      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+      (symbol "C_0_1"
+        (polyline (pts (xy -2.032 -0.762) (xy 2.032 -0.762)) (stroke (width 0.508) (type default)) (fill (type none)))
+        (polyline (pts (xy -2.032 0.762) (xy 2.032 0.762)) (stroke (width 0.508) (type default)) (fill (type none)))
+      )
+      (symbol "C_1_1"
+        (pin passive line (at 0 3.81 270) (length 2.794) (name "~" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
+        (pin passive line (at 0 -3.81 90) (length 2.794) (name "~" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
+      )
+    )''',
+    "power:GND": '''    (symbol "power:GND" (power) (pin_names (offset 0)) (exclude_from_sim no) (in_bom yes) (on_board yes)
+      (property "Reference" "#PWR" (at 0 -6.35 0) (effects (font (size 1.27 1.27)) hide))
+      (property "Value" "GND" (at 0 -3.81 0) (effects (font (size 1.27 1.27))))
+      (property "Footprint" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+      (property "Datasheet" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+      (symbol "GND_0_1"
+        (polyline (pts (xy 0 0) (xy 0 -1.27) (xy 1.27 -1.27) (xy 0 -2.54) (xy -1.27 -1.27) (xy 0 -1.27)) (stroke (width 0) (type default)) (fill (type none)))
+      )
+      (symbol "GND_1_1"
+        (pin power_in line (at 0 0 270) (length 0) hide (name "GND" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
+      )
+    )''',
+    "Simulation_SPICE:VDC": '''    (symbol "Simulation_SPICE:VDC" (pin_numbers hide) (pin_names (offset 0.0254)) (exclude_from_sim no) (in_bom yes) (on_board yes)
+      (property "Reference" "V" (at 2.54 2.54 0) (effects (font (size 1.27 1.27)) (justify left)))
+      (property "Value" "VDC" (at 2.54 0 0) (effects (font (size 1.27 1.27)) (justify left)))
+      (property "Footprint" "" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+      (property "Datasheet" "~" (at 0 0 0) (effects (font (size 1.27 1.27)) hide))
+      (symbol "VDC_0_1"
+        (circle (center 0 0) (radius 3.81) (stroke (width 0.254) (type default)) (fill (type background)))
+        (polyline (pts (xy -1.27 0.635) (xy 1.27 0.635)) (stroke (width 0) (type default)) (fill (type none)))
+        (polyline (pts (xy 0 -0.635) (xy 0 -1.905)) (stroke (width 0) (type default)) (fill (type none)))
+        (polyline (pts (xy 0 1.905) (xy 0 0.635)) (stroke (width 0) (type default)) (fill (type none)))
+      )
+      (symbol "VDC_1_1"
+        (pin passive line (at 0 6.35 270) (length 2.54) (name "+" (effects (font (size 1.27 1.27)))) (number "1" (effects (font (size 1.27 1.27)))))
+        (pin passive line (at 0 -6.35 90) (length 2.54) (name "-" (effects (font (size 1.27 1.27)))) (number "2" (effects (font (size 1.27 1.27)))))
+      )
+    )''',
+}
+
+_ENTRY_PREFIX = b'\t(symbol "'
+_ITEM_RE = re.compile(r'^\t\t\((\S+)')
+_EXTENDS_RE = re.compile(r'^\t\t\(extends "([^"]*)"\)', re.MULTILINE)
+_LEADING_TABS_RE = re.compile(r'^\t+', re.MULTILINE)
+_PIN_RE = re.compile(
+    r'\(pin\s+\S+\s+\S+\s+\(at\s+(-?[\d.]+)\s+(-?[\d.]+)\s+-?[\d.]+\).*?\(number\s+"([^"]*)"',
+    re.DOTALL
+)
+
+
+class SymbolLibrary:
+    """
+    Symbol definitions from a directory of .kicad_sym files
+
+    Each library file is indexed on first use (symbol name -> byte range of
+    its top-level entry) and each definition is serialized once per process.
+    Library files are expected in KiCad's canonical tab-indented layout.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or Config.SYMBOL_DIR
+        self._index: Dict[str, Dict[str, Tuple[int, int]]] = {}
+        self._definitions: Dict[str, Optional[str]] = {}
+        self._pins: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    def _library_index(self, lib: str) -> Dict[str, Tuple[int, int]]:
+        index = self._index.get(lib)
+        if index is not None:
+            return index
+
+        with self._lock:
+            if lib in self._index:
+                return self._index[lib]
+            index = {}
+            path = os.path.join(self.directory, f"{lib}.kicad_sym")
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    name, start, offset = None, 0, 0
+                    for line in f:
+                        if line.startswith(_ENTRY_PREFIX) or line.rstrip() == b')':
+                            if name is not None:
+                                index[name] = (start, offset)
+                            name = line[len(_ENTRY_PREFIX):].split(b'"', 1)[0].decode('utf-8') \
+                                if line.startswith(_ENTRY_PREFIX) else None
+                            start = offset
+                        offset += len(line)
+            self._index[lib] = index
+            return index
+
+    def _read_entry(self, lib: str, name: str) -> Optional[str]:
+        span = self._library_index(lib).get(name)
+        if span is None:
+            return None
+        with open(os.path.join(self.directory, f"{lib}.kicad_sym"), 'rb') as f:
+            f.seek(span[0])
+            return f.read(span[1] - span[0]).decode('utf-8')
+
+    def _flatten(self, lib: str, name: str, depth: int = 0) -> Optional[List[Tuple[str, str]]]:
+        """Top-level items (head, text) of an entry with any 'extends' resolved"""
+        entry = self._read_entry(lib, name)
+        if entry is None or depth > 8:
+            return None
+
+        items = []
+        for line in entry.splitlines(keepends=True)[1:-1]:
+            match = _ITEM_RE.match(line)
+            if match:
+                items.append([match.group(1), line])
+            elif items:
+                items[-1][1] += line
+        items = [(head, text) for head, text in items]
+
+        parent = _EXTENDS_RE.search(entry)
+        if parent is None:
+            return items
+
+        parent_items = self._flatten(lib, parent.group(1), depth + 1)
+        if parent_items is None:
+            return None
+        unit_prefix = f'(symbol "{parent.group(1)}_'
+        return (
+            [(h, t) for h, t in parent_items if h not in ('property', 'symbol', 'embedded_fonts')] +
+            [(h, t) for h, t in items if h == 'property'] +
+            [(h, t.replace(unit_prefix, f'(symbol "{name}_', 1)) for h, t in parent_items if h == 'symbol'] +
+            [(h, t) for h, t in parent_items if h == 'embedded_fonts']
+        )
+
+    def definition(self, lib_id: str) -> Optional[str]:
+        """
+        Serialized lib_symbols entry for a symbol
+
+        Args:
+            lib_id: Library identifier, e.g. "Device:L"
+
+        Returns:
+            Definition text indented for a schematic, or None if unknown
+        """
+        if lib_id in self._definitions:
+            return self._definitions[lib_id]
+
+        text = None
+        lib, _, name = lib_id.partition(':')
+        items = self._flatten(lib, name) if name else None
+        if items is not None:
+            body = ''.join(text for _, text in items)
+            body = _LEADING_TABS_RE.sub(lambda m: '  ' * (len(m.group()) + 1), body)
+            text = f'    (symbol "{lib_id}"\n{body}    )'
+        elif lib_id in BUILTIN_SYMBOLS:
+            text = BUILTIN_SYMBOLS[lib_id]
+
+        self._definitions[lib_id] = text
+        return text
+
+    def pins(self, lib_id: str) -> Dict[str, Tuple[float, float]]:
+        """
+        Pin connection points in symbol coordinates (y up, KiCad library convention)
+
+        Args:
+            lib_id: Library identifier
+
+        Returns:
+            Mapping of pin number to (x, y); empty if the symbol is unknown
+        """
+        if lib_id not in self._pins:
+            pins = {}
+            for x, y, number in _PIN_RE.findall(self.definition(lib_id) or ''):
+                pins.setdefault(number, (float(x), float(y)))
+            self._pins[lib_id] = pins
+        return self._pins[lib_id]
+
+
+_default_library: Optional[SymbolLibrary] = None
+
+
+def default_library() -> SymbolLibrary:
+    """Process-wide library over Config.SYMBOL_DIR"""
+    global _default_library
+    if _default_library is None:
+        _default_library = SymbolLibrary()
+    return _default_library
@@ -0,0 +1,88 @@
+"""
+Tests for the batched AC frequency-response engine
+"""
+
+import math
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+import ac_analysis
+import filter_synthesis
+from ac_analysis import analyze_ac
+from explainer import generate_circuit_explanation
+
+
+def part(ref, comp_type, *nets, value='1k'):
+    return {'id': ref, 'type': comp_type, 'value': value, 'nets': list(nets)}
+
+
+def rc(filter_type, r='1k', c='159.155n'):
+    first, second = ('R1', 'resistor', r), ('C1', 'capacitor', c)
+    if filter_type == 'highpass':
+        first, second = second, first
+    return {'type': f'rc_{filter_type}_filter', 'constraints': {'cutoff_freq': '1k'}, 'components': [
+        part(first[0], first[1], 'IN', 'N1', value=first[2]),
+        part(second[0], second[1], 'N1', 'GND', value=second[2]),
+    ]}
+
+
+@pytest.mark.parametrize('filter_type, slope, phase', [('lowpass', -20, -45), ('highpass', 20, 45)])
+def test_first_order_rc(filter_type, slope, phase):
+    response = analyze_ac(rc(filter_type), points=401)
+    assert response.output_net == 'N1'
+    assert response.cutoff_freq == pytest.approx(1000, rel=1e-3)
+    assert response.rolloff_db_per_decade == pytest.approx(slope, abs=0.1)
+    # 401 points over four decades put the design cutoff at the centre
+    assert response.freqs[200] == pytest.approx(1000)
+    assert response.phase_deg[200] == pytest.approx(phase, abs=0.1)
+
+
+@pytest.mark.parametrize('topology, order', [('sallen_key', 5), ('rc_ladder', 3)])
+def test_matches_synthesized_response(topology, order):
+    circuit = filter_synthesis.synthesize_filter(2000, order, 'butterworth', 'lowpass', topology)
+    response = analyze_ac(circuit)
+    expected = filter_synthesis.frequency_response(circuit, response.freqs)
+    assert np.allclose(response.magnitude, expected, rtol=1e-9, atol=1e-12)
+    assert response.cutoff_freq == pytest.approx(circuit['synthesis']['cutoff_freq'], rel=5e-3)
+    if topology == 'sallen_key':
+        assert response.rolloff_db_per_decade == pytest.approx(-20 * order, abs=0.5)
+
+
+def test_results_are_cached_per_circuit():
+    first = analyze_ac(rc('lowpass'))
+    # Same electrical content under other ids of dict objects hits the cache
+    assert analyze_ac(rc('lowpass')) is first
+    assert analyze_ac(rc('lowpass', r='2k')) is not first
+    assert analyze_ac(rc('lowpass'), points=50) is not first
+    with pytest.raises(ValueError):
+        first.gain[0] = 0
+
+
+def test_long_sweeps_are_solved_in_chunks(monkeypatch):
+    circuit = filter_synthesis.synthesize_filter(500, 4, 'chebyshev', 'highpass')
+    whole = analyze_ac(circuit, points=300).magnitude
+    monkeypatch.setattr(ac_analysis, 'MAX_BATCH_ENTRIES', 1)
+    monkeypatch.setattr(ac_analysis, '_cache', ac_analysis.OrderedDict())
+    assert np.allclose(analyze_ac(circuit, points=300).magnitude, whole)
+
+
+def test_unclear_or_broken_netlists_raise():
+    circuit = rc('lowpass')
+    circuit['components'].append(part('R2', 'resistor', 'N1', 'N2'))
+    circuit['components'].append(part('R3', 'resistor', 'N2', 'GND'))
+    with pytest.raises(ValueError, match='output net'):
+        analyze_ac(circuit)
+    assert analyze_ac(circuit, output_net='N2').magnitude[0] == pytest.approx(1 / 3, rel=1e-3)
+    with pytest.raises(ValueError, match='points'):
+        analyze_ac(rc('lowpass'), points=1)
+
+
+def test_explainer_reports_measured_response():
+    circuit = rc('lowpass', r='10k', c='15.9n')
+    text = generate_circuit_explanation(circuit)
+    cutoff = 1 / (2 * math.pi * 10e3 * 15.9e-9)
+    assert f"-3 dB point is at {cutoff / 1000:.3g}kHz, rolling off at -20 dB/decade" in text
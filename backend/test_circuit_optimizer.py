@@ -0,0 +1,88 @@
+"""
+Tests for RC pair optimization
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+import e_series
+from circuit_optimizer import ComponentOptimizer
+from component_calculator import ComponentCalculator, apply_cutoff_constraint
+
+
+def test_rc_search_finds_best_pair_and_alternatives():
+    ranked = ComponentOptimizer().search_rc_pairs(1000, top_k=4)
+    errors = [pair["error_percent"] for pair in ranked]
+    assert len(ranked) == 4 and errors == sorted(errors)
+    assert all(1e3 <= pair["resistance"] <= 100e3 for pair in ranked)
+
+    # Nothing in the grid beats the reported best pair
+    series = e_series.table('E12')
+    r = series[(series >= 1e3) & (series <= 100e3)]
+    c = series[(series >= 100e-12) & (series <= 10e-6)]
+    best = np.abs(1 / (2 * np.pi * np.multiply.outer(r, c)) - 1000).min() / 10
+    assert errors[0] == pytest.approx(best)
+
+
+def test_cutoff_constraint_rewrites_filter_values():
+    circuit = {
+        "constraints": {"cutoff_freq": "2kHz"},
+        "components": [{"id": "R1", "type": "resistor", "value": "1k"},
+                       {"id": "C1", "type": "capacitor", "value": "1u"}],
+    }
+    alternatives = apply_cutoff_constraint(circuit, top_k=3)
+    assert [comp["value"] for comp in circuit["components"]] == ["12.0k", "6.8n"]
+    assert len(alternatives) == 2
+    assert apply_cutoff_constraint({"components": circuit["components"]}) is None
+    # Malformed model output is left for the validator to report
+    assert apply_cutoff_constraint({"constraints": {"cutoff_freq": "1k"}, "components": ["R1", None]}) is None
+    assert apply_cutoff_constraint({"constraints": "1kHz", "components": circuit["components"]}) is None
+    assert apply_cutoff_constraint({"constraints": {"cutoff_freq": "1k"}, "components": "R1 C1"}) is None
+    # Out of reach of the standard ranges: the extracted values stand
+    for cutoff in ("10MHz", "0.01Hz"):
+        assert apply_cutoff_constraint({"constraints": {"cutoff_freq": cutoff},
+                                        "components": circuit["components"]}) is None
+        assert [comp["value"] for comp in circuit["components"]] == ["12.0k", "6.8n"]
+
+
+def test_divider_front_trades_accuracy_for_current():
+    front = ComponentOptimizer().search_divider_pairs(9, 5)
+    assert front[0]["error_percent"] == pytest.approx(0)
+    for better, cheaper in zip(front, front[1:]):
+        assert better["error_percent"] <= cheaper["error_percent"]
+        assert cheaper["current"] < better["current"]
+
+    limited = ComponentOptimizer().search_divider_pairs(9, 5, max_current=20e-6, max_output_impedance=150e3)
+    assert limited and all(p["current"] <= 20e-6 and p["output_impedance"] <= 150e3 for p in limited)
+    assert ComponentOptimizer().search_divider_pairs(9, 5, max_current=1e-9) == []
+
+
+def test_divider_batch_matches_single_searches():
+    rng = np.random.default_rng(0)
+    vin = rng.uniform(3, 24, 50)
+    vout = vin * rng.uniform(0.1, 0.9, 50)
+    batch = ComponentOptimizer(use_e24=True).search_divider_batch(vin, vout, max_power=1e-3)
+    for i in range(50):
+        best = ComponentOptimizer(use_e24=True).search_divider_pairs(vin[i], vout[i], max_power=1e-3)[0]
+        assert batch["error_percent"][i] == pytest.approx(best["error_percent"], abs=1e-7)
+
+    infeasible = ComponentOptimizer().search_divider_batch([9.0], [5.0], max_current=1e-9)
+    assert np.isnan(infeasible["r1"][0])
+
+
+def test_batch_calculators_match_scalar_calculators():
+    freqs = np.logspace(0, 6, 200)
+    rc = ComponentCalculator.calculate_rc_filter_batch(freqs)
+    assert rc.dtype.names == ('resistance', 'capacitance', 'frequency', 'error_percent')
+    assert ComponentCalculator.format_batch(rc) == [ComponentCalculator.calculate_rc_filter(f) for f in freqs]
+
+    vin = np.array([9.0, 12.0, 5.0, 24.0])
+    vout = np.array([5.0, 3.3, 2.5, 12.0])
+    divider = ComponentCalculator.calculate_voltage_divider_batch(vin, vout)
+    assert ComponentCalculator.format_batch(divider) == [
+        ComponentCalculator.calculate_voltage_divider(a, b) for a, b in zip(vin, vout)
+    ]
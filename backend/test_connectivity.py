@@ -0,0 +1,90 @@
+"""
+Tests for the connectivity engine and the validator checks built on it
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from circuit_validator import validate_circuit
+from connectivity import Connectivity
+
+
+def part(ref, comp_type, *nets, value='1k'):
+    return {'id': ref, 'type': comp_type, 'value': value, 'nets': list(nets)}
+
+
+def messages_of(circuit, level):
+    _, messages = validate_circuit(circuit)
+    return [m.message for m in messages if m.level.value == level]
+
+
+def test_islands_and_ground_reachability():
+    connectivity = Connectivity([
+        part('R1', 'resistor', 'IN', 'N1'),
+        part('C1', 'capacitor', 'N1', 'GND'),
+        part('R2', 'resistor', 'A', 'B'),
+        part('R3', 'resistor', 'B', 'A'),
+        part('R4', 'resistor', 'X', 'Y'),
+    ])
+    assert connectivity.islands() == [['R1', 'C1'], ['R2', 'R3'], ['R4']]
+    assert connectivity.ungrounded() == [['R2', 'R3'], ['R4']]
+    assert connectivity.connected('IN', 'GND') and not connectivity.connected('A', 'GND')
+    assert connectivity.connected('IN', 'MISSING') is None
+    assert connectivity.floating_nets() == [('IN', 'R1'), ('GND', 'C1'), ('X', 'R4'), ('Y', 'R4')]
+
+
+def test_shorts_and_parallel_sources():
+    connectivity = Connectivity([
+        part('V1', 'voltage_source', 'VCC', 'VCC', value='5'),
+        part('V2', 'voltage_source', 'IN', 'GND', value='5'),
+        part('V3', 'voltage_source', 'GND', 'IN', value='3.3'),
+        part('R1', 'resistor', 'IN', 'IN'),
+        # A follower ties two of its pins together without being shorted
+        part('U1', 'opamp', 'OUT', 'OUT', 'IN', 'VEE', '', '', '', 'VCC', value='TL072'),
+    ])
+    assert [(ref, net) for ref, _, net in connectivity.shorted] == [('V1', 'VCC'), ('R1', 'IN')]
+    assert connectivity.parallel_sources == [('V2', 'V3', ('IN', 'GND'))]
+
+
+def test_validator_reports_connectivity_problems():
+    circuit = {'type': 'rc_lowpass_filter', 'components': [
+        part('R1', 'resistor', 'IN', 'N1'),
+        part('C1', 'capacitor', 'N1', 'GND'),
+        part('R2', 'resistor', 'A', 'B'),
+        part('C2', 'capacitor', 'B', 'A', value='10n'),
+        part('V1', 'voltage_source', 'N1', 'N1', value='5'),
+    ]}
+    assert messages_of(circuit, 'ERROR') == ["Voltage source V1 is shorted: both terminals on net 'N1'"]
+    warnings = messages_of(circuit, 'WARNING')
+    assert "No path to ground from R2, C2" in warnings
+    assert "Net 'IN' connects to only one component: R1" in warnings
+
+    # Without any ground, disconnected parts are reported against the largest one
+    circuit['type'] = 'voltage_divider'
+    for comp in circuit['components']:
+        comp['nets'] = ['M' if net == 'GND' else net for net in comp['nets']]
+    assert "R2, C2 not connected to the rest of the circuit" in messages_of(circuit, 'WARNING')
+
+
+def test_validates_100k_part_netlist():
+    components = []
+    for i in range(50_000):
+        components.append(part(f'R{i}', 'resistor', f'N{i}', f'N{i + 1}'))
+        components.append(part(f'C{i}', 'capacitor', f'N{i + 1}', 'GND', value='100n'))
+    components.append(part('R_ISLAND', 'resistor', 'P', 'Q'))
+
+    # Timing lives in scripts/bench_validation_rules.py
+    is_valid, messages = validate_circuit({'type': 'rc_ladder', 'components': components})
+    assert is_valid
+    assert "No path to ground from R_ISLAND" in [m.message for m in messages]
+
+
+def test_vss_and_agnd_count_as_ground():
+    circuit = {'circuit_type': 'rc_lowpass', 'constraints': {'cutoff_freq': '1k'}, 'components': [
+        part('R1', 'resistor', 'IN', 'OUT'),
+        part('C1', 'capacitor', 'OUT', 'VSS', value='159n'),
+        part('R2', 'resistor', 'OUT', 'agnd', value='100k'),
+    ]}
+    assert not Connectivity(circuit['components']).ungrounded()
+    assert not any('ground' in message for message in messages_of(circuit, 'ERROR'))
@@ -0,0 +1,99 @@
+"""
+Tests for the DC operating-point solver and the validation it feeds
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+import dc_analysis
+from circuit_validator import validate_circuit
+from dc_analysis import solve_dc
+
+
+def part(ref, comp_type, *nets, value='1k', **extra):
+    return {'id': ref, 'type': comp_type, 'value': value, 'nets': list(nets), **extra}
+
+
+def divider(r1='100', r2='80'):
+    return [
+        part('V1', 'voltage_source', 'IN', 'GND', value='9V'),
+        part('R1', 'resistor', 'IN', 'OUT', value=r1),
+        part('R2', 'resistor', 'OUT', 'GND', value=r2),
+    ]
+
+
+def test_divider_operating_point():
+    solution = solve_dc(divider() + [part('C1', 'capacitor', 'OUT', 'GND', value='100n')])
+    assert solution.node_voltages == pytest.approx({'GND': 0.0, 'IN': 9.0, 'OUT': 4.0})
+    assert solution.currents['V1'] == pytest.approx(0.05)
+    assert solution.power == pytest.approx({'R1': 0.25, 'R2': 0.2, 'V1': 0.45})
+    # Nothing drives an RC filter on its own
+    assert solve_dc(divider()[1:]) is None
+
+
+def test_follower_inductor_and_current_source():
+    solution = solve_dc([
+        part('V1', 'voltage_source', 'IN', 'GND', value='5'),
+        part('L1', 'inductor', 'IN', 'A', value='10m'),
+        part('R1', 'resistor', 'A', 'B'),
+        part('R2', 'resistor', 'B', 'GND'),
+        part('U1', 'opamp', 'OUT', 'OUT', 'B', 'VEE', '', '', '', 'VCC', value='TL072'),
+        part('RL', 'resistor', 'OUT', 'GND', value='100'),
+        part('I1', 'current_source', 'GND', 'N', value='1m'),
+        part('R3', 'resistor', 'N', 'GND', value='2k'),
+    ])
+    voltages = solution.node_voltages
+    assert voltages['OUT'] == pytest.approx(2.5) and voltages['N'] == pytest.approx(2.0)
+    assert solution.currents['L1'] == pytest.approx(2.5e-3)
+    assert solution.currents['U1'] == pytest.approx(-25e-3)
+    assert 'VCC' not in voltages and solution.floating_nets == []
+
+
+def test_validator_flags_overpower_loops_and_floating_nets():
+    circuit = {'type': 'voltage_divider', 'components': divider('100', '20') + [
+        part('R3', 'resistor', 'X', 'Y', power_rating='1W'),
+        part('C1', 'capacitor', 'OUT', 'X', value='1u'),
+        part('L1', 'inductor', 'IN', 'GND', value='1m'),
+    ]}
+    is_valid, messages = validate_circuit(circuit)
+    assert not is_valid
+    errors = {m.component_id: m for m in messages if m.level.value == 'ERROR'}
+    assert set(errors) == {'R1', 'L1'}
+    assert errors['R1'].message == "Resistor R1 dissipates 562mW, over its 250mW rating"
+    assert errors['R1'].details['current'] == pytest.approx(0.075)
+    assert "Net 'X' has no DC path to ground; its voltage is undefined" in [m.message for m in messages]
+    info = [m for m in messages if m.level.value == 'INFO' and m.details and 'node_voltages' in m.details]
+    assert info[0].details['node_voltages']['OUT'] == pytest.approx(1.5)
+
+
+def test_supply_current_is_reported():
+    _, messages = validate_circuit({'type': 'voltage_divider', 'components': divider('10k', '10k')})
+    supplied = [m for m in messages if m.component_id == 'V1']
+    assert supplied[0].message == "V1 supplies 450uA (4.05mW)"
+    assert supplied[0].details['current'] == pytest.approx(4.5e-4)
+
+
+def ladder(sections):
+    components = [part('V1', 'voltage_source', 'N0', 'GND', value='5')]
+    for i in range(sections):
+        components.append(part(f'R{i}', 'resistor', f'N{i}', f'N{i + 1}'))
+        components.append(part(f'S{i}', 'resistor', f'N{i + 1}', 'GND', value='10k'))
+    return components
+
+
+def test_sparse_and_dense_solves_agree(monkeypatch):
+    sparse = solve_dc(ladder(300))
+    monkeypatch.setattr(dc_analysis, 'SPARSE_THRESHOLD', 10 ** 9)
+    dense = solve_dc(ladder(300))
+    assert dense.node_voltages == pytest.approx(sparse.node_voltages, rel=1e-9)
+
+
+def test_solves_thousands_of_nodes():
+    # Timing lives in scripts/bench_dc_analysis.py
+    solution = solve_dc(ladder(5000))
+    # Deep in the ladder the voltage ratio per section is constant
+    v = solution.node_voltages
+    assert v['N2'] / v['N1'] == pytest.approx(v['N3'] / v['N2'])
@@ -0,0 +1,79 @@
+"""
+Tests for request deadlines and cooperative cancellation
+"""
+
+import os
+import socket
+import sys
+import time
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+from config import Config
+from deadline import Deadline, DEADLINE_HEADER, client_disconnect_probe
+from error_handler import RequestCancelledError
+from file_manager import FileManager
+from scratch_workspace import ScratchWorkspacePool
+
+
+def test_budget_is_capped_by_remaining_time():
+    deadline = Deadline(5)
+    assert deadline.budget(30) <= 5
+    assert deadline.budget(1) == 1
+    deadline.check("stage")
+
+
+def test_expired_deadline_raises_with_stage():
+    deadline = Deadline(0)
+    with pytest.raises(RequestCancelledError) as exc:
+        deadline.check("intent_extraction")
+    assert exc.value.stage == "intent_extraction"
+    assert exc.value.reason == "deadline"
+
+
+def test_disconnect_cancels_before_deadline():
+    deadline = Deadline(60, cancel_check=lambda: True)
+    assert deadline.cancelled
+    assert deadline.reason == "disconnect"
+
+
+def test_probe_sees_client_close():
+    server, client = socket.socketpair()
+    with server:
+        probe = client_disconnect_probe({'werkzeug.socket': server}, interval=0)
+        assert probe() is False
+        client.close()
+        assert probe() is True
+
+
+def test_no_probe_without_nonblocking_peek(monkeypatch):
+    monkeypatch.delattr(socket, 'MSG_DONTWAIT', raising=False)
+    server, client = socket.socketpair()
+    with server, client:
+        assert client_disconnect_probe({'werkzeug.socket': server}) is None
+
+
+def test_header_overrides_config_deadline():
+    deadline = Deadline.from_headers({DEADLINE_HEADER: "2"})
+    assert deadline.remaining() <= 2
+
+
+@pytest.mark.parametrize("raw", ["nan", "inf", "-5", "0", "soon"])
+def test_bad_header_falls_back_to_config(raw):
+    deadline = Deadline.from_headers({DEADLINE_HEADER: raw})
+    assert 0 < deadline.remaining() <= Config.REQUEST_DEADLINE
+    assert not deadline.cancelled
+
+
+def test_execute_skidl_kills_process_on_deadline(tmp_path):
+    fm = FileManager(
+        output_dir=str(tmp_path / "output"),
+        scratch_pool=ScratchWorkspacePool(root=str(tmp_path / "scratch"))
+    )
+    started = time.monotonic()
+    with pytest.raises(RequestCancelledError):
+        fm.execute_skidl("import time\ntime.sleep(20)\n", "slow", Deadline(0.5))
+
+    assert time.monotonic() - started < 5
+    assert list((tmp_path / "output").iterdir()) == []
@@ -0,0 +1,43 @@
+"""
+Tests for E-series value lookup
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+import e_series
+from circuit_optimizer import ComponentOptimizer
+from component_calculator import ComponentCalculator
+
+
+def test_series_sizes_and_known_values():
+    for name in ('E6', 'E12', 'E24', 'E48', 'E96', 'E192'):
+        assert len(e_series.SERIES[name]) == int(name[1:])
+    assert 9.20 in e_series.SERIES['E192']
+    assert e_series.SERIES['E96'][-1] == 9.76
+
+
+def test_nearest_rounds_across_decades():
+    assert e_series.nearest(9.6e3) == 10e3
+    assert e_series.nearest(1.09) == 1.0
+    assert e_series.nearest(4.7e-9, 'E6') == 4.7e-9
+    assert e_series.nearest(1234.0, 'E96') == 1240.0
+    with pytest.raises(ValueError):
+        e_series.nearest(0.0)
+
+
+def test_array_lookup_matches_scalar_lookup():
+    values = np.logspace(-14, 12, 2000)
+    rounded = e_series.nearest(values.reshape(40, 50), 'E24')
+    assert rounded.shape == (40, 50)
+    assert rounded.ravel().tolist() == [e_series.nearest(v, 'E24') for v in values]
+
+
+def test_calculators_use_the_shared_tables():
+    assert ComponentCalculator._nearest_e12(9.9e3) == 10e3
+    assert ComponentCalculator._nearest_capacitor(9.5e-9) == 10e-9
+    assert ComponentOptimizer(use_e24=True).find_nearest_standard_value(2950.0)[0] == 3000.0
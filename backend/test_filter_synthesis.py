@@ -0,0 +1,124 @@
+"""
+Tests for higher-order filter synthesis
+"""
+
+import math
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+import filter_synthesis
+import si_units
+from circuit_validator import validate_circuit
+from dsl_generator import generate_dsl_from_json
+from filter_synthesis import stage_targets, synthesize_filter, synthesize_from_intent
+from skidl_generator import SKiDLGenerator
+
+
+def nodal_response(circuit_json, freq):
+    """Vout/Vin of the emitted netlist, solved node by node with ideal op-amp followers"""
+    components = circuit_json['components']
+    # Signal nets only: the op-amp supply pins carry no signal
+    nets = {net for comp in components if comp['type'] != 'opamp' for net in comp['nets']}
+    nets |= {comp['nets'][i] for comp in components if comp['type'] == 'opamp' for i in (0, 2)}
+    nets = sorted(nets - {'GND'})
+    index = {net: i for i, net in enumerate(nets)}
+    s = 2j * math.pi * freq
+    matrix = np.zeros((len(nets), len(nets)), dtype=complex)
+    rhs = np.zeros(len(nets), dtype=complex)
+    for comp in components:
+        if comp['type'] not in ('resistor', 'capacitor'):
+            continue
+        value = si_units.parse(comp['value'])
+        admittance = 1 / value if comp['type'] == 'resistor' else s * value
+        a, b = (index.get(net) for net in comp['nets'])
+        for i, j in ((a, b), (b, a)):
+            if i is not None:
+                matrix[i, i] += admittance
+                if j is not None:
+                    matrix[i, j] -= admittance
+    # Driven input and follower outputs replace their node equations
+    fixed = [(index['IN'], None)]
+    fixed += [(index[comp['nets'][0]], index[comp['nets'][2]]) for comp in components if comp['type'] == 'opamp']
+    for row, follows in fixed:
+        matrix[row] = 0
+        matrix[row, row] = 1
+        if follows is None:
+            rhs[row] = 1
+        else:
+            matrix[row, follows] = -1
+    return abs(np.linalg.solve(matrix, rhs)[index['OUT']])
+
+
+def test_prototype_stages_match_tables():
+    assert [q for _, q in stage_targets('butterworth', 4)] == pytest.approx([0.5412, 1.3066], abs=1e-4)
+    assert stage_targets('butterworth', 3)[0] == (pytest.approx(1.0), None)
+    assert stage_targets('bessel', 2)[0][1] == pytest.approx(1 / math.sqrt(3), abs=1e-4)
+    omega, q = stage_targets('chebyshev', 2, ripple_db=1.0)[0]
+    assert (omega, q) == (pytest.approx(1.0500, abs=1e-3), pytest.approx(0.9565, abs=1e-3))
+    # Bessel prototypes are rescaled to -3 dB at the cutoff
+    poles = filter_synthesis.prototype_poles('bessel', 5)
+    assert filter_synthesis._gain(poles, 1.0) == pytest.approx(1 / math.sqrt(2))
+
+
+@pytest.mark.parametrize('topology,response,filter_type,order', [
+    ('sallen_key', 'butterworth', 'lowpass', 3),
+    ('sallen_key', 'chebyshev', 'highpass', 4),
+    ('sallen_key', 'bessel', 'highpass', 5),
+    ('rc_ladder', 'butterworth', 'lowpass', 3),
+    ('rc_ladder', 'butterworth', 'highpass', 4),
+])
+def test_emitted_netlist_realizes_reported_response(topology, response, filter_type, order):
+    circuit = synthesize_filter(2000, order, response, filter_type, topology)
+    for freq in (200, 1500, 2000, 3000, 20000):
+        expected = filter_synthesis.frequency_response(circuit, [freq])[0]
+        assert nodal_response(circuit, freq) == pytest.approx(expected, rel=1e-3)
+
+
+@pytest.mark.parametrize('response', filter_synthesis.RESPONSES)
+@pytest.mark.parametrize('filter_type', filter_synthesis.FILTER_TYPES)
+def test_cutoff_is_close_for_every_order(response, filter_type):
+    for order in range(2, filter_synthesis.MAX_ORDER + 1):
+        synthesis = synthesize_filter(1000, order, response, filter_type)['synthesis']
+        assert synthesis['cutoff_error_percent'] < 3, (order, synthesis['cutoff_freq'])
+        assert len(synthesis['stages']) == (order + 1) // 2
+
+
+def test_circuit_json_feeds_dsl_and_skidl():
+    circuit = synthesize_filter(1000, 4, 'butterworth', 'lowpass')
+    is_valid, messages = validate_circuit(circuit)
+    assert is_valid and not [m for m in messages if 'value' in m.message]
+
+    code = SKiDLGenerator().dsl_to_skidl(generate_dsl_from_json(circuit))
+    assert code.count("Part('Device', 'Opamp_Dual'") == 2
+    # Section A only: output and inverting input tied, section B pins unconnected
+    assert 'U1[1] += N3' in code and 'U1[2] += N3' in code and 'U1[3] += N2' in code
+    assert 'U1[5]' not in code
+
+
+def test_synthesize_from_intent_only_expands_higher_orders():
+    extracted = {'circuit_type': 'rc_highpass', 'components': [],
+                 'constraints': {'cutoff_freq': '1k', 'order': '3', 'response': 'Bessel'}}
+    circuit = synthesize_from_intent(extracted)
+    assert circuit['type'] == 'bessel_highpass_filter'
+    assert circuit['constraints']['order'] == 3
+    extracted['constraints']['order'] = '1'
+    assert synthesize_from_intent(extracted) is None
+    assert synthesize_from_intent({'circuit_type': 'voltage_divider', 'constraints': {'order': 2}}) is None
+    with pytest.raises(ValueError, match='Order'):
+        synthesize_from_intent({'circuit_type': 'rc_lowpass',
+                                'constraints': {'cutoff_freq': '1k', 'order': filter_synthesis.MAX_ORDER + 1}})
+    with pytest.raises(ValueError, match='Constraints'):
+        synthesize_from_intent({'circuit_type': 'rc_lowpass', 'constraints': ['1kHz', 'order 4']})
+
+
+def test_rejects_unsupported_designs():
+    with pytest.raises(ValueError):
+        synthesize_filter(1000, filter_synthesis.MAX_ORDER + 1)
+    with pytest.raises(ValueError):
+        synthesize_filter(1000, 2, response='elliptic')
+    with pytest.raises(ValueError):
+        synthesize_filter(-5, 2)
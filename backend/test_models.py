@@ -0,0 +1,91 @@
+"""
+Tests for the pydantic circuit schema
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+from circuit_validator import validate_circuit
+from models import Circuit, check_schema, component_warnings, validate_circuit_json, validate_circuits
+
+
+def rc_lowpass(**constraints):
+    return {
+        'circuit_type': 'rc_lowpass',
+        'components': [
+            {'id': 'R1', 'type': 'resistor', 'value': 1000, 'nets': ['IN', 'OUT']},
+            {'id': 'C1', 'type': 'capacitor', 'value': '159n', 'nets': ['OUT', 'GND']},
+        ],
+        'constraints': constraints,
+    }
+
+
+def test_generated_circuits_pass_the_schema():
+    circuit, errors = check_schema(rc_lowpass(cutoff_freq=1000, order=1))
+    assert errors == []
+    assert circuit.components[0].value == '1000' and circuit.constraints.cutoff_freq == '1000'
+
+    # 'type' stands in for circuit_type; op-amps carry part numbers and unused pins
+    circuit, errors = check_schema({'type': 'butterworth_lowpass_filter', 'components': [
+        {'id': 'U1', 'type': 'opamp', 'value': 'TL072', 'nets': ['OUT', 'OUT', 'IN', 'VEE', '', '', '', 'VCC']},
+    ]})
+    assert errors == [] and circuit.circuit_type == 'butterworth_lowpass_filter'
+
+
+def test_errors_name_the_component():
+    circuit = rc_lowpass(cutoff_freq='1k')
+    circuit['components'][0]['value'] = '-1k'
+    circuit['components'][1]['nets'] = ['OUT']
+    _, errors = check_schema(circuit)
+    assert errors == [('R1', 'Component R1: value must be positive'),
+                      ('C1', 'Component C1: must connect to at least 2 nets')]
+
+
+def test_unknown_types_and_unparseable_values_only_warn():
+    circuit = rc_lowpass(cutoff_freq='1k')
+    circuit['components'][0]['value'] = 'big'
+    circuit['components'][1].update(type='resonator')
+    circuit['components'].append({'id': 'G1', 'type': 'ground', 'value': '', 'nets': ['GND']})
+    model, errors = check_schema(circuit)
+    assert errors == []
+    assert component_warnings(model) == [('R1', "Component R1 value 'big' cannot be parsed"),
+                                         ('C1', 'Component C1 has unrecognized type: resonator')]
+    _, messages = validate_circuit(circuit)
+    assert [m.component_id for m in messages if m.level.value == 'WARNING'][:2] == ['R1', 'C1']
+
+
+def test_validator_reports_schema_errors():
+    circuit = rc_lowpass(cutoff_freq='1k')
+    circuit['components'][0]['nets'] = ['IN', 'OUT', 'GND']
+    is_valid, messages = validate_circuit(circuit)
+    assert not is_valid
+    assert [(m.level.value, m.component_id) for m in messages if m.level.value == 'ERROR'] == [('ERROR', 'R1')]
+
+
+def test_batch_validation_keeps_order():
+    good = rc_lowpass(cutoff_freq='1k')
+    bad_value = rc_lowpass(cutoff_freq='1k')
+    bad_value['components'][1]['value'] = '-100n'
+    results = validate_circuits([good, bad_value, good, {'components': []}])
+    assert [isinstance(circuit, Circuit) for circuit, _ in results] == [True, False, True, False]
+    assert results[1][1] == [('C1', 'Component C1: value must be positive')]
+    assert {message for _, message in results[3][1]} == {
+        'circuit_type: Field required', 'components: List should have at least 1 item after validation, not 0'}
+    assert validate_circuits([good, good])[1][1] == []
+    with pytest.raises(TypeError, match='list of circuits'):
+        validate_circuits(good)
+
+
+def test_validate_circuit_json_applies_circuit_type_rules():
+    model, errors = validate_circuit_json(rc_lowpass())
+    assert model is None and errors == ['Validation error: rc_lowpass requires cutoff_freq in constraints']
+
+
+def test_validate_circuit_json_rejects_shorted_parts():
+    circuit = rc_lowpass(cutoff_freq='1k')
+    circuit['components'][0]['nets'] = ['OUT', 'OUT']
+    model, errors = validate_circuit_json(circuit)
+    assert model is None and "R1 on 'OUT'" in errors[0]
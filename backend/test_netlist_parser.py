@@ -0,0 +1,77 @@
+"""
+Tests for the streaming KiCad netlist parser
+"""
+
+import io
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+from netlist_parser import parse_netlist, tokenize, NetlistParseError, STRING
+
+SAMPLE_NETLIST = '''(export (version "D")
+  (design (source "circuit.py") (tool "SKiDL (2.2.0)"))
+  (components
+    (comp (ref "C1") (value "159n")
+      (footprint "Capacitor_SMD:C_0805_2012Metric")
+      (fields (field (name "Datasheet") "~"))
+      (libsource (lib "Device") (part "C")))
+    (comp (ref "R1") (value "1k")
+      (libsource (lib "Device") (part "R"))))
+  (nets
+    (net (code 1) (name "GND") (class "Default")
+      (node (ref "C1") (pin "2") (pintype "PASSIVE")))
+    (net (code 2) (name "N1") (class "Default")
+      (node (ref "C1") (pin "1") (pintype "PASSIVE"))
+      (node (ref "R1") (pin "2") (pintype "PASSIVE")))))
+'''
+
+
+def synthetic_netlist(parts: int, nodes_per_net: int = 50) -> str:
+    comps = ''.join(
+        f'(comp (ref "R{i}") (value "1k") (libsource (lib "Device") (part "R")))\n'
+        for i in range(parts)
+    )
+    nets = []
+    for code, start in enumerate(range(0, parts, nodes_per_net), start=1):
+        nodes = ''.join(
+            f'(node (ref "R{i}") (pin "1"))' for i in range(start, min(start + nodes_per_net, parts))
+        )
+        nets.append(f'(net (code {code}) (name "N{code}") {nodes})\n')
+    return f'(export (components {comps}) (nets {"".join(nets)}))'
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 65536])
+def test_parses_components_and_nets(chunk_size):
+    netlist = parse_netlist(io.StringIO(SAMPLE_NETLIST), chunk_size=chunk_size)
+
+    assert netlist.component_values() == [("C1", "159n"), ("R1", "1k")]
+    assert netlist.components[0].lib_id == "Device:C"
+    assert netlist.components[0].footprint == "Capacitor_SMD:C_0805_2012Metric"
+    assert netlist.net_map() == {
+        "GND": [("C1", "2")],
+        "N1": [("C1", "1"), ("R1", "2")],
+    }
+    assert netlist.nets[1].code == 2
+
+
+def test_string_offsets_and_escapes():
+    text = '(value "a\\"b") (x "ok")'
+    tokens = [t for t in tokenize(io.StringIO(text), chunk_size=3) if t[0] == STRING]
+
+    assert tokens[0][1] == 'a"b'
+    assert text[tokens[1][2]:tokens[1][3]] == '"ok"'
+
+
+def test_large_nets_are_parsed_completely():
+    netlist = parse_netlist(io.StringIO(synthetic_netlist(5000, nodes_per_net=2500)))
+
+    assert len(netlist.components) == 5000
+    assert [len(net.nodes) for net in netlist.nets] == [2500, 2500]
+
+
+def test_unbalanced_netlist_is_rejected():
+    with pytest.raises(NetlistParseError):
+        parse_netlist(io.StringIO('(export (components (comp (ref "R1"))'))
@@ -0,0 +1,117 @@
+"""
+Tests for the local parts catalog
+"""
+
+import os
+import sqlite3
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+import parts_catalog
+from circuit_optimizer import ComponentOptimizer
+from component_calculator import ComponentCalculator
+from parts_catalog import CatalogPart, PartsCatalog
+
+ROWS = [
+    ('R-1K', 'resistor', '1k', '1%', '0603', 500),
+    ('R-4K7', 'resistor', '4.7k', '5%', '0603', 200),
+    ('R-4K7-P', 'resistor', '4k7', '0.1%', '0805', 20),
+    ('R-10K', 'resistor', '10k', '1%', '0603', 1000),
+    ('R-12K', 'resistor', '12k', '1%', '0603', 0),
+    ('R-33K', 'resistor', '33k', '1%', '0603', 300),
+    ('C-10N', 'capacitor', '10nF', '10%', '0603', 800),
+    ('C-100N', 'capacitor', '100n', '10%', '0603', 900),
+]
+
+
+@pytest.fixture
+def catalog():
+    return PartsCatalog(parts_catalog._part_from_row(dict(zip(parts_catalog.COLUMNS, row))) for row in ROWS)
+
+
+def test_csv_and_sqlite_load_the_same_stocked_parts(tmp_path):
+    csv_path = tmp_path / 'parts.csv'
+    csv_path.write_text('sku,type,value,tolerance,package,stock\n'
+                        + ''.join(','.join(map(str, row)) + '\n' for row in ROWS))
+    db_path = tmp_path / 'parts.db'
+    with sqlite3.connect(db_path) as connection:
+        connection.execute('CREATE TABLE parts (sku, type, value, tolerance, package, stock)')
+        connection.executemany('INSERT INTO parts VALUES (?, ?, ?, ?, ?, ?)', ROWS)
+    connection.close()
+
+    from_csv = PartsCatalog.from_file(str(csv_path))
+    from_db = PartsCatalog.from_file(str(db_path))
+    assert from_csv.parts == from_db.parts
+    # The out-of-stock 12k is dropped
+    assert len(from_csv) == len(ROWS) - 1
+    assert from_csv.values('resistor').tolist() == [1e3, 4.7e3, 10e3, 33e3]
+
+
+def test_nearest_returns_closest_stocked_part(catalog):
+    assert catalog.nearest('resistor', 11.5e3).value == 10e3   # 12k is out of stock
+    assert catalog.nearest('resistor', 20e3).value == 33e3     # closer by ratio than 10k
+    assert catalog.nearest('resistor', 1.0).value == 1e3
+    assert catalog.nearest('resistor', 1e9).value == 33e3
+    # Duplicate values resolve to the tightest tolerance
+    assert catalog.nearest('resistor', 4.7e3).sku == 'R-4K7-P'
+    assert catalog.nearest('resistor', 4.7e3, package='0603').sku == 'R-4K7'
+    assert catalog.nearest('inductor', 1e-3) is None
+
+
+def test_nearest_matches_brute_force_on_large_catalog():
+    rng = np.random.default_rng(1)
+    values = np.unique(np.round(10 ** rng.uniform(0, 7, 20_000), 1))
+    catalog = PartsCatalog(CatalogPart(str(i), 'resistor', float(v), 0.01, '0603', 1)
+                           for i, v in enumerate(values))
+    for target in 10 ** rng.uniform(0, 7, 200):
+        expected = values[np.abs(np.log(values / target)).argmin()]
+        assert catalog.nearest('resistor', target).value == pytest.approx(expected)
+
+
+def test_optimizer_searches_only_stocked_values(catalog):
+    optimizer = ComponentOptimizer(catalog=catalog)
+    stocked_r = set(catalog.values('resistor').tolist())
+    stocked_c = set(catalog.values('capacitor').tolist())
+
+    for pair in optimizer.search_rc_pairs(1000, top_k=5):
+        assert pair['resistance'] in stocked_r and pair['capacitance'] in stocked_c
+    batch = optimizer.search_rc_batch([100, 1000, 5000])
+    assert set(batch['resistance'].tolist()) <= stocked_r
+    assert set(batch['capacitance'].tolist()) <= stocked_c
+
+    front = optimizer.search_divider_pairs(9, 5, resistance_range=(1e3, 100e3))
+    assert all(d['r1'] in stocked_r and d['r2'] in stocked_r for d in front)
+    assert optimizer.find_nearest_standard_value(11.5e3)[0] == 10e3
+
+
+def test_calculator_uses_default_catalog(catalog):
+    parts_catalog.set_default_catalog(catalog)
+    try:
+        r, c = ComponentCalculator.calculate_rc_filter(1000)
+        assert (r, c) == ('33.0k', '10.0n')   # 482Hz, the closest stocked pair
+        assert ComponentCalculator._nearest_e12(11.5e3) == 10e3
+    finally:
+        parts_catalog.set_default_catalog(None)
+    assert ComponentCalculator._nearest_e12(11.5e3) == 12e3
+
+
+def test_bad_rows_are_skipped_and_load_failures_cached(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "parts.csv"
+    path.write_text(",".join(parts_catalog.COLUMNS) + "\nR-1K,resistor,1k,1%,0603,5\nR-BAD,resistor,lots,1%,0603,5\n")
+    assert [part.sku for part in PartsCatalog.from_csv(str(path)).parts] == ['R-1K']
+    assert "skipped 1 malformed row" in capsys.readouterr().out
+
+    calls = []
+    def unreadable(*args):
+        calls.append(args)
+        raise OSError("no such file")
+    monkeypatch.setattr(parts_catalog.Config, 'PARTS_CATALOG', str(tmp_path / "missing.csv"))
+    monkeypatch.setattr(PartsCatalog, 'from_file', unreadable)
+    monkeypatch.setattr(parts_catalog, '_default_loaded', False)
+    monkeypatch.setattr(parts_catalog, '_default_catalog', None)
+    assert parts_catalog.default_catalog() is None
+    assert parts_catalog.default_catalog() is None
+    assert len(calls) == 1
@@ -0,0 +1,69 @@
+"""
+Tests for automatic schematic placement
+"""
+
+import io
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from netlist_parser import Netlist, NetlistComponent, NetlistNet, NetlistNode
+from placement import place, GRID
+from file_manager import FileManager
+from schematic_writer import SchematicWriter
+
+
+def rc_ladder(stages: int) -> Netlist:
+    netlist = Netlist()
+    nets = {'IN': [], 'GND': []}
+    for i in range(1, stages + 1):
+        left = 'IN' if i == 1 else f'N{i - 1}'
+        right = 'OUT' if i == stages else f'N{i}'
+        netlist.components += [NetlistComponent(f'R{i}', '1k', 'Device', 'R'),
+                               NetlistComponent(f'C{i}', '100n', 'Device', 'C')]
+        nets.setdefault(left, []).append(NetlistNode(f'R{i}', '1'))
+        nets.setdefault(right, []).append(NetlistNode(f'R{i}', '2'))
+        nets[right].append(NetlistNode(f'C{i}', '1'))
+        nets['GND'].append(NetlistNode(f'C{i}', '2'))
+    netlist.nets = [NetlistNet(code, name, nodes) for code, (name, nodes) in enumerate(nets.items(), 1)]
+    return netlist
+
+
+def test_positions_are_unique_and_on_grid():
+    placement = place(rc_ladder(50))
+    positions = [(s.x, s.y) for s in placement.symbols.values()]
+
+    assert len(placement.symbols) == 100
+    assert len(set(positions)) == len(positions)
+    for x, y in positions:
+        assert abs(x / GRID - round(x / GRID)) < 1e-6
+        assert abs(y / GRID - round(y / GRID)) < 1e-6
+
+
+def test_signal_flows_left_to_right():
+    symbols = place(rc_ladder(3)).symbols
+
+    assert symbols['R1'].x < symbols['R2'].x < symbols['R3'].x
+    # Ground-connected parts sit below the series element of their column
+    assert symbols['C1'].x == symbols['R2'].x
+    assert symbols['C1'].y > symbols['R2'].y
+
+
+def test_places_thousand_parts():
+    netlist = rc_ladder(500)
+    placement = place(netlist)
+    assert len(placement.symbols) == 1000
+
+
+def test_generic_schematic_places_every_part(tmp_path):
+    netlist = rc_ladder(2)
+    netlist.components.append(NetlistComponent('L1', '10u', 'Device', 'L'))
+    netlist.nets.append(NetlistNet(9, 'OUT2', [NetlistNode('L1', '1')]))
+    buf = io.StringIO()
+
+    FileManager(output_dir=str(tmp_path))._generate_generic_schematic(SchematicWriter(buf), netlist)
+    text = buf.getvalue()
+
+    assert text.count('(symbol (lib_id "Device:') == len(netlist.components)
+    assert text.count('(lib_id "power:GND")') == 2
+    assert '(wire ' in text
@@ -0,0 +1,70 @@
+"""
+Tests for the streaming schematic writer
+"""
+
+import io
+import re
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from netlist_parser import tokenize, LPAREN, RPAREN
+from schematic_writer import SchematicWriter
+
+
+def write_sample(lib_ids=None, deterministic=True) -> str:
+    buf = io.StringIO()
+    writer = SchematicWriter(buf, deterministic=deterministic)
+    writer.begin(lib_ids=lib_ids)
+    writer.emit_symbol("Device:R", "R1", "1k", (120, 100), reference_at=(120, 95))
+    writer.emit_power((140, 123.81))
+    writer.emit_wire((114.92, 100), (100, 100))
+    writer.emit_junction((125.08, 115))
+    writer.emit_label("IN", (100, 100))
+    writer.end()
+    return buf.getvalue()
+
+
+def test_output_is_balanced_sexpr():
+    depth = 0
+    for kind, _, _, _ in tokenize(io.StringIO(write_sample())):
+        depth += {LPAREN: 1, RPAREN: -1}.get(kind, 0)
+        assert depth >= 0
+    assert depth == 0
+
+
+def test_coordinates_are_formatted_without_float_noise():
+    text = write_sample()
+    assert "(xy 114.92 100)" in text
+    assert "(at 140 130.16 0)" in text
+    assert '"#PWR001"' in text
+
+
+def test_lib_symbols_are_selectable():
+    assert '(symbol "Simulation_SPICE:VDC"' in write_sample()
+    only_r = write_sample(lib_ids=["Device:R"])
+    assert '(symbol "Device:R"' in only_r
+    assert '(symbol "Device:C"' not in only_r
+    assert "(lib_symbols)" in write_sample(lib_ids=())
+
+
+def test_deterministic_output_is_reproducible():
+    first, second = write_sample(), write_sample()
+    uuids = re.findall(r'\(uuid ([0-9a-f-]+)\)', first)
+
+    assert first == second
+    assert "(date " not in first
+    assert len(uuids) == len(set(uuids))
+
+
+def test_random_uuids_when_disabled():
+    assert write_sample(deterministic=False) != write_sample(deterministic=False)
+
+
+def test_header_version_reads_the_embedded_library_syntax():
+    # A schematic may not declare an older format than the library symbols it embeds
+    text = write_sample(lib_ids=["Device:L"])
+    assert "(hide yes)" in text
+    with open(os.path.join(os.path.dirname(__file__), "..", "kicad_libs", "symbols", "Device.kicad_sym")) as f:
+        library_version = int(re.search(r'\(version (\d+)\)', f.read(200)).group(1))
+    assert int(re.match(r'\(kicad_sch \(version (\d+)\)', text).group(1)) >= library_version
@@ -0,0 +1,50 @@
+"""
+Tests for scratch workspace recycling and artifact promotion
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from scratch_workspace import ScratchWorkspacePool
+
+
+def test_workspace_is_recycled(tmp_path):
+    pool = ScratchWorkspacePool(root=str(tmp_path / "scratch"), max_idle=2)
+
+    with pool.workspace() as slot:
+        (slot / "circuit.erc").write_text("debris")
+        (slot / "nested").mkdir()
+        (slot / "nested" / "file.log").write_text("debris")
+        first = slot
+
+    assert pool.idle_count() == 1
+    with pool.workspace() as slot:
+        assert slot == first
+        assert list(slot.iterdir()) == []
+
+
+def test_idle_pool_is_bounded(tmp_path):
+    pool = ScratchWorkspacePool(root=str(tmp_path / "scratch"), max_idle=1)
+    a, b = pool.acquire(), pool.acquire()
+    pool.release(a)
+    pool.release(b)
+
+    assert pool.idle_count() == 1
+    assert not b.exists()
+
+
+def test_promote_publishes_only_artifacts(tmp_path):
+    pool = ScratchWorkspacePool(root=str(tmp_path / "scratch"))
+    dest = tmp_path / "output" / "circuit_abc"
+    dest.parent.mkdir()
+
+    with pool.workspace() as slot:
+        (slot / "circuit.py").write_text("code")
+        (slot / "circuit.net").write_text("(export)")
+        (slot / "circuit.erc").write_text("debris")
+        published = pool.promote(slot, dest, ["circuit.py", "circuit.net"])
+
+    assert sorted(p.name for p in published) == ["circuit.net", "circuit.py"]
+    assert sorted(p.name for p in dest.iterdir()) == ["circuit.net", "circuit.py"]
+    assert not any(p.name.endswith(".partial") for p in dest.parent.iterdir())
@@ -0,0 +1,99 @@
+"""
+Tests for hierarchical sheet generation
+"""
+
+import io
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import pytest
+
+import sheet_builder
+from netlist_parser import Netlist, NetlistComponent, NetlistNet, NetlistNode
+from schematic_writer import SchematicWriter
+from sheet_builder import partition_netlist, write_hierarchical_schematic
+from test_placement import rc_ladder
+
+
+def clusters(count: int, size: int) -> Netlist:
+    """count fully connected resistor clusters chained by a single net each"""
+    netlist = Netlist()
+    nets = {}
+    for c in range(count):
+        refs = [f"R{c * size + i + 1}" for i in range(size)]
+        for i, ref in enumerate(refs):
+            netlist.components.append(NetlistComponent(ref, '1k', 'Device', 'R'))
+            nets.setdefault(f"C{c}_A", []).append(NetlistNode(ref, '1'))
+            nets.setdefault(f"C{c}_B", []).append(NetlistNode(ref, '2'))
+        if c:
+            nets[f"C{c - 1}_B"].append(NetlistNode(refs[0], '1'))
+    netlist.nets = [NetlistNet(code, name, nodes) for code, (name, nodes) in enumerate(nets.items(), 1)]
+    # Interleave so the partitioner cannot rely on netlist order
+    netlist.components = netlist.components[::2] + netlist.components[1::2]
+    return netlist
+
+
+def test_partition_respects_size_and_cuts_few_nets():
+    netlist = clusters(4, 10)
+    groups = partition_netlist(netlist, 20)
+
+    assert sorted(ref for group in groups for ref in group) == sorted(c.ref for c in netlist.components)
+    assert all(len(group) <= 20 for group in groups)
+
+    sheet_of = {ref: i for i, group in enumerate(groups) for ref in group}
+    cut = [net.name for net in netlist.nets if len({sheet_of[n.ref] for n in net.nodes}) > 1]
+    assert len(cut) <= 2
+
+
+def test_hierarchical_output_links_sheets(tmp_path):
+    netlist = rc_ladder(30)
+    buf = io.StringIO()
+    paths = write_hierarchical_schematic(SchematicWriter(buf), netlist, tmp_path, "circuit", 20, workers=1)
+    root = buf.getvalue()
+
+    assert len(paths) >= 3
+    assert root.count('(sheet (at ') == len(paths)
+    placed = 0
+    for path in paths:
+        text = path.read_text()
+        assert f'(property "Sheetfile" "{path.name}"' in root
+        placed += text.count('(symbol (lib_id "Device:')
+        for line in text.splitlines():
+            if '(hierarchical_label "' in line:
+                name = line.split('"')[1]
+                assert f'(pin "{name}" bidirectional' in root
+    assert placed == len(netlist.components)
+
+    # Power references stay unique across sheets
+    power = [line.split('"')[3] for path in paths for line in path.read_text().splitlines()
+             if '(property "Reference" "#PWR0' in line]
+    assert len(power) == len(set(power)) == 30
+
+
+def test_parallel_sheets_keep_routing_metrics(tmp_path):
+    from analytics import metrics
+    counts = []
+    for workers in (1, 2):
+        before = metrics.metrics["net_routes_total"]
+        write_hierarchical_schematic(SchematicWriter(io.StringIO()), rc_ladder(30), tmp_path, "circuit", 20,
+                                     workers=workers)
+        counts.append(metrics.metrics["net_routes_total"] - before)
+    assert counts[0] > 0 and counts[0] == counts[1]
+
+
+def test_failed_sheet_removes_written_sheets(tmp_path, monkeypatch):
+    draw = sheet_builder.draw_netlist
+    calls = []
+
+    def fail_second(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("drawing failed")
+        draw(*args, **kwargs)
+
+    monkeypatch.setattr(sheet_builder, 'draw_netlist', fail_second)
+    with pytest.raises(RuntimeError):
+        write_hierarchical_schematic(SchematicWriter(io.StringIO()), rc_ladder(30), tmp_path, "circuit", 20,
+                                     workers=1)
+    assert list(tmp_path.iterdir()) == []
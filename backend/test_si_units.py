@@ -0,0 +1,67 @@
+"""
+Tests for SI value parsing and formatting
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+import si_units
+from circuit_validator import validate_circuit
+from explainer import ExplanationGenerator
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("4.7k", 4.7e3), ("4k7", 4.7e3), ("4R7", 4.7), ("R47", 0.47), ("100nF", 100e-9),
+    ("2.2µF", 2.2e-6), ("2.2uF", 2.2e-6), ("5mA", 5e-3), ("10M", 10e6), ("1 kHz", 1e3),
+    ("1.5kΩ", 1.5e3), ("9V", 9.0), ("1e3", 1e3), ("-5k", -5e3), ("330", 330.0),
+    # Units in any case, and SPICE's meg, as the old explainer parser accepted
+    ("100nf", 100e-9), ("10uf", 10e-6), ("5.5v", 5.5), ("1meg", 1e6), ("2.2MEG", 2.2e6),
+    ("10 kOhms", 10e3), ("4.7KOHM", 4.7e3), ("1khz", 1e3), ("10mH", 10e-3), ("1f", 1e-15),
+])
+def test_parse(text, expected):
+    # Exact: the prefix shifts the decimal exponent instead of multiplying
+    assert si_units.parse(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "k", "abc", "1.5k7", "4x", "1farad"])
+def test_parse_rejects_malformed_values(text):
+    with pytest.raises(ValueError):
+        si_units.parse(text)
+    assert si_units.try_parse(text) is None
+
+
+def test_format_round_trips():
+    for value in (4.7e3, 33e-9, 1e6, 0.47, 150e-15, 12.4e3):
+        assert si_units.parse(si_units.format_value(value)) == pytest.approx(value)
+    assert si_units.format_value(999.6) == "1k"
+    assert si_units.format_value(15e3, decimals=1) == "15.0k"
+    assert si_units.format_value(999.96, decimals=1) == "1.0k"
+    assert si_units.format_value(-999.996e-6, "A", decimals=2) == "-1.00mA"
+    assert si_units.format_value(4.7e-9, "F") == "4.7nF"
+
+
+def test_parse_array_keeps_shape_and_marks_bad_values():
+    parsed = si_units.parse_array([["1k", "2.2u"], ["bad", "1k"]])
+    assert parsed.shape == (2, 2)
+    assert parsed[0, 0] == parsed[1, 1] == 1e3 and parsed[0, 1] == 2.2e-6
+    assert np.isnan(parsed[1, 0])
+
+
+def test_modules_share_the_parser():
+    # "m" is milli, not mega as the old explainer parser had it
+    assert ExplanationGenerator()._parse_value("10m") == 10e-3
+
+    circuit = {
+        'type': 'voltage_divider',
+        'components': [
+            {'id': 'R1', 'type': 'resistor', 'value': '-4k7', 'nets': ['IN', 'OUT']},
+            {'id': 'R2', 'type': 'resistor', 'value': '4k7', 'nets': ['OUT', 'GND']},
+        ],
+    }
+    is_valid, messages = validate_circuit(circuit)
+    assert not is_valid
+    assert [m.component_id for m in messages if m.level.value == "ERROR"] == ['R1']
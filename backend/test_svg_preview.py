@@ -0,0 +1,65 @@
+"""
+Tests for SVG schematic previews
+"""
+
+import io
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from xml.etree import ElementTree
+
+from schematic_writer import SchematicWriter
+from sheet_builder import draw_netlist
+from svg_preview import SchematicPreview
+from test_placement import rc_ladder
+from test_value_patcher import make_manager, generate, RC_CODE
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def test_preview_records_what_the_writer_draws():
+    preview = SchematicPreview()
+    netlist = rc_ladder(3)
+    draw_netlist(SchematicWriter(io.StringIO(), observer=preview), netlist)
+    svg = preview.render()
+    root = ElementTree.fromstring(svg)
+
+    # One definition per symbol type, one instance per placed symbol
+    assert len(root.find(f'{SVG}defs')) == len({s['lib_id'] for s in preview.symbols})
+    assert len(root.findall(f'.//{SVG}use')) == len(preview.symbols)
+    assert len(preview.symbols) >= len(netlist.components)
+    assert preview.wires and root.find(f'{SVG}path') is not None
+    texts = [text.text for text in root.iter(f'{SVG}text')]
+    assert all(comp.ref in texts for comp in netlist.components)
+
+
+def test_with_values_only_changes_values():
+    preview = SchematicPreview()
+    preview.symbol("Device:R", "R1", "1k", (10.0, 10.0), 0, None, None, False)
+    patched = preview.with_values({"R1": "4.7k"})
+
+    assert ">4.7k<" in patched.render() and ">1k<" not in patched.render()
+    assert preview.symbols[0]['value'] == "1k"
+
+
+def test_previews_are_stored_once_per_schematic(tmp_path):
+    manager = make_manager(tmp_path, 'out')
+    generate(manager, '1k', '159n')
+    first = manager.preview_id(str(next((tmp_path / 'out').glob('*/circuit.kicad_pro'))))
+    assert first and manager.preview_path(first).read_text().startswith('<svg')
+
+    # A value-only regeneration gets its own preview with the new values
+    generate(manager, '2.2k', '68n')
+    assert len(list((tmp_path / 'out' / 'previews').iterdir())) == 2
+    patched = [path.read_text() for path in (tmp_path / 'out' / 'previews').iterdir()
+               if path.stem != first]
+    assert '>2.2k<' in patched[0] and '>68n<' in patched[0]
+
+    # Regenerating an identical circuit reuses the stored preview
+    ok, netlist_path, _ = manager.execute_skidl(RC_CODE.format(r='1k', c='159n'))
+    ok, project_path, _ = manager.convert_to_kicad(netlist_path)
+    assert manager.preview_id(project_path) == first
+    assert len(list((tmp_path / 'out' / 'previews').iterdir())) == 2
+
+    assert manager.preview_path('../circuit') is None
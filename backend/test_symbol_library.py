@@ -0,0 +1,61 @@
+"""
+Tests for the indexed symbol library
+"""
+
+import io
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from netlist_parser import tokenize, LPAREN, RPAREN
+from schematic_writer import SchematicWriter
+from symbol_library import SymbolLibrary
+
+
+def balanced(text: str) -> bool:
+    depth = 0
+    for kind, _, _, _ in tokenize(io.StringIO(text)):
+        depth += {LPAREN: 1, RPAREN: -1}.get(kind, 0)
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def test_definitions_come_from_the_library():
+    library = SymbolLibrary()
+    inductor = library.definition("Device:L")
+
+    assert inductor.startswith('    (symbol "Device:L"\n')
+    assert '(symbol "L_1_1"' in inductor
+    assert balanced(inductor)
+    assert library.definition("Device:L") is inductor
+    assert library.pins("Device:LED") == {"1": (-3.81, 0.0), "2": (3.81, 0.0)}
+
+
+def test_derived_symbols_are_flattened():
+    definition = SymbolLibrary().definition("Device:Filter_EMI_C")
+
+    assert "(extends" not in definition
+    assert '(symbol "Filter_EMI_C_1_1"' in definition
+    assert '"C_Feedthrough_' not in definition
+    assert balanced(definition)
+
+
+def test_unknown_and_builtin_symbols(tmp_path):
+    library = SymbolLibrary(str(tmp_path))
+
+    assert library.definition("Device:DoesNotExist") is None
+    assert library.definition("power:GND").startswith('    (symbol "power:GND"')
+
+
+def test_writer_embeds_only_used_symbols():
+    buf = io.StringIO()
+    writer = SchematicWriter(buf)
+    writer.begin(lib_ids=["Device:L", "Device:L", "Device:D"])
+    writer.end()
+    text = buf.getvalue()
+
+    assert text.count('(symbol "Device:L"') == 1
+    assert '(symbol "Device:D"' in text
+    assert '(symbol "Device:R"' not in text
+    assert balanced(text)
@@ -0,0 +1,69 @@
+"""
+Tests for Monte Carlo tolerance analysis
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+from tolerance_analysis import _sample, analyze_tolerance, part_tolerance
+
+RC_FILTER = {
+    'type': 'rc_lowpass_filter',
+    'constraints': {'cutoff_freq': '1kHz'},
+    'components': [
+        {'id': 'R1', 'type': 'resistor', 'value': '4.7k', 'nets': ['IN', 'OUT']},
+        {'id': 'C1', 'type': 'capacitor', 'value': '33n', 'nets': ['OUT', 'GND']},
+    ],
+}
+
+DIVIDER = {
+    'type': 'voltage_divider',
+    'constraints': {'input_voltage': '9V', 'output_voltage': '5V'},
+    'components': [
+        {'id': 'R2', 'type': 'resistor', 'value': '15k', 'nets': ['OUT', 'GND']},
+        {'id': 'R1', 'type': 'resistor', 'value': '12k', 'nets': ['IN', 'OUT']},
+    ],
+}
+
+
+def test_tolerance_follows_series_or_explicit_value():
+    assert part_tolerance({'type': 'resistor', 'value': '4.7k'}) == 0.1
+    assert part_tolerance({'type': 'resistor', 'value': '4.99k'}) == 0.01
+    assert part_tolerance({'type': 'capacitor', 'value': '33n'}) == 0.2
+    assert part_tolerance({'type': 'resistor', 'value': '4.7k', 'tolerance': '1%'}) == 0.01
+
+
+def test_rc_cutoff_distribution():
+    result = analyze_tolerance(RC_FILTER)
+
+    assert result['quantity'] == 'cutoff_frequency'
+    assert result['nominal'] == pytest.approx(1026.14, rel=1e-4)
+    assert result['percentiles']['p5'] < result['percentiles']['p50'] < result['percentiles']['p95']
+    assert result['percentiles']['p50'] == pytest.approx(result['nominal'], rel=0.01)
+    assert 0 < result['yield_percent'] < 100
+    assert analyze_tolerance(RC_FILTER) == result
+
+
+def test_normal_samples_are_truncated_not_clipped():
+    values = _sample(np.random.default_rng(0), 1000.0, 0.1, 100_000, 'normal')
+    assert values.min() >= 900 and values.max() <= 1100
+    # Clipping would pile about 270 draws onto the bounds
+    assert np.count_nonzero(np.isclose(values, 900) | np.isclose(values, 1100)) == 0
+
+
+def test_divider_output_within_part_tolerances():
+    result = analyze_tolerance(DIVIDER, distribution='uniform')
+    assert result['tolerances'] == {'R1': 0.1, 'R2': 0.1}
+    assert result['nominal'] == pytest.approx(5.0)
+    # Opposite 10% errors in R1 and R2 move Vout by at most 9%
+    assert 4.55 <= result['percentiles']['p1'] < 5.0 < result['percentiles']['p99'] <= 5.41
+    assert result['yield_percent'] == 100.0
+
+
+def test_unsupported_circuits_are_skipped():
+    assert analyze_tolerance({'type': 'led_driver', 'components': []}) is None
+    assert analyze_tolerance(dict(DIVIDER, constraints={})) is None
@@ -0,0 +1,122 @@
+"""
+Tests for the transient simulation engine
+"""
+
+import math
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+import pytest
+
+import filter_synthesis
+import transient_analysis
+from transient_analysis import simulate_transient, stream_transient
+
+
+def part(ref, comp_type, *nets, value='1k'):
+    return {'id': ref, 'type': comp_type, 'value': value, 'nets': list(nets)}
+
+
+def rc_lowpass(r='1k', c='1u', source='5'):
+    components = [part('R1', 'resistor', 'IN', 'OUT', value=r), part('C1', 'capacitor', 'OUT', 'GND', value=c)]
+    if source:
+        components.insert(0, part('V1', 'voltage_source', 'IN', 'GND', value=source))
+    return {'type': 'rc_lowpass_filter', 'constraints': {'cutoff_freq': '159.155'}, 'components': components}
+
+
+def series_rlc():
+    return {'components': [
+        part('R1', 'resistor', 'IN', 'A', value='10'),
+        part('L1', 'inductor', 'A', 'OUT', value='1m'),
+        part('C1', 'capacitor', 'OUT', 'GND', value='1u'),
+    ]}
+
+
+def rlc_step(t):
+    # Underdamped series RLC, unit step, taken across the capacitor
+    alpha, w0 = 10 / (2 * 1e-3), 1 / math.sqrt(1e-3 * 1e-6)
+    wd = math.sqrt(w0 ** 2 - alpha ** 2)
+    return 1 - np.exp(-alpha * t) * (np.cos(wd * t) + alpha / wd * np.sin(wd * t))
+
+
+@pytest.mark.parametrize('adaptive', [False, True])
+def test_rc_step_has_its_time_constant(adaptive):
+    result = simulate_transient(rc_lowpass(), t_stop=10e-3, steps=10_000, adaptive=adaptive)
+    exact = 5 * (1 - np.exp(-result.time / 1e-3))
+    assert np.max(np.abs(result.waveforms['OUT'] - exact)) < 1e-3
+    assert result.crossing_time('OUT', 1 - math.exp(-1)) == pytest.approx(1e-3, rel=1e-3)
+    assert result.waveforms['IN'][0] == 0 and result.waveforms['IN'][-1] == pytest.approx(5)
+    assert result.time[0] == 0 and result.time[-1] == pytest.approx(10e-3)
+
+
+def test_crossing_time_against_settled_value():
+    # Five time constants end 0.67% short of 5 V, which pulls the 63.2% point early
+    result = simulate_transient(rc_lowpass(), t_stop=5e-3, steps=10_000)
+    assert result.crossing_time('OUT', 1 - math.exp(-1)) == pytest.approx(0.9885e-3, rel=1e-3)
+    assert result.crossing_time('OUT', 1 - math.exp(-1), final=5) == pytest.approx(1e-3, rel=1e-3)
+
+
+def test_rlc_ringing_matches_closed_form():
+    result = simulate_transient(series_rlc(), t_stop=2e-3, steps=20_000)
+    assert np.allclose(result.waveforms['OUT'], rlc_step(result.time), atol=1e-5)
+    adaptive = simulate_transient(series_rlc(), t_stop=2e-3, adaptive=True, rtol=1e-5)
+    assert np.allclose(adaptive.waveforms['OUT'], rlc_step(adaptive.time), atol=1e-3)
+    # The run steps finely through the ringing and stretches out once it has died away
+    gaps = np.diff(adaptive.time)
+    assert adaptive.steps < 2000 and gaps.max() > 4 * gaps.min()
+
+
+def test_blocked_steps_match_stepping_one_at_a_time(monkeypatch):
+    circuit = filter_synthesis.synthesize_filter(1000, 4, 'butterworth', 'lowpass', 'sallen_key')
+    sine = lambda t: np.sin(2 * np.pi * 2000 * t)
+    blocked = simulate_transient(circuit, t_stop=5e-3, steps=9000, source=sine)
+    monkeypatch.setattr(transient_analysis, 'MAX_BLOCK_ENTRIES', 0)
+    single = simulate_transient(circuit, t_stop=5e-3, steps=9000, source=sine)
+    assert np.allclose(blocked.waveforms['OUT'], single.waveforms['OUT'], atol=1e-12)
+    # A fourth-order Butterworth passes a tone at twice its cutoff at 1/sqrt(257)
+    tail = blocked.waveforms['OUT'][-3600:]
+    assert (tail.max() - tail.min()) / 2 == pytest.approx(1 / math.sqrt(257), rel=0.02)
+
+
+def test_long_runs_stream_in_chunks():
+    chunks = stream_transient(rc_lowpass(), t_stop=5e-3, steps=250_000, chunk_steps=100_000)
+    sizes, last = [], None
+    for chunk in chunks:
+        sizes.append(len(chunk.time))
+        last = chunk
+    assert sizes == [1, 100_000, 100_000, 50_000]
+    assert last.time[-1] == pytest.approx(5e-3)
+    assert last.voltages['OUT'][-1] == pytest.approx(5 * (1 - math.exp(-5)), rel=1e-6)
+
+
+def test_defaults_and_errors():
+    # No source: a unit step on IN, run for TAU_SPAN time constants of the cutoff
+    result = simulate_transient(rc_lowpass(source=None))
+    assert result.time[-1] == pytest.approx(10e-3, rel=1e-4)
+    assert result.waveforms['IN'][-1] == pytest.approx(1) and len(result.to_dict(max_points=100)['time']) <= 101
+    with pytest.raises(ValueError, match='t_stop'):
+        simulate_transient(series_rlc())
+    with pytest.raises(ValueError, match='steps'):
+        simulate_transient(rc_lowpass(), steps=0)
+    for t_stop in (math.inf, math.nan, -1e-3):
+        with pytest.raises(ValueError, match='t_stop'):
+            simulate_transient(rc_lowpass(), t_stop=t_stop, adaptive=True)
+    with pytest.raises(ValueError, match='no path to ground'):
+        simulate_transient(rc_lowpass(), nets=['OUT', 'X'])
+
+
+def test_adaptive_runs_stop_at_their_step_budget():
+    # A barely damped tank rings through the whole run, so it never gets to stretch its steps
+    tank = {'components': [
+        part('R1', 'resistor', 'IN', 'A', value='1m'),
+        part('L1', 'inductor', 'A', 'OUT', value='1u'),
+        part('C1', 'capacitor', 'OUT', 'GND', value='1n'),
+    ]}
+    with pytest.raises(ValueError, match='more than 500 steps'):
+        simulate_transient(tank, t_stop=1e-3, adaptive=True, max_steps=500)
+    with pytest.raises(ValueError, match='more than 500 steps'):
+        list(stream_transient(tank, t_stop=1e-3, adaptive=True, max_steps=500))
+    with pytest.raises(ValueError, match='between 1 and 100 steps'):
+        simulate_transient(rc_lowpass(), steps=1000, max_steps=100)
@@ -0,0 +1,86 @@
+"""
+Tests for the per-circuit-type validation rule registry
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+import validation_rules
+from circuit_validator import CircuitValidator
+from validation_rules import (COMMON_RULES, CircuitIndex, ValidationLevel, ValidationMessage,
+                              compiled_rules, register_circuit_type, requires_ground, run_rules)
+
+
+def part(ref, comp_type, *nets, value='1k'):
+    return {'id': ref, 'type': comp_type, 'value': value, 'nets': list(nets)}
+
+
+def test_types_compile_to_flat_rule_tuples():
+    rules = compiled_rules('rc_lowpass')
+    assert rules[:len(COMMON_RULES)] == COMMON_RULES and requires_ground in rules
+    # Intent names and generated-JSON names share one declaration
+    assert compiled_rules('rc_lowpass_filter') is rules
+    assert compiled_rules('voltage_divider') != rules
+    assert compiled_rules('butterworth_lowpass_filter') == COMMON_RULES
+    assert validation_rules.json_type('rc_highpass') == 'rc_highpass_filter'
+    assert validation_rules.json_type('bessel_lowpass') == 'bessel_lowpass'
+
+
+def test_rules_share_the_index_and_registered_types_run_their_rules():
+    seen = []
+
+    def no_inductors(index):
+        seen.append(index)
+        if index.type_counts['inductor']:
+            return [ValidationMessage(ValidationLevel.ERROR, "No inductors allowed")]
+        return []
+
+    register_circuit_type('test_rl_network', 'test_rl_network_circuit', requires_ground, no_inductors)
+    circuit = {'type': 'test_rl_network_circuit', 'components': [
+        part('R1', 'resistor', 'IN', 'GND'), part('L1', 'inductor', 'IN', 'GND', value='10u')]}
+    index = CircuitIndex(circuit)
+    assert index.circuit_type == 'test_rl_network'
+    assert [m.message for m in run_rules(index)] == ["No inductors allowed"]
+    assert seen == [index]
+
+
+def test_yes_no_callers_stop_at_the_first_error():
+    # Shorted source (common rule) and no ground (type rule): two errors
+    circuit = {'type': 'rc_lowpass_filter', 'components': [
+        part('R1', 'resistor', 'IN', 'OUT'), part('C1', 'capacitor', 'OUT', 'IN'),
+        part('V1', 'voltage_source', 'IN', 'IN', value='5')]}
+    validator = CircuitValidator(profile=True)
+    _, messages = validator.validate(circuit)
+    assert len([m for m in messages if m.level == ValidationLevel.ERROR]) == 2
+    assert 'requires_ground' in validator.timings
+
+    assert not validator.is_valid(circuit)
+    assert [m.level for m in validator.messages].count(ValidationLevel.ERROR) == 1
+    assert 'requires_ground' not in validator.timings
+    assert {'schema', 'index', 'check_shorts'} <= set(validator.timings)
+
+
+def test_missing_constraints_and_parts():
+    circuit = {'circuit_type': 'voltage_divider', 'constraints': {'input_voltage': '9'}, 'components': [
+        part('R1', 'resistor', 'IN', 'OUT'), part('C1', 'capacitor', 'OUT', 'GND', value='1u')]}
+    _, messages = CircuitValidator().validate(circuit)
+    assert [m.message for m in messages if m.level == ValidationLevel.ERROR] == [
+        "Voltage divider must have at least 2 resistors",
+        "voltage_divider requires input_voltage and output_voltage in constraints",
+    ]
+
+
+def test_rules_only_see_schema_checked_components():
+    def divider(nets):
+        return {'type': 'voltage_divider', 'components': [
+            {'id': 'R1', 'type': 'resistor', 'value': '1k', 'nets': nets},
+            {'id': 'R2', 'type': 'resistor', 'value': '1k', 'nets': ['1', 'GND']},
+        ]}
+    # JSON numbers are coerced to net names before any rule runs
+    is_valid, messages = CircuitValidator().validate(divider([1, 2]))
+    assert is_valid and not any(m.level == ValidationLevel.ERROR for m in messages)
+    # Nets the schema rejects stop validation there instead of reaching the rules
+    is_valid, messages = CircuitValidator().validate(divider([['a'], 'b']))
+    assert not is_valid
+    assert [m.message for m in messages] == ['Component R1 nets.0: Input should be a valid string']
@@ -0,0 +1,80 @@
+"""
+Tests for value-only incremental regeneration
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from pathlib import Path
+
+from file_manager import FileManager
+from scratch_workspace import ScratchWorkspacePool
+from value_patcher import topology_signature, schematic_value_spans, patch_values
+
+RC_CODE = '''from skidl import *
+R1 = Part('Device', 'R', value='{r}', footprint='Resistor_SMD:R_0805_2012Metric')
+C1 = Part('Device', 'C', value='{c}', footprint='Capacitor_SMD:C_0805_2012Metric')
+'''
+
+RC_NETLIST = '''(export (version "D")
+  (components
+    (comp (ref "C1") (value "{c}") (libsource (lib "Device") (part "C")))
+    (comp (ref "R1") (value "{r}") (libsource (lib "Device") (part "R"))))
+  (nets
+    (net (code 1) (name "GND") (node (ref "C1") (pin "2")))
+    (net (code 2) (name "IN") (node (ref "R1") (pin "1")))
+    (net (code 3) (name "OUT") (node (ref "C1") (pin "1")) (node (ref "R1") (pin "2")))))
+'''
+
+
+def make_manager(tmp_path, name):
+    """FileManager whose SKiDL run writes RC_NETLIST with the script's values"""
+    manager = FileManager(str(tmp_path / name), ScratchWorkspacePool(str(tmp_path / f"{name}_scratch")))
+    manager.skidl_runs = 0
+
+    def fake_run(python_exe, work_dir, deadline):
+        manager.skidl_runs += 1
+        _, values = topology_signature((Path(work_dir) / 'circuit.py').read_text())
+        (Path(work_dir) / 'circuit.net').write_text(RC_NETLIST.format(r=values['R1'], c=values['C1']))
+        return 0, ''
+
+    manager._run_skidl_process = fake_run
+    return manager
+
+
+def generate(manager, r, c):
+    ok, netlist_path, error = manager.execute_skidl(RC_CODE.format(r=r, c=c))
+    assert ok, error
+    ok, project_path, error = manager.convert_to_kicad(netlist_path)
+    assert ok, error
+    folder = Path(project_path).parent
+    return {name: (folder / name).read_text() for name in
+            ('circuit.py', 'circuit.net', 'circuit.kicad_sch', 'circuit.kicad_pro')}
+
+
+def test_value_change_patches_instead_of_regenerating(tmp_path):
+    manager = make_manager(tmp_path, 'cached')
+    generate(manager, '1k', '159n')
+    patched = generate(manager, '2.2k', '68n')
+    assert manager.skidl_runs == 1
+
+    fresh = generate(make_manager(tmp_path, 'fresh'), '2.2k', '68n')
+    assert patched == fresh
+
+
+def test_topology_change_runs_skidl(tmp_path):
+    manager = make_manager(tmp_path, 'cached')
+    generate(manager, '1k', '159n')
+    manager.execute_skidl(RC_CODE.format(r='1k', c='159n').replace('0805', '0603'))
+    assert manager.skidl_runs == 2
+
+
+def test_schematic_spans_skip_library_symbols():
+    text = ('(kicad_sch (lib_symbols (symbol "Device:R" (property "Value" "R")))'
+            ' (symbol (lib_id "Device:R") (property "Reference" "R1") (property "Value" "1k")))')
+    spans = schematic_value_spans(text)
+
+    assert list(spans) == ["R1"]
+    assert patch_values(text, spans, {"R1": "4.7k"}).endswith('(property "Value" "4.7k")))')
+    assert patch_values(text, spans, {"R2": "1k"}) is None
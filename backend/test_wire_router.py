@@ -0,0 +1,87 @@
+"""
+Tests for the Manhattan wire router
+"""
+
+import os
+import sys
+sys.path.append(os.path.dirname(__file__))
+
+from placement import place
+from wire_router import WireRouter, to_cell, _cells
+from analytics import metrics
+from test_placement import rc_ladder
+
+
+def connected_pins(routed, pin_cells):
+    """Pins reachable from the first pin through wires, junctions and labels"""
+    parent = {}
+
+    def find(cell):
+        parent.setdefault(cell, cell)
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    junctions = {to_cell(p) for p in routed.junctions}
+    for start, end in routed.wires:
+        a, b = to_cell(start), to_cell(end)
+        union(a, b)
+        for cell in _cells(a, b):
+            if cell in junctions or cell in pin_cells:
+                union(cell, a)
+    labels = [to_cell(p) for p in routed.labels]
+    for cell in labels[1:]:
+        union(cell, labels[0])
+    root = find(pin_cells[0])
+    return {cell for cell in pin_cells if find(cell) == root}
+
+
+def test_every_net_is_fully_connected():
+    netlist = rc_ladder(20)
+    placement = place(netlist)
+    nets = {name: nodes for name, nodes in netlist.net_map().items() if name != 'GND'}
+    router = WireRouter(placement, nets)
+
+    for routed in router.route(nets):
+        pin_cells = router._pin_cells(nets[routed.name])
+        assert connected_pins(routed, pin_cells) == set(pin_cells), routed.name
+
+
+def test_wires_of_different_nets_never_overlap_or_touch():
+    netlist = rc_ladder(20)
+    nets = {name: nodes for name, nodes in netlist.net_map().items() if name != 'GND'}
+    routed = WireRouter(place(netlist), nets).route(nets)
+
+    owner = {}
+    for net in routed:
+        for start, end in net.wires:
+            a, b = to_cell(start), to_cell(end)
+            axis = 'h' if a[1] == b[1] else 'v'
+            for cell in _cells(a, b):
+                assert owner.setdefault((cell, axis), net.name) == net.name
+    for net in routed:
+        for start, end in net.wires:
+            for cell in (to_cell(start), to_cell(end)):
+                for axis in 'hv':
+                    assert owner.get((cell, axis), net.name) == net.name
+
+
+def test_wires_avoid_symbol_bodies():
+    netlist = rc_ladder(5)
+    nets = netlist.net_map()
+    router = WireRouter(place(netlist), nets)
+    for net in router.route(nets):
+        for start, end in net.wires:
+            assert not any(cell in router.body for cell in _cells(to_cell(start), to_cell(end)))
+
+
+def test_routing_large_netlist_records_metrics():
+    netlist = rc_ladder(500)
+    nets = {name: nodes for name, nodes in netlist.net_map().items() if name != 'GND'}
+    before = metrics.metrics["net_routes_total"]
+    WireRouter(place(netlist), nets).route(nets)
+    assert metrics.metrics["net_routes_total"] - before == len(nets)
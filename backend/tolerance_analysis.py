@@ -0,0 +1,166 @@
+"""
+Monte Carlo tolerance analysis
+Samples every part within its tolerance and reports how the circuit's key
+quantity (RC cutoff frequency or divider output voltage) spreads
+"""
+
+import math
+import os
+import sys
+from typing import Any, Dict, List, Optional
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+import e_series
+import si_units
+from component_calculator import ComponentCalculator
+from connectivity import GROUND_NETS
+
+DEFAULT_SAMPLES = 100_000
+
+# Normal sampling puts the tolerance at three standard deviations
+SIGMAS = 3.0
+
+PERCENTILES = (1, 5, 50, 95, 99)
+
+# Series a part is assumed to come from, coarsest first; a value found only
+# in a finer series implies that series' tighter tolerance
+_CANDIDATE_SERIES = {
+    'resistor': ('E12', 'E24', 'E48', 'E96', 'E192'),
+    'capacitor': ('E6', 'E12', 'E24', 'E48', 'E96', 'E192'),
+}
+_DEFAULT_SERIES = {
+    'resistor': ComponentCalculator.RESISTOR_SERIES,
+    'capacitor': ComponentCalculator.CAPACITOR_SERIES,
+}
+
+
+def _parse_tolerance(value: Any) -> float:
+    """Fraction from 0.05, "5%" or "±5%" """
+    if isinstance(value, str):
+        text = value.strip().lstrip('±')
+        return float(text[:-1]) / 100 if text.endswith('%') else float(text)
+    return float(value)
+
+
+def part_tolerance(component: Dict[str, Any]) -> float:
+    """
+    Tolerance of one part as a fraction
+
+    An explicit "tolerance" field wins; otherwise the coarsest standard series
+    containing the value decides (4.7k is E12, so 10%; 4.99k is E96, so 1%).
+    Non-standard values get the tolerance of the type's default series.
+    """
+    if component.get('tolerance') is not None:
+        return _parse_tolerance(component['tolerance'])
+    comp_type = component.get('type', 'resistor')
+    candidates = _CANDIDATE_SERIES.get(comp_type, _CANDIDATE_SERIES['resistor'])
+    series = e_series.series_of(si_units.parse(component['value']), candidates)
+    return e_series.TOLERANCE[series or _DEFAULT_SERIES.get(comp_type, candidates[0])]
+
+
+def _sample(rng: np.random.Generator, nominal: float, tolerance: float, samples: int,
+            distribution: str) -> np.ndarray:
+    if distribution == 'uniform':
+        deviation = rng.uniform(-tolerance, tolerance, samples)
+    elif distribution == 'normal':
+        # Truncated normal: draws beyond the tolerance (0.27% of them) are redrawn
+        deviation = rng.normal(0.0, tolerance / SIGMAS, samples)
+        outside = np.abs(deviation) > tolerance
+        while outside.any():
+            deviation[outside] = rng.normal(0.0, tolerance / SIGMAS, int(outside.sum()))
+            outside = np.abs(deviation) > tolerance
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    return nominal * (1.0 + deviation)
+
+
+def _circuit_kind(circuit_json: Dict[str, Any]) -> str:
+    kind = str(circuit_json.get('type') or circuit_json.get('circuit_type') or '')
+    if kind.startswith(('rc_lowpass', 'rc_highpass')):
+        return 'rc_filter'
+    if kind.startswith('voltage_divider'):
+        return 'voltage_divider'
+    return ''
+
+
+def _divider_resistors(resistors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """(top, bottom) resistor of a divider; the bottom one connects to ground"""
+    grounded = [comp for comp in resistors
+                if any(str(net).upper() in GROUND_NETS for net in comp.get('nets', []))]
+    if len(grounded) == 1:
+        return [comp for comp in resistors if comp is not grounded[0]] + grounded
+    return sorted(resistors, key=lambda comp: str(comp.get('id', '')))
+
+
+def analyze_tolerance(circuit_json: Dict[str, Any], samples: int = DEFAULT_SAMPLES,
+                      spec_tolerance: float = 0.1, distribution: str = 'normal',
+                      seed: Optional[int] = 0) -> Optional[Dict[str, Any]]:
+    """
+    Monte Carlo spread of an RC filter's cutoff or a divider's output voltage
+
+    Args:
+        circuit_json: Circuit with components and constraints
+        samples: Number of Monte Carlo draws
+        spec_tolerance: Allowed deviation from the target (the cutoff_freq or
+            output_voltage constraint, else the nominal value) counted as yield
+        distribution: 'normal' (tolerance = 3 sigma, truncated) or 'uniform'
+        seed: RNG seed, fixed by default so repeated requests report the same numbers
+
+    Returns:
+        Dict with quantity, unit, nominal, mean, std, percentiles, spec,
+        yield_percent, samples and per-part tolerances; None if the circuit is
+        not an RC filter or voltage divider or its values cannot be parsed
+    """
+    kind = _circuit_kind(circuit_json)
+    components = circuit_json.get('components') or []
+    constraints = circuit_json.get('constraints') or {}
+    resistors = [comp for comp in components if comp.get('type') == 'resistor']
+    capacitors = [comp for comp in components if comp.get('type') == 'capacitor']
+    rng = np.random.default_rng(seed)
+
+    try:
+        if kind == 'rc_filter' and len(resistors) == 1 and len(capacitors) == 1:
+            parts = resistors + capacitors
+            r, c = (si_units.parse(comp['value']) for comp in parts)
+            tolerances = [part_tolerance(comp) for comp in parts]
+            r_samples = _sample(rng, r, tolerances[0], samples, distribution)
+            c_samples = _sample(rng, c, tolerances[1], samples, distribution)
+            values = 1.0 / (2.0 * math.pi * r_samples * c_samples)
+            nominal = 1.0 / (2.0 * math.pi * r * c)
+            target = constraints.get('cutoff_freq')
+            quantity, unit = 'cutoff_frequency', 'Hz'
+        elif kind == 'voltage_divider' and len(resistors) == 2 and constraints.get('input_voltage'):
+            parts = _divider_resistors(resistors)
+            vin = si_units.parse(constraints['input_voltage'])
+            r1, r2 = (si_units.parse(comp['value']) for comp in parts)
+            tolerances = [part_tolerance(comp) for comp in parts]
+            r1_samples = _sample(rng, r1, tolerances[0], samples, distribution)
+            r2_samples = _sample(rng, r2, tolerances[1], samples, distribution)
+            values = vin * r2_samples / (r1_samples + r2_samples)
+            nominal = vin * r2 / (r1 + r2)
+            target = constraints.get('output_voltage')
+            quantity, unit = 'output_voltage', 'V'
+        else:
+            return None
+        target = si_units.parse(target) if target not in (None, '') else nominal
+    except (KeyError, ValueError) as e:
+        print(f"Warning: tolerance analysis skipped: {e}")
+        return None
+
+    low, high = target * (1 - spec_tolerance), target * (1 + spec_tolerance)
+    in_spec = np.count_nonzero((values >= low) & (values <= high))
+    return {
+        'quantity': quantity,
+        'unit': unit,
+        'nominal': nominal,
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'percentiles': {f"p{p}": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+        'spec': {'target': target, 'min': low, 'max': high},
+        'yield_percent': float(100.0 * in_spec / samples),
+        'samples': samples,
+        'distribution': distribution,
+        'tolerances': {str(comp.get('id', '')): tol for comp, tol in zip(parts, tolerances)},
+    }
@@ -0,0 +1,395 @@
+"""
+Transient Simulation
+Steps the MNA system G x + C dx/dt = b(t) of a linear R/L/C/source netlist
+through time with trapezoidal companion models, solving the step matrix once
+per step size and reusing it for every step, in fixed- or adaptive-step mode;
+waveforms come back as NumPy arrays and long runs stream in chunks
+"""
+
+import math
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from ac_analysis import MNASystem, _cutoff_hint, build_mna, pick_nets
+
+DEFAULT_STEPS = 1000
+MAX_STEPS = 100_000_000
+
+# Without t_stop, simulate this many time constants of the design cutoff
+TAU_SPAN = 10
+
+# Samples per streamed chunk
+CHUNK_STEPS = 1 << 16
+
+# Matrix entries in the table of propagator powers that evaluates a block of
+# steps at once; circuits too large for a useful table step one at a time
+MAX_BLOCK_ENTRIES = 1 << 20
+MAX_BLOCK_STEPS = 4096
+
+# Adaptive steps are the largest step halved up to MAX_LEVELS times, so only a
+# handful of step matrices are ever solved
+ADAPTIVE_MIN_STEPS = 100
+MAX_LEVELS = 24
+START_LEVEL = 8
+DEFAULT_RTOL = 1e-4
+DEFAULT_ATOL = 1e-6
+
+# Samples kept per waveform in JSON output
+MAX_PLOT_POINTS = 1000
+
+Source = Callable[[np.ndarray], np.ndarray]
+
+
+@dataclass
+class TransientChunk:
+    """
+    Consecutive samples of a simulation
+
+    Attributes:
+        time: Sample times in seconds
+        voltages: Net name to its voltage at each sample time
+    """
+    time: np.ndarray
+    voltages: Dict[str, np.ndarray]
+
+
+@dataclass
+class TransientResult:
+    """
+    Waveforms of a transient simulation
+
+    Attributes:
+        time: Sample times in seconds, starting at 0
+        waveforms: Net name to its voltage at each sample time
+        input_net, output_net: Driven and measured nets
+        steps: Accepted timesteps
+        rejected: Adaptive steps retried at a smaller size
+    """
+    time: np.ndarray
+    waveforms: Dict[str, np.ndarray]
+    input_net: str
+    output_net: str
+    steps: int
+    rejected: int = 0
+
+    def crossing_time(self, net: str, fraction: float, final: Optional[float] = None) -> Optional[float]:
+        """
+        First time a net covers `fraction` of its swing from the first sample
+        to `final`, interpolated between samples (0.632 gives an RC time
+        constant, 0.1 and 0.9 the ends of the rise time)
+
+        Without `final` the swing ends at the last sample, which reads short
+        of the settled value unless the run is long: after 5 time constants
+        0.632 comes out 1.15% early.
+        """
+        v = self.waveforms[net]
+        swing = (v[-1] if final is None else final) - v[0]
+        if swing == 0:
+            return None
+        progress = (v - v[0]) / swing
+        hits = np.flatnonzero(progress >= fraction)
+        if not len(hits):
+            return None
+        i = int(hits[0])
+        if i == 0:
+            return float(self.time[0])
+        t0, t1 = self.time[i - 1], self.time[i]
+        p0, p1 = progress[i - 1], progress[i]
+        return float(t0 + (fraction - p0) / (p1 - p0) * (t1 - t0))
+
+    def to_dict(self, max_points: int = MAX_PLOT_POINTS) -> Dict[str, Any]:
+        """JSON-ready summary and waveforms, decimated to at most max_points samples"""
+        stride = max(1, math.ceil(len(self.time) / max_points))
+        picked = np.arange(0, len(self.time), stride)
+        if picked[-1] != len(self.time) - 1:
+            picked = np.append(picked, len(self.time) - 1)
+        return {
+            'input_net': self.input_net,
+            'output_net': self.output_net,
+            'steps': self.steps,
+            'rejected': self.rejected,
+            'time': self.time[picked].tolist(),
+            'waveforms': {net: v[picked].tolist() for net, v in self.waveforms.items()},
+        }
+
+
+def step_source(level: float) -> Source:
+    """Input that steps from 0 to `level` just after t = 0"""
+    return lambda t: np.where(np.asarray(t) > 0, level, 0.0)
+
+
+class _Stepper:
+    """
+    Step propagators of one MNA system, one per step size and method
+
+    A capacitor over a step h is its companion model, a conductance 2C/h
+    (C/h for backward Euler) beside a current source carrying its history;
+    for the whole system that is (G + 2C/h) x1 = (2C/h - G) x0 + b0 + b1.
+    The step matrix is solved once per step size, giving
+    x1 = A x0 + d0 u0 + d1 u1 + e for the input u and the fixed sources.
+    """
+
+    def __init__(self, system: MNASystem):
+        self.system = system
+        self.size = len(system.drive)
+        self._propagators: Dict[Tuple[float, bool], Tuple[np.ndarray, ...]] = {}
+        self._powers: Dict[float, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def propagator(self, h: float, trapezoidal: bool = True) -> Tuple[np.ndarray, ...]:
+        key = (h, trapezoidal)
+        if key not in self._propagators:
+            G, C = self.system.G, self.system.C
+            scale = 2.0 / h if trapezoidal else 1.0 / h
+            history = scale * C - G if trapezoidal else scale * C
+            rhs = np.column_stack([history, self.system.drive, self.system.bias])
+            try:
+                solved = np.linalg.solve(G + scale * C, rhs)
+            except np.linalg.LinAlgError:
+                raise ValueError("Circuit has no unique transient solution (check for loops of sources)")
+            A, d, bias = solved[:, :-2], solved[:, -2], solved[:, -1]
+            if trapezoidal:
+                self._propagators[key] = (A, d, d, 2.0 * bias)
+            else:
+                self._propagators[key] = (A, np.zeros_like(d), d, bias)
+        return self._propagators[key]
+
+    def step(self, x: np.ndarray, u0: float, u1: float, h: float, trapezoidal: bool = True) -> np.ndarray:
+        A, d0, d1, e = self.propagator(h, trapezoidal)
+        return A @ x + (d0 * u0 + d1 * u1 + e)
+
+    def block_steps(self) -> int:
+        return min(MAX_BLOCK_STEPS, MAX_BLOCK_ENTRIES // max(self.size * self.size, 1))
+
+    def powers(self, h: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per j below block_steps(): A^(j+1), the input response A^j d as a
+        spectrum, and the fixed-source sum (I + A + ... + A^j) e
+        """
+        if h not in self._powers:
+            A, d, _, e = self.propagator(h)
+            count = self.block_steps()
+            P = np.empty((count, self.size, self.size))
+            P[0] = A
+            for j in range(1, count):
+                P[j] = P[j - 1] @ A
+            D = np.vstack([d, P[:-1] @ d])
+            E = np.cumsum(np.vstack([e, P[:-1] @ e]), axis=0)
+            self._powers[h] = (P, np.fft.rfft(D, 2 * count, axis=0), E)
+        return self._powers[h]
+
+    def run(self, x: np.ndarray, u_prev: float, u: np.ndarray, h: float) -> np.ndarray:
+        """States after each of len(u) trapezoidal steps with inputs u"""
+        states = np.empty((len(u), self.size))
+        A, d, _, e = self.propagator(h)
+        # Each step takes the input as u0 + u1
+        w = np.concatenate(([u_prev], u[:-1])) + u
+        block = self.block_steps()
+        if block < 2:
+            for j in range(len(u)):
+                x = A @ x + (d * w[j] + e)
+                states[j] = x
+            return states
+        # A block of steps at once: x_j = A^(j+1) x + sum A^(j-i) d w_i + sum A^i e,
+        # the middle term a convolution
+        P, D, E = self.powers(h)
+        for start in range(0, len(u), block):
+            count = min(block, len(u) - start)
+            driven = np.fft.irfft(D * np.fft.rfft(w[start:start + count], 2 * block)[:, None], 2 * block, axis=0)
+            states[start:start + count] = P[:count] @ x + driven[:count] + E[:count]
+            x = states[start + count - 1]
+        return states
+
+
+def _initial_state(system: MNASystem, u0: float) -> np.ndarray:
+    """DC operating point with the input at u0; capacitors DC leaves undefined start discharged"""
+    rhs = system.drive * u0 + system.bias
+    try:
+        return np.linalg.solve(system.G, rhs)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(system.G, rhs, rcond=None)[0]
+
+
+def _chunk(time: np.ndarray, states: np.ndarray, probes: Dict[str, int]) -> TransientChunk:
+    return TransientChunk(time, {net: states[:, row].copy() for net, row in probes.items()})
+
+
+def _fixed(stepper: _Stepper, x: np.ndarray, source: Source, t_stop: float, steps: int,
+           probes: Dict[str, int], chunk_steps: int) -> Iterator[TransientChunk]:
+    h = t_stop / steps
+    # One backward Euler step first, so a step at t = 0 does not ring in the
+    # trapezoidal rule's algebraic unknowns
+    u_prev = float(source(np.array([h]))[0])
+    x = stepper.step(x, 0.0, u_prev, h, trapezoidal=False)
+    done = 1
+    states, time = x[None, :], np.array([h])
+    while True:
+        count = min(chunk_steps - len(time), steps - done)
+        if count > 0:
+            t = np.arange(done + 1, done + count + 1) * h
+            more = stepper.run(x, u_prev, np.asarray(source(t), dtype=float), h)
+            states, time = np.concatenate([states, more]), np.concatenate([time, t])
+            x, u_prev = more[-1], float(source(t[-1:])[0])
+            done += count
+        yield _chunk(time, states, probes)
+        if done >= steps:
+            return
+        states, time = np.empty((0, stepper.size)), np.empty(0)
+
+
+def _adaptive(stepper: _Stepper, x: np.ndarray, source: Source, t_stop: float, rtol: float, atol: float,
+              probes: Dict[str, int], chunk_steps: int, max_steps: int,
+              stats: Dict[str, int]) -> Iterator[TransientChunk]:
+    """
+    Step doubling: each step is taken once whole and once as two halves, and
+    the trapezoidal rule's error is a third of their difference. Positions
+    are counted in ticks of the smallest step so t_stop is met exactly.
+    Retried steps count towards max_steps, as they cost as much to take.
+    """
+    h_max = t_stop / ADAPTIVE_MIN_STEPS
+    ticks_per_max = 1 << MAX_LEVELS
+    total = ADAPTIVE_MIN_STEPS * ticks_per_max
+    nodes = len(stepper.system.rows)
+
+    def at(ticks: int) -> float:
+        return ticks / ticks_per_max * h_max
+
+    level = START_LEVEL
+    pos = ticks_per_max >> level
+    u = float(source(np.array([at(pos)]))[0])
+    x = stepper.step(x, 0.0, u, at(pos), trapezoidal=False)
+    stats['steps'] += 1
+    time, states = [at(pos)], [x]
+    while pos < total:
+        if stats['steps'] + stats['rejected'] > max_steps:
+            raise ValueError(f"Adaptive run needs more than {max_steps} steps; loosen rtol/atol")
+        while (ticks_per_max >> level) > total - pos:
+            level += 1
+        span = ticks_per_max >> level
+        h, half = span / ticks_per_max * h_max, span / 2 / ticks_per_max * h_max
+        u_mid, u_end = (float(v) for v in source(np.array([at(pos + span // 2), at(pos + span)])))
+        whole = stepper.step(x, u, u_end, h)
+        mid = stepper.step(x, u, u_mid, half)
+        end = stepper.step(mid, u_mid, u_end, half)
+        scale = atol + rtol * np.maximum(np.abs(end[:nodes]), np.abs(x[:nodes]))
+        error = float(np.max(np.abs(end[:nodes] - whole[:nodes]) / 3 / scale, initial=0.0))
+        if error > 1.0 and level < MAX_LEVELS - 1:
+            level += 1
+            stats['rejected'] += 1
+            continue
+        pos += span
+        x, u = end, u_end
+        time += [at(pos - span // 2), at(pos)]
+        states += [mid, end]
+        stats['steps'] += 2
+        # Halving the step cuts the trapezoidal error eightfold
+        if error < 0.1 and level > 0 and pos % (span * 2) == 0:
+            level -= 1
+        if len(time) >= chunk_steps:
+            yield _chunk(np.array(time), np.array(states), probes)
+            time, states = [], []
+    if time:
+        yield _chunk(np.array(time), np.array(states), probes)
+
+
+def _prepare(circuit_json: Dict[str, Any], t_stop: Optional[float], steps: int, adaptive: bool,
+             max_steps: int, input_net: Optional[str], output_net: Optional[str], nets: Optional[Sequence[str]]):
+    if not 1 <= max_steps <= MAX_STEPS:
+        raise ValueError(f"max_steps must be between 1 and {MAX_STEPS}, got {max_steps}")
+    if not adaptive and not 1 <= steps <= max_steps:
+        raise ValueError(f"Simulation needs between 1 and {max_steps} steps, got {steps}")
+    components = [comp for comp in circuit_json.get('components', []) if isinstance(comp, dict)]
+    input_net, output_net = pick_nets(components, input_net, output_net)
+    if t_stop is None:
+        cutoff = _cutoff_hint(circuit_json)
+        if cutoff is None:
+            raise ValueError("Give t_stop; the circuit states no cutoff_freq to time the run from")
+        t_stop = TAU_SPAN / (2 * math.pi * cutoff)
+    if not (math.isfinite(t_stop) and t_stop > 0):
+        raise ValueError(f"t_stop must be positive and finite, got {t_stop}")
+    system = build_mna(components, input_net)
+    probed = list(nets) if nets is not None else [input_net, output_net]
+    probes = {net: system.row(net) for net in dict.fromkeys(probed)}
+    return system, t_stop, input_net, output_net, probes
+
+
+def _stream(system: MNASystem, t_stop: float, steps: int, adaptive: bool, max_steps: int,
+            source: Optional[Source], probes: Dict[str, int], rtol: float, atol: float, chunk_steps: int,
+            stats: Dict[str, int]) -> Iterator[TransientChunk]:
+    if source is None:
+        source = step_source(system.drive_level)
+    stepper = _Stepper(system)
+    x = _initial_state(system, float(source(np.array([0.0]))[0]))
+    yield _chunk(np.array([0.0]), x[None, :], probes)
+    if adaptive:
+        yield from _adaptive(stepper, x, source, t_stop, rtol, atol, probes, max(chunk_steps, 2),
+                             max_steps, stats)
+    else:
+        stats['steps'] = steps
+        yield from _fixed(stepper, x, source, t_stop, steps, probes, max(chunk_steps, 1))
+
+
+def stream_transient(circuit_json: Dict[str, Any], t_stop: Optional[float] = None, steps: int = DEFAULT_STEPS,
+                     adaptive: bool = False, source: Optional[Source] = None, input_net: Optional[str] = None,
+                     output_net: Optional[str] = None, nets: Optional[Sequence[str]] = None,
+                     rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL,
+                     chunk_steps: int = CHUNK_STEPS, max_steps: int = MAX_STEPS) -> Iterator[TransientChunk]:
+    """
+    Transient waveforms of a circuit's netlist, yielded in chunks
+
+    Resistors, capacitors, inductors and sources are simulated, op-amps are
+    ideal. The input net is driven by `source`, by default a step to the
+    value of the source on it (1 V if it has none); other sources hold their
+    DC value. The run starts from the DC operating point at t = 0.
+
+    Args:
+        circuit_json: Circuit JSON with components
+        t_stop: End time in seconds; by default TAU_SPAN time constants of
+            constraints.cutoff_freq
+        steps: Fixed timesteps over the run (ignored when adaptive)
+        adaptive: Size steps to keep the local error within rtol/atol
+        source: Input voltage as a vectorized function of time
+        input_net, output_net: As for analyze_ac
+        nets: Nets to record; the input and output nets by default
+        chunk_steps: Samples per yielded chunk
+        max_steps: Most steps the run may take, retried adaptive steps
+            included; at most MAX_STEPS
+
+    Returns:
+        Iterator of TransientChunk, the first starting at t = 0
+
+    Raises:
+        ValueError: If the nets cannot be found, the run is invalid, an
+            adaptive run passes max_steps or the circuit has no unique solution
+    """
+    system, t_stop, _, _, probes = _prepare(circuit_json, t_stop, steps, adaptive, max_steps,
+                                            input_net, output_net, nets)
+    return _stream(system, t_stop, steps, adaptive, max_steps, source, probes, rtol, atol, chunk_steps,
+                   {'steps': 0, 'rejected': 0})
+
+
+def simulate_transient(circuit_json: Dict[str, Any], t_stop: Optional[float] = None, steps: int = DEFAULT_STEPS,
+                       adaptive: bool = False, source: Optional[Source] = None, input_net: Optional[str] = None,
+                       output_net: Optional[str] = None, nets: Optional[Sequence[str]] = None,
+                       rtol: float = DEFAULT_RTOL, atol: float = DEFAULT_ATOL,
+                       max_steps: int = MAX_STEPS) -> TransientResult:
+    """
+    Transient waveforms of a circuit's netlist as whole arrays
+
+    Takes the arguments of stream_transient and collects its chunks.
+
+    Returns:
+        TransientResult
+    """
+    system, t_stop, input_net, output_net, probes = _prepare(
+        circuit_json, t_stop, steps, adaptive, max_steps, input_net, output_net, nets)
+    stats = {'steps': 0, 'rejected': 0}
+    chunks = list(_stream(system, t_stop, steps, adaptive, max_steps, source, probes, rtol, atol,
+                          CHUNK_STEPS, stats))
+    time = np.concatenate([chunk.time for chunk in chunks])
+    waveforms = {net: np.concatenate([chunk.voltages[net] for chunk in chunks]) for net in probes}
+    return TransientResult(time, waveforms, input_net, output_net, stats['steps'], stats['rejected'])
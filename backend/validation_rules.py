@@ -0,0 +1,292 @@
+"""
+Validation Rule Registry
+Each circuit type declares its checks once; the registry compiles them into
+a flat tuple of rule callables per type name, and every rule reads the same
+precomputed CircuitIndex instead of walking the netlist itself
+"""
+
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from enum import Enum
+from functools import cached_property
+from typing import Any, Callable, Dict, List, Optional, Tuple
+sys.path.append(os.path.dirname(__file__))
+
+import si_units
+from connectivity import Connectivity
+from dc_analysis import DCSolution, resistor_rating, solve_dc
+
+
+class ValidationLevel(Enum):
+    ERROR = "ERROR"
+    WARNING = "WARNING"
+    INFO = "INFO"
+
+
+@dataclass
+class ValidationMessage:
+    level: ValidationLevel
+    message: str
+    component_id: str = None
+    # Numbers behind the message (currents, power, node voltages)
+    details: Dict[str, Any] = None
+
+
+# Component refs listed per connectivity message before eliding the rest
+MAX_LISTED_REFS = 5
+
+
+class CircuitIndex:
+    """
+    Everything the rules look up, computed once per circuit
+
+    Args:
+        circuit_json: Circuit JSON that has passed models.check_schema; the
+            rules rely on its component shapes (string nets, unique ids)
+    """
+
+    def __init__(self, circuit_json: Dict[str, Any]):
+        components = circuit_json.get('components') if isinstance(circuit_json, dict) else None
+        self.components: List[Dict[str, Any]] = [
+            comp for comp in components if isinstance(comp, dict)
+        ] if isinstance(components, list) else []
+        raw_type = ''
+        if isinstance(circuit_json, dict):
+            raw_type = str(circuit_json.get('type') or circuit_json.get('circuit_type') or '')
+        spec = CIRCUIT_TYPES.get(_ALIASES.get(raw_type, ''))
+        # Registered name, so rules need not know every alias
+        self.circuit_type = spec.name if spec else raw_type
+        constraints = circuit_json.get('constraints') if isinstance(circuit_json, dict) else None
+        self.constraints: Optional[Dict[str, Any]] = constraints if isinstance(constraints, dict) else None
+        self.type_counts = Counter(comp.get('type') for comp in self.components)
+        self.connectivity = Connectivity(self.components)
+
+    @cached_property
+    def dc(self) -> Optional[DCSolution]:
+        """DC operating point, solved on first use; None without a ground or source"""
+        counts = self.type_counts
+        if not counts['voltage_source'] and not counts['current_source']:
+            return None  # an undriven netlist sits at 0 V; skip the pass over its nets
+        return solve_dc(self.components)
+
+
+# A rule returns its messages (empty when the circuit passes)
+Rule = Callable[[CircuitIndex], List[ValidationMessage]]
+
+
+def list_refs(refs: List[str]) -> str:
+    """Comma-separated refs, eliding all but the first MAX_LISTED_REFS"""
+    listed = ', '.join(refs[:MAX_LISTED_REFS])
+    extra = len(refs) - MAX_LISTED_REFS
+    return f"{listed} and {extra} more" if extra > 0 else listed
+
+
+def check_floating_nodes(index: CircuitIndex) -> List[ValidationMessage]:
+    """Nets that connect to only one component (floating nodes)"""
+    return [ValidationMessage(ValidationLevel.WARNING, f"Net '{net}' connects to only one component: {comp_id}")
+            for net, comp_id in index.connectivity.floating_nets()]
+
+
+def check_islands(index: CircuitIndex) -> List[ValidationMessage]:
+    """Groups of components with no connection to the rest of the circuit"""
+    connectivity = index.connectivity
+    if connectivity.has_ground:
+        return [ValidationMessage(ValidationLevel.WARNING, f"No path to ground from {list_refs(refs)}", refs[0])
+                for refs in connectivity.ungrounded()]
+    return [ValidationMessage(ValidationLevel.WARNING,
+                              f"{list_refs(refs)} not connected to the rest of the circuit", refs[0])
+            for refs in connectivity.islands()[1:]]
+
+
+def check_shorts(index: CircuitIndex) -> List[ValidationMessage]:
+    """Parts with every pin on one net, and voltage sources in parallel"""
+    messages = []
+    for comp_id, comp_type, net in index.connectivity.shorted:
+        if comp_type == 'voltage_source':
+            messages.append(ValidationMessage(
+                ValidationLevel.ERROR, f"Voltage source {comp_id} is shorted: both terminals on net '{net}'", comp_id))
+        else:
+            messages.append(ValidationMessage(
+                ValidationLevel.WARNING, f"Component {comp_id} is shorted: all pins on net '{net}'", comp_id))
+    for first, second, (net_a, net_b) in index.connectivity.parallel_sources:
+        messages.append(ValidationMessage(
+            ValidationLevel.WARNING,
+            f"Voltage sources {first} and {second} are in parallel across '{net_a}' and '{net_b}'", second))
+    return messages
+
+
+def check_dc_operating_point(index: CircuitIndex) -> List[ValidationMessage]:
+    """Over-power resistors, source loops and nets left floating at DC"""
+    solution = index.dc
+    if solution is None:
+        return []
+    messages = []
+    # A source with both terminals on one net is already reported as shorted
+    shorted = {ref for ref, _, _ in index.connectivity.shorted}
+    for ref in solution.source_loops:
+        if ref not in shorted:
+            messages.append(ValidationMessage(
+                ValidationLevel.ERROR, f"{ref} closes a loop of voltage sources and inductors with no resistance", ref))
+    if solution.singular:
+        messages.append(ValidationMessage(
+            ValidationLevel.WARNING, "DC operating point has no unique solution; check op-amp feedback"))
+        return messages
+
+    power, currents = solution.power, solution.currents
+    for comp in index.components:
+        ref = comp.get('id')
+        if comp.get('type') != 'resistor' or ref not in power:
+            continue
+        rating = resistor_rating(comp)
+        if power[ref] > rating:
+            messages.append(ValidationMessage(
+                ValidationLevel.ERROR,
+                f"Resistor {ref} dissipates {si_units.format_value(power[ref], 'W')}, "
+                f"over its {si_units.format_value(rating, 'W')} rating",
+                ref, {'power': power[ref], 'rating': rating, 'current': currents[ref]}))
+    for net in solution.floating_nets:
+        messages.append(ValidationMessage(
+            ValidationLevel.WARNING, f"Net '{net}' has no DC path to ground; its voltage is undefined"))
+    for comp in index.components:
+        ref = comp.get('id')
+        if comp.get('type') in ('voltage_source', 'current_source') and ref in power:
+            messages.append(ValidationMessage(
+                ValidationLevel.INFO,
+                f"{ref} supplies {si_units.format_value(abs(currents[ref]), 'A')} "
+                f"({si_units.format_value(power[ref], 'W')})",
+                ref, {'current': currents[ref], 'power': power[ref]}))
+    if solution.unmodeled:
+        messages.append(ValidationMessage(
+            ValidationLevel.INFO, f"{list_refs(solution.unmodeled)} treated as open at DC"))
+    messages.append(ValidationMessage(
+        ValidationLevel.INFO, f"DC operating point solved for {len(solution.node_voltages)} nets", None,
+        {'node_voltages': solution.node_voltages, 'currents': currents, 'power': power}))
+    return messages
+
+
+def requires_ground(index: CircuitIndex) -> List[ValidationMessage]:
+    """A ground net must be present"""
+    if index.connectivity.has_ground:
+        return []
+    return [ValidationMessage(ValidationLevel.ERROR, "Circuit requires a ground (GND) node but none found")]
+
+
+def requires_parts(label: str, **minimum: int) -> Rule:
+    """Rule requiring at least minimum[type] components of each type"""
+    wanted = ' and '.join(f"{count} {comp_type}{'s' if count > 1 else ''}" for comp_type, count in minimum.items())
+    message = f"{label} must have at least {wanted}"
+
+    def rule(index: CircuitIndex) -> List[ValidationMessage]:
+        counts = index.type_counts
+        if all(counts[comp_type] >= count for comp_type, count in minimum.items()):
+            return []
+        return [ValidationMessage(ValidationLevel.ERROR, message)]
+
+    rule.__name__ = f"requires_parts({', '.join(minimum)})"
+    return rule
+
+
+def requires_constraints(*names: str) -> Rule:
+    """Rule requiring constraint values, when the circuit carries constraints at all"""
+    def rule(index: CircuitIndex) -> List[ValidationMessage]:
+        constraints = index.constraints
+        # Generated netlists come without their design constraints
+        if constraints is None or all(constraints.get(name) for name in names):
+            return []
+        return [ValidationMessage(
+            ValidationLevel.ERROR, f"{index.circuit_type} requires {' and '.join(names)} in constraints")]
+
+    rule.__name__ = f"requires_constraints({', '.join(names)})"
+    return rule
+
+
+@dataclass(frozen=True)
+class CircuitTypeSpec:
+    """
+    Rules of one circuit type
+
+    Attributes:
+        name: Name used by intent extraction (rc_lowpass)
+        json_type: 'type' written into generated circuit JSON (rc_lowpass_filter)
+        rules: Checks run after COMMON_RULES
+        aliases: Other names accepted for the type
+    """
+    name: str
+    json_type: str
+    rules: Tuple[Rule, ...]
+    aliases: Tuple[str, ...] = ()
+
+
+# Run for every circuit, registered or not
+COMMON_RULES: Tuple[Rule, ...] = (check_floating_nodes, check_islands, check_shorts, check_dc_operating_point)
+
+CIRCUIT_TYPES: Dict[str, CircuitTypeSpec] = {}
+_ALIASES: Dict[str, str] = {}
+_COMPILED: Dict[str, Tuple[Rule, ...]] = {}
+
+
+def register_circuit_type(name: str, json_type: str, *rules: Rule, aliases: Tuple[str, ...] = ()):
+    """Declare a circuit type and its rules, replacing any earlier declaration"""
+    spec = CircuitTypeSpec(name, json_type, tuple(rules), tuple(aliases))
+    CIRCUIT_TYPES[name] = spec
+    for alias in (name, json_type, *aliases):
+        _ALIASES[alias] = name
+    _COMPILED[name] = COMMON_RULES + spec.rules
+
+
+def compiled_rules(circuit_type: str) -> Tuple[Rule, ...]:
+    """Flat rule tuple for a registered name or alias; COMMON_RULES otherwise"""
+    return _COMPILED.get(_ALIASES.get(circuit_type, ''), COMMON_RULES)
+
+
+def json_type(circuit_type: str) -> str:
+    """Generated-JSON 'type' for a circuit type name, unchanged if unregistered"""
+    spec = CIRCUIT_TYPES.get(_ALIASES.get(circuit_type, ''))
+    return spec.json_type if spec else circuit_type
+
+
+def run_rules(index: CircuitIndex, rules: Tuple[Rule, ...] = None, stop_on_error: bool = False,
+              timings: Optional[Dict[str, float]] = None) -> List[ValidationMessage]:
+    """
+    Run rules over an index
+
+    Args:
+        index: Precomputed circuit index
+        rules: Rules to run; defaults to the compiled rules of index.circuit_type
+        stop_on_error: Return as soon as a rule reports an ERROR
+        timings: If given, seconds spent per rule name are added to it
+
+    Returns:
+        Messages of every rule run, in rule order
+    """
+    if rules is None:
+        rules = compiled_rules(index.circuit_type)
+    messages: List[ValidationMessage] = []
+    for rule in rules:
+        if timings is None:
+            found = rule(index)
+        else:
+            start = time.perf_counter()
+            found = rule(index)
+            timings[rule.__name__] = timings.get(rule.__name__, 0.0) + time.perf_counter() - start
+        messages.extend(found)
+        if stop_on_error and any(m.level == ValidationLevel.ERROR for m in found):
+            break
+    return messages
+
+
+register_circuit_type(
+    'rc_lowpass', 'rc_lowpass_filter',
+    requires_ground, requires_parts('RC filter', resistor=1, capacitor=1), requires_constraints('cutoff_freq'))
+register_circuit_type(
+    'rc_highpass', 'rc_highpass_filter',
+    requires_ground, requires_parts('RC filter', resistor=1, capacitor=1), requires_constraints('cutoff_freq'))
+register_circuit_type(
+    'rc_filter', 'rc_filter',
+    requires_ground, requires_parts('RC filter', resistor=1, capacitor=1))
+register_circuit_type(
+    'voltage_divider', 'voltage_divider',
+    requires_parts('Voltage divider', resistor=2), requires_constraints('input_voltage', 'output_voltage'))
@@ -0,0 +1,121 @@
+"""
+Incremental value patching for generated circuits
+Recognizes SKiDL scripts that differ from an earlier one only in component
+values and rewrites just the Value fields of the cached netlist and
+schematic, using character offsets recorded when they were first generated
+"""
+
+import hashlib
+import io
+import re
+from typing import Dict, List, Optional, Tuple
+
+from netlist_parser import tokenize, LPAREN, RPAREN, STRING
+
+Span = Tuple[int, int]
+
+# Matches generated Part lines, e.g. R1 = Part('Device', 'R', value='1k', ...)
+_PART_VALUE_RE = re.compile(r"^(\w+) = Part\((.*?)value='([^']*)'", re.MULTILINE)
+
+
+def topology_signature(skidl_code: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Hash of a SKiDL script with component values blanked out
+
+    Args:
+        skidl_code: Generated SKiDL script
+
+    Returns:
+        Tuple of (signature, {ref: value})
+    """
+    values = {match.group(1): match.group(3) for match in _PART_VALUE_RE.finditer(skidl_code)}
+    normalized = _PART_VALUE_RE.sub(lambda m: f"{m.group(1)} = Part({m.group(2)}value=?", skidl_code)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest(), values
+
+
+def _value_spans(text: str, owner: List[str], ref_field: str, value_field: str) -> Dict[str, Span]:
+    """
+    Offsets of value strings keyed by reference
+
+    Walks the S-expression once. Inside each list at path owner, the first
+    string of the ref_field child names the element and the span of the
+    value_field child's value string is recorded. For schematics the fields
+    are properties, whose first string is the property name.
+    """
+    spans: Dict[str, Span] = {}
+    path: List[str] = []
+    strings: List[Tuple[str, Span]] = []  # strings seen in the current field list
+    ref = value_span = None
+    expect_head = False
+    field_depth = len(owner) + 1
+
+    for kind, value, start, end in tokenize(io.StringIO(text)):
+        if kind == LPAREN:
+            if expect_head:
+                path.append('')
+            expect_head = True
+            continue
+        if kind == RPAREN:
+            if expect_head:
+                expect_head = False
+                continue
+            if len(path) == field_depth and path[:-1] == owner:
+                head = path[-1]
+                if head == 'property' and len(strings) >= 2:
+                    head, strings = strings[0][0], strings[1:]
+                if strings and head == ref_field:
+                    ref = strings[0][0]
+                elif strings and head == value_field:
+                    value_span = strings[0][1]
+                strings = []
+            elif len(path) == len(owner) and path == owner:
+                if ref is not None and value_span is not None:
+                    spans[ref] = value_span
+                ref = value_span = None
+            path.pop()
+            continue
+        if expect_head:
+            path.append(value)
+            expect_head = False
+        elif kind == STRING and len(path) == field_depth and path[:-1] == owner:
+            strings.append((value, (start, end)))
+
+    return spans
+
+
+def netlist_value_spans(text: str) -> Dict[str, Span]:
+    """Offsets of each (comp (ref ...) (value "...")) value string in a KiCad netlist"""
+    return _value_spans(text, ['export', 'components', 'comp'], 'ref', 'value')
+
+
+def schematic_value_spans(text: str) -> Dict[str, Span]:
+    """Offsets of each placed symbol's Value property string in a .kicad_sch"""
+    return _value_spans(text, ['kicad_sch', 'symbol'], 'Reference', 'Value')
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def patch_values(text: str, spans: Dict[str, Span], values: Dict[str, str]) -> Optional[str]:
+    """
+    Replace value strings at known offsets
+
+    Args:
+        text: Template document
+        spans: Offsets of each reference's quoted value string in text
+        values: New values by reference
+
+    Returns:
+        Patched text, or None if a reference has no recorded offset
+    """
+    if any(ref not in spans for ref in values):
+        return None
+    pieces = []
+    pos = 0
+    for start, end, ref in sorted((spans[ref][0], spans[ref][1], ref) for ref in values):
+        pieces.append(text[pos:start])
+        pieces.append(_quote(values[ref]))
+        pos = end
+    pieces.append(text[pos:])
+    return ''.join(pieces)
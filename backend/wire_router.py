@@ -0,0 +1,219 @@
+"""
+Manhattan wire router for generated schematics
+Connects placed pins net by net with orthogonal segments, using a grid
+index of occupied cells so every collision check costs one dict lookup per
+cell rather than a scan over everything already drawn
+"""
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from placement import Placement
+from analytics import metrics
+
+# Routing cell: half the 2.54 mm grid, so 3.81 mm pin offsets land on cells
+CELL = 1.27
+BODY_MARGIN = 2  # cells of symbol body on each side of the origin
+
+Cell = Tuple[int, int]
+Point = Tuple[float, float]
+Segment = Tuple[Cell, Cell]
+
+
+def to_cell(point: Point) -> Cell:
+    return (round(point[0] / CELL), round(point[1] / CELL))
+
+
+def to_point(cell: Cell) -> Point:
+    return (round(cell[0] * CELL, 4), round(cell[1] * CELL, 4))
+
+
+def _cells(start: Cell, end: Cell) -> Iterable[Cell]:
+    """Cells covered by an axis-aligned segment, endpoints included"""
+    (x1, y1), (x2, y2) = start, end
+    if y1 == y2:
+        step = 1 if x2 >= x1 else -1
+        return ((x, y1) for x in range(x1, x2 + step, step))
+    step = 1 if y2 >= y1 else -1
+    return ((x1, y) for y in range(y1, y2 + step, step))
+
+
+@dataclass
+class RoutedNet:
+    name: str
+    wires: List[Tuple[Point, Point]] = field(default_factory=list)
+    junctions: List[Point] = field(default_factory=list)
+    labels: List[Point] = field(default_factory=list)
+    duration: float = 0.0
+
+
+class WireRouter:
+    """
+    Routes nets over a placement
+
+    The index keeps, per cell, the net owning a horizontal wire, the net
+    owning a vertical wire, and the net owning a connection point (pin, wire
+    end or corner). A candidate segment is rejected if it enters a symbol
+    body, overlaps another net's wire, passes through another net's
+    connection point, or ends on another net's wire. Perpendicular crossings
+    are allowed; KiCad only joins them at a junction.
+    """
+
+    def __init__(self, placement: Placement, pins: Dict[str, List[Tuple[str, str]]],
+                 record_route: Optional[Callable[[str, int, float, bool], None]] = None):
+        """
+        Args:
+            placement: Placed symbols
+            pins: Net name to its (ref, pin) nodes
+            record_route: Called with (net, pins, duration, routed) per net;
+                metrics.record_net_route by default
+        """
+        self.placement = placement
+        self.record_route = record_route or metrics.record_net_route
+        self.body: Set[Cell] = set()
+        self.horizontal: Dict[Cell, str] = {}
+        self.vertical: Dict[Cell, str] = {}
+        self.points: Dict[Cell, str] = {}
+
+        for symbol in placement.symbols.values():
+            self._add_body(symbol)
+        for name, nodes in pins.items():
+            for cell in self._pin_cells(nodes):
+                self.points[cell] = name
+
+    def _add_body(self, symbol):
+        ox, oy = to_cell((symbol.x, symbol.y))
+        x_lo, x_hi, y_lo, y_hi = -BODY_MARGIN, BODY_MARGIN, -BODY_MARGIN, BODY_MARGIN
+        # Stretch the body up to, but not over, each pin tip
+        for dx, dy in symbol.pins.values():
+            cx, cy = round(dx / CELL), round(dy / CELL)
+            if abs(cy) >= abs(cx):
+                y_lo, y_hi = min(y_lo, cy + 1), max(y_hi, cy - 1)
+            else:
+                x_lo, x_hi = min(x_lo, cx + 1), max(x_hi, cx - 1)
+        for x in range(ox + x_lo, ox + x_hi + 1):
+            for y in range(oy + y_lo, oy + y_hi + 1):
+                self.body.add((x, y))
+
+    def _pin_cells(self, nodes: List[Tuple[str, str]]) -> List[Cell]:
+        cells = []
+        for ref, pin in nodes:
+            symbol = self.placement.symbols.get(ref)
+            if symbol is not None:
+                cell = to_cell(symbol.pin_position(pin))
+                if cell not in cells:
+                    cells.append(cell)
+        return cells
+
+    def _segment_free(self, net: str, start: Cell, end: Cell) -> bool:
+        owners = self.horizontal if start[1] == end[1] else self.vertical
+        for cell in _cells(start, end):
+            if cell in self.body:
+                return False
+            if owners.get(cell, net) != net or self.points.get(cell, net) != net:
+                return False
+            if cell in (start, end) and (self.horizontal.get(cell, net) != net or
+                                         self.vertical.get(cell, net) != net):
+                return False
+        return True
+
+    def _candidates(self, start: Cell, end: Cell) -> Iterable[List[Cell]]:
+        """Paths as corner lists: straight, both L shapes, then Z shapes through a channel"""
+        (x1, y1), (x2, y2) = start, end
+        if x1 == x2 or y1 == y2:
+            yield [start, end]
+        yield [start, (x2, y1), end]
+        yield [start, (x1, y2), end]
+        mid_x = (x1 + x2) // 2
+        for offset in (0, 1, -1, 2, -2):
+            x = mid_x + offset
+            yield [start, (x, y1), (x, y2), end]
+        mid_y = (y1 + y2) // 2
+        for offset in (0, 1, -1, 2, -2):
+            y = mid_y + offset
+            yield [start, (x1, y), (x2, y), end]
+
+    def _find_path(self, net: str, start: Cell, end: Cell) -> Optional[List[Segment]]:
+        for corners in self._candidates(start, end):
+            segments = [(a, b) for a, b in zip(corners, corners[1:]) if a != b]
+            if all(self._segment_free(net, a, b) for a, b in segments):
+                return segments
+        return None
+
+    def _commit(self, net: str, segments: List[Segment], ends: Counter, interior: Set[Cell]):
+        for start, end in segments:
+            owners = self.horizontal if start[1] == end[1] else self.vertical
+            for cell in _cells(start, end):
+                owners[cell] = net
+                if cell not in (start, end):
+                    interior.add(cell)
+            for cell in (start, end):
+                ends[cell] += 1
+                self.points[cell] = net
+
+    def route_net(self, name: str, nodes: List[Tuple[str, str]]) -> RoutedNet:
+        """
+        Route one net
+
+        Pins are joined in x order, each to the previous pin (or, failing
+        that, the first pin). Pins that cannot be reached get a net label.
+
+        Args:
+            name: Net name
+            nodes: (ref, pin) pairs on the net
+
+        Returns:
+            RoutedNet with wires, junctions and fallback label positions
+        """
+        started = time.perf_counter()
+        result = RoutedNet(name)
+        pins = sorted(self._pin_cells(nodes))
+        ends: Counter = Counter()
+        interior: Set[Cell] = set()
+        labelled: Set[Cell] = set()
+
+        if len(pins) == 1:
+            labelled.add(pins[0])
+        for i in range(1, len(pins)):
+            target = pins[i]
+            for anchor in dict.fromkeys((pins[i - 1], pins[0])):
+                segments = self._find_path(name, anchor, target)
+                if segments is not None:
+                    self._commit(name, segments, ends, interior)
+                    result.wires.extend((to_point(a), to_point(b)) for a, b in segments)
+                    break
+            else:
+                labelled.update((pins[i - 1], target))
+
+        pin_set = set(pins)
+        for cell in sorted(set(ends) | pin_set):
+            degree = ends[cell] + (cell in pin_set) + 2 * (cell in interior)
+            if degree >= 3:
+                result.junctions.append(to_point(cell))
+        result.labels = [to_point(cell) for cell in sorted(labelled)]
+        result.duration = time.perf_counter() - started
+        self.record_route(name, len(pins), result.duration, not labelled or len(pins) == 1)
+        return result
+
+    def route(self, nets: Dict[str, List[Tuple[str, str]]]) -> List[RoutedNet]:
+        """
+        Route several nets, shortest first so local connections get the
+        direct paths
+
+        Args:
+            nets: Net name to its (ref, pin) nodes
+
+        Returns:
+            RoutedNet per net, in routing order
+        """
+        def span(item):
+            cells = self._pin_cells(item[1])
+            if not cells:
+                return 0
+            xs = [x for x, _ in cells]
+            ys = [y for _, y in cells]
+            return (max(xs) - min(xs)) + (max(ys) - min(ys))
+
+        return [self.route_net(name, nodes) for name, nodes in sorted(nets.items(), key=span)]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+AC Analysis Benchmark
+Times the batched frequency sweep against solving one frequency at a time,
+and a cache hit, for synthesized filters of growing order
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (the analysis imports its siblings flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import numpy as np
+
+import ac_analysis
+from filter_synthesis import synthesize_filter
+
+POINTS = 1000
+ORDERS = (2, 4, 8)
+
+
+def _per_frequency_ms(circuit):
+    """Same system, one np.linalg.solve per frequency"""
+    components = circuit['components']
+    input_net, output_net = ac_analysis.pick_nets(components, None, None)
+    system = ac_analysis.build_mna(components, input_net)
+    G, C, b, out_row = system.G, system.C, system.drive, system.row(output_net)
+    freqs = ac_analysis._sweep(circuit, None, None, POINTS)
+    start = time.perf_counter()
+    for f in freqs:
+        np.linalg.solve(G + 2j * np.pi * f * C, b)[out_row]
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    print("\n" + "="*60)
+    print("AC ANALYSIS BENCHMARK")
+    print("="*60)
+    print(f"\n  {POINTS} sweep points")
+    for topology in ('sallen_key', 'rc_ladder'):
+        for order in ORDERS:
+            circuit = synthesize_filter(1000, order, 'butterworth', 'lowpass', topology)
+            ac_analysis._cache.clear()
+            start = time.perf_counter()
+            response = ac_analysis.analyze_ac(circuit, points=POINTS)
+            batched = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            ac_analysis.analyze_ac(circuit, points=POINTS)
+            cached = (time.perf_counter() - start) * 1000
+            print(f"\n  {topology} order {order}: -3 dB at {response.cutoff_freq:.1f} Hz, "
+                  f"{response.rolloff_db_per_decade:.1f} dB/decade")
+            print(f"    batched sweep:  {batched:8.2f} ms")
+            print(f"    per frequency:  {_per_frequency_ms(circuit):8.2f} ms")
+            print(f"    cache hit:      {cached:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
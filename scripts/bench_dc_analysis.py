@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+DC Operating Point Benchmark
+Solves driven resistor ladders of growing size and reports the solve time
+with and without the sparse path
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (the solver imports its siblings flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import dc_analysis
+from dc_analysis import solve_dc
+
+SIZES = (100, 1_000, 10_000, 100_000)
+REPEATS = 3
+
+
+def _ladder(nodes):
+    """Voltage source driving a series/shunt resistor ladder with `nodes` nets"""
+    components = [{'id': 'V1', 'type': 'voltage_source', 'value': '5', 'nets': ['N0', 'GND']}]
+    for i in range(nodes):
+        components.append({'id': f'R{i}', 'type': 'resistor', 'value': '1k', 'nets': [f'N{i}', f'N{i + 1}']})
+        components.append({'id': f'S{i}', 'type': 'resistor', 'value': '10k', 'nets': [f'N{i + 1}', 'GND']})
+    return components
+
+
+def _best_ms(components):
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        solve_dc(components)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    print("\n" + "="*60)
+    print("DC OPERATING POINT BENCHMARK")
+    print("="*60)
+    sparse = dc_analysis.splu is not None
+    print(f"\n  SciPy sparse solver: {'available' if sparse else 'not installed (dense only)'}")
+    for nodes in SIZES:
+        components = _ladder(nodes)
+        print(f"\n  {nodes:,} nodes ({len(components):,} parts)")
+        print(f"    default path: {_best_ms(components):9.2f} ms")
+        if nodes <= 1_000:
+            threshold = dc_analysis.SPARSE_THRESHOLD
+            dc_analysis.SPARSE_THRESHOLD = 10 ** 9
+            try:
+                print(f"    dense NumPy:  {_best_ms(components):9.2f} ms")
+            finally:
+                dc_analysis.SPARSE_THRESHOLD = threshold
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+E-Series Lookup Benchmark
+Times one million nearest-value lookups per series, vectorized and scalar
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (e_series is imported flat by its users)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import numpy as np
+
+import e_series
+
+LOOKUPS = 1_000_000
+SCALAR_LOOKUPS = 100_000
+
+
+def main():
+    print("\n" + "="*60)
+    print("E-SERIES LOOKUP BENCHMARK")
+    print("="*60)
+    rng = np.random.default_rng(0)
+    values = 10 ** rng.uniform(-12, 9, LOOKUPS)
+    for series in e_series.SERIES:
+        e_series.table(series)  # build the table before timing
+        start = time.perf_counter()
+        e_series.nearest(values, series)
+        vectorized = time.perf_counter() - start
+
+        scalars = values[:SCALAR_LOOKUPS].tolist()
+        start = time.perf_counter()
+        for value in scalars:
+            e_series.nearest(value, series)
+        scalar = (time.perf_counter() - start) * LOOKUPS / SCALAR_LOOKUPS
+        print(f"  {series:>5}: {vectorized * 1000:8.1f} ms array, "
+              f"{scalar * 1000:8.1f} ms scalar (per {LOOKUPS:,} lookups)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Filter Synthesis Benchmark
+Times Sallen-Key and RC ladder synthesis for orders 2-8 and reports how
+close the standard-value designs land to the requested cutoff
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (the synthesis module imports its siblings flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from filter_synthesis import FILTER_TYPES, RESPONSES, synthesize_filter
+
+CUTOFFS = (50.0, 1000.0, 12500.0)
+REPEATS = 5
+
+
+def _time(**kwargs):
+    """Best-of-REPEATS milliseconds and worst cutoff error over CUTOFFS"""
+    best, worst_error = float('inf'), 0.0
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        designs = [synthesize_filter(cutoff, **kwargs) for cutoff in CUTOFFS]
+        best = min(best, (time.perf_counter() - start) / len(CUTOFFS))
+    for design in designs:
+        worst_error = max(worst_error, design['synthesis']['cutoff_error_percent'] or float('inf'))
+    return best * 1000, worst_error
+
+
+def main():
+    print("\n" + "="*60)
+    print("FILTER SYNTHESIS BENCHMARK")
+    print("="*60)
+    synthesize_filter(1000.0, 2)  # build series tables before timing
+    for filter_type in FILTER_TYPES:
+        for response in RESPONSES:
+            print(f"\n  Sallen-Key {response} {filter_type}")
+            for order in range(2, 9):
+                ms, error = _time(order=order, response=response, filter_type=filter_type)
+                print(f"    order {order}: {ms:7.2f} ms per design, worst cutoff error {error:5.2f}%")
+        print(f"\n  RC ladder {filter_type}")
+        for order in range(2, 9):
+            ms, error = _time(order=order, filter_type=filter_type, topology='rc_ladder')
+            print(f"    order {order}: {ms:7.2f} ms per design, worst cutoff error {error:5.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Component Optimizer Benchmark
+Times the exhaustive RC pair search, batched voltage divider searches and
+looped versus batched calculator sweeps, and lookups in a large parts catalog
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (the optimizer imports its siblings flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import numpy as np
+
+from circuit_optimizer import ComponentOptimizer
+from component_calculator import ComponentCalculator
+from parts_catalog import CatalogPart, PartsCatalog
+
+
+def main():
+    print("\n" + "="*60)
+    print("COMPONENT OPTIMIZER BENCHMARK")
+    print("="*60)
+    for series in ('E12', 'E24', 'E96', 'E192'):
+        optimizer = ComponentOptimizer()
+        optimizer.search_rc_pairs(1000, r_series=series, c_series=series)  # build tables before timing
+        start = time.perf_counter()
+        optimizer.search_rc_pairs(1234, r_series=series, c_series=series)
+        print(f"  RC search {series:>5}: {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    rng = np.random.default_rng(0)
+    for targets in (1000, 10000):
+        vin = rng.uniform(3, 48, targets)
+        vout = vin * rng.uniform(0.05, 0.95, targets)
+        for series in ('E12', 'E96'):
+            start = time.perf_counter()
+            result = ComponentOptimizer().search_divider_batch(vin, vout, max_current=1e-3, series=series)
+            elapsed = time.perf_counter() - start
+            print(f"  Divider batch {targets:>6} x {series:>4}: {elapsed * 1000:8.1f} ms "
+                  f"(worst error {np.nanmax(result['error_percent']):.2f}%)")
+
+    freqs = np.logspace(0, 6, 2000)
+    start = time.perf_counter()
+    looped = [ComponentCalculator.calculate_rc_filter(f) for f in freqs]
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    result = ComponentCalculator.calculate_rc_filter_batch(freqs)
+    batch_time = time.perf_counter() - start
+    formatted = ComponentCalculator.format_batch(result)
+    assert formatted == looped
+    print(f"  RC sweep {len(freqs)} targets: {loop_time * 1000:8.1f} ms looped, "
+          f"{batch_time * 1000:8.1f} ms batched ({loop_time / batch_time:.0f}x)")
+
+    # 50k SKUs spread over 1 ohm to 10M in three packages
+    values = np.round(10 ** rng.uniform(0, 7, 50_000), 2)
+    catalog = PartsCatalog(CatalogPart(f"R{i}", 'resistor', float(v), 0.01, ('0402', '0603', '0805')[i % 3], 100)
+                           for i, v in enumerate(values))
+    start = time.perf_counter()
+    catalog.values('resistor')
+    print(f"  Catalog index {len(catalog)} SKUs: {(time.perf_counter() - start) * 1000:8.1f} ms")
+    targets = (10 ** rng.uniform(0, 7, 100_000)).tolist()
+    start = time.perf_counter()
+    for target in targets:
+        catalog.nearest('resistor', target)
+    elapsed = time.perf_counter() - start
+    print(f"  Catalog nearest: {elapsed / len(targets) * 1e6:8.2f} us per lookup")
+    optimizer = ComponentOptimizer(catalog=catalog)
+    start = time.perf_counter()
+    result = optimizer.search_divider_batch(vin[:100], vout[:100], max_current=1e-3)
+    print(f"  Divider batch 100 over catalog: {(time.perf_counter() - start) * 1000:8.1f} ms "
+          f"(worst error {np.nanmax(result['error_percent']):.3f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Placement Benchmark
+Times automatic placement on synthetic RC ladder netlists of growing size
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (placement imports its siblings flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from netlist_parser import Netlist, NetlistComponent, NetlistNet, NetlistNode
+from placement import place
+
+
+def rc_ladder(parts: int) -> Netlist:
+    """IN -[R]- N1 -[R]- N2 ... OUT, with a capacitor to GND at every node"""
+    netlist = Netlist()
+    stages = max(parts // 2, 1)
+    nets = {'IN': [], 'GND': []}
+    for i in range(stages):
+        left = 'IN' if i == 0 else f'N{i}'
+        right = 'OUT' if i == stages - 1 else f'N{i + 1}'
+        netlist.components.append(NetlistComponent(f'R{i + 1}', '1k', 'Device', 'R'))
+        netlist.components.append(NetlistComponent(f'C{i + 1}', '100n', 'Device', 'C'))
+        nets.setdefault(left, []).append(NetlistNode(f'R{i + 1}', '1'))
+        nets.setdefault(right, []).append(NetlistNode(f'R{i + 1}', '2'))
+        nets[right].append(NetlistNode(f'C{i + 1}', '1'))
+        nets['GND'].append(NetlistNode(f'C{i + 1}', '2'))
+    netlist.nets = [NetlistNet(code, name, nodes) for code, (name, nodes) in enumerate(nets.items(), start=1)]
+    return netlist
+
+
+def main():
+    print("\n" + "="*60)
+    print("PLACEMENT BENCHMARK")
+    print("="*60)
+    place(rc_ladder(2))  # load the symbol library before timing
+    for parts in (10, 100, 1000, 10000):
+        netlist = rc_ladder(parts)
+        start = time.perf_counter()
+        placement = place(netlist)
+        elapsed = time.perf_counter() - start
+        print(f"  {parts:>6} parts: {elapsed * 1000:8.1f} ms "
+              f"({placement.width:.0f} x {placement.height:.0f} mm)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+SI Value Parsing Benchmark
+Compares the shared cached parser with the per-call parser the explainer used
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (si_units is imported flat by its users)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import numpy as np
+
+import si_units
+
+VALUES = ["1k", "4.7k", "10k", "159n", "100nF", "2.2uF", "33n", "1M", "470", "5V", "1kHz", "4k7"]
+CALLS = 200_000
+
+
+def legacy_parse(value_str):
+    """The explainer's former parser: rebuilds its tables and imports re per call"""
+    value_str = value_str.strip().lower()
+    multipliers = {'g': 1e9, 'm': 1e6, 'k': 1e3, 'h': 1e2, 'da': 1e1, 'd': 1e-1,
+                   'c': 1e-2, 'µ': 1e-6, 'u': 1e-6, 'n': 1e-9, 'p': 1e-12, 'f': 1e-15}
+    import re
+    match = re.match(r'([0-9.]+)\s*([a-zµ]*)', value_str)
+    if match:
+        number = float(match.group(1))
+        for prefix, multiplier in multipliers.items():
+            if match.group(2).startswith(prefix):
+                return number * multiplier
+        return number
+    return None
+
+
+def timed(label, func, values):
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1e9 / len(values):8.0f} ns/value")
+    return elapsed
+
+
+def main():
+    print("\n" + "="*60)
+    print("SI VALUE PARSING BENCHMARK")
+    print("="*60)
+    values = (VALUES * (CALLS // len(VALUES) + 1))[:CALLS]
+    legacy = timed("legacy explainer parser", legacy_parse, values)
+    cached = timed("si_units.parse (cached)", si_units.parse, values)
+    si_units._parse_text.cache_clear()
+    unique = [f"{i}k" for i in range(CALLS // 10)]
+    timed("si_units.parse (all misses)", si_units.parse, unique)
+
+    start = time.perf_counter()
+    si_units.parse_array(np.array(values))
+    array = time.perf_counter() - start
+    print(f"  {'si_units.parse_array':<28} {array * 1e9 / len(values):8.0f} ns/value")
+    print(f"\n  Cached parse speedup over legacy: {legacy / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
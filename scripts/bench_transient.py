@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Transient Simulation Benchmark
+Times 1M-step fixed runs of small circuits, evaluated in blocks and one step
+at a time, and an adaptive run of the same span
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (the simulator imports its siblings flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+import numpy as np
+
+import transient_analysis
+from filter_synthesis import synthesize_filter
+from transient_analysis import simulate_transient
+
+STEPS = 1_000_000
+# Stepping one at a time is slow enough to time over fewer steps and scale up
+SINGLE_STEPS = 100_000
+
+
+def _circuits():
+    yield 'rc lowpass', {'constraints': {'cutoff_freq': '1k'}, 'components': [
+        {'id': 'R1', 'type': 'resistor', 'value': '1k', 'nets': ['IN', 'OUT']},
+        {'id': 'C1', 'type': 'capacitor', 'value': '159.155n', 'nets': ['OUT', 'GND']},
+    ]}
+    yield 'series rlc', {'constraints': {'cutoff_freq': '5k'}, 'components': [
+        {'id': 'R1', 'type': 'resistor', 'value': '10', 'nets': ['IN', 'A']},
+        {'id': 'L1', 'type': 'inductor', 'value': '1m', 'nets': ['A', 'OUT']},
+        {'id': 'C1', 'type': 'capacitor', 'value': '1u', 'nets': ['OUT', 'GND']},
+    ]}
+    yield 'sallen-key order 4', synthesize_filter(1000, 4, 'butterworth', 'lowpass', 'sallen_key')
+
+
+def _timed(circuit, **options):
+    start = time.perf_counter()
+    result = simulate_transient(circuit, **options)
+    return result, time.perf_counter() - start
+
+
+def main():
+    print("\n" + "="*60)
+    print("TRANSIENT SIMULATION BENCHMARK")
+    print("="*60)
+    sine = lambda t: np.sin(2 * np.pi * 1000 * t)
+    for name, circuit in _circuits():
+        print(f"\n  {name}")
+        for label, source in (('step', None), ('1 kHz sine', sine)):
+            _, seconds = _timed(circuit, steps=STEPS, source=source)
+            print(f"    {STEPS:,} steps, {label:10s} {seconds * 1000:8.1f} ms  "
+                  f"({seconds / STEPS * 1e9:6.0f} ns/step)")
+        entries = transient_analysis.MAX_BLOCK_ENTRIES
+        transient_analysis.MAX_BLOCK_ENTRIES = 0
+        try:
+            _, seconds = _timed(circuit, steps=SINGLE_STEPS, source=sine)
+        finally:
+            transient_analysis.MAX_BLOCK_ENTRIES = entries
+        print(f"    one step at a time:        {seconds / SINGLE_STEPS * STEPS * 1000:8.1f} ms  "
+              f"({seconds / SINGLE_STEPS * 1e9:6.0f} ns/step)")
+        result, seconds = _timed(circuit, adaptive=True)
+        print(f"    adaptive step:             {seconds * 1000:8.1f} ms  "
+              f"({result.steps:,} steps, {result.rejected} retried)")
+
+
+if __name__ == "__main__":
+    main()
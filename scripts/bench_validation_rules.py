@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Validation Rule Benchmark
+Validates RC ladders of growing size and reports the time spent in the
+schema check, the shared index and each compiled rule
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path (the validator imports its siblings flat)
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from circuit_validator import CircuitValidator
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def _ladder(parts):
+    """RC ladder of about `parts` components on a grounded lowpass type"""
+    components = []
+    for i in range(parts // 2):
+        components.append({'id': f'R{i}', 'type': 'resistor', 'value': '1k', 'nets': [f'N{i}', f'N{i + 1}']})
+        components.append({'id': f'C{i}', 'type': 'capacitor', 'value': '100n', 'nets': [f'N{i + 1}', 'GND']})
+    return {'type': 'rc_lowpass_filter', 'components': components}
+
+
+def main():
+    print("\n" + "="*60)
+    print("VALIDATION RULE BENCHMARK")
+    print("="*60)
+    validator = CircuitValidator(profile=True)
+    validator.validate(_ladder(100))  # warm the SI parser cache
+    for size in SIZES:
+        circuit = _ladder(size)
+        start = time.perf_counter()
+        validator.validate(circuit)
+        total = time.perf_counter() - start
+        print(f"\n  {size:,} parts: {total * 1000:8.1f} ms")
+        for name, seconds in validator.timings.items():
+            print(f"    {name:<40} {seconds * 1000:8.2f} ms")
+
+        # A shorted source up front: yes/no callers stop at the first error
+        circuit['components'].insert(0, {'id': 'V1', 'type': 'voltage_source', 'value': '5', 'nets': ['N0', 'N0']})
+        start = time.perf_counter()
+        validator.is_valid(circuit)
+        print(f"    {'is_valid (stops at first error)':<40} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
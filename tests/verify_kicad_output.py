@@ -1,7 +1,12 @@
 import subprocess
+import sys
 from pathlib import Path
 import json
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from netlist_parser import parse_netlist, NetlistParseError
+
 class KiCadOutputVerifier:
     def __init__(self):
         self.output_dir = Path("output_api")
@@ -9,21 +14,29 @@ class KiCadOutputVerifier:
     def verify_netlist(self, netlist_path):
         """Verify netlist file is valid"""
         try:
-            with open(netlist_path, 'r') as f:
-                content = f.read()
+            netlist = parse_netlist(netlist_path)
+            refs = {comp.ref for comp in netlist.components}
             
             checks = {
                 "file_exists": True,
-                "not_empty": len(content) > 0,
-                "has_components": "comp" in content.lower() or "part" in content.lower(),
-                "has_nets": "net" in content.lower(),
-                "valid_format": content.startswith("(") or content.startswith("<")
+                "valid_format": True,
+                "has_components": len(netlist.components) > 0,
+                "has_nets": len(netlist.nets) > 0,
+                "nodes_reference_components": all(
+                    node.ref in refs for net in netlist.nets for node in net.nodes
+                )
             }
             
             return {
                 "valid": all(checks.values()),
                 "checks": checks
             }
+        except NetlistParseError as e:
+            return {
+                "valid": False,
+                "checks": {"file_exists": True, "valid_format": False},
+                "error": str(e)
+            }
         except Exception as e:
             return {
                 "valid": False,
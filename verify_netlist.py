@@ -1,22 +1,38 @@
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from netlist_parser import parse_netlist, NetlistParseError
 
 netlist_file = 'test_voltage_divider.net'
 
 if os.path.exists(netlist_file):
     print(f"✓ Netlist file exists: {netlist_file}")
     
-    # Read and display contents
-    with open(netlist_file, 'r') as f:
-        content = f.read()
-        print("\nNetlist contents:")
-        print("-" * 50)
-        print(content)
-        print("-" * 50)
-        
-        # Check for expected components
-        if 'R1' in content and 'R2' in content:
-            print("✓ Components found in netlist")
-        else:
-            print("✗ Components missing from netlist")
+    try:
+        netlist = parse_netlist(netlist_file)
+    except NetlistParseError as e:
+        print(f"✗ Netlist is malformed: {e}")
+        sys.exit(1)
+    
+    # Display parsed contents
+    print("\nComponents:")
+    print("-" * 50)
+    for comp in netlist.components:
+        print(f"  {comp.ref:6} {comp.value:10} {comp.lib_id}")
+    print("\nNets:")
+    print("-" * 50)
+    for net in netlist.nets:
+        nodes = ', '.join(f"{node.ref}.{node.pin}" for node in net.nodes)
+        print(f"  {net.name:10} {nodes}")
+    print("-" * 50)
+    
+    # Check for expected components
+    refs = {comp.ref for comp in netlist.components}
+    if {'R1', 'R2'} <= refs:
+        print("✓ Components found in netlist")
+    else:
+        print("✗ Components missing from netlist")
 else:
     print(f"✗ Netlist file not found: {netlist_file}")